@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.database import DatabaseHandler
+
+
+SAMPLE_METRICS = {
+    'time_lapse': 1,
+    'monitoring_time': '00:00',
+    'cpu_percent': 12.5,
+    'gpu_load': 3.0,
+    'ram_free_mb': 4096.0,
+    'ram_total_mb': 16384.0,
+    'disk_free_gb': 120.5,
+    'disk_total_gb': 512.0
+}
+
+
+def bench_inserts(handler: DatabaseHandler, rows: int) -> float:
+    """Замер количества вставок в секунду через adding_data"""
+    started = time.perf_counter()
+    for _ in range(rows):
+        handler.adding_data(SAMPLE_METRICS)
+
+    return rows / (time.perf_counter() - started)
+
+
+def run(rows: int, synchronous: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy = DatabaseHandler(db_name=os.path.join(tmp_dir, 'legacy.db'))
+        legacy.logger.disabled = True
+        legacy_rate = bench_inserts(legacy, rows)
+
+        persistent = DatabaseHandler(
+            db_name=os.path.join(tmp_dir, 'persistent.db'),
+            persistent=True,
+            synchronous=synchronous
+        )
+        persistent.logger.disabled = True
+        persistent_rate = bench_inserts(persistent, rows)
+        persistent.close()
+
+    print(f"Вставок: {rows}")
+    print(f"Соединение на каждый вызов (rollback journal): {legacy_rate:10.1f} вставок/сек")
+    print(f"Постоянное соединение (WAL, synchronous={synchronous}): {persistent_rate:10.1f} вставок/сек")
+    print(f"Ускорение: x{persistent_rate / legacy_rate:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение скорости вставки метрик в SQLite")
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--synchronous', default='NORMAL')
+    args = parser.parse_args()
+    run(args.rows, args.synchronous)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.disk_monitor import DiskMonitoring
+
+
+def legacy_rom_info() -> tuple[float, float]:
+    """Прежняя реализация SystemMonitor.get_rom_info через запуск df"""
+    result = subprocess.run(['df'], stdout=subprocess.PIPE, text=True, check=True)
+    device_line = next((line for line in result.stdout.splitlines() if line.startswith('/dev/')), None)
+    if device_line is None:
+        return 0.0, 0.0
+
+    parts = re.sub(r'\x1b\[[0-9;]*[mG]', '', device_line).split()
+    return round(float(parts[3]) / (1024 * 1024), 1), round(float(parts[1]) / (1024 * 1024), 1)
+
+
+def bench(label: str, func, iterations: int) -> None:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    per_call_us = (time.perf_counter() - started) / iterations * 1_000_000
+    print(f"{label:<40} {per_call_us:12.1f} мкс/вызов")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение сбора информации о дисках: df и statvfs")
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    disk_monitoring = DiskMonitoring()
+    disk_monitoring.logger.disabled = True
+
+    bench("df (подпроцесс на каждый вызов)", legacy_rom_info, args.iterations)
+    bench("DiskMonitoring.get_rom_info (statvfs)", disk_monitoring.get_rom_info, args.iterations)
+    bench("DiskMonitoring.get_all_usage", disk_monitoring.get_all_usage, args.iterations)
+    disk_monitoring.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.database import BLOCK_COLUMNS, BLOCK_RAW_ROW_BYTES, BLOCK_WINDOW_MS
+from src.gorilla import decode_block, encode_block
+
+
+def make_window(rows: int, interval_ms: int, seed: int = 0):
+    """Синтетическое окно замеров: шаг с дрожанием, плавные и постоянные столбцы, время сессии"""
+    rng = random.Random(seed)
+    timestamps = [1_700_000_000_000 + i * interval_ms + rng.randint(-3, 3) for i in range(rows)]
+    ids = [seed * rows + i + 1 for i in range(rows)]
+    columns = []
+    for index, _ in enumerate(BLOCK_COLUMNS):
+        if index % 3 == 0:
+            columns.append([round(50 + 30 * math.sin(i / 200) + rng.random(), 1) for i in range(rows)])
+        elif index % 3 == 1:
+            columns.append([float(4096 + i // 500) for i in range(rows)])
+        else:
+            columns.append([512.0] * rows)
+    texts = [[f"{i * interval_ms // 60_000:02d}:{i * interval_ms // 1000 % 60:02d}" for i in range(rows)]]
+    return timestamps, ids, columns, texts
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def run(rows: int, interval_ms: int) -> None:
+    window_rows = min(rows, BLOCK_WINDOW_MS // interval_ms)
+    blocks = [make_window(window_rows, interval_ms, seed) for seed in range(max(1, rows // window_rows))]
+    total_rows = window_rows * len(blocks)
+    values = total_rows * len(BLOCK_COLUMNS)
+
+    encode_time, encoded = timed(lambda: [encode_block(*block) for block in blocks])
+    decode_time, _ = timed(lambda: [decode_block(data) for data in encoded])
+    single_time, _ = timed(lambda: [decode_block(data, columns=[1], texts=[]) for data in encoded])
+
+    raw_bytes = total_rows * BLOCK_RAW_ROW_BYTES
+    compressed = sum(len(data) for data in encoded)
+    print(f"Строк: {total_rows} ({len(blocks)} блоков по {window_rows}), столбцов: {len(BLOCK_COLUMNS)}")
+    print(f"Размер: {raw_bytes / 2 ** 20:.1f} МБ -> {compressed / 2 ** 20:.2f} МБ "
+          f"(x{raw_bytes / compressed:.1f}, {compressed * 8 / (values + total_rows):.2f} бит на значение)")
+    print(f"Сжатие: {values / encode_time:,.0f} значений/сек")
+    print(f"Распаковка всех столбцов: {values / decode_time:,.0f} значений/сек")
+    print(f"Распаковка одного столбца: {total_rows / single_time:,.0f} строк/сек")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Степень сжатия и скорость распаковки блоков Gorilla")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--interval-ms', type=int, default=500)
+    args = parser.parse_args()
+    run(args.rows, args.interval_ms)
+
+
+if __name__ == '__main__':
+    main()
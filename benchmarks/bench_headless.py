@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Код, выполняемый в отдельном процессе: создание сборщика и один тик сбора
+HEADLESS_SNIPPET = '''
+from src.collector import MetricsCollector
+from src.database import DatabaseHandler
+collector = MetricsCollector(DatabaseHandler({db!r}))
+collector.collect_metrics()
+'''
+
+QT_SNIPPET = '''
+from PySide6.QtWidgets import QApplication
+from src.system_monitor import SystemMonitor
+from src.database import DatabaseHandler
+app = QApplication([])
+monitor = SystemMonitor(DatabaseHandler({db!r}))
+monitor.collector.collect_metrics()
+'''
+
+REPORT = '''
+import json, sys, psutil
+print(json.dumps({
+    'rss_mb': psutil.Process().memory_info().rss / (1024 * 1024),
+    'qt_loaded': 'PySide6' in sys.modules,
+}))
+'''
+
+
+def measure(snippet: str, db_path: str) -> dict:
+    """Время запуска процесса до первого собранного тика и RSS после него"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', snippet.format(db=db_path) + REPORT],
+        cwd=project_root, env=env, capture_output=True, text=True, check=True
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['startup_ms'] = elapsed_ms
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время запуска и RSS headless-сборщика и Qt-адаптера")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.db')
+        for label, snippet in (('MetricsCollector (headless)', HEADLESS_SNIPPET), ('SystemMonitor (Qt)', QT_SNIPPET)):
+            reports = [measure(snippet, db_path) for _ in range(args.runs)]
+            startup_ms = sorted(report['startup_ms'] for report in reports)[len(reports) // 2]
+            rss_mb = max(report['rss_mb'] for report in reports)
+            print(f"{label:<30} запуск {startup_ms:8.1f} мс   RSS {rss_mb:7.1f} МБ   "
+                  f"PySide6 загружен: {reports[0]['qt_loaded']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.io_monitor import IOMonitoring
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Стоимость сбора сетевой и дисковой статистики за тик")
+    parser.add_argument('--samples', type=int, default=1000, help="Количество сборов")
+    parser.add_argument('--interval', type=float, default=0.01, help="Пауза между сборами, сек")
+    args = parser.parse_args()
+
+    io_monitoring = IOMonitoring()
+    io_monitoring.logger.disabled = True
+
+    costs = []
+    for _ in range(args.samples):
+        io_monitoring.sample()
+        costs.append(io_monitoring.last_cost_ms)
+        time.sleep(args.interval)
+    io_monitoring.close()
+
+    costs.sort()
+    print(f"Сборов: {len(costs)}, бюджет: {io_monitoring.budget_ms} мс")
+    print(f"медиана {costs[len(costs) // 2] * 1000:.0f} мкс, "
+          f"p99 {costs[int(len(costs) * 0.99)] * 1000:.0f} мкс, максимум {costs[-1] * 1000:.0f} мкс")
+    print(f"Превышений бюджета: {io_monitoring.budget_overruns}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from PySide6.QtCore import QCoreApplication, QObject, QTimer, Signal, Qt
+
+from src.sampling import SamplingThread
+
+
+PROBE_INTERVAL_MS = 10
+
+
+class SampleBridge(QObject):
+    """Доставка готовых сэмплов в главный поток, как SystemMonitor.update_metrics"""
+    sample_ready = Signal(dict)
+
+
+def slow_collector(cost_ms: float) -> dict:
+    """Имитация сборщика с заданной стоимостью тика"""
+    time.sleep(cost_ms / 1000)
+    return {'cpu_percent': 0.0}
+
+
+def measure(app: QCoreApplication, cost_ms: float, interval: float, duration: float, threaded: bool) -> float:
+    """
+    Измерение максимального опоздания таймера-зонда главного потока.
+
+    :return: Максимальная задержка главного цикла событий в мс
+    """
+    bridge = SampleBridge()
+    bridge.sample_ready.connect(lambda metrics: None, Qt.QueuedConnection)
+    tick = lambda *_: bridge.sample_ready.emit(slow_collector(cost_ms))
+
+    if threaded:
+        sampler = SamplingThread(tick, interval)
+        sampler.start()
+    else:
+        sampler = QTimer()
+        sampler.timeout.connect(tick)
+        sampler.start(int(interval * 1000))
+
+    max_lateness = 0.0
+    last = time.perf_counter()
+
+    def probe():
+        nonlocal last, max_lateness
+        now = time.perf_counter()
+        max_lateness = max(max_lateness, (now - last) * 1000 - PROBE_INTERVAL_MS)
+        last = now
+
+    probe_timer = QTimer()
+    probe_timer.timeout.connect(probe)
+    probe_timer.start(PROBE_INTERVAL_MS)
+    QTimer.singleShot(int(duration * 1000), app.quit)
+    app.exec()
+
+    probe_timer.stop()
+    sampler.stop()
+    return max_lateness
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Задержка главного потока в зависимости от стоимости сбора метрик")
+    parser.add_argument('--interval', type=float, default=0.25)
+    parser.add_argument('--duration', type=float, default=2.0)
+    parser.add_argument('--costs', type=float, nargs='+', default=[0, 50, 200])
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    print(f"{'Стоимость тика, мс':>20} {'QTimer в GUI, мс':>18} {'Поток сбора, мс':>17}")
+    for cost_ms in args.costs:
+        legacy = measure(app, cost_ms, args.interval, args.duration, threaded=False)
+        threaded = measure(app, cost_ms, args.interval, args.duration, threaded=True)
+        print(f"{cost_ms:>20.0f} {legacy:>18.1f} {threaded:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import os
+import sys
+import time
+
+import psutil
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.cpu_monitor import CPUMonitoring
+from src.proc_reader import ProcReader
+
+
+def run_at_rate(sample, rate_hz: float, duration: float) -> tuple[float, float]:
+    """
+    Сбор с заданной частотой в течение duration секунд.
+
+    :return: (среднее время одного сбора в мкс, доля процессорного времени процесса в %)
+    """
+    interval_ns = int(1_000_000_000 / rate_hz)
+    deadline = time.monotonic_ns()
+    samples = 0
+    sample_ns = 0
+    cpu_started = time.process_time()
+    wall_started = time.monotonic()
+
+    while time.monotonic() - wall_started < duration:
+        started = time.perf_counter_ns()
+        sample()
+        sample_ns += time.perf_counter_ns() - started
+        samples += 1
+
+        deadline += interval_ns
+        remaining = deadline - time.monotonic_ns()
+        if remaining > 0:
+            time.sleep(remaining / 1_000_000_000)
+
+    cpu_percent = (time.process_time() - cpu_started) / (time.monotonic() - wall_started) * 100
+    return sample_ns / samples / 1000, cpu_percent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение сбора ЦП/памяти через psutil и ProcReader")
+    parser.add_argument('--duration', type=float, default=5.0, help="Длительность каждого прогона, сек")
+    parser.add_argument('--rates', type=float, nargs='+', default=[10, 100], help="Частоты сбора, Гц")
+    args = parser.parse_args()
+
+    if not ProcReader.is_supported():
+        print("ProcReader не поддерживается на этой платформе")
+        return
+
+    reader = ProcReader()
+    reader.logger.disabled = True
+    psutil_cpu = CPUMonitoring()
+    proc_cpu = CPUMonitoring(reader)
+
+    def psutil_sample() -> None:
+        """Сбор по умолчанию: счётчики ЦП через psutil.cpu_times и psutil.virtual_memory()"""
+        psutil_cpu.sample()
+        psutil.virtual_memory()
+
+    def proc_sample() -> None:
+        """Сбор с --proc-reader: те же CPUMonitoring.sample и память из /proc"""
+        proc_cpu.sample()
+        reader.get_ram_info()
+
+    print(f"{'Способ':<22} {'Частота':>8} {'мкс/сбор':>10} {'ЦП процесса':>12}")
+    for rate in args.rates:
+        for label, sample in (('psutil', psutil_sample), ('ProcReader', proc_sample)):
+            per_sample_us, cpu_percent = run_at_rate(sample, rate, args.duration)
+            print(f"{label:<22} {rate:>6.0f} Гц {per_sample_us:>10.1f} {cpu_percent:>11.2f}%")
+
+    reader.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.database import DatabaseHandler
+from src.export import EXPORT_FORMATS, ExportJob, available_formats
+
+
+FILL_QUERY = '''WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?)
+                INSERT INTO system_metrics (
+                    time_lapse, timestamp, monitoring_time, cpu_percent, gpu_load,
+                    ram_free_mb, ram_total_mb, disk_free_gb, disk_total_gb, ts_ms, session_id)
+                SELECT 1, '2024-01-15', '00:00', n % 100, n % 50, 4096.0, 16384.0, 120.5, 512.0, n * 1000, 1
+                FROM seq'''
+
+
+def fill_database(handler: DatabaseHandler, rows: int) -> None:
+    """Заполнение базы синтетическими строками, если их меньше rows"""
+    with handler._get_connection() as conn:
+        existing = conn.execute('SELECT COUNT(*) FROM system_metrics').fetchone()[0]
+        if existing < rows:
+            conn.execute(FILL_QUERY, (rows - existing,))
+            conn.commit()
+
+
+def measure(label: str, func) -> None:
+    """Замер времени и пикового потребления памяти Python-объектами"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<45} {elapsed:8.2f} сек  пик памяти {peak / (1024 * 1024):9.1f} МБ  строк {result}")
+
+
+def run(rows: int, db_path: str, chunk_size: int) -> None:
+    handler = DatabaseHandler(db_name=db_path, persistent=True)
+    handler.logger.disabled = True
+    fill_database(handler, rows)
+
+    measure("get_all_metric (fetchall)", lambda: len(handler.get_all_metric()))
+    measure(
+        f"iter_metrics (keyset, chunk_size={chunk_size})",
+        lambda: sum(len(chunk) for chunk in handler.iter_metrics(chunk_size=chunk_size))
+    )
+
+    last_id = handler.get_latest_metrics(1)[0][0]
+    measure("get_metrics_since (последние 100 строк)", lambda: len(handler.get_metrics_since(last_id - 100)))
+
+    with tempfile.TemporaryDirectory() as export_dir:
+        for fmt in available_formats():
+            path = os.path.join(export_dir, 'export' + EXPORT_FORMATS[fmt])
+            job = ExportJob(handler, path, chunk_size=chunk_size, end_ms=2 ** 62)
+            job.logger.disabled = True
+            measure(f"ExportJob {fmt} (chunk_size={chunk_size})", job.run)
+    handler.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение fetchall, потокового чтения и экспорта метрик")
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--db', help="Путь к базе; по умолчанию временный файл")
+    args = parser.parse_args()
+
+    if args.db:
+        run(args.rows, args.db, args.chunk_size)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        run(args.rows, os.path.join(tmp_dir, 'bench_reads.db'), args.chunk_size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.database import DatabaseHandler
+from src.segment_log import SegmentLogHandler, np
+
+
+def make_batches(rows: int, batch_size: int):
+    """Синтетические замеры с интервалом 100 мс, разбитые на пачки MetricsWriter"""
+    base = 1_700_000_000_000
+    for start in range(0, rows, batch_size):
+        yield [
+            {
+                'timestamp_ms': base + i * 100,
+                'session_id': 1,
+                'time_lapse': 0.1,
+                'monitoring_time': '00:00',
+                'cpu_percent': float(i % 100),
+                'gpu_load': float(i % 50),
+                'ram_free_mb': 4096.0 + i % 7,
+                'ram_total_mb': 16384.0,
+                'disk_free_gb': 120.5,
+                'disk_total_gb': 512.0
+            }
+            for i in range(start, min(start + batch_size, rows))
+        ]
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def write_all(handler, rows: int, batch_size: int) -> int:
+    return sum(handler.adding_data_batch(batch) for batch in make_batches(rows, batch_size))
+
+
+def sqlite_size(path: str) -> int:
+    return sum(os.path.getsize(path + suffix) for suffix in ('', '-wal') if os.path.exists(path + suffix))
+
+
+def run(rows: int, batch_size: int, tmp_dir: str) -> None:
+    base = 1_700_000_000_000
+    # Диапазон - средняя десятая часть записанного интервала
+    start_ms = base + rows * 100 * 45 // 100
+    end_ms = base + rows * 100 * 55 // 100
+
+    db_path = os.path.join(tmp_dir, 'bench.db')
+    sqlite = DatabaseHandler(db_name=db_path, persistent=True)
+    sqlite.logger.disabled = True
+    sqlite_write, _ = timed(lambda: write_all(sqlite, rows, batch_size))
+    sqlite.checkpoint()
+    sqlite_scan, sqlite_rows = timed(lambda: sqlite.get_series(('cpu_percent',), start_ms, end_ms))
+
+    segments = SegmentLogHandler(os.path.join(tmp_dir, 'bench.seg'))
+    segments.logger.disabled = True
+    segment_write, _ = timed(lambda: write_all(segments, rows, batch_size))
+    segment_scan, segment_rows = timed(lambda: segments.get_series(('cpu_percent',), start_ms, end_ms))
+
+    print(f"Записей: {rows}, пачка: {batch_size}, диапазон выборки: {len(sqlite_rows)} строк")
+    print(f"{'':<34} {'записей/сек':>12} {'размер, МБ':>11} {'выборка, мс':>12}")
+    print(f"{'SQLite (WAL, с агрегатами)':<34} {rows / sqlite_write:12.0f} "
+          f"{sqlite_size(db_path) / 2 ** 20:11.1f} {sqlite_scan * 1000:12.1f}")
+    print(f"{'Журнал сегментов (кортежи)':<34} {rows / segment_write:12.0f} "
+          f"{segments.nbytes / 2 ** 20:11.1f} {segment_scan * 1000:12.1f}")
+
+    if np is not None:
+        numpy_scan, arrays = timed(lambda: segments.scan_arrays(start_ms, end_ms))
+        mean_scan, _ = timed(lambda: [array['cpu_percent'].mean() for array in segments.scan_arrays(start_ms, end_ms)])
+        print(f"{'Журнал сегментов (NumPy, mmap)':<34} {'':>12} {'':>11} {numpy_scan * 1000:12.3f}")
+        print(f"{'  то же + среднее cpu_percent':<34} {'':>12} {'':>11} {mean_scan * 1000:12.3f}")
+        assert sum(len(array) for array in arrays) == len(segment_rows)
+
+    assert len(segment_rows) == len(sqlite_rows)
+    sqlite.close()
+    segments.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение SQLite и журнала сегментов: запись, размер, выборка")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--batch-size', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        run(args.rows, args.batch_size, tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import threading
+
+from PySide6.QtCore import QObject, Signal
+
+from src.export import ExportJob
+from src.retention import ClearJob
+
+
+# Задачи с методами run(progress) -> int | None и cancel()
+Job = ClearJob | ExportJob
+
+
+class BackgroundJob(QObject):
+    """
+    Qt-адаптер над задачей (Job), выполняемой в фоновом потоке.
+
+    Сигналы испускаются из фонового потока и доставляются получателям в
+    потоке GUI через очередь событий Qt. progress передаёт процент
+    выполнения, finished - результат Job.run (количество записей) или -1
+    при ошибке. Одновременно выполняется не больше одной задачи.
+    """
+    progress = Signal(int)
+    finished = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._job: Job | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start_job(self, job: Job) -> bool:
+        """
+        Запуск задачи в фоновом потоке.
+
+        :return: False, если предыдущая задача ещё выполняется
+        """
+        if self.running:
+            return False
+
+        self._job = job
+        self._thread = threading.Thread(target=self._run, args=(job,), name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self, job: Job) -> None:
+        result = job.run(self.progress.emit)
+        self.finished.emit(-1 if result is None else result)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Ожидание завершения задачи.
+
+        :return: True, если задача завершена
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.running
+
+    def close(self) -> None:
+        """Прерывание задачи после текущей порции и ожидание потока"""
+        if self._job is not None:
+            self._job.cancel()
+        self.wait()
@@ -0,0 +1,91 @@
+from typing import List, Sequence
+
+from PySide6.QtCore import QEvent, QRect, QSize
+from PySide6.QtGui import QColor, QPainter, QPaintEvent
+from PySide6.QtWidgets import QToolTip, QWidget
+
+
+# Шаг квантования загрузки, %: ячейка перерисовывается только при смене уровня
+LEVEL_STEP = 5
+
+
+class CPUHeatmap(QWidget):
+    """
+    Тепловая карта загрузки ядер ЦП.
+
+    Каждое ядро - ячейка сетки, цвет которой меняется от зелёного (простой)
+    к красному (полная загрузка). При обновлении перерисовываются только
+    ячейки, у которых изменился уровень загрузки.
+    """
+
+    def __init__(self, columns: int = 16, cell_size: int = 20, spacing: int = 2, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.cell_size = cell_size
+        self.spacing = spacing
+        self._values: List[float] = []
+        self._levels: List[int] = []
+        self.setMouseTracking(True)
+
+    @property
+    def values(self) -> List[float]:
+        return list(self._values)
+
+    @staticmethod
+    def level(value: float) -> int:
+        return int(min(max(value, 0.0), 100.0) // LEVEL_STEP)
+
+    @staticmethod
+    def level_color(level: int) -> QColor:
+        """Цвет уровня загрузки: зелёный (120°) -> красный (0°)"""
+        max_level = 100 // LEVEL_STEP
+        hue = int(120 * (1 - min(level, max_level) / max_level))
+        return QColor.fromHsv(hue, 200, 220)
+
+    def cell_rect(self, index: int) -> QRect:
+        row, column = divmod(index, self.columns)
+        step = self.cell_size + self.spacing
+        return QRect(column * step, row * step, self.cell_size, self.cell_size)
+
+    def sizeHint(self) -> QSize:
+        count = max(len(self._values), 1)
+        columns = min(count, self.columns)
+        rows = (count + self.columns - 1) // self.columns
+        step = self.cell_size + self.spacing
+        return QSize(columns * step, rows * step)
+
+    def set_values(self, values: Sequence[float]) -> None:
+        """Обновление загрузки ядер с перерисовкой изменившихся ячеек"""
+        if len(values) != len(self._values):
+            self._values = list(values)
+            self._levels = [self.level(value) for value in values]
+            self.updateGeometry()
+            self.update()
+            return
+
+        for index, value in enumerate(values):
+            self._values[index] = value
+            level = self.level(value)
+            if level != self._levels[index]:
+                self._levels[index] = level
+                self.update(self.cell_rect(index))
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        dirty = event.rect()
+        for index, level in enumerate(self._levels):
+            rect = self.cell_rect(index)
+            if rect.intersects(dirty):
+                painter.fillRect(rect, self.level_color(level))
+        painter.end()
+
+    def event(self, event: QEvent) -> bool:
+        if event.type() == QEvent.ToolTip:
+            for index, value in enumerate(self._values):
+                if self.cell_rect(index).contains(event.pos()):
+                    QToolTip.showText(event.globalPos(), f"Ядро {index}: {value:.1f}%", self)
+                    return True
+            QToolTip.hideText()
+            event.ignore()
+            return True
+        return super().event(event)
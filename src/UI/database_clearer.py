@@ -0,0 +1,26 @@
+from src.database import DatabaseHandler
+from src.retention import ClearJob
+from src.UI.background_job import BackgroundJob
+
+
+class DatabaseClearer(BackgroundJob):
+    """
+    Очистка базы в фоновом потоке (ClearJob).
+
+    finished передаёт количество удалённых записей или -1 при ошибке.
+    """
+
+    def __init__(self, database_handler: DatabaseHandler, chunk_size: int = 5000, parent=None):
+        super().__init__(parent)
+        self.database_handler = database_handler
+        self.chunk_size = chunk_size
+
+    def start(self) -> bool:
+        """
+        Запуск очистки.
+
+        :return: False, если очистка уже выполняется
+        """
+        if self.running:
+            return False
+        return self.start_job(ClearJob(self.database_handler, chunk_size=self.chunk_size))
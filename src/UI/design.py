@@ -15,11 +15,11 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QFont, QFontDatabase, QGradient, QIcon,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
-from PySide6.QtWidgets import (QApplication, QGridLayout, QHBoxLayout, QHeaderView,
+from PySide6.QtWidgets import (QAbstractItemView, QApplication, QGridLayout, QHBoxLayout, QHeaderView,
     QLabel, QLayout, QLineEdit, QMainWindow,
     QProgressBar, QPushButton, QSizePolicy, QSpacerItem,
-    QSpinBox, QTabWidget, QTableWidget, QTableWidgetItem,
-    QVBoxLayout, QWidget)
+    QDoubleSpinBox, QSpinBox, QTabWidget, QTableView, QVBoxLayout,
+    QWidget)
 
 class Ui_SystemPulse(object):
     def setupUi(self, SystemPulse):
@@ -103,23 +103,23 @@ class Ui_SystemPulse(object):
 "}\n"
 "\n"
 "/* \u0421\u0442\u0438\u043b\u0438\u0437\u0430\u0446\u0438\u044f QSpinBox */\n"
-"QSpinBox {\n"
+"QSpinBox, QDoubleSpinBox {\n"
 "    background-color: #222222; \n"
 "    color: #ffffff;          \n"
 "    border-radius: 3px; \n"
 "}\n"
 "\n"
-"QSpinBox:hover{\n"
+"QSpinBox:hover, QDoubleSpinBox:hover{\n"
 "  background-color: #222229; \n"
 "}\n"
 "\n"
-"QSpinBox::up-button {\n"
+"QSpinBox::up-button, QDoubleSpinBox::up-button {\n"
 "    subcontrol-origin: border;\n"
 "    subcontrol-position: right;\n"
 "	background-color: #342882; \n"
 "	border-radius: 3px; \n"
 "}\n"
-"QSpinBox::down-button {\n"
+"QSpinBox::down-button, QDoubleSpinBox::down-button {\n"
 "	subcont"
                         "rol-origin: border;\n"
 "    subcontrol-position: left;\n"
@@ -145,12 +145,12 @@ class Ui_SystemPulse(object):
 "    border: 1px solid #222222;\n"
 "}\n"
 "\n"
-"QTableWidget::item {\n"
+"QTableView::item {\n"
 "    padding: 5px;\n"
 "    border: 1px solid #333333;\n"
 "}\n"
 "\n"
-"QTableWidget::item:selected {\n"
+"QTableView::item:selected {\n"
 "    background-color: #342882;\n"
 "}\n"
 "\n"
@@ -482,7 +482,7 @@ class Ui_SystemPulse(object):
 
         self.horizontalLayout_4.addItem(self.horizontalSpacer_14)
 
-        self.spinBox_update_interval = QSpinBox(self.tab_3)
+        self.spinBox_update_interval = QDoubleSpinBox(self.tab_3)
         self.spinBox_update_interval.setObjectName(u"spinBox_update_interval")
         self.spinBox_update_interval.setMinimumSize(QSize(60, 0))
         font8 = QFont()
@@ -491,9 +491,11 @@ class Ui_SystemPulse(object):
         self.spinBox_update_interval.setFont(font8)
         self.spinBox_update_interval.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
         self.spinBox_update_interval.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.spinBox_update_interval.setMinimum(1)
-        self.spinBox_update_interval.setMaximum(60)
-        self.spinBox_update_interval.setValue(1)
+        self.spinBox_update_interval.setDecimals(2)
+        self.spinBox_update_interval.setMinimum(0.100000000000000)
+        self.spinBox_update_interval.setMaximum(60.000000000000000)
+        self.spinBox_update_interval.setSingleStep(0.050000000000000)
+        self.spinBox_update_interval.setValue(1.000000000000000)
 
         self.horizontalLayout_4.addWidget(self.spinBox_update_interval)
 
@@ -587,36 +589,15 @@ class Ui_SystemPulse(object):
 
         self.verticalLayout_2.addLayout(self.horizontalLayout_2)
 
-        self.tableWidget_DB = QTableWidget(self.tab_4)
-        if (self.tableWidget_DB.columnCount() < 10):
-            self.tableWidget_DB.setColumnCount(10)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.tableWidget_DB.setHorizontalHeaderItem(0, __qtablewidgetitem)
-        __qtablewidgetitem1 = QTableWidgetItem()
-        self.tableWidget_DB.setHorizontalHeaderItem(1, __qtablewidgetitem1)
-        __qtablewidgetitem2 = QTableWidgetItem()
-        self.tableWidget_DB.setHorizontalHeaderItem(2, __qtablewidgetitem2)
-        __qtablewidgetitem3 = QTableWidgetItem()
-        self.tableWidget_DB.setHorizontalHeaderItem(3, __qtablewidgetitem3)
-        __qtablewidgetitem4 = QTableWidgetItem()
-        self.tableWidget_DB.setHorizontalHeaderItem(4, __qtablewidgetitem4)
-        __qtablewidgetitem5 = QTableWidgetItem()
-        self.tableWidget_DB.setHorizontalHeaderItem(5, __qtablewidgetitem5)
-        __qtablewidgetitem6 = QTableWidgetItem()
-        self.tableWidget_DB.setHorizontalHeaderItem(6, __qtablewidgetitem6)
-        __qtablewidgetitem7 = QTableWidgetItem()
-        self.tableWidget_DB.setHorizontalHeaderItem(7, __qtablewidgetitem7)
-        __qtablewidgetitem8 = QTableWidgetItem()
-        self.tableWidget_DB.setHorizontalHeaderItem(8, __qtablewidgetitem8)
-        __qtablewidgetitem9 = QTableWidgetItem()
-        self.tableWidget_DB.setHorizontalHeaderItem(9, __qtablewidgetitem9)
-        self.tableWidget_DB.setObjectName(u"tableWidget_DB")
+        self.tableView_DB = QTableView(self.tab_4)
+        self.tableView_DB.setObjectName(u"tableView_DB")
         font11 = QFont()
         font11.setFamilies([u"Arial"])
         font11.setPointSize(14)
-        self.tableWidget_DB.setFont(font11)
+        self.tableView_DB.setFont(font11)
+        self.tableView_DB.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
 
-        self.verticalLayout_2.addWidget(self.tableWidget_DB)
+        self.verticalLayout_2.addWidget(self.tableView_DB)
 
         self.tabWidget_SystemPulse.addTab(self.tab_4, "")
         self.tab_2 = QWidget()
@@ -848,26 +829,6 @@ class Ui_SystemPulse(object):
         self.tabWidget_SystemPulse.setTabText(self.tabWidget_SystemPulse.indexOf(self.tab_3), QCoreApplication.translate("SystemPulse", u"\u041c\u043e\u043d\u0438\u0442\u043e\u0440\u0438\u043d\u0433", None))
         self.label_DB.setText(QCoreApplication.translate("SystemPulse", u"\u0418\u0441\u0442\u043e\u0440\u0438\u044f \u0437\u0430\u043f\u0438\u0441\u0438 \u0432 \u0411\u0414:", None))
         self.pushButton_remove.setText(QCoreApplication.translate("SystemPulse", u"\u0423\u0434\u0430\u043b\u0438\u0442\u044c \u0434\u0430\u043d\u043d\u044b\u0435", None))
-        ___qtablewidgetitem = self.tableWidget_DB.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(QCoreApplication.translate("SystemPulse", u"ID", None));
-        ___qtablewidgetitem1 = self.tableWidget_DB.horizontalHeaderItem(1)
-        ___qtablewidgetitem1.setText(QCoreApplication.translate("SystemPulse", u"\u0418\u043d\u0442\u0435\u0440\u0432\u0430\u043b (\u0441\u0435\u043a)", None));
-        ___qtablewidgetitem2 = self.tableWidget_DB.horizontalHeaderItem(2)
-        ___qtablewidgetitem2.setText(QCoreApplication.translate("SystemPulse", u"\u0414\u0430\u0442\u0430", None));
-        ___qtablewidgetitem3 = self.tableWidget_DB.horizontalHeaderItem(3)
-        ___qtablewidgetitem3.setText(QCoreApplication.translate("SystemPulse", u"\u0412\u0440\u0435\u043c\u044f", None));
-        ___qtablewidgetitem4 = self.tableWidget_DB.horizontalHeaderItem(4)
-        ___qtablewidgetitem4.setText(QCoreApplication.translate("SystemPulse", u"\u0426\u041f (%)", None));
-        ___qtablewidgetitem5 = self.tableWidget_DB.horizontalHeaderItem(5)
-        ___qtablewidgetitem5.setText(QCoreApplication.translate("SystemPulse", u"\u0412\u0438\u0434\u0435\u043e\u043a\u0430\u0440\u0442\u0430 (%)", None));
-        ___qtablewidgetitem6 = self.tableWidget_DB.horizontalHeaderItem(6)
-        ___qtablewidgetitem6.setText(QCoreApplication.translate("SystemPulse", u"\u0421\u0432\u043e\u0431\u043e\u0434\u043d\u043e \u041e\u0417\u0423 (\u041c\u0431)", None));
-        ___qtablewidgetitem7 = self.tableWidget_DB.horizontalHeaderItem(7)
-        ___qtablewidgetitem7.setText(QCoreApplication.translate("SystemPulse", u"\u0412\u0441\u0435\u0433\u043e \u041e\u0417\u0423 (\u041c\u0431)", None));
-        ___qtablewidgetitem8 = self.tableWidget_DB.horizontalHeaderItem(8)
-        ___qtablewidgetitem8.setText(QCoreApplication.translate("SystemPulse", u"\u0421\u0432\u043e\u0431\u043e\u0434\u043d\u043e \u041f\u0417\u0423 (\u0413\u0431)", None));
-        ___qtablewidgetitem9 = self.tableWidget_DB.horizontalHeaderItem(9)
-        ___qtablewidgetitem9.setText(QCoreApplication.translate("SystemPulse", u"\u0412\u0441\u0435\u0433\u043e \u041f\u0417\u0423 (\u0413\u0431)", None));
         self.tabWidget_SystemPulse.setTabText(self.tabWidget_SystemPulse.indexOf(self.tab_4), QCoreApplication.translate("SystemPulse", u"\u0418\u0441\u0442\u043e\u0440\u0438\u044f", None))
         self.label_OS.setText(QCoreApplication.translate("SystemPulse", u"\u041e\u0421", None))
         self.lineEdit_OS.setText("")
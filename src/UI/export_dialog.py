@@ -0,0 +1,65 @@
+import time
+from datetime import datetime
+from typing import Dict, Tuple
+
+from PySide6.QtWidgets import QComboBox, QDialog, QDialogButtonBox, QFormLayout
+
+from src.database import DatabaseHandler
+
+
+def format_session(session: tuple) -> str:
+    """Подпись сессии записи: номер и время начала и конца"""
+    session_id, started_ms, ended_ms = session
+    started = datetime.fromtimestamp(started_ms / 1000).strftime('%Y-%m-%d %H:%M')
+    ended = datetime.fromtimestamp(ended_ms / 1000).strftime('%H:%M') if ended_ms else "..."
+    return f"Сессия {session_id}: {started} - {ended}"
+
+
+class ExportDialog(QDialog):
+    """
+    Выбор интервала и сессии записи для экспорта.
+
+    Интервалы - те же, что у графиков (длительность в секундах до текущего
+    момента), плюс вся история; сессии читаются из базы, новые - первыми.
+    """
+
+    def __init__(self, database_handler: DatabaseHandler, ranges: Dict[str, float], parent=None):
+        """
+        :param database_handler: Обработчик базы данных
+        :param ranges: Подпись -> длительность интервала в секундах
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Экспорт данных")
+
+        self.comboBox_range = QComboBox(self)
+        self.comboBox_range.addItem("Вся история", None)
+        for label, seconds in ranges.items():
+            self.comboBox_range.addItem(label, seconds)
+
+        self.comboBox_session = QComboBox(self)
+        self.comboBox_session.addItem("Все сессии", None)
+        for session in reversed(database_handler.get_sessions()):
+            self.comboBox_session.addItem(format_session(session), session[0])
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, parent=self)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        layout = QFormLayout(self)
+        layout.addRow("Интервал:", self.comboBox_range)
+        layout.addRow("Сессия:", self.comboBox_session)
+        layout.addRow(buttons)
+
+    def selection(self) -> Tuple[int | None, int | None, int | None]:
+        """
+        Выбранные параметры экспорта для MetricsExporter.start.
+
+        :return: (start_ms, end_ms, session_id); None - без ограничения
+        """
+        seconds = self.comboBox_range.currentData()
+        if seconds is None:
+            start_ms = end_ms = None
+        else:
+            end_ms = int(time.time() * 1000)
+            start_ms = end_ms - int(seconds * 1000)
+        return start_ms, end_ms, self.comboBox_session.currentData()
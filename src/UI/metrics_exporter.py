@@ -0,0 +1,35 @@
+from src.database import DatabaseHandler
+from src.export import ExportJob
+from src.UI.background_job import BackgroundJob
+
+
+class MetricsExporter(BackgroundJob):
+    """
+    Экспорт метрик в файл в фоновом потоке (ExportJob).
+
+    finished передаёт количество экспортированных записей или -1 при ошибке.
+    """
+
+    def __init__(self, database_handler: DatabaseHandler, chunk_size: int = 10_000, parent=None):
+        super().__init__(parent)
+        self.database_handler = database_handler
+        self.chunk_size = chunk_size
+
+    def start(
+            self,
+            path: str,
+            start_ms: int | None = None,
+            end_ms: int | None = None,
+            session_id: int | None = None
+    ) -> bool:
+        """
+        Запуск экспорта; формат определяется по расширению path.
+
+        :return: False, если экспорт уже выполняется
+        """
+        if self.running:
+            return False
+        return self.start_job(ExportJob(
+            self.database_handler, path, start_ms=start_ms, end_ms=end_ms, session_id=session_id,
+            chunk_size=self.chunk_size
+        ))
@@ -0,0 +1,150 @@
+import threading
+from typing import Any, List
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QPersistentModelIndex, Signal
+
+from src.database import DatabaseHandler
+
+
+HEADERS = [
+    'ID', 'Интервал (сек)', 'Дата', 'Время', 'ЦП (%)', 'Видеокарта (%)',
+    'Свободно ОЗУ (Мб)', 'Всего ОЗУ (Мб)', 'Свободно ПЗУ (Гб)', 'Всего ПЗУ (Гб)'
+]
+
+
+class MetricsTableModel(QAbstractTableModel):
+    """
+    Модель таблицы истории метрик поверх базы данных.
+
+    Строки подгружаются страницами по мере прокрутки (canFetchMore/fetchMore),
+    новые записи дописываются в конец через beginInsertRows, а текст ячеек
+    форматируется только при запросе представлением в data().
+
+    Новые записи (append_new_rows) читаются в фоновом потоке и передаются в
+    поток GUI сигналом: запрос ждёт блокировку базы вместе с записью,
+    очисткой и сжатием и не должен задерживать отрисовку.
+    """
+    # Поколение модели (см. reload), id, после которого читались строки, и строки
+    _new_rows_fetched = Signal(int, int, object)
+
+    def __init__(self, database_handler: DatabaseHandler, page_size: int = 500, parent=None):
+        super().__init__(parent)
+        self.database_handler = database_handler
+        self.page_size = page_size
+        self._rows: List[tuple] = []
+        self._exhausted = False
+        self._generation = 0
+        self._fetch_thread: threading.Thread | None = None
+        self._new_rows_fetched.connect(self._on_new_rows_fetched)
+
+    @property
+    def fetching(self) -> bool:
+        """Выполняется фоновое чтение новых строк"""
+        return self._fetch_thread is not None and self._fetch_thread.is_alive()
+
+    @property
+    def last_id(self) -> int:
+        """id последней загруженной строки"""
+        return self._rows[-1][0] if self._rows else 0
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(HEADERS)
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        if role == Qt.DisplayRole:
+            value = self._rows[index.row()][index.column()]
+            return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(HEADERS):
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        return not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        """Подгрузка следующей страницы строк"""
+        if parent.isValid():
+            return
+
+        rows = self.database_handler.get_metrics_since(self.last_id, self.page_size)
+        self._exhausted = len(rows) < self.page_size
+        self._append_rows(rows)
+
+    def append_new_rows(self) -> bool:
+        """
+        Фоновое чтение строк, появившихся в базе после последней загруженной.
+
+        Если история ещё не дочитана до конца, новые строки подгрузятся
+        обычным fetchMore при прокрутке.
+
+        :return: False, если чтение не запущено: история не дочитана или
+            предыдущее чтение ещё выполняется
+        """
+        if not self._exhausted or self.fetching:
+            return False
+
+        self._fetch_thread = threading.Thread(
+            target=self._fetch_new_rows, args=(self._generation, self.last_id),
+            name='MetricsTableFetch', daemon=True
+        )
+        self._fetch_thread.start()
+        return True
+
+    def _fetch_new_rows(self, generation: int, last_id: int) -> None:
+        rows = self.database_handler.get_metrics_since(last_id, self.page_size)
+        self._new_rows_fetched.emit(generation, last_id, rows)
+
+    def _on_new_rows_fetched(self, generation: int, last_id: int, rows: List[tuple]) -> None:
+        """Дописывание прочитанных строк в потоке GUI, если модель не менялась с начала чтения"""
+        if generation != self._generation or last_id != self.last_id or not self._exhausted:
+            return
+
+        self._append_rows(rows)
+        if len(rows) == self.page_size:
+            self._exhausted = False
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Ожидание завершения фонового чтения.
+
+        :return: True, если чтение завершено
+        """
+        if self._fetch_thread is not None:
+            self._fetch_thread.join(timeout)
+        return not self.fetching
+
+    def _append_rows(self, rows: List[tuple]) -> None:
+        if not rows:
+            return
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def reload(self) -> None:
+        """Сброс загруженных строк и повторное чтение с начала"""
+        self.beginResetModel()
+        self._generation += 1
+        self._rows = []
+        self._exhausted = False
+        self.endResetModel()
@@ -0,0 +1,137 @@
+from typing import List, Sequence, Tuple
+
+from PySide6.QtCore import QPointF, QRectF, QSize, Qt
+from PySide6.QtGui import QColor, QPainter, QPaintEvent, QPen, QPolygonF, QResizeEvent
+from PySide6.QtWidgets import QWidget
+
+from src.downsampling import finite_range, lttb
+
+
+# Отступ области графика от краёв виджета, пикселей
+MARGIN = 4
+TITLE_HEIGHT = 16
+
+
+class TimeSeriesChart(QWidget):
+    """
+    Линейный график временного ряда.
+
+    Перед отрисовкой ряд прореживается методом LTTB до числа точек, не
+    превышающего ширину области графика в пикселях, поэтому стоимость
+    отрисовки не зависит от длины ряда. Частоту вызова set_data определяет
+    владелец графика.
+    """
+
+    def __init__(
+            self,
+            title: str,
+            unit: str,
+            y_max: float | None = None,
+            color: str = '#2e86de',
+            parent=None
+    ):
+        """
+        :param title: Подпись графика
+        :param unit: Единица измерения значений
+        :param y_max: Верхняя граница оси Y; None - по максимуму данных
+        :param color: Цвет линии
+        """
+        super().__init__(parent)
+        self.title = title
+        self.unit = unit
+        self.y_max = y_max
+        self.color = QColor(color)
+        self._source: Tuple[Sequence[float], Sequence[float]] = ([], [])
+        self._xs: List[float] = []
+        self._ys: List[float] = []
+        self.setMinimumHeight(80)
+
+    @property
+    def point_count(self) -> int:
+        """Число точек, которые будут нарисованы"""
+        return len(self._xs)
+
+    def sizeHint(self) -> QSize:
+        return QSize(320, 120)
+
+    def plot_rect(self) -> QRectF:
+        return QRectF(self.rect()).adjusted(MARGIN, MARGIN + TITLE_HEIGHT, -MARGIN, -MARGIN)
+
+    def max_points(self) -> int:
+        """Предел числа точек: ширина области графика в пикселях"""
+        return max(int(self.plot_rect().width()), 3)
+
+    def set_data(self, xs: Sequence[float], ys: Sequence[float]) -> None:
+        """Установка ряда (метки времени и значения) с прореживанием и перерисовкой"""
+        self._source = (xs, ys)
+        self._resample()
+        self.update()
+
+    def clear(self) -> None:
+        self.set_data([], [])
+
+    def _resample(self) -> None:
+        self._xs, self._ys = lttb(*self._source, self.max_points())
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        self._resample()
+        super().resizeEvent(event)
+
+    def _y_range(self) -> Tuple[float, float]:
+        if self.y_max is not None:
+            return 0.0, self.y_max
+
+        value_range = finite_range(self._ys)
+        if value_range is None:
+            return 0.0, 1.0
+        low, high = value_range
+        if high - low < 1e-9:
+            return low - 1.0, high + 1.0
+        return low, high
+
+    def _polylines(self) -> List[QPolygonF]:
+        """Участки ломаной в координатах виджета; NaN разрывает линию"""
+        if not self._xs:
+            return []
+
+        area = self.plot_rect()
+        x_min, x_max = self._xs[0], self._xs[-1]
+        x_span = (x_max - x_min) or 1.0
+        y_min, y_max = self._y_range()
+        y_span = y_max - y_min
+
+        polylines = []
+        current = QPolygonF()
+        for x, y in zip(self._xs, self._ys):
+            if y != y:
+                if current.size() > 1:
+                    polylines.append(current)
+                current = QPolygonF()
+                continue
+            current.append(QPointF(
+                area.left() + (x - x_min) / x_span * area.width(),
+                area.bottom() - (min(max(y, y_min), y_max) - y_min) / y_span * area.height()
+            ))
+        if current.size() > 0:
+            polylines.append(current)
+        return polylines
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        area = self.plot_rect()
+        painter.fillRect(area, QColor(0, 0, 0, 20))
+
+        caption = self.title
+        last = next((y for y in reversed(self._ys) if y == y), None)
+        if last is not None:
+            caption += f": {last:.1f} {self.unit}"
+        painter.drawText(
+            QRectF(MARGIN, 0, self.width() - 2 * MARGIN, TITLE_HEIGHT + MARGIN),
+            Qt.AlignLeft | Qt.AlignVCenter, caption
+        )
+
+        painter.setPen(QPen(self.color, 1.5))
+        for polyline in self._polylines():
+            painter.drawPolyline(polyline)
+        painter.end()
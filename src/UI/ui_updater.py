@@ -0,0 +1,97 @@
+import time
+from typing import Any, Callable, Dict
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtWidgets import QWidget
+
+
+class WidgetUpdater:
+    """
+    Вывод значений в виджеты через сеттеры, привязанные один раз при создании.
+
+    Для виджетов с setText используется он, иначе setValue. Значение, уже
+    показанное виджетом, повторно не устанавливается, поэтому неизменившиеся
+    виджеты не перерисовываются.
+    """
+
+    def __init__(self, widgets: Dict[str, QWidget]):
+        self._setters: Dict[str, Callable[[Any], None]] = {
+            name: widget.setText if hasattr(widget, 'setText') else widget.setValue
+            for name, widget in widgets.items()
+        }
+        self._shown: Dict[str, Any] = {}
+
+    def apply(self, values: Dict[str, Any]) -> int:
+        """
+        Установка значений по именам виджетов.
+
+        :return: Количество виджетов, значение которых изменилось
+        """
+        changed = 0
+        for name, value in values.items():
+            if name in self._shown and self._shown[name] == value:
+                continue
+            self._setters[name](value)
+            self._shown[name] = value
+            changed += 1
+        return changed
+
+    def invalidate(self) -> None:
+        """Сброс запомненных значений: следующий apply установит все заново"""
+        self._shown.clear()
+
+
+class UpdateCoalescer(QObject):
+    """
+    Объединение частых обновлений интерфейса.
+
+    Хранится только последний переданный замер; он применяется сразу, если
+    с прошлого применения прошло не меньше interval_ms, иначе - по таймеру,
+    когда интервал истечёт. Промежуточные замеры отбрасываются.
+    """
+
+    def __init__(self, apply: Callable[[Dict[str, Any]], None], interval_ms: int, parent: QObject | None = None):
+        super().__init__(parent)
+        self._apply = apply
+        self.interval_ms = interval_ms
+        self._pending: Dict[str, Any] | None = None
+        self._last_applied = -float('inf')
+        self.submitted = 0
+        self.applied = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def dropped(self) -> int:
+        """Количество замеров, вытесненных более новыми"""
+        return self.submitted - self.applied - (self._pending is not None)
+
+    def submit(self, metrics: Dict[str, Any]) -> None:
+        self._pending = metrics
+        self.submitted += 1
+        if self._timer.isActive():
+            return
+
+        remaining_ms = self.interval_ms - (time.monotonic() - self._last_applied) * 1000
+        if remaining_ms <= 0:
+            self.flush()
+        else:
+            self._timer.start(int(remaining_ms) + 1)
+
+    def flush(self) -> None:
+        """Немедленное применение отложенного замера"""
+        self._timer.stop()
+        if self._pending is None:
+            return
+
+        metrics, self._pending = self._pending, None
+        self._last_applied = time.monotonic()
+        self.applied += 1
+        self._apply(metrics)
+
+    def cancel(self) -> None:
+        """Отбрасывание отложенного замера"""
+        self._timer.stop()
+        self._pending = None
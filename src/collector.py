@@ -0,0 +1,316 @@
+import sys
+import os
+import argparse
+import signal
+import threading
+import time
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Sequence
+
+import psutil
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.database import DatabaseHandler
+from src.metrics_writer import MetricsWriter
+from src.retention import RetentionPolicy, RetentionWorker, load_retention_policy
+from src.segment_log import SegmentLogHandler
+from src.rollups import ROLLUP_RESOLUTIONS
+from src.sampling import SCHEDULE_POLICIES, SamplingThread, Tick
+from src.proc_reader import ProcReader
+from src.collector_registry import CollectorPool, create_collectors
+from src.logger_config import get_logger
+
+
+STORAGE_BACKENDS = ('sqlite', 'segments')
+
+# Доля интервала, в течение которой тик ждёт результаты сборщиков
+COLLECT_DEADLINE_FRACTION = 0.8
+
+
+class MetricsCollector:
+    """
+    Ядро сбора системных метрик без зависимости от Qt.
+
+    Метрики собираются в потоке SamplingThread сборщиками из реестра
+    (collector_registry), работающими параллельно в CollectorPool,
+    записываются в базу (напрямую или через MetricsWriter) и передаются
+    подписчикам, добавленным через add_listener. Используется как GUI (через SystemMonitor), так и
+    консольным демоном: python -m src.collector
+    """
+
+    def __init__(
+            self,
+            database_handler: DatabaseHandler | None = None,
+            metrics_writer: MetricsWriter | None = None,
+            interval: float = 1,
+            policy: str = 'skip',
+            use_proc_reader: bool = False,
+            collectors: Sequence[str] | None = None,
+            collector_options: Dict[str, Dict[str, Any]] | None = None
+    ):
+        """
+        :param database_handler: Обработчик базы данных
+        :param metrics_writer: Буферизованная запись; без неё метрики пишутся по одной
+        :param interval: Интервал сбора в секундах, допускаются дробные значения
+        :param policy: Поведение при пропущенных сроках тиков, см. SCHEDULE_POLICIES
+        :param use_proc_reader: Читать ЦП и память через ProcReader вместо psutil
+            (для частого сбора; только при наличии /proc)
+        :param collectors: Имена сборщиков из COLLECTOR_REGISTRY; None - все зарегистрированные
+        :param collector_options: Дополнительные аргументы сборщиков, см. create_collectors
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.database_handler = database_handler or DatabaseHandler()
+        self.metrics_writer = metrics_writer
+        self.proc_reader = ProcReader() if use_proc_reader and ProcReader.is_supported() else None
+        self.pool = CollectorPool(create_collectors(collectors, self.proc_reader, collector_options))
+
+        self.monitoring = False
+        self.session_id: int | None = None
+        # Момент запуска по time.monotonic: время мониторинга не зависит от перевода часов
+        self.start_time: float | None = None
+        self.time_lapse = interval
+        self.sampler = SamplingThread(self.collect_metrics, interval, policy=policy)
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Подписка на собранные метрики; вызывается в потоке сбора"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def set_interval(self, interval: float) -> None:
+        """Установка интервала сбора"""
+        self.sampler.set_interval(interval)
+        self.time_lapse = interval
+        self.logger.info(f"Интервал обновления установлен: {self.time_lapse} сек.")
+
+    def start(self) -> bool:
+        """
+        Запуск сбора с открытием новой сессии записи.
+
+        :return: True, если сбор запущен
+        """
+        if self.monitoring:
+            return True
+
+        try:
+            self.monitoring = True
+            self.start_time = time.monotonic()
+            self.session_id = self.database_handler.start_session()
+            self.sampler.start()
+            self.logger.info("Мониторинг запущен")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Ошибка при запуске мониторинга: {e}")
+            self.stop()
+            return False
+
+    def stop(self) -> None:
+        """Остановка сбора с закрытием сессии записи"""
+        if not self.monitoring:
+            return
+
+        self.monitoring = False
+        self.sampler.stop()
+        self.start_time = None
+        if self.metrics_writer is not None:
+            self.metrics_writer.flush()
+        self.database_handler.end_session(self.session_id)
+        self.session_id = None
+        self.logger.info(
+            f"Мониторинг остановлен: пропущено тиков {self.sampler.skipped_ticks}, "
+            f"макс. опоздание {self.sampler.max_lateness_ms:.1f} мс"
+        )
+        self.logger.info(f"Время сборщиков: {self.format_collector_stats()}")
+
+    def format_collector_stats(self) -> str:
+        """Сводка времени работы сборщиков для диагностики"""
+        return "; ".join(
+            f"{name} ср. {stats.avg_ms:.2f} / макс. {stats.max_ms:.2f} мс, "
+            f"таймаутов {stats.timeouts}, ошибок {stats.errors}"
+            for name, stats in self.pool.stats.items()
+        )
+
+    def close(self) -> None:
+        """Остановка сбора и освобождение ресурсов сборщиков"""
+        self.stop()
+        self.pool.close()
+        if self.proc_reader is not None:
+            self.proc_reader.close()
+
+    def get_monitoring_time(self) -> str:
+        """Получение текущего времени мониторинга"""
+        if self.start_time:
+            elapsed_time = time.monotonic() - self.start_time
+            minutes, seconds = divmod(int(elapsed_time), 60)
+            return f"{minutes:02d}:{seconds:02d}"
+
+        return ""
+
+    def collect_metrics(self, tick: Tick | None = None) -> None:
+        """Один тик сбора: получение, запись и рассылка метрик подписчикам"""
+        try:
+            metrics = self.gather_metrics(tick)
+            if self.metrics_writer is not None:
+                self.metrics_writer.submit(metrics)
+            else:
+                self.database_handler.adding_data(metrics)
+
+            for listener in self._listeners:
+                listener(metrics)
+
+        except Exception as e:
+            self.logger.error(f"Ошибка сбора системных метрик: {e}")
+
+    def gather_metrics(self, tick: Tick | None = None) -> Dict[str, Any]:
+        """
+        Детальный сбор системных метрик.
+
+        :param tick: Тик планировщика; его фактическое время становится меткой времени записи
+        """
+        try:
+            collected, stale = self.pool.run(self.time_lapse * COLLECT_DEADLINE_FRACTION)
+
+            return {
+                **collected,
+                'timestamp_ms': tick.timestamp_ms if tick else time.time_ns() // 1_000_000,
+                'session_id': self.session_id,
+                'time_lapse': self.time_lapse,
+                'interval_ms': self.time_lapse * 1000,
+                'lateness_ms': tick.lateness_ms if tick else None,
+                'stale_collectors': stale,
+                'collector_latency_ms': self.pool.latency_ms(),
+                'monitoring_time': self.get_monitoring_time() or "00:00"
+            }
+
+        except Exception as e:
+            self.logger.error(f"Ошибка получения системных метрик: {e}")
+            return {}
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m src.collector',
+        description="Сбор системных метрик в базу данных без графического интерфейса"
+    )
+    parser.add_argument('--interval', type=float, default=1.0, help="Интервал сбора, сек")
+    parser.add_argument('--db', default='system_monitoring.db',
+                        help="Путь к файлу базы данных (для --storage segments - к каталогу сегментов)")
+    parser.add_argument('--storage', choices=STORAGE_BACKENDS, default='sqlite',
+                        help="Хранилище: SQLite или журнал сегментов с записями фиксированной ширины")
+    parser.add_argument('--policy', choices=SCHEDULE_POLICIES, default='skip',
+                        help="Поведение при пропущенных сроках тиков")
+    parser.add_argument('--duration', type=float, default=None,
+                        help="Время работы, сек; по умолчанию - до SIGINT/SIGTERM")
+    parser.add_argument('--proc-reader', action='store_true',
+                        help="Читать ЦП и память напрямую из /proc вместо psutil")
+    parser.add_argument('--mount', action='append', dest='mount_points', default=None, metavar='PATH',
+                        help="Отслеживаемая точка монтирования (можно несколько раз; первая - основная); "
+                             "по умолчанию - все диски, основная - '/'")
+    parser.add_argument('--batch-size', type=int, default=50, help="Размер пачки записи в базу")
+    parser.add_argument('--flush-interval-ms', type=int, default=1000,
+                        help="Максимальная задержка записи в базу, мс")
+
+    # По умолчанию сроки хранения берутся из базы (load_retention_policy); без
+    # сохранённой политики и флагов данные не удаляются
+    parser.add_argument('--keep-raw-days', type=float, default=None,
+                        help=f"Срок хранения сырых замеров, сутки; 0 - без ограничения "
+                             f"(включает очистку, по умолчанию {RetentionPolicy.raw_days})")
+    parser.add_argument('--compress-after-days', type=float, default=None,
+                        help=f"Возраст замеров для сжатия в блоки, сутки; 0 - не сжимать "
+                             f"(включает очистку, по умолчанию {RetentionPolicy.compress_after_days})")
+    for resolution, days in RetentionPolicy().rollup_days.items():
+        parser.add_argument(f'--keep-{resolution}-days', type=float, default=None,
+                            help=f"Срок хранения агрегатов {resolution}, сутки; 0 - без ограничения "
+                                 f"(включает очистку, по умолчанию {days})")
+
+    args = parser.parse_args(argv)
+    if args.interval <= 0:
+        parser.error("--interval должен быть положительным")
+    return args
+
+
+def retention_policy_from_args(
+        args: argparse.Namespace,
+        saved: RetentionPolicy | None = None
+) -> RetentionPolicy | None:
+    """
+    Сроки хранения из аргументов командной строки (0 - без ограничения).
+
+    :param saved: Политика, сохранённая в базе; флаги переопределяют её сроки
+    :return: saved, если ни один флаг не задан; None - очистка не включена
+    """
+    flags = {'raw_days': args.keep_raw_days, 'compress_after_days': args.compress_after_days}
+    rollup_flags = {resolution: getattr(args, f'keep_{resolution}_days') for resolution in ROLLUP_RESOLUTIONS}
+    if all(value is None for value in (*flags.values(), *rollup_flags.values())):
+        return saved
+
+    policy = saved or RetentionPolicy()
+    rollup_days = dict(policy.rollup_days)
+    rollup_days.update({resolution: days or None for resolution, days in rollup_flags.items() if days is not None})
+    return replace(
+        policy,
+        **{name: value or None for name, value in flags.items() if value is not None},
+        rollup_days=rollup_days
+    )
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Запуск сборщика в режиме демона"""
+    started = time.perf_counter()
+    args = parse_args(argv)
+    logger = get_logger('Collector')
+
+    if args.storage == 'segments':
+        # Журнал сегментов не ведёт агрегаты, сроки хранения к нему не применяются
+        database_handler = SegmentLogHandler(args.db)
+        retention_worker = None
+    else:
+        database_handler = DatabaseHandler(args.db, persistent=True)
+        policy = retention_policy_from_args(args, load_retention_policy(database_handler))
+        retention_worker = None if policy is None else RetentionWorker(database_handler, policy)
+    metrics_writer = MetricsWriter(
+        database_handler, batch_size=args.batch_size, flush_interval_ms=args.flush_interval_ms
+    )
+    collector = MetricsCollector(
+        database_handler, metrics_writer, interval=args.interval, policy=args.policy,
+        use_proc_reader=args.proc_reader, collector_options={'disk': {'mount_points': args.mount_points}}
+    )
+
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+
+    try:
+        metrics_writer.start()
+        if retention_worker is not None:
+            retention_worker.start()
+        if not collector.start():
+            return 1
+
+        startup_ms = (time.perf_counter() - started) * 1000
+        rss_mb = psutil.Process().memory_info().rss / (1024 * 1024)
+        logger.info(
+            f"Сборщик запущен: инициализация {startup_ms:.0f} мс, RSS {rss_mb:.1f} МБ, "
+            f"интервал {args.interval} сек"
+        )
+
+        stop_event.wait(args.duration)
+        return 0
+
+    finally:
+        collector.close()
+        if retention_worker is not None:
+            retention_worker.close()
+        metrics_writer.close()
+        database_handler.close()
+        logger.info("Сборщик остановлен")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,297 @@
+import sys
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple, Type
+
+import psutil
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.database import IO_RATE_KEYS
+from src.proc_reader import ProcReader
+from src.cpu_monitor import CPUMonitoring, BREAKDOWN_FIELDS
+from src.disk_monitor import DiskMonitoring
+from src.gpu_monitor import DEFAULT_CACHE_PATH, GPUMonitoring
+from src.io_monitor import IOMonitoring
+from src.logger_config import get_logger, LogSampler
+
+
+# Время ожидания результата сборщика по умолчанию, сек
+DEFAULT_TIMEOUT = 0.5
+
+
+class Collector:
+    """
+    Источник группы метрик для MetricsCollector.
+
+    Подкласс задаёт уникальное имя name, ожидание timeout и значения default,
+    которые используются, пока сборщик ни разу не вернул результат, и
+    реализует collect(). Исключение из collect() означает, что за этот тик
+    данных нет: в запись попадут последние успешные значения с пометкой
+    устаревших. Новые сборщики подключаются декоратором register_collector.
+    """
+
+    name: str = ''
+    timeout: float = DEFAULT_TIMEOUT
+    default: Dict[str, Any] = {}
+
+    def __init__(self, proc_reader: ProcReader | None = None, timeout: float | None = None):
+        """
+        :param proc_reader: Общий источник /proc для сборщиков, которые его поддерживают
+        :param timeout: Ожидание результата, сек; None - значение класса
+        """
+        self.proc_reader = proc_reader
+        if timeout is not None:
+            self.timeout = timeout
+
+    def collect(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+COLLECTOR_REGISTRY: Dict[str, Type[Collector]] = {}
+
+
+def register_collector(cls: Type[Collector]) -> Type[Collector]:
+    """Декоратор регистрации сборщика под именем cls.name"""
+    if not cls.name:
+        raise ValueError(f"У сборщика {cls.__name__} не задано имя")
+    if cls.name in COLLECTOR_REGISTRY and COLLECTOR_REGISTRY[cls.name] is not cls:
+        raise ValueError(f"Сборщик '{cls.name}' уже зарегистрирован")
+    COLLECTOR_REGISTRY[cls.name] = cls
+    return cls
+
+
+def create_collectors(
+        names: Sequence[str] | None = None,
+        proc_reader: ProcReader | None = None,
+        options: Dict[str, Dict[str, Any]] | None = None
+) -> List[Collector]:
+    """
+    Создание сборщиков из реестра.
+
+    :param names: Имена сборщиков; None - все зарегистрированные в порядке регистрации
+    :param options: Имя сборщика -> дополнительные аргументы конструктора
+        (например, {'disk': {'mount_points': ['/', '/home']}})
+    """
+    names = list(COLLECTOR_REGISTRY) if names is None else list(names)
+    options = options or {}
+    unknown = [name for name in [*names, *options] if name not in COLLECTOR_REGISTRY]
+    if unknown:
+        raise ValueError(f"Неизвестные сборщики: {', '.join(unknown)}")
+    return [COLLECTOR_REGISTRY[name](proc_reader=proc_reader, **options.get(name, {})) for name in names]
+
+
+@register_collector
+class CPUCollector(Collector):
+    name = 'cpu'
+    timeout = 0.2
+    default = {'cpu_percent': 0.0, 'cpu_per_core': [], **{key: 0.0 for key in BREAKDOWN_FIELDS}}
+
+    def __init__(self, proc_reader: ProcReader | None = None, timeout: float | None = None):
+        super().__init__(proc_reader, timeout)
+        self.cpu_monitoring = CPUMonitoring(proc_reader)
+
+    def collect(self) -> Dict[str, Any]:
+        return self.cpu_monitoring.sample()
+
+
+@register_collector
+class MemoryCollector(Collector):
+    name = 'memory'
+    timeout = 0.2
+    default = {'ram_free_mb': 0.0, 'ram_total_mb': 0.0}
+
+    def collect(self) -> Dict[str, Any]:
+        if self.proc_reader is not None:
+            ram_free_mb, ram_total_mb = self.proc_reader.get_ram_info()
+        else:
+            ram = psutil.virtual_memory()
+            ram_free_mb, ram_total_mb = round(ram.available / (1024 * 1024), 2), round(ram.total / (1024 * 1024), 2)
+        return {'ram_free_mb': ram_free_mb, 'ram_total_mb': ram_total_mb}
+
+
+@register_collector
+class DiskCollector(Collector):
+    """
+    Место на дисках: disk_free_gb/disk_total_gb - по основной точке монтирования,
+    disk_mounts - {точка монтирования: [свободно ГБ, всего ГБ]} по всем отслеживаемым
+    """
+    name = 'disk'
+    default = {'disk_free_gb': 0.0, 'disk_total_gb': 0.0, 'disk_mounts': {}}
+
+    def __init__(
+            self,
+            proc_reader: ProcReader | None = None,
+            timeout: float | None = None,
+            mount_points: List[str] | None = None
+    ):
+        """
+        :param mount_points: Отслеживаемые точки монтирования, см. DiskMonitoring
+        """
+        super().__init__(proc_reader, timeout)
+        self.disk_monitoring = DiskMonitoring(mount_points)
+
+    def collect(self) -> Dict[str, Any]:
+        usage = self.disk_monitoring.get_all_usage()
+        disk_free_gb, disk_total_gb = usage[self.disk_monitoring.primary_mount]
+        return {
+            'disk_free_gb': disk_free_gb,
+            'disk_total_gb': disk_total_gb,
+            'disk_mounts': {mount: list(values) for mount, values in usage.items()}
+        }
+
+    def close(self) -> None:
+        self.disk_monitoring.close()
+
+
+@register_collector
+class GPUCollector(Collector):
+    name = 'gpu'
+    default = {'gpu_load': 0.0}
+    # Файл кэша обнаруженных GPU, см. GPUMonitoring; None - без кэша на диске
+    cache_path: str | None = DEFAULT_CACHE_PATH
+
+    def __init__(self, proc_reader: ProcReader | None = None, timeout: float | None = None):
+        super().__init__(proc_reader, timeout)
+        self.gpu_monitoring = GPUMonitoring(cache_path=self.cache_path)
+
+    def collect(self) -> Dict[str, Any]:
+        return {'gpu_load': self.gpu_monitoring.get_gpu_load()}
+
+    def close(self) -> None:
+        self.gpu_monitoring.close()
+
+
+@register_collector
+class IOCollector(Collector):
+    name = 'io'
+    timeout = 0.2
+    default = {**{key: 0.0 for key in IO_RATE_KEYS}, 'io_devices': {'net': {}, 'disk': {}}}
+
+    def __init__(self, proc_reader: ProcReader | None = None, timeout: float | None = None):
+        super().__init__(proc_reader, timeout)
+        self.io_monitoring = IOMonitoring()
+
+    def collect(self) -> Dict[str, Any]:
+        return self.io_monitoring.sample()
+
+    def close(self) -> None:
+        self.io_monitoring.close()
+
+
+@dataclass
+class CollectorStats:
+    """Статистика времени работы сборщика, мс"""
+    last_ms: float = 0.0
+    max_ms: float = 0.0
+    total_ms: float = 0.0
+    runs: int = 0
+    timeouts: int = 0
+    errors: int = 0
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.runs if self.runs else 0.0
+
+    def record(self, elapsed_ms: float) -> None:
+        self.last_ms = elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.total_ms += elapsed_ms
+        self.runs += 1
+
+
+class CollectorPool:
+    """
+    Параллельный запуск сборщиков в пуле потоков.
+
+    За тик каждый сборщик запускается не более одного раза: если он ещё не
+    завершил прошлый запуск, новый не ставится в очередь, а ожидается
+    прежний. Сборщик, не уложившийся в свой timeout (или в общий срок тика),
+    а также завершившийся с ошибкой, отдаёт последние успешные значения и
+    попадает в список устаревших.
+    """
+
+    def __init__(self, collectors: Sequence[Collector], max_workers: int | None = None):
+        self.logger = get_logger(self.__class__.__name__)
+        self.collectors = list(collectors)
+        self.stats: Dict[str, CollectorStats] = {collector.name: CollectorStats() for collector in self.collectors}
+        self._last_good: Dict[str, Dict[str, Any]] = {
+            collector.name: dict(collector.default) for collector in self.collectors
+        }
+        self._pending: Dict[str, Future] = {}
+        self._timeout_log_sampler = LogSampler(100)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(len(self.collectors), 1), thread_name_prefix='collector'
+        )
+
+    def get(self, name: str) -> Collector:
+        """Сборщик по имени"""
+        for collector in self.collectors:
+            if collector.name == name:
+                return collector
+        raise KeyError(name)
+
+    def _timed_collect(self, collector: Collector) -> Dict[str, Any]:
+        started = time.perf_counter_ns()
+        try:
+            return collector.collect()
+        finally:
+            self.stats[collector.name].record((time.perf_counter_ns() - started) / 1_000_000)
+
+    def run(self, deadline: float | None = None) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Один запуск всех сборщиков.
+
+        :param deadline: Общий срок ожидания результатов, сек; None - только timeout сборщиков
+        :return: (объединённые метрики, имена сборщиков с устаревшими значениями)
+        """
+        started = time.monotonic()
+        for collector in self.collectors:
+            if collector.name not in self._pending:
+                self._pending[collector.name] = self._executor.submit(self._timed_collect, collector)
+
+        metrics: Dict[str, Any] = {}
+        stale: List[str] = []
+        for collector in self.collectors:
+            name = collector.name
+            timeout = collector.timeout if deadline is None else min(collector.timeout, deadline)
+            try:
+                values = self._pending[name].result(timeout=max(started + timeout - time.monotonic(), 0))
+
+            except TimeoutError:
+                self.stats[name].timeouts += 1
+                stale.append(name)
+                if self._timeout_log_sampler():
+                    self.logger.warning(
+                        f"Сборщик '{name}' не уложился в {timeout * 1000:.0f} мс, используются прошлые значения"
+                    )
+
+            except Exception as e:
+                del self._pending[name]
+                self.stats[name].errors += 1
+                stale.append(name)
+                self.logger.error(f"Ошибка сборщика '{name}': {e}")
+
+            else:
+                del self._pending[name]
+                self._last_good[name] = values
+
+            metrics.update(self._last_good[name])
+
+        return metrics, stale
+
+    def latency_ms(self) -> Dict[str, float]:
+        """Время последнего завершённого запуска каждого сборщика, мс"""
+        return {name: round(stats.last_ms, 3) for name, stats in self.stats.items()}
+
+    def close(self) -> None:
+        """Остановка пула без ожидания зависших сборщиков и освобождение их ресурсов"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for collector in self.collectors:
+            collector.close()
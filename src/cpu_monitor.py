@@ -0,0 +1,94 @@
+import sys
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+
+import psutil
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.proc_reader import ProcReader
+from src.logger_config import get_logger
+
+
+# Порядок счётчиков, как в строках cpu файла /proc/stat
+CPU_TIME_FIELDS = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal')
+
+# Составляющие загрузки: ключ метрики -> индексы счётчиков CPU_TIME_FIELDS
+BREAKDOWN_FIELDS = {
+    'cpu_user': (0, 1),
+    'cpu_system': (2, 5, 6),
+    'cpu_iowait': (4,),
+    'cpu_steal': (7,),
+}
+
+IDLE_INDEXES = (3, 4)
+
+
+class CPUMonitoring:
+    """
+    Загрузка ЦП по ядрам и по видам времени (user/system/iowait/steal).
+
+    Проценты вычисляются по разности счётчиков времени ЦП между вызовами
+    sample(). Счётчики читаются через ProcReader, если он передан, иначе
+    через psutil.cpu_times.
+    """
+
+    def __init__(self, proc_reader: ProcReader | None = None):
+        """
+        :param proc_reader: Источник счётчиков /proc/stat; None - использовать psutil
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.proc_reader = proc_reader
+        self._last_times = self._read_times()
+
+    def _read_times(self) -> List[Tuple[float, ...]]:
+        """Счётчики времени: первый элемент - суммарный, далее по ядрам"""
+        if self.proc_reader is not None:
+            return self.proc_reader.read_cpu_times()
+
+        all_times = [psutil.cpu_times(), *psutil.cpu_times(percpu=True)]
+        return [tuple(getattr(times, field, 0.0) for field in CPU_TIME_FIELDS) for times in all_times]
+
+    @staticmethod
+    def _deltas(current: Sequence[float], previous: Sequence[float]) -> Tuple[List[float], float]:
+        deltas = [max(now - before, 0) for now, before in zip(current, previous)]
+        return deltas, sum(deltas)
+
+    @classmethod
+    def _busy_percent(cls, current: Sequence[float], previous: Sequence[float]) -> float:
+        deltas, total = cls._deltas(current, previous)
+        if total <= 0:
+            return 0.0
+        idle = sum(deltas[index] for index in IDLE_INDEXES)
+        return round((total - idle) / total * 100, 1)
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Загрузка ЦП с предыдущего вызова.
+
+        :return: Словарь с ключами cpu_percent, cpu_per_core и составляющими BREAKDOWN_FIELDS, %
+        """
+        times = self._read_times()
+        last_times = self._last_times
+        self._last_times = times
+
+        # При смене числа ядер (hotplug) поядерные значения за этот интервал не считаются,
+        # общая загрузка считается по строке cpu как обычно
+        last_cores = last_times[1:]
+        if len(times) != len(last_times):
+            self.logger.info(f"Изменилось число ядер ЦП: {len(last_times) - 1} -> {len(times) - 1}")
+            last_cores = times[1:]
+
+        deltas, total = self._deltas(times[0], last_times[0])
+        metrics: Dict[str, Any] = {
+            'cpu_percent': self._busy_percent(times[0], last_times[0]),
+            'cpu_per_core': [
+                self._busy_percent(core, last_core) for core, last_core in zip(times[1:], last_cores)
+            ],
+        }
+        for key, indexes in BREAKDOWN_FIELDS.items():
+            part = sum(deltas[index] for index in indexes)
+            metrics[key] = round(part / total * 100, 1) if total > 0 else 0.0
+
+        return metrics
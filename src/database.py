@@ -4,15 +4,23 @@ import os
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
+import heapq
+import itertools
+import json
 import sqlite3
+import struct
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Any, List
-from src.logger_config import get_logger
+from typing import Dict, Any, List, Iterator, Sequence, Tuple
+from src.gorilla import decode_block, encode_block
+from src.logger_config import get_logger, LogSampler
+from src.rollups import ROLLUP_METRICS, ROLLUP_RESOLUTIONS, PercentileTracker, aggregate, bucket_start, rollup_table
 
 
 CREATE_TABLE = '''CREATE TABLE IF NOT EXISTS system_metrics (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    time_lapse INTEGER,
+                    time_lapse REAL,
                     timestamp DATE,
                     monitoring_time TEXT,
                     cpu_percent REAL,
@@ -20,21 +28,163 @@ CREATE_TABLE = '''CREATE TABLE IF NOT EXISTS system_metrics (
                     ram_free_mb REAL,
                     ram_total_mb REAL,
                     disk_free_gb REAL,
-                    disk_total_gb REAL)
+                    disk_total_gb REAL,
+                    ts_ms INTEGER,
+                    session_id INTEGER,
+                    interval_ms REAL,
+                    lateness_ms REAL,
+                    cpu_user REAL,
+                    cpu_system REAL,
+                    cpu_iowait REAL,
+                    cpu_steal REAL,
+                    cpu_per_core BLOB,
+                    net_rx_bytes_s REAL,
+                    net_tx_bytes_s REAL,
+                    disk_read_bytes_s REAL,
+                    disk_write_bytes_s REAL,
+                    disk_read_iops REAL,
+                    disk_write_iops REAL,
+                    io_devices TEXT,
+                    stale_collectors TEXT,
+                    collector_latency TEXT,
+                    disk_mounts TEXT)
                 '''
 
+CREATE_SESSIONS_TABLE = '''CREATE TABLE IF NOT EXISTS monitoring_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    started_ms INTEGER NOT NULL,
+                    ended_ms INTEGER)
+                '''
+
+# Агрегаты по корзинам времени, см. src/rollups.py
+CREATE_ROLLUP_TABLE = '''CREATE TABLE IF NOT EXISTS {table} (
+                    metric TEXT NOT NULL,
+                    bucket_ms INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    sum REAL NOT NULL,
+                    min REAL NOT NULL,
+                    max REAL NOT NULL,
+                    p95 REAL,
+                    PRIMARY KEY (metric, bucket_ms)) WITHOUT ROWID
+                '''
+
+UPSERT_ROLLUP = (
+    "INSERT INTO {table} (metric, bucket_ms, count, sum, min, max) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (metric, bucket_ms) DO UPDATE SET count = count + excluded.count, sum = sum + excluded.sum, "
+    "min = MIN(min, excluded.min), max = MAX(max, excluded.max)"
+)
+
+UPDATE_ROLLUP_P95 = "UPDATE {table} SET p95 = ? WHERE metric = ? AND bucket_ms = ?"
+
+CREATE_BLOCKS_TABLE = '''CREATE TABLE IF NOT EXISTS metrics_blocks (
+                    id INTEGER PRIMARY KEY,
+                    session_id INTEGER,
+                    start_ms INTEGER NOT NULL,
+                    end_ms INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    min_id INTEGER,
+                    max_id INTEGER)
+                '''
+
+# Настройки приложения, хранящиеся вместе с данными (ключ -> строка)
+CREATE_SETTINGS_TABLE = '''CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL) WITHOUT ROWID
+                '''
+
+CREATE_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_system_metrics_ts ON system_metrics (ts_ms)',
+    'CREATE INDEX IF NOT EXISTS idx_system_metrics_session_ts ON system_metrics (session_id, ts_ms)',
+    'CREATE INDEX IF NOT EXISTS idx_metrics_blocks_start ON metrics_blocks (start_ms)',
+    'CREATE INDEX IF NOT EXISTS idx_metrics_blocks_max_id ON metrics_blocks (max_id)'
+]
+
+
+INSERT_COLUMNS = (
+    'time_lapse', 'timestamp', 'monitoring_time', 'cpu_percent', 'gpu_load',
+    'ram_free_mb', 'ram_total_mb', 'disk_free_gb', 'disk_total_gb',
+    'ts_ms', 'session_id', 'interval_ms', 'lateness_ms',
+    'cpu_user', 'cpu_system', 'cpu_iowait', 'cpu_steal', 'cpu_per_core',
+    'net_rx_bytes_s', 'net_tx_bytes_s', 'disk_read_bytes_s', 'disk_write_bytes_s',
+    'disk_read_iops', 'disk_write_iops', 'io_devices', 'stale_collectors', 'collector_latency', 'disk_mounts'
+)
+
+INSERT_INTO = (
+    f"INSERT INTO system_metrics ({', '.join(INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(INSERT_COLUMNS))})"
+)
+
+METRIC_COLUMNS = (
+    'id', 'time_lapse', 'timestamp', 'monitoring_time', 'cpu_percent', 'gpu_load',
+    'ram_free_mb', 'ram_total_mb', 'disk_free_gb', 'disk_total_gb'
+)
+
+QUERY_COLUMNS = METRIC_COLUMNS + (
+    'ts_ms', 'session_id', 'interval_ms', 'lateness_ms',
+    'cpu_user', 'cpu_system', 'cpu_iowait', 'cpu_steal', 'cpu_per_core',
+    'net_rx_bytes_s', 'net_tx_bytes_s', 'disk_read_bytes_s', 'disk_write_bytes_s',
+    'disk_read_iops', 'disk_write_iops', 'io_devices', 'stale_collectors', 'collector_latency', 'disk_mounts'
+)
+
+SELECT_QUERY_COLUMNS = f"SELECT {', '.join(QUERY_COLUMNS)} FROM system_metrics"
+
+TS_MS_INDEX = INSERT_COLUMNS.index('ts_ms')
+ROLLUP_INDEXES = {metric: INSERT_COLUMNS.index(metric) for metric in ROLLUP_METRICS}
+
+# Разрешение сырых данных в get_trend
+RAW_RESOLUTION = 'raw'
+
+# Версия схемы хранится в PRAGMA user_version
+SCHEMA_VERSION = 10
+
+SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+# Сообщения об успешной записи выводятся раз в LOG_SAMPLE_EVERY операций
+LOG_SAMPLE_EVERY = 100
+
+# Суммарные скорости ввода-вывода; по устройствам они хранятся в io_devices (JSON)
+IO_RATE_KEYS = (
+    'net_rx_bytes_s', 'net_tx_bytes_s', 'disk_read_bytes_s', 'disk_write_bytes_s',
+    'disk_read_iops', 'disk_write_iops'
+)
+
+# Столбцы сжатых блоков истории (metrics_blocks): числовые кодируются XOR, текстовые и BLOB - zlib;
+# вместе с id, ts_ms и session_id блока они покрывают все столбцы system_metrics
+BLOCK_COLUMNS = (
+    'time_lapse', 'cpu_percent', 'gpu_load', 'ram_free_mb', 'ram_total_mb', 'disk_free_gb', 'disk_total_gb',
+    'interval_ms', 'lateness_ms', 'cpu_user', 'cpu_system', 'cpu_iowait', 'cpu_steal', *IO_RATE_KEYS
+)
+BLOCK_TEXT_COLUMNS = (
+    'timestamp', 'monitoring_time', 'cpu_per_core', 'io_devices', 'stale_collectors', 'collector_latency',
+    'disk_mounts'
+)
+
+# Окно сжатия: один блок содержит замеры одной сессии за одно окно
+BLOCK_WINDOW_MS = 3_600_000
+
+# Размер числовой части несжатой строки блока для оценки степени сжатия: id, метка времени, сессия
+# и числовые столбцы по 8 байт
+BLOCK_RAW_ROW_BYTES = 8 * (len(BLOCK_COLUMNS) + 3)
+
+# Поядерная загрузка хранится в BLOB как uint16 (сотые доли процента), little-endian
+PER_CORE_FORMAT = '<{}H'
+
+
+def pack_per_core(values: Sequence[float] | None) -> bytes | None:
+    """Упаковка поядерной загрузки ЦП в 2 байта на ядро"""
+    if not values:
+        return None
+    scaled = (round(min(max(value, 0.0), 100.0) * 100) for value in values)
+    return struct.pack(PER_CORE_FORMAT.format(len(values)), *scaled)
+
+
+def unpack_per_core(blob: bytes | None) -> List[float]:
+    """Распаковка поядерной загрузки ЦП из BLOB"""
+    if not blob:
+        return []
+    return [value / 100 for value in struct.unpack(PER_CORE_FORMAT.format(len(blob) // 2), blob)]
 
-INSERT_INTO = '''INSERT INTO system_metrics (
-                    time_lapse, 
-                    timestamp,
-                    monitoring_time, 
-                    cpu_percent, 
-                    gpu_load,
-                    ram_free_mb, 
-                    ram_total_mb, 
-                    disk_free_gb, 
-                    disk_total_gb) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-               '''
 
 REQUIRED_KEYS = [
     'time_lapse', 'monitoring_time', 'cpu_percent', 'gpu_load',
@@ -43,21 +193,85 @@ REQUIRED_KEYS = [
 
 
 class DatabaseHandler:
-    def __init__(self, db_name='system_monitoring.db'):
+    def __init__(
+            self,
+            db_name='system_monitoring.db',
+            persistent: bool = False,
+            synchronous: str = 'NORMAL',
+            cache_size_kb: int = 8192
+    ):
+        """
+        :param db_name: Путь к файлу базы данных
+        :param persistent: Держать одно долгоживущее соединение в режиме WAL
+            вместо открытия нового соединения на каждый вызов
+        :param synchronous: Уровень PRAGMA synchronous для долгоживущего соединения
+        :param cache_size_kb: Размер страничного кэша SQLite в КБ
+        """
         self.logger = get_logger(self.__class__.__name__)
         self.logger.info(f"Инициализация базы данных: {db_name}")
         self.db_name = db_name
+        self.persistent = persistent
+
+        synchronous = synchronous.upper()
+        if synchronous not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Недопустимый уровень synchronous: {synchronous}")
+
+        self.synchronous = synchronous
+        self.cache_size_kb = cache_size_kb
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+        self._insert_log_sampler = LogSampler(LOG_SAMPLE_EVERY)
+        self._batch_log_sampler = LogSampler(LOG_SAMPLE_EVERY)
+        self._percentile_trackers = {
+            resolution: PercentileTracker(resolution_ms) for resolution, resolution_ms in ROLLUP_RESOLUTIONS.items()
+        }
         self.create_table()
 
     def _get_connection(self) -> sqlite3.Connection:
         """Создание соединения с базой данных"""
+        if self.persistent and self._connection is not None:
+            return self._connection
+
         try:
-            conn = sqlite3.connect(self.db_name)
+            if not self.persistent:
+                return sqlite3.connect(self.db_name)
+
+            conn = sqlite3.connect(self.db_name, check_same_thread=False)
+            self._configure_connection(conn)
+            self._connection = conn
             return conn
+
         except sqlite3.Error as e:
             self.logger.error(f"Ошибка при подключении к базе данных: {e}")
             raise
 
+    def _configure_connection(self, conn: sqlite3.Connection) -> None:
+        """Настройка долгоживущего соединения: WAL, synchronous и размер кэша"""
+        # Переключение в WAL записывает заголовок файла, после чего auto_vacuum новой базы уже не изменить
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        journal_mode = conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+        self.logger.info(
+            f"Постоянное соединение: journal_mode={journal_mode}, "
+            f"synchronous={self.synchronous}, cache_size={self.cache_size_kb} КБ"
+        )
+
+    def close(self) -> None:
+        """Закрытие долгоживущего соединения с базой данных"""
+        with self._lock:
+            self.flush_rollups()
+            if self._connection is None:
+                return
+
+            try:
+                self._connection.close()
+                self.logger.info("Соединение с базой данных закрыто")
+            except sqlite3.Error as e:
+                self.logger.error(f"Ошибка при закрытии соединения: {e}")
+            finally:
+                self._connection = None
+
     def _validate_metrics(self, metrics: Dict[str, Any]) -> bool:
         """Валидация входящих метрик"""
         if not all(key in metrics for key in REQUIRED_KEYS):
@@ -65,9 +279,7 @@ class DatabaseHandler:
 
         try:
             for key in REQUIRED_KEYS:
-                if key == 'time_lapse':
-                    int(metrics[key])
-                elif key == 'monitoring_time':
+                if key == 'monitoring_time':
                     str(metrics[key])
                 else:
                     float(metrics[key])
@@ -78,15 +290,175 @@ class DatabaseHandler:
 
         return True
 
+    @staticmethod
+    def _metrics_to_row(metrics: Dict[str, Any]) -> tuple:
+        """Преобразование словаря метрик в строку для INSERT_INTO"""
+        ts_ms = int(metrics.get('timestamp_ms') or time.time() * 1000)
+        return (
+            metrics['time_lapse'],
+            datetime.fromtimestamp(ts_ms / 1000).strftime('%Y-%m-%d'),
+            metrics['monitoring_time'],
+            metrics['cpu_percent'],
+            metrics['gpu_load'],
+            metrics['ram_free_mb'],
+            metrics['ram_total_mb'],
+            metrics['disk_free_gb'],
+            metrics['disk_total_gb'],
+            ts_ms,
+            metrics.get('session_id'),
+            float(metrics.get('interval_ms') or float(metrics['time_lapse']) * 1000),
+            metrics.get('lateness_ms'),
+            metrics.get('cpu_user'),
+            metrics.get('cpu_system'),
+            metrics.get('cpu_iowait'),
+            metrics.get('cpu_steal'),
+            pack_per_core(metrics.get('cpu_per_core')),
+            *(metrics.get(key) for key in IO_RATE_KEYS),
+            json.dumps(metrics['io_devices'], separators=(',', ':')) if metrics.get('io_devices') else None,
+            ','.join(metrics['stale_collectors']) if metrics.get('stale_collectors') else None,
+            json.dumps(metrics['collector_latency_ms'], separators=(',', ':'))
+            if metrics.get('collector_latency_ms') else None,
+            json.dumps(metrics['disk_mounts'], separators=(',', ':')) if metrics.get('disk_mounts') else None
+        )
+
     def create_table(self) -> None:
         """Создание таблицы для хранения системных метрик"""
         try:
-            with self._get_connection() as conn:
-                            cursor = conn.cursor()
-                            cursor.execute(CREATE_TABLE)
-                            conn.commit()
-        except sqlite3.Error:
-            pass
+            with self._lock, self._get_connection() as conn:
+                cursor = conn.cursor()
+                # auto_vacuum можно включить только до создания первой таблицы
+                if cursor.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0:
+                    cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                cursor.execute(CREATE_TABLE)
+                cursor.execute(CREATE_SESSIONS_TABLE)
+                for resolution in ROLLUP_RESOLUTIONS:
+                    cursor.execute(CREATE_ROLLUP_TABLE.format(table=rollup_table(resolution)))
+                self._migrate(cursor)
+                for statement in CREATE_INDEXES:
+                    cursor.execute(statement)
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при создании таблицы: {e}")
+
+    def _migrate(self, cursor: sqlite3.Cursor) -> None:
+        """Миграция существующей базы данных до SCHEMA_VERSION"""
+        version = cursor.execute('PRAGMA user_version').fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        migrations = {
+            2: self._migrate_to_v2,
+            3: self._migrate_to_v3,
+            4: self._migrate_to_v4,
+            5: self._migrate_to_v5,
+            6: self._migrate_to_v6,
+            7: self._migrate_to_v7,
+            8: self._migrate_to_v8,
+            9: self._migrate_to_v9,
+            10: self._migrate_to_v10
+        }
+        # user_version = 0 соответствует исходной схеме (версия 1)
+        for target_version in range(max(version, 1) + 1, SCHEMA_VERSION + 1):
+            migrations[target_version](cursor)
+            self.logger.info(f"База данных мигрирована до версии схемы {target_version}")
+
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    @staticmethod
+    def _add_missing_columns(cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]) -> None:
+        """Добавление отсутствующих столбцов в таблицу"""
+        existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+        for name, column_type in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {column_type}')
+
+    def _migrate_to_v2(self, cursor: sqlite3.Cursor) -> None:
+        """Версия 2: точная метка времени в мс и идентификатор сессии записи"""
+        self._add_missing_columns(cursor, 'system_metrics', {'ts_ms': 'INTEGER', 'session_id': 'INTEGER'})
+        cursor.execute(
+            "UPDATE system_metrics SET ts_ms = CAST(strftime('%s', timestamp) AS INTEGER) * 1000 "
+            "WHERE ts_ms IS NULL"
+        )
+
+    def _migrate_to_v3(self, cursor: sqlite3.Cursor) -> None:
+        """Версия 3: дробный интервал сбора в мс и опоздание тика планировщика"""
+        self._add_missing_columns(cursor, 'system_metrics', {'interval_ms': 'REAL', 'lateness_ms': 'REAL'})
+        cursor.execute("UPDATE system_metrics SET interval_ms = time_lapse * 1000.0 WHERE interval_ms IS NULL")
+
+    def _migrate_to_v4(self, cursor: sqlite3.Cursor) -> None:
+        """Версия 4: составляющие загрузки ЦП и поядерная загрузка в упакованном виде"""
+        self._add_missing_columns(cursor, 'system_metrics', {
+            'cpu_user': 'REAL', 'cpu_system': 'REAL', 'cpu_iowait': 'REAL',
+            'cpu_steal': 'REAL', 'cpu_per_core': 'BLOB'
+        })
+
+    def _migrate_to_v5(self, cursor: sqlite3.Cursor) -> None:
+        """Версия 5: скорости сетевого и дискового ввода-вывода"""
+        columns = {key: 'REAL' for key in IO_RATE_KEYS}
+        columns['io_devices'] = 'TEXT'
+        self._add_missing_columns(cursor, 'system_metrics', columns)
+
+    def _migrate_to_v6(self, cursor: sqlite3.Cursor) -> None:
+        """Версия 6: устаревшие значения и время работы сборщиков"""
+        self._add_missing_columns(cursor, 'system_metrics', {'stale_collectors': 'TEXT', 'collector_latency': 'TEXT'})
+
+    def _migrate_to_v7(self, cursor: sqlite3.Cursor) -> None:
+        """Версия 7: заполнение агрегатов по уже записанным метрикам (перцентили не вычисляются)"""
+        for resolution, resolution_ms in ROLLUP_RESOLUTIONS.items():
+            for metric in ROLLUP_METRICS:
+                cursor.execute(
+                    f"INSERT OR REPLACE INTO {rollup_table(resolution)} (metric, bucket_ms, count, sum, min, max) "
+                    f"SELECT ?, ts_ms - ts_ms % {resolution_ms}, COUNT({metric}), SUM({metric}), "
+                    f"MIN({metric}), MAX({metric}) FROM system_metrics "
+                    f"WHERE ts_ms IS NOT NULL AND {metric} IS NOT NULL GROUP BY 2",
+                    (metric,)
+                )
+
+    def _migrate_to_v8(self, cursor: sqlite3.Cursor) -> None:
+        """Версия 8: сжатые блоки истории (см. compact_window)"""
+        cursor.execute(CREATE_BLOCKS_TABLE)
+
+    def _migrate_to_v9(self, cursor: sqlite3.Cursor) -> None:
+        """Версия 9: настройки приложения (см. get_setting)"""
+        cursor.execute(CREATE_SETTINGS_TABLE)
+
+    def _migrate_to_v10(self, cursor: sqlite3.Cursor) -> None:
+        """Версия 10: место на дисках по точкам монтирования (JSON)"""
+        self._add_missing_columns(cursor, 'system_metrics', {'disk_mounts': 'TEXT'})
+
+    def _update_rollups(self, cursor: sqlite3.Cursor, rows: List[tuple]) -> None:
+        """
+        Инкрементальное обновление агрегатов по только что вставленным строкам.
+
+        count/sum/min/max обновляются UPSERT по затронутым корзинам, перцентиль
+        записывается при закрытии корзины (см. PercentileTracker).
+        """
+        samples = [
+            (row[TS_MS_INDEX], {metric: row[index] for metric, index in ROLLUP_INDEXES.items()})
+            for row in rows
+        ]
+        for resolution, resolution_ms in ROLLUP_RESOLUTIONS.items():
+            table = rollup_table(resolution)
+            cursor.executemany(UPSERT_ROLLUP.format(table=table), [
+                (metric, bucket, *values) for (metric, bucket), values in aggregate(samples, resolution_ms).items()
+            ])
+            closed = self._percentile_trackers[resolution].add(samples)
+            if closed:
+                cursor.executemany(UPDATE_ROLLUP_P95.format(table=table), closed)
+
+    def flush_rollups(self) -> None:
+        """Запись перцентилей открытых корзин (при остановке записи)"""
+        closed = {resolution: tracker.close() for resolution, tracker in self._percentile_trackers.items()}
+        if not any(closed.values()):
+            return
+
+        try:
+            with self._lock, self._get_connection() as conn:
+                for resolution, rows in closed.items():
+                    conn.executemany(UPDATE_ROLLUP_P95.format(table=rollup_table(resolution)), rows)
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при записи агрегатов: {e}")
 
     def adding_data(self, metrics: Dict[str, Any]) -> bool:
         """Добавление метрик в базу данных"""
@@ -94,22 +466,15 @@ class DatabaseHandler:
             return False
 
         try:
-            with self._get_connection() as conn:
+            with self._lock, self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(INSERT_INTO, (
-                    metrics['time_lapse'],
-                    datetime.now().strftime('%Y-%m-%d'),
-                    metrics['monitoring_time'],
-                    metrics['cpu_percent'],
-                    metrics['gpu_load'],
-                    metrics['ram_free_mb'],
-                    metrics['ram_total_mb'],
-                    metrics['disk_free_gb'],
-                    metrics['disk_total_gb']
-                ))
+                row = self._metrics_to_row(metrics)
+                cursor.execute(INSERT_INTO, row)
+                self._update_rollups(cursor, [row])
                 conn.commit()
 
-                self.logger.info("Метрики успешно добавлены")
+                if self._insert_log_sampler():
+                    self.logger.debug(f"Метрики успешно добавлены (всего {self._insert_log_sampler.count})")
                 return True
 
         except sqlite3.Error as e:
@@ -120,28 +485,764 @@ class DatabaseHandler:
             self.logger.critical(f"Неожиданная ошибка при добавлении метрик: {unexpected_error}")
             return False
 
-    def get_all_metric(self) -> List[tuple]:
-        """Получение всех метрик из базы данных"""
+    def adding_data_batch(self, metrics_batch: List[Dict[str, Any]]) -> int:
+        """
+        Добавление пачки метрик одной транзакцией через executemany.
+
+        :param metrics_batch: Список словарей метрик
+        :return: Количество добавленных записей
+        """
+        rows = [self._metrics_to_row(metrics) for metrics in metrics_batch if self._validate_metrics(metrics)]
+        if not rows:
+            return 0
+
         try:
-            with sqlite3.connect(self.db_name) as conn:
+            with self._lock, self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM system_metrics')
-                metrics = cursor.fetchall()
-                self.logger.info(f"Получено {len(metrics)} записей")
-                return metrics
-        except sqlite3.Error:
+                cursor.executemany(INSERT_INTO, rows)
+                self._update_rollups(cursor, rows)
+                conn.commit()
+
+            if self._batch_log_sampler():
+                self.logger.debug(f"Добавлено {len(rows)} записей метрик")
+            return len(rows)
+
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при пакетном добавлении метрик: {e}")
+            return 0
+
+    def get_all_metric(self) -> List[tuple]:
+        """Получение всех метрик из базы данных, включая сжатые блоки, в порядке id"""
+        metrics = list(self._iter_by_id(METRIC_COLUMNS))
+        self.logger.info(f"Получено {len(metrics)} записей")
+        return metrics
+
+    def _query(self, query: str, params: tuple = ()) -> List[tuple]:
+        """Выполнение запроса на чтение с возвратом всех строк"""
+        try:
+            with self._lock, self._get_connection() as conn:
+                return conn.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при чтении метрик: {e}")
             return []
 
+    def get_metrics_range(
+            self,
+            start_ms: int,
+            end_ms: int,
+            session_id: int | None = None,
+            limit: int | None = None
+    ) -> List[tuple]:
+        """
+        Получение метрик за интервал времени [start_ms, end_ms].
+
+        :param start_ms: Начало интервала, мс от начала эпохи
+        :param end_ms: Конец интервала, мс от начала эпохи
+        :param session_id: Ограничить выборку одной сессией записи
+        :param limit: Максимальное количество строк
+        :return: Строки со столбцами QUERY_COLUMNS в порядке времени
+        """
+        query = f"{SELECT_QUERY_COLUMNS} WHERE ts_ms BETWEEN ? AND ?"
+        params: tuple = (start_ms, end_ms)
+        if session_id is not None:
+            query += " AND session_id = ?"
+            params += (session_id,)
+
+        query += " ORDER BY ts_ms"
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+
+        rows = self._query(query, params)
+        block_rows = self._read_blocks(QUERY_COLUMNS, start_ms, end_ms, session_id)
+        return self._merge_rows(rows, block_rows, QUERY_COLUMNS.index('ts_ms'), limit)
+
+    def get_series(self, columns: Sequence[str], start_ms: int, end_ms: int) -> List[tuple]:
+        """
+        Временные ряды выбранных столбцов за интервал [start_ms, end_ms] для графиков.
+
+        :param columns: Столбцы из QUERY_COLUMNS
+        :return: Строки (ts_ms, *columns) в порядке времени
+        """
+        if not columns or not set(columns) <= set(QUERY_COLUMNS):
+            raise ValueError(f"Недопустимый набор столбцов: {columns}")
+
+        rows = self._query(
+            f"SELECT ts_ms, {', '.join(columns)} FROM system_metrics WHERE ts_ms BETWEEN ? AND ? ORDER BY ts_ms",
+            (start_ms, end_ms)
+        )
+        return self._merge_rows(rows, self._read_blocks(('ts_ms', *columns), start_ms, end_ms), 0)
+
+    def _read_blocks(
+            self,
+            columns: Sequence[str],
+            start_ms: int,
+            end_ms: int,
+            session_id: int | None = None
+    ) -> List[tuple]:
+        """Строки из сжатых блоков за [start_ms, end_ms] в виде столбцов columns"""
+        query = "SELECT session_id, data FROM metrics_blocks WHERE start_ms BETWEEN ? AND ? AND end_ms >= ?"
+        params: tuple = (start_ms - BLOCK_WINDOW_MS + 1, end_ms, start_ms)
+        if session_id is not None:
+            query += " AND session_id = ?"
+            params += (session_id,)
+
+        rows = []
+        for block_session, data in self._query(query + " ORDER BY start_ms", params):
+            timestamps, block_rows = self._decode_block_rows(block_session, data, columns)
+            rows.extend(row for ts_ms, row in zip(timestamps, block_rows) if start_ms <= ts_ms <= end_ms)
+        return rows
+
+    @staticmethod
+    def _decode_block_rows(session_id: int | None, data: bytes, columns: Sequence[str]) -> Tuple[List[int], List[tuple]]:
+        """
+        Распаковка блока в строки со столбцами columns.
+
+        Распаковываются только потоки нужных столбцов.
+
+        :return: (метки времени строк, строки)
+        """
+        block = decode_block(
+            data,
+            [BLOCK_COLUMNS.index(column) for column in columns if column in BLOCK_COLUMNS],
+            [BLOCK_TEXT_COLUMNS.index(column) for column in columns if column in BLOCK_TEXT_COLUMNS]
+        )
+        sources = []
+        for column in columns:
+            if column == 'id':
+                sources.append(block.ids)
+            elif column == 'ts_ms':
+                sources.append(block.timestamps)
+            elif column == 'session_id':
+                sources.append([session_id] * len(block.timestamps))
+            elif column in BLOCK_COLUMNS:
+                sources.append(block.values[BLOCK_COLUMNS.index(column)])
+            else:
+                sources.append(block.texts[BLOCK_TEXT_COLUMNS.index(column)])
+        return block.timestamps, list(zip(*sources))
+
+    @staticmethod
+    def _merge_rows(rows: List[tuple], block_rows: List[tuple], ts_index: int, limit: int | None = None) -> List[tuple]:
+        """Объединение строк таблицы и сжатых блоков в порядке времени"""
+        if not block_rows:
+            return rows
+
+        merged = sorted(rows + block_rows, key=lambda row: row[ts_index])
+        return merged if limit is None else merged[:limit]
+
+    def choose_resolution(self, start_ms: int, end_ms: int, max_points: int) -> str:
+        """
+        Самое подробное разрешение, при котором ряд за [start_ms, end_ms] не
+        превышает max_points точек: сырые данные, затем агрегаты по минутам и
+        по часам. Если бюджет не выполняется ни для одного, берутся самые
+        крупные агрегаты.
+        """
+        # Замеры из сжатых блоков учитываются в бюджете сырых данных
+        compressed = self._query(
+            "SELECT COALESCE(SUM(count), 0) FROM metrics_blocks WHERE start_ms BETWEEN ? AND ? AND end_ms >= ?",
+            (start_ms - BLOCK_WINDOW_MS + 1, end_ms, start_ms)
+        )
+        candidates = [(
+            RAW_RESOLUTION,
+            "SELECT 1 FROM system_metrics WHERE ts_ms BETWEEN ? AND ?",
+            (start_ms, end_ms),
+            compressed[0][0] if compressed else 0
+        )]
+        for resolution, resolution_ms in ROLLUP_RESOLUTIONS.items():
+            candidates.append((
+                resolution,
+                f"SELECT 1 FROM {rollup_table(resolution)} WHERE metric = ? AND bucket_ms BETWEEN ? AND ?",
+                (ROLLUP_METRICS[0], start_ms - resolution_ms + 1, end_ms),
+                0
+            ))
+
+        for resolution, query, params, extra in candidates:
+            # LIMIT останавливает подсчёт, как только бюджет превышен
+            count = self._query(f"SELECT COUNT(*) FROM ({query} LIMIT ?)", params + (max_points + 1,))
+            if count and count[0][0] + extra <= max_points:
+                return resolution
+        return candidates[-1][0]
+
+    def get_trend(
+            self,
+            metric: str,
+            start_ms: int,
+            end_ms: int,
+            max_points: int
+    ) -> Tuple[str, List[tuple]]:
+        """
+        Ряд метрики за интервал с автоматическим выбором разрешения (choose_resolution).
+
+        :param metric: Метрика из ROLLUP_METRICS
+        :param max_points: Бюджет точек (например, ширина графика в пикселях)
+        :return: (разрешение, строки (ts_ms, avg, min, max, p95)); для сырых данных
+            все четыре значения совпадают, для агрегатов ts_ms - начало корзины
+        """
+        if metric not in ROLLUP_METRICS:
+            raise ValueError(f"Для метрики нет агрегатов: {metric}")
+
+        resolution = self.choose_resolution(start_ms, end_ms, max_points)
+        if resolution == RAW_RESOLUTION:
+            rows = [(ts_ms, value, value, value, value) for ts_ms, value in self.get_series((metric,), start_ms, end_ms)]
+        else:
+            rows = self._query(
+                f"SELECT bucket_ms, sum / count, min, max, p95 FROM {rollup_table(resolution)} "
+                f"WHERE metric = ? AND bucket_ms BETWEEN ? AND ? ORDER BY bucket_ms",
+                (metric, start_ms - ROLLUP_RESOLUTIONS[resolution] + 1, end_ms)
+            )
+        return resolution, rows
+
+    def delete_expired(self, resolution: str, cutoff_ms: int, limit: int) -> int:
+        """
+        Удаление одной порции строк старше cutoff_ms отдельной транзакцией.
+
+        :param resolution: RAW_RESOLUTION или ключ ROLLUP_RESOLUTIONS
+        :param cutoff_ms: Граница хранения, мс
+        :param limit: Максимальное количество удаляемых строк
+        :return: Количество удалённых строк
+        """
+        if resolution == RAW_RESOLUTION:
+            # Сжатые блоки - те же сырые замеры; удаляются после строк таблицы
+            query = (
+                "DELETE FROM system_metrics WHERE id IN "
+                "(SELECT id FROM system_metrics WHERE ts_ms < ? ORDER BY ts_ms LIMIT ?)"
+            )
+        elif resolution in ROLLUP_RESOLUTIONS:
+            table = rollup_table(resolution)
+            query = (
+                f"DELETE FROM {table} WHERE (metric, bucket_ms) IN "
+                f"(SELECT metric, bucket_ms FROM {table} WHERE bucket_ms < ? LIMIT ?)"
+            )
+        else:
+            raise ValueError(f"Неизвестное разрешение: {resolution}")
+
+        try:
+            with self._lock, self._get_connection() as conn:
+                deleted = conn.execute(query, (cutoff_ms, limit)).rowcount
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при удалении устаревших данных: {e}")
+            return 0
+
+        # Блок содержит до часа замеров, поэтому блоки удаляются по одному за транзакцию
+        while resolution == RAW_RESOLUTION and deleted < limit:
+            blocks, count = self.delete_blocks(cutoff_ms, 1)
+            if not blocks:
+                break
+            deleted += count
+        return deleted
+
+    def begin_clear(self) -> Dict[str, int] | None:
+        """
+        Начало очистки всех метрик без удаления строк (см. delete_metrics_chunk).
+
+        Одной короткой транзакцией фиксируются границы уже записанных строк и
+        удаляются агрегаты текущих корзин, в которые продолжится запись; более
+        старые корзины удаляются затем порциями через delete_expired.
+
+        :return: Границы очистки: 'min_id', 'max_id', граница сжатых блоков
+            'blocks' (см. delete_blocks) и граница корзин каждого разрешения
+            ROLLUP_RESOLUTIONS; None при ошибке
+        """
+        now_ms = int(time.time() * 1000)
+        try:
+            with self._lock, self._get_connection() as conn:
+                min_id, max_id = conn.execute(
+                    'SELECT COALESCE(MIN(id), 0), COALESCE(MAX(id), 0) FROM system_metrics'
+                ).fetchone()
+                bounds = {'min_id': min_id, 'max_id': max_id, 'blocks': now_ms}
+                for resolution, resolution_ms in ROLLUP_RESOLUTIONS.items():
+                    bounds[resolution] = bucket_start(now_ms, resolution_ms)
+                    conn.execute(f'DELETE FROM {rollup_table(resolution)} WHERE bucket_ms >= ?', (bounds[resolution],))
+                    self._percentile_trackers[resolution].close()
+                conn.commit()
+
+            self.logger.info(f"Начата очистка метрик с id до {max_id}")
+            return bounds
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при очистке метрик: {e}")
+            return None
+
+    def delete_metrics_chunk(self, max_id: int, limit: int) -> Tuple[int, int] | None:
+        """
+        Удаление одной порции строк с id не больше max_id отдельной транзакцией.
+
+        Удаляется диапазон id, поэтому строки, записанные после begin_clear,
+        не затрагиваются.
+
+        :return: (количество удалённых строк, наибольший удалённый id); None при ошибке
+        """
+        try:
+            with self._lock, self._get_connection() as conn:
+                row = conn.execute(
+                    'SELECT id FROM system_metrics WHERE id <= ? ORDER BY id LIMIT 1 OFFSET ?',
+                    (max_id, limit - 1)
+                ).fetchone()
+                upper_id = row[0] if row else max_id
+                deleted = conn.execute('DELETE FROM system_metrics WHERE id <= ?', (upper_id,)).rowcount
+                conn.commit()
+                return deleted, upper_id
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при очистке метрик: {e}")
+            return None
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """
+        Возврат до pages свободных страниц файловой системе.
+
+        Работает только для баз с auto_vacuum = INCREMENTAL (так создаются
+        новые базы); в остальных освобождённые страницы переиспользуются
+        внутри файла.
+
+        :return: Количество освобождённых страниц
+        """
+        try:
+            with self._lock, self._get_connection() as conn:
+                if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                    return 0
+
+                before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+                # execute() выполняет PRAGMA incremental_vacuum только на одну страницу
+                conn.executescript(f'PRAGMA incremental_vacuum({int(pages)})')
+                return before - conn.execute('PRAGMA freelist_count').fetchone()[0]
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка инкрементального VACUUM: {e}")
+            return 0
+
+    def checkpoint(self) -> None:
+        """Перенос WAL в основной файл с усечением журнала"""
+        try:
+            with self._lock, self._get_connection() as conn:
+                conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка контрольной точки WAL: {e}")
+
+    def get_storage_stats(self) -> Dict[str, int]:
+        """Размер страницы, число страниц и свободных страниц файла базы"""
+        try:
+            with self._lock, self._get_connection() as conn:
+                return {
+                    pragma: conn.execute(f'PRAGMA {pragma}').fetchone()[0]
+                    for pragma in ('page_size', 'page_count', 'freelist_count', 'auto_vacuum')
+                }
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при чтении параметров базы: {e}")
+            return {}
+
+    def get_session_metrics(self, session_id: int) -> List[tuple]:
+        """Получение всех метрик одной сессии записи"""
+        rows = self._query(f"{SELECT_QUERY_COLUMNS} WHERE session_id = ? ORDER BY ts_ms", (session_id,))
+        block_rows = self._read_blocks(QUERY_COLUMNS, -2 ** 63 + BLOCK_WINDOW_MS, 2 ** 63 - 1, session_id)
+        return self._merge_rows(rows, block_rows, QUERY_COLUMNS.index('ts_ms'))
+
+    def oldest_window(self, before_ms: int) -> int | None:
+        """
+        Начало самого старого окна BLOCK_WINDOW_MS с несжатыми строками, целиком
+        закрытого до before_ms; None, если такого окна нет.
+        """
+        rows = self._query("SELECT MIN(ts_ms) FROM system_metrics WHERE ts_ms < ?", (before_ms,))
+        if not rows or rows[0][0] is None:
+            return None
+
+        window_start = bucket_start(rows[0][0], BLOCK_WINDOW_MS)
+        return window_start if window_start + BLOCK_WINDOW_MS <= before_ms else None
+
+    def compact_window(self, window_start_ms: int) -> int:
+        """
+        Сжатие строк окна [window_start_ms, window_start_ms + BLOCK_WINDOW_MS) в блоки.
+
+        Строки каждой сессии кодируются (gorilla.encode_block: delta-of-delta
+        меток времени и id, XOR значений столбцов BLOCK_COLUMNS, zlib для
+        BLOCK_TEXT_COLUMNS) без удержания блокировки, затем одной транзакцией
+        блоки вставляются, а исходные строки удаляются. Блок хранит все
+        столбцы строки вместе с её id, поэтому читатели по времени и по id
+        возвращают сжатые строки без изменений. Если строки окна изменились
+        во время кодирования, транзакция откатывается.
+
+        :return: Количество сжатых строк
+        """
+        window_end_ms = window_start_ms + BLOCK_WINDOW_MS
+        rows = self._query(
+            f"SELECT id, session_id, ts_ms, {', '.join(BLOCK_COLUMNS + BLOCK_TEXT_COLUMNS)} FROM system_metrics "
+            f"WHERE ts_ms >= ? AND ts_ms < ? ORDER BY session_id, ts_ms, id",
+            (window_start_ms, window_end_ms)
+        )
+        if not rows:
+            return 0
+
+        sessions: Dict[int | None, List[tuple]] = {}
+        for row in rows:
+            sessions.setdefault(row[1], []).append(row)
+
+        text_start = 3 + len(BLOCK_COLUMNS)
+        blocks = []
+        for session_id, session_rows in sessions.items():
+            columns = list(zip(*session_rows))
+            blocks.append((
+                session_id, session_rows[0][2], session_rows[-1][2], len(session_rows),
+                encode_block(columns[2], columns[0], columns[3:text_start], columns[text_start:]),
+                min(columns[0]), max(columns[0])
+            ))
+
+        try:
+            with self._lock, self._get_connection() as conn:
+                deleted = conn.execute(
+                    "DELETE FROM system_metrics WHERE ts_ms >= ? AND ts_ms < ? AND id <= ?",
+                    (window_start_ms, window_end_ms, max(row[0] for row in rows))
+                ).rowcount
+                if deleted != len(rows):
+                    conn.rollback()
+                    self.logger.warning(f"Строки окна {window_start_ms} изменились при сжатии, окно пропущено")
+                    return 0
+
+                conn.executemany(
+                    "INSERT INTO metrics_blocks (session_id, start_ms, end_ms, count, data, min_id, max_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    blocks
+                )
+                conn.commit()
+                return deleted
+
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при сжатии истории: {e}")
+            return 0
+
+    def delete_blocks(self, cutoff_ms: int, limit: int) -> Tuple[int, int]:
+        """
+        Удаление одной порции сжатых блоков, закончившихся до cutoff_ms.
+
+        :param limit: Максимальное количество удаляемых блоков
+        :return: (количество удалённых блоков, количество сжатых строк в них);
+            порция неполная, если блоков меньше limit
+        """
+        try:
+            with self._lock, self._get_connection() as conn:
+                blocks = conn.execute(
+                    "SELECT id, count FROM metrics_blocks WHERE end_ms < ? LIMIT ?", (cutoff_ms, limit)
+                ).fetchall()
+                conn.executemany("DELETE FROM metrics_blocks WHERE id = ?", [(block_id,) for block_id, _ in blocks])
+                conn.commit()
+                return len(blocks), sum(count for _, count in blocks)
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при удалении сжатых блоков: {e}")
+            return 0, 0
+
+    def get_block_stats(self) -> Dict[str, float]:
+        """
+        Статистика сжатых блоков: количество блоков и строк, объём сжатых данных
+        и числовой части тех же строк по 8 байт на значение (BLOCK_RAW_ROW_BYTES),
+        степень сжатия. Текстовые столбцы входят только в сжатый объём, поэтому
+        степень сжатия занижена.
+        """
+        rows = self._query("SELECT COUNT(*), COALESCE(SUM(count), 0), COALESCE(SUM(LENGTH(data)), 0) FROM metrics_blocks")
+        blocks, count, compressed = rows[0] if rows else (0, 0, 0)
+        raw = count * BLOCK_RAW_ROW_BYTES
+        return {
+            'blocks': blocks,
+            'rows': count,
+            'compressed_bytes': compressed,
+            'raw_bytes': raw,
+            'ratio': raw / compressed if compressed else 0.0
+        }
+
+    def get_latest_metrics(self, limit: int) -> List[tuple]:
+        """Получение последних limit записей (включая сжатые блоки) в порядке возрастания id"""
+        if limit < 1:
+            return []
+
+        rows = self._query(f"{SELECT_QUERY_COLUMNS} ORDER BY id DESC LIMIT ?", (limit,))
+        # Блоки просматриваются от новых к старым, пока в них могут быть id больше уже отобранных
+        floor_id = rows[-1][0] if len(rows) == limit else 0
+        blocks = self._query(
+            "SELECT max_id, session_id, data FROM metrics_blocks WHERE max_id > ? ORDER BY max_id DESC", (floor_id,)
+        )
+        for max_id, session_id, data in blocks:
+            if len(rows) == limit and max_id < rows[-1][0]:
+                break
+            rows = heapq.nlargest(
+                limit, rows + self._decode_block_rows(session_id, data, QUERY_COLUMNS)[1], key=lambda row: row[0]
+            )
+
+        rows.reverse()
+        return rows
+
+    def iter_metrics(
+            self,
+            chunk_size: int = 1000,
+            after_id: int = 0,
+            columns: tuple = METRIC_COLUMNS
+    ) -> Iterator[List[tuple]]:
+        """
+        Потоковое чтение метрик пачками с keyset-пагинацией (WHERE id > ? LIMIT ?).
+
+        Блокировка соединения удерживается только на время чтения одной пачки,
+        поэтому запись метрик между пачками не блокируется. Строки сжатых
+        блоков включаются в порядке id.
+
+        :param chunk_size: Количество строк в пачке
+        :param after_id: Начать со строк с id больше указанного
+        :param columns: Столбцы выборки, первым должен идти id
+        :return: Генератор пачек строк
+        """
+        if columns[0] != 'id' or not set(columns) <= set(QUERY_COLUMNS):
+            raise ValueError(f"Недопустимый набор столбцов: {columns}")
+
+        rows = self._iter_by_id(columns, after_id, chunk_size)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+
+    def _iter_by_id(self, columns: Sequence[str], after_id: int = 0, chunk_size: int = 1000) -> Iterator[tuple]:
+        """
+        Строки таблицы и сжатых блоков с id больше after_id в порядке id.
+
+        Строки таблицы читаются keyset-пагинацией пачками по chunk_size, блоки
+        распаковываются по одному по мере продвижения по id.
+
+        :param columns: Столбцы выборки, первым должен идти id
+        """
+        return heapq.merge(
+            self._iter_table_by_id(columns, after_id, chunk_size),
+            self._iter_blocks_by_id(columns, after_id),
+            key=lambda row: row[0]
+        )
+
+    def _iter_table_by_id(self, columns: Sequence[str], after_id: int, chunk_size: int) -> Iterator[tuple]:
+        query = f"SELECT {', '.join(columns)} FROM system_metrics WHERE id > ? ORDER BY id LIMIT ?"
+        last_id = after_id
+        while True:
+            chunk = self._query(query, (last_id, chunk_size))
+            yield from chunk
+            if len(chunk) < chunk_size:
+                return
+
+            last_id = chunk[-1][0]
+
+    def _iter_blocks_by_id(self, columns: Sequence[str], after_id: int) -> Iterator[tuple]:
+        """
+        Строки сжатых блоков в порядке id.
+
+        Диапазоны id блоков разных сессий одного окна пересекаются, поэтому
+        строка выдаётся только после распаковки всех блоков, начинающихся не
+        позже её id.
+        """
+        blocks = self._query(
+            "SELECT id, min_id, session_id FROM metrics_blocks WHERE max_id > ? ORDER BY min_id", (after_id,)
+        )
+        pending: List[Tuple[int, tuple]] = []
+        for block_id, min_id, session_id in blocks:
+            while pending and pending[0][0] < min_id:
+                yield heapq.heappop(pending)[1]
+
+            data = self._query("SELECT data FROM metrics_blocks WHERE id = ?", (block_id,))
+            if not data:
+                continue
+            for row in self._decode_block_rows(session_id, data[0][0], columns)[1]:
+                if row[0] > after_id:
+                    heapq.heappush(pending, (row[0], row))
+
+        while pending:
+            yield heapq.heappop(pending)[1]
+
+    def count_metrics_range(self, start_ms: int, end_ms: int, session_id: int | None = None) -> int:
+        """Количество замеров за [start_ms, end_ms], включая сжатые блоки (оценка по блокам целиком)"""
+        session_filter = "" if session_id is None else " AND session_id = ?"
+        session_params: tuple = () if session_id is None else (session_id,)
+        raw = self._query(
+            f"SELECT COUNT(*) FROM system_metrics WHERE ts_ms BETWEEN ? AND ?{session_filter}",
+            (start_ms, end_ms) + session_params
+        )
+        compressed = self._query(
+            "SELECT COALESCE(SUM(count), 0) FROM metrics_blocks "
+            f"WHERE start_ms BETWEEN ? AND ? AND end_ms >= ?{session_filter}",
+            (start_ms - BLOCK_WINDOW_MS + 1, end_ms, start_ms) + session_params
+        )
+        return (raw[0][0] if raw else 0) + (compressed[0][0] if compressed else 0)
+
+    def iter_metrics_range(
+            self,
+            start_ms: int,
+            end_ms: int,
+            session_id: int | None = None,
+            chunk_size: int = 1000,
+            columns: Sequence[str] = QUERY_COLUMNS
+    ) -> Iterator[List[tuple]]:
+        """
+        Потоковое чтение метрик за [start_ms, end_ms] пачками в порядке времени.
+
+        Строки таблицы читаются keyset-пагинацией по (ts_ms, id), сжатые блоки -
+        по одному окну BLOCK_WINDOW_MS; оба потока сливаются по времени. В памяти
+        одновременно находятся не больше одной пачки и одного окна блоков,
+        блокировка соединения удерживается только на время чтения пачки.
+
+        :param columns: Столбцы из QUERY_COLUMNS, среди них должен быть ts_ms
+        :return: Генератор пачек строк со столбцами columns
+        """
+        if 'ts_ms' not in columns or not set(columns) <= set(QUERY_COLUMNS):
+            raise ValueError(f"Недопустимый набор столбцов: {columns}")
+
+        ts_index = list(columns).index('ts_ms')
+        rows = heapq.merge(
+            self._iter_table_rows(columns, start_ms, end_ms, session_id, chunk_size),
+            self._iter_block_rows(columns, start_ms, end_ms, session_id),
+            key=lambda row: row[ts_index]
+        )
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _iter_table_rows(
+            self,
+            columns: Sequence[str],
+            start_ms: int,
+            end_ms: int,
+            session_id: int | None,
+            chunk_size: int
+    ) -> Iterator[tuple]:
+        """Строки system_metrics за интервал с keyset-пагинацией по (ts_ms, id)"""
+        query = f"SELECT id, ts_ms, {', '.join(columns)} FROM system_metrics WHERE ts_ms BETWEEN ? AND ?"
+        params: tuple = (start_ms, end_ms)
+        if session_id is not None:
+            query += " AND session_id = ?"
+            params += (session_id,)
+        query += " AND (ts_ms > ? OR (ts_ms = ? AND id > ?)) ORDER BY ts_ms, id LIMIT ?"
+
+        last_ts, last_id = start_ms - 1, 0
+        while True:
+            chunk = self._query(query, params + (last_ts, last_ts, last_id, chunk_size))
+            for row in chunk:
+                yield row[2:]
+            if len(chunk) < chunk_size:
+                return
+
+            last_id, last_ts = chunk[-1][0], chunk[-1][1]
+
+    def _iter_block_rows(
+            self,
+            columns: Sequence[str],
+            start_ms: int,
+            end_ms: int,
+            session_id: int | None
+    ) -> Iterator[tuple]:
+        """Строки сжатых блоков за интервал, по одному окну BLOCK_WINDOW_MS за раз"""
+        query = "SELECT MIN(start_ms) FROM metrics_blocks WHERE start_ms BETWEEN ? AND ? AND end_ms >= ?"
+        session_params: tuple = ()
+        if session_id is not None:
+            query += " AND session_id = ?"
+            session_params = (session_id,)
+
+        window_from = start_ms - BLOCK_WINDOW_MS + 1
+        while window_from <= end_ms:
+            rows = self._query(query, (window_from, end_ms, start_ms) + session_params)
+            if not rows or rows[0][0] is None:
+                return
+
+            window_start = bucket_start(rows[0][0], BLOCK_WINDOW_MS)
+            window_end = window_start + BLOCK_WINDOW_MS - 1
+            block_rows = self._read_blocks(columns, max(start_ms, window_start), min(end_ms, window_end), session_id)
+            ts_index = list(columns).index('ts_ms')
+            yield from sorted(block_rows, key=lambda row: row[ts_index])
+            window_from = window_end + 1
+
+    def get_metrics_since(self, last_id: int, limit: int | None = None) -> List[tuple]:
+        """
+        Получение строк с id больше last_id для инкрементальных потребителей.
+
+        :param last_id: Последний уже обработанный id
+        :param limit: Максимальное количество строк
+        :return: Строки со столбцами METRIC_COLUMNS в порядке id, включая сжатые блоки
+        """
+        return list(itertools.islice(self._iter_by_id(METRIC_COLUMNS, last_id, limit or 1000), limit))
+
+    def start_session(self) -> int | None:
+        """
+        Регистрация новой сессии записи.
+
+        :return: Идентификатор сессии или None при ошибке
+        """
+        try:
+            with self._lock, self._get_connection() as conn:
+                cursor = conn.execute(
+                    'INSERT INTO monitoring_sessions (started_ms) VALUES (?)',
+                    (int(time.time() * 1000),)
+                )
+                conn.commit()
+                self.logger.info(f"Начата сессия записи {cursor.lastrowid}")
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при создании сессии записи: {e}")
+            return None
+
+    def end_session(self, session_id: int | None) -> None:
+        """Отметка времени завершения сессии записи"""
+        if session_id is None:
+            return
+
+        try:
+            with self._lock, self._get_connection() as conn:
+                conn.execute(
+                    'UPDATE monitoring_sessions SET ended_ms = ? WHERE id = ?',
+                    (int(time.time() * 1000), session_id)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при завершении сессии записи: {e}")
+
+    def get_sessions(self) -> List[tuple]:
+        """Получение списка сессий записи (id, started_ms, ended_ms)"""
+        return self._query('SELECT id, started_ms, ended_ms FROM monitoring_sessions ORDER BY id')
+
+    def get_setting(self, key: str) -> str | None:
+        """Значение настройки или None, если она не задана"""
+        rows = self._query('SELECT value FROM settings WHERE key = ?', (key,))
+        return rows[0][0] if rows else None
+
+    def set_setting(self, key: str, value: str | None) -> bool:
+        """
+        Сохранение настройки; None удаляет её.
+
+        :return: True при успешной записи
+        """
+        try:
+            with self._lock, self._get_connection() as conn:
+                if value is None:
+                    conn.execute('DELETE FROM settings WHERE key = ?', (key,))
+                else:
+                    conn.execute(
+                        'INSERT INTO settings (key, value) VALUES (?, ?) '
+                        'ON CONFLICT (key) DO UPDATE SET value = excluded.value',
+                        (key, value)
+                    )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            self.logger.error(f"Ошибка при сохранении настройки {key}: {e}")
+            return False
+
     def clear_all_metric(self) -> bool:
         """Очистка всех метрик из базы данных"""
         try:
-            with sqlite3.connect(self.db_name) as conn:
+            with self._lock, self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='system_metrics'")
                 table_exists = cursor.fetchone()
 
                 if table_exists:
                     cursor.execute('DELETE FROM system_metrics')
+                    cursor.execute('DELETE FROM metrics_blocks')
+                    for resolution, tracker in self._percentile_trackers.items():
+                        cursor.execute(f'DELETE FROM {rollup_table(resolution)}')
+                        tracker.close()
                 else:
                     self.create_table()
 
@@ -0,0 +1,172 @@
+import sys
+import os
+import re
+import select
+from typing import Any, Dict, List, Tuple
+
+import psutil
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.logger_config import get_logger
+
+
+MOUNTINFO_PATH = '/proc/self/mountinfo'
+
+BYTES_IN_GB = 1024 * 1024 * 1024
+
+
+class DiskMonitoring:
+    """
+    Сбор информации о дисковом пространстве без запуска внешних процессов.
+
+    Размер и свободное место читаются через os.statvfs (или psutil.disk_usage,
+    если statvfs недоступен). Список точек монтирования кэшируется и
+    перечитывается только после изменения /proc/self/mountinfo, о котором ядро
+    сообщает событием POLLPRI.
+    """
+
+    def __init__(self, mount_points: List[str] | None = None, mountinfo_path: str = MOUNTINFO_PATH):
+        """
+        :param mount_points: Отслеживаемые точки монтирования; первая считается основной.
+            По умолчанию - все смонтированные блочные устройства, основная - '/'
+        :param mountinfo_path: Путь к mountinfo
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.mount_points = list(mount_points) if mount_points else None
+        self.primary_mount = self.mount_points[0] if self.mount_points else '/'
+        self.mountinfo_path = mountinfo_path
+        self._mounts: Dict[str, Tuple[str, str]] | None = None
+        self._poller = self._open_mountinfo_poller()
+
+    def _open_mountinfo_poller(self) -> Any:
+        """Подписка на изменения mountinfo через poll"""
+        if not hasattr(select, 'poll') or not os.path.exists(self.mountinfo_path):
+            return None
+
+        try:
+            self._mountinfo_fd = os.open(self.mountinfo_path, os.O_RDONLY)
+            poller = select.poll()
+            poller.register(self._mountinfo_fd, select.POLLPRI | select.POLLERR)
+            return poller
+
+        except OSError as e:
+            self.logger.error(f"Не удалось открыть {self.mountinfo_path}: {e}")
+            return None
+
+    def _mounts_changed(self) -> bool:
+        """Проверка без блокировки, изменился ли список монтирований"""
+        if self._poller is None:
+            return False
+
+        events = self._poller.poll(0)
+        if not events:
+            return False
+
+        # Событие сбрасывается повторным чтением файла с начала
+        os.lseek(self._mountinfo_fd, 0, os.SEEK_SET)
+        while os.read(self._mountinfo_fd, 65536):
+            pass
+        return True
+
+    @staticmethod
+    def _unescape(path: str) -> str:
+        """Раскодирование восьмеричных escape-последовательностей mountinfo (\\040 и т.п.)"""
+        return re.sub(r'\\([0-7]{3})', lambda match: chr(int(match.group(1), 8)), path)
+
+    def _read_mounts(self) -> Dict[str, Tuple[str, str]]:
+        """
+        Чтение списка монтирований блочных устройств (кроме loop-устройств).
+
+        :return: Словарь {точка монтирования: (тип ФС, устройство)}
+        """
+        mounts: Dict[str, Tuple[str, str]] = {}
+        if not os.path.exists(self.mountinfo_path):
+            for partition in psutil.disk_partitions(all=False):
+                mounts[partition.mountpoint] = (partition.fstype, partition.device)
+            return mounts
+
+        with open(self.mountinfo_path, 'r') as f:
+            for line in f:
+                pre, _, post = line.partition(' - ')
+                fields, post_fields = pre.split(), post.split()
+                if len(fields) < 5 or len(post_fields) < 2:
+                    continue
+
+                fstype, source = post_fields[0], post_fields[1]
+                # Loop-устройства - образы (snap, squashfs), а не диски
+                if source.startswith('/dev/') and not source.startswith('/dev/loop'):
+                    mounts[self._unescape(fields[4])] = (fstype, source)
+
+        return mounts
+
+    @property
+    def mounts(self) -> Dict[str, Tuple[str, str]]:
+        """Кэшированный список монтирований блочных устройств"""
+        if self._mounts is None or self._mounts_changed():
+            self.refresh_mounts()
+        return self._mounts
+
+    def refresh_mounts(self) -> None:
+        """Принудительное перечитывание списка монтирований"""
+        try:
+            self._mounts = self._read_mounts()
+            self.logger.info(f"Обнаружено точек монтирования: {len(self._mounts)}")
+
+        except OSError as e:
+            self.logger.error(f"Ошибка чтения списка монтирований: {e}")
+            self._mounts = {}
+
+    def monitored_mounts(self) -> List[str]:
+        """Точки монтирования, по которым собирается статистика"""
+        if self.mount_points is None:
+            return sorted(self.mounts)
+
+        mounted = self.mounts
+        return [mount for mount in self.mount_points if mount in mounted or mount == self.primary_mount]
+
+    @staticmethod
+    def _usage_bytes(mount_point: str) -> Tuple[int, int]:
+        """Свободное (доступное пользователю) и общее место в байтах"""
+        if hasattr(os, 'statvfs'):
+            stat = os.statvfs(mount_point)
+            return stat.f_bavail * stat.f_frsize, stat.f_blocks * stat.f_frsize
+
+        usage = psutil.disk_usage(mount_point)
+        return usage.free, usage.total
+
+    def get_disk_usage(self, mount_point: str) -> Tuple[float, float]:
+        """
+        Получение свободного и общего места на разделе.
+
+        :return: (свободно ГБ, всего ГБ)
+        """
+        try:
+            free_bytes, total_bytes = self._usage_bytes(mount_point)
+            return round(free_bytes / BYTES_IN_GB, 1), round(total_bytes / BYTES_IN_GB, 1)
+
+        except OSError as e:
+            self.logger.error(f"Ошибка получения информации о разделе {mount_point}: {e}")
+            return 0.0, 0.0
+
+    def get_all_usage(self) -> Dict[str, Tuple[float, float]]:
+        """Свободное и общее место (ГБ) по всем отслеживаемым точкам монтирования, включая основную"""
+        mounts = self.monitored_mounts()
+        if self.primary_mount not in mounts:
+            mounts.insert(0, self.primary_mount)
+        return {mount: self.get_disk_usage(mount) for mount in mounts}
+
+    def get_rom_info(self) -> Tuple[float, float]:
+        """
+        Свободное и общее место на основном разделе.
+
+        :return: (свободно ГБ, всего ГБ)
+        """
+        return self.get_disk_usage(self.primary_mount)
+
+    def close(self) -> None:
+        """Закрытие дескриптора mountinfo"""
+        if self._poller is not None:
+            os.close(self._mountinfo_fd)
+            self._poller = None
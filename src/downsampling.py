@@ -0,0 +1,76 @@
+import math
+from typing import List, Sequence, Tuple
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> Tuple[List[float], List[float]]:
+    """
+    Прореживание ряда методом Largest-Triangle-Three-Buckets.
+
+    Первая и последняя точки сохраняются, остальные делятся на threshold - 2
+    корзины; из каждой корзины берётся точка, образующая треугольник
+    наибольшей площади с выбранной точкой предыдущей корзины и средней
+    точкой следующей. Форма графика (пики и провалы) при этом сохраняется.
+    Точки со значением NaN при выборе пропускаются.
+
+    :param xs: Координаты по оси X (время), по возрастанию
+    :param ys: Значения
+    :param threshold: Максимальное число точек результата
+    :return: (xs, ys) не более чем из threshold точек
+    """
+    length = len(xs)
+    if threshold >= length:
+        return list(xs), list(ys)
+    if threshold < 3:
+        raise ValueError("Для прореживания нужно не меньше 3 точек")
+
+    # Срезы списков выполняются на C; для буферов и представлений это одна копия ряда
+    xs = list(xs)
+    ys = list(ys)
+    last_x, last_y = xs[-1], ys[-1]
+    point_x, point_y = xs[0], ys[0]
+    sampled_x = [point_x]
+    sampled_y = [point_y]
+    bucket_size = (length - 2) / (threshold - 2)
+
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, length)
+
+        # Средняя точка следующей корзины (для последней - последняя точка ряда)
+        following = [(x, y) for x, y in zip(xs[end:next_end], ys[end:next_end]) if y == y]
+        if following:
+            avg_x = sum(x for x, _ in following) / len(following)
+            avg_y = sum(y for _, y in following) / len(following)
+        else:
+            avg_x, avg_y = last_x, last_y
+
+        if point_y != point_y:
+            point_y = avg_y
+        dx = point_x - avg_x
+        dy = avg_y - point_y
+
+        # Сравнение с NaN ложно, поэтому точки без значения не выбираются
+        best_area = -1.0
+        best_index = start
+        for index, x, y in zip(range(start, end), xs[start:end], ys[start:end]):
+            area = abs(dx * (y - point_y) - (point_x - x) * dy)
+            if area > best_area:
+                best_area = area
+                best_index = index
+
+        point_x, point_y = xs[best_index], ys[best_index]
+        sampled_x.append(point_x)
+        sampled_y.append(point_y)
+
+    sampled_x.append(last_x)
+    sampled_y.append(last_y)
+    return sampled_x, sampled_y
+
+
+def finite_range(values: Sequence[float]) -> Tuple[float, float] | None:
+    """Минимум и максимум без учёта NaN; None, если конечных значений нет"""
+    finite = [value for value in values if not math.isnan(value)]
+    if not finite:
+        return None
+    return min(finite), max(finite)
@@ -0,0 +1,299 @@
+import sys
+import os
+import argparse
+import csv
+import json
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime
+from typing import Callable, List, Sequence
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy не входит в зависимости проекта: экспорт в .npz недоступен
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow не входит в зависимости проекта: экспорт в Parquet недоступен
+    pa = pq = None
+
+from src.database import BLOCK_TEXT_COLUMNS, QUERY_COLUMNS, DatabaseHandler, unpack_per_core
+from src.logger_config import get_logger
+
+
+# Формат -> расширение файла
+EXPORT_FORMATS = {'csv': '.csv', 'npz': '.npz', 'parquet': '.parquet'}
+
+EXPORT_COLUMNS = QUERY_COLUMNS
+
+INTEGER_COLUMNS = ('id', 'ts_ms', 'session_id')
+TEXT_COLUMNS = BLOCK_TEXT_COLUMNS
+FLOAT_COLUMNS = tuple(column for column in EXPORT_COLUMNS if column not in INTEGER_COLUMNS + TEXT_COLUMNS)
+
+# Замер вне сессии записи в .npz (целочисленный столбец не хранит NULL)
+NPZ_NO_SESSION = -1
+
+PER_CORE_INDEX = EXPORT_COLUMNS.index('cpu_per_core')
+
+
+def available_formats() -> List[str]:
+    """Форматы, для которых установлены необходимые библиотеки"""
+    return [fmt for fmt in EXPORT_FORMATS if (fmt != 'npz' or np is not None) and (fmt != 'parquet' or pq is not None)]
+
+
+def format_from_path(path: str) -> str:
+    """Формат экспорта по расширению файла"""
+    extension = os.path.splitext(path)[1].lower()
+    for fmt, fmt_extension in EXPORT_FORMATS.items():
+        if extension == fmt_extension:
+            return fmt
+    raise ValueError(f"Неизвестный формат экспорта: {path}")
+
+
+class CsvExportWriter:
+    """Построчная запись CSV с заголовком; NULL записывается пустым полем"""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def write(self, rows: List[list]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class NpzExportWriter:
+    """
+    Столбцовый архив NumPy (.npz) с числовыми столбцами.
+
+    Пачки каждого столбца дописываются во временный файл, после чего файлы
+    копируются в несжатый zip-архив с заголовками .npy: память не зависит
+    от количества строк. Пропуски: NaN в вещественных столбцах,
+    NPZ_NO_SESSION в session_id.
+    """
+    columns = INTEGER_COLUMNS + FLOAT_COLUMNS
+
+    def __init__(self, path: str):
+        if np is None:
+            raise RuntimeError("Для экспорта в .npz требуется NumPy")
+
+        self.path = path
+        self._dtypes = {column: np.dtype('<i8' if column in INTEGER_COLUMNS else '<f8') for column in self.columns}
+        self._indexes = {column: EXPORT_COLUMNS.index(column) for column in self.columns}
+        self._spools = {column: tempfile.TemporaryFile() for column in self.columns}
+        self._count = 0
+
+    def write(self, rows: List[list]) -> None:
+        for column, spool in self._spools.items():
+            index = self._indexes[column]
+            if column == 'session_id':
+                values = [NPZ_NO_SESSION if row[index] is None else row[index] for row in rows]
+            elif column in INTEGER_COLUMNS:
+                values = [row[index] for row in rows]
+            else:
+                values = [np.nan if row[index] is None else row[index] for row in rows]
+            spool.write(np.asarray(values, dtype=self._dtypes[column]).tobytes())
+        self._count += len(rows)
+
+    def close(self) -> None:
+        try:
+            with zipfile.ZipFile(self.path, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for column, spool in self._spools.items():
+                    spool.seek(0)
+                    with archive.open(f'{column}.npy', 'w', force_zip64=True) as member:
+                        header = {'descr': self._dtypes[column].str, 'fortran_order': False, 'shape': (self._count,)}
+                        np.lib.format.write_array_header_1_0(member, header)
+                        shutil.copyfileobj(spool, member)
+        finally:
+            for spool in self._spools.values():
+                spool.close()
+
+
+class ParquetExportWriter:
+    """Запись Parquet через pyarrow: одна группа строк на пачку"""
+
+    def __init__(self, path: str):
+        if pq is None:
+            raise RuntimeError("Для экспорта в Parquet требуется pyarrow")
+
+        self._schema = pa.schema([
+            (column, pa.int64() if column in INTEGER_COLUMNS else pa.string() if column in TEXT_COLUMNS else pa.float64())
+            for column in EXPORT_COLUMNS
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: List[list]) -> None:
+        arrays = [
+            pa.array([row[index] for row in rows], type=field.type)
+            for index, field in enumerate(self._schema)
+        ]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+EXPORT_WRITERS = {'csv': CsvExportWriter, 'npz': NpzExportWriter, 'parquet': ParquetExportWriter}
+
+
+class ExportJob:
+    """
+    Потоковый экспорт метрик за интервал времени в файл.
+
+    Строки читаются пачками (DatabaseHandler.iter_metrics_range) и сразу
+    передаются записи, поэтому память не зависит от размера базы. Файл
+    пишется под временным именем и переименовывается после успешного
+    завершения. Выполняется в фоновом потоке владельца; запись метрик во
+    время экспорта продолжается.
+    """
+
+    def __init__(
+            self,
+            database_handler: DatabaseHandler,
+            path: str,
+            fmt: str | None = None,
+            start_ms: int | None = None,
+            end_ms: int | None = None,
+            session_id: int | None = None,
+            chunk_size: int = 10_000
+    ):
+        """
+        :param database_handler: Обработчик базы данных
+        :param path: Путь к файлу экспорта
+        :param fmt: Ключ EXPORT_FORMATS; по умолчанию - по расширению path
+        :param start_ms: Начало интервала, мс; по умолчанию - вся история
+        :param end_ms: Конец интервала, мс; по умолчанию - момент создания задачи
+        :param session_id: Ограничить экспорт одной сессией записи
+        :param chunk_size: Количество строк в пачке чтения
+        """
+        fmt = fmt or format_from_path(path)
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат экспорта: {fmt}")
+        if fmt not in available_formats():
+            raise RuntimeError(f"Формат {fmt} недоступен: не установлена необходимая библиотека")
+        if chunk_size < 1:
+            raise ValueError("Размер порции должен быть положительным")
+
+        self.logger = get_logger(self.__class__.__name__)
+        self.database_handler = database_handler
+        self.path = path
+        self.format = fmt
+        self.start_ms = 0 if start_ms is None else start_ms
+        self.end_ms = int(time.time() * 1000) if end_ms is None else end_ms
+        self.session_id = session_id
+        self.chunk_size = chunk_size
+        self._stop_event = threading.Event()
+
+    def run(self, progress: Callable[[int], None] | None = None) -> int | None:
+        """
+        Выполнение экспорта.
+
+        :param progress: Вызывается с процентом выполнения (0-100)
+        :return: Количество экспортированных строк; None при ошибке или прерывании
+        """
+        total = self.database_handler.count_metrics_range(self.start_ms, self.end_ms, self.session_id)
+        part_path = self.path + '.part'
+        exported = 0
+        try:
+            writer = EXPORT_WRITERS[self.format](part_path)
+            try:
+                for chunk in self.database_handler.iter_metrics_range(
+                        self.start_ms, self.end_ms, self.session_id, self.chunk_size, EXPORT_COLUMNS
+                ):
+                    if self._stop_event.is_set():
+                        break
+                    writer.write([self._convert(row) for row in chunk])
+                    exported += len(chunk)
+                    if progress is not None and total:
+                        progress(min(99, exported * 100 // total))
+            finally:
+                writer.close()
+
+            if self._stop_event.is_set():
+                self.logger.warning(f"Экспорт в {self.path} прерван")
+                os.remove(part_path)
+                return None
+
+            os.replace(part_path, self.path)
+        except (OSError, RuntimeError, ValueError) as e:
+            self.logger.error(f"Ошибка экспорта в {self.path}: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return None
+
+        self.logger.info(f"Экспортировано записей: {exported} в {self.path}")
+        if progress is not None:
+            progress(100)
+        return exported
+
+    @staticmethod
+    def _convert(row: tuple) -> list:
+        """Поядерная загрузка из BLOB в JSON-список"""
+        row = list(row)
+        if row[PER_CORE_INDEX] is not None:
+            row[PER_CORE_INDEX] = json.dumps(unpack_per_core(row[PER_CORE_INDEX]))
+        return row
+
+    def cancel(self) -> None:
+        """Прерывание экспорта после текущей пачки; незавершённый файл удаляется"""
+        self._stop_event.set()
+
+
+def parse_time_ms(value: str) -> int:
+    """Метка времени из аргумента: мс от начала эпохи или дата/время ISO 8601 (местное время)"""
+    if value.lstrip('-').isdigit():
+        return int(value)
+    return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m src.export',
+        description="Экспорт записанных метрик в CSV, NumPy .npz или Parquet"
+    )
+    parser.add_argument('output', help="Файл экспорта; формат определяется по расширению")
+    parser.add_argument('--db', default='system_monitoring.db', help="Путь к файлу базы данных")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default=None,
+                        help="Формат экспорта, если расширение файла другое")
+    parser.add_argument('--start', type=parse_time_ms, default=None,
+                        help="Начало интервала: мс от начала эпохи или '2024-01-31 12:00'")
+    parser.add_argument('--end', type=parse_time_ms, default=None, help="Конец интервала, как --start")
+    parser.add_argument('--session', type=int, default=None, help="Номер сессии записи")
+    parser.add_argument('--chunk-size', type=int, default=10_000, help="Количество строк в пачке чтения")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Экспорт из командной строки"""
+    args = parse_args(argv)
+    logger = get_logger('Export')
+    if not os.path.exists(args.db):
+        logger.error(f"База данных не найдена: {args.db}")
+        return 1
+
+    database_handler = DatabaseHandler(args.db)
+    try:
+        job = ExportJob(
+            database_handler, args.output, fmt=args.format, start_ms=args.start, end_ms=args.end,
+            session_id=args.session, chunk_size=args.chunk_size
+        )
+    except (RuntimeError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+
+    return 0 if job.run() is not None else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
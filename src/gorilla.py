@@ -0,0 +1,295 @@
+import math
+import struct
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+
+# Формат блока: версия, количество строк, количество числовых и текстовых столбцов;
+# затем смещения потоков (uint32): метки времени, id, числовые столбцы, текстовые столбцы
+BLOCK_HEADER = struct.Struct('<HIHH')
+BLOCK_FORMAT_VERSION = 1
+
+# Корзины delta-of-delta меток времени: (префикс, длина префикса, разрядность значения)
+TIMESTAMP_BUCKETS = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12))
+TIMESTAMP_FALLBACK = (0b1111, 4, 64)
+
+_DOUBLE = struct.Struct('<d')
+_UINT64 = struct.Struct('<Q')
+
+# NULL хранится как NaN: SQLite сам превращает NaN в NULL, поэтому отображение взаимно однозначно
+NULL_BITS = 0x7FF8000000000000
+
+# Текстовый столбец: тип значений и длина NULL в таблице длин
+TEXT_KIND_STR = 0
+TEXT_KIND_BYTES = 1
+NULL_LENGTH = 0xFFFFFFFF
+
+
+def float_to_bits(value: float | None) -> int:
+    return NULL_BITS if value is None else _UINT64.unpack(_DOUBLE.pack(value))[0]
+
+
+def bits_to_float(bits: int) -> float | None:
+    value = _DOUBLE.unpack(_UINT64.pack(bits))[0]
+    return None if math.isnan(value) else value
+
+
+class BitWriter:
+    """Запись битового потока старшими битами вперёд"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value: int, width: int) -> None:
+        self._acc = (self._acc << width) | (value & ((1 << width) - 1))
+        self._bits += width
+        if self._bits >= 64:
+            extra = self._bits % 8
+            self._buffer += (self._acc >> extra).to_bytes(self._bits // 8, 'big')
+            self._acc &= (1 << extra) - 1
+            self._bits = extra
+
+    def getvalue(self) -> bytes:
+        """Поток, дополненный нулями до целого байта"""
+        padding = -self._bits % 8
+        tail = (self._acc << padding).to_bytes((self._bits + padding) // 8, 'big')
+        return bytes(self._buffer) + tail
+
+
+class BitReader:
+    """Чтение битового потока, записанного BitWriter"""
+
+    def __init__(self, data: bytes, offset: int = 0):
+        self._data = data
+        self._pos = offset * 8
+
+    def read(self, width: int) -> int:
+        start = self._pos >> 3
+        end = (self._pos + width + 7) >> 3
+        chunk = int.from_bytes(self._data[start:end], 'big')
+        shift = (end << 3) - self._pos - width
+        self._pos += width
+        return (chunk >> shift) & ((1 << width) - 1)
+
+    def read_bit(self) -> int:
+        bit = (self._data[self._pos >> 3] >> (7 - (self._pos & 7))) & 1
+        self._pos += 1
+        return bit
+
+
+def encode_integers(values: Sequence[int]) -> bytes:
+    """
+    Сжатие целых чисел (меток времени в мс, id): первое значение целиком,
+    затем delta-of-delta.
+
+    При постоянном интервале сбора каждая следующая метка занимает один бит,
+    при дрожании в пределах ±63 мс - 9 бит; последовательные id - один бит.
+    """
+    writer = BitWriter()
+    previous = previous_delta = 0
+    for index, ts in enumerate(values):
+        if index == 0:
+            writer.write(ts, 64)
+        else:
+            delta = ts - previous
+            dod = delta - previous_delta
+            if dod == 0:
+                writer.write(0, 1)
+            else:
+                for prefix, prefix_bits, width in TIMESTAMP_BUCKETS:
+                    if -(1 << (width - 1)) < dod <= (1 << (width - 1)):
+                        break
+                else:
+                    prefix, prefix_bits, width = TIMESTAMP_FALLBACK
+                writer.write(prefix, prefix_bits)
+                writer.write(dod, width)
+            previous_delta = delta
+        previous = ts
+    return writer.getvalue()
+
+
+def decode_integers(reader: BitReader, count: int) -> List[int]:
+    result: List[int] = []
+    if not count:
+        return result
+
+    previous = reader.read(64)
+    if previous >= 1 << 63:
+        previous -= 1 << 64
+    result.append(previous)
+    delta = 0
+    for _ in range(count - 1):
+        if reader.read_bit():
+            width = TIMESTAMP_FALLBACK[2]
+            for _, _, bucket_width in TIMESTAMP_BUCKETS:
+                if not reader.read_bit():
+                    width = bucket_width
+                    break
+            # Значение хранится в дополнительном коде разрядности width
+            dod = reader.read(width)
+            if dod > 1 << (width - 1):
+                dod -= 1 << width
+            delta += dod
+        previous += delta
+        result.append(previous)
+    return result
+
+
+def encode_floats(values: Sequence[float | None]) -> bytes:
+    """
+    Сжатие ряда чисел XOR с предыдущим значением (Gorilla).
+
+    Повтор значения занимает один бит; изменение, у которого значимые биты
+    XOR укладываются в окно предыдущего, - 2 бита и эти значимые биты.
+    """
+    writer = BitWriter()
+    previous = 0
+    leading = trailing = -1
+    for index, value in enumerate(values):
+        bits = float_to_bits(value)
+        if index == 0:
+            writer.write(bits, 64)
+            previous = bits
+            continue
+
+        xor = bits ^ previous
+        previous = bits
+        if xor == 0:
+            writer.write(0, 1)
+            continue
+
+        new_leading = min(64 - xor.bit_length(), 31)
+        new_trailing = (xor & -xor).bit_length() - 1
+        if leading >= 0 and new_leading >= leading and new_trailing >= trailing:
+            writer.write(0b10, 2)
+            writer.write(xor >> trailing, 64 - leading - trailing)
+        else:
+            leading, trailing = new_leading, new_trailing
+            meaningful = 64 - leading - trailing
+            writer.write(0b11, 2)
+            writer.write(leading, 5)
+            writer.write(meaningful & 63, 6)
+            writer.write(xor >> trailing, meaningful)
+    return writer.getvalue()
+
+
+def decode_floats(reader: BitReader, count: int) -> List[float | None]:
+    result: List[float | None] = []
+    if not count:
+        return result
+
+    previous = reader.read(64)
+    result.append(bits_to_float(previous))
+    leading = trailing = 0
+    for _ in range(count - 1):
+        if reader.read_bit():
+            if reader.read_bit():
+                leading = reader.read(5)
+                meaningful = reader.read(6) or 64
+                trailing = 64 - leading - meaningful
+            previous ^= reader.read(64 - leading - trailing) << trailing
+        result.append(bits_to_float(previous))
+    return result
+
+
+def encode_texts(values: Sequence[str | bytes | None]) -> bytes:
+    """
+    Сжатие текстового или двоичного столбца: байт типа, затем zlib от
+    таблицы длин (uint32, NULL_LENGTH для NULL) и значений подряд.
+    """
+    if any(isinstance(value, bytes) for value in values):
+        if any(isinstance(value, str) for value in values):
+            raise ValueError("Столбец содержит одновременно строки и байты")
+        kind, encoded = TEXT_KIND_BYTES, list(values)
+    else:
+        kind, encoded = TEXT_KIND_STR, [None if value is None else value.encode('utf-8') for value in values]
+
+    lengths = struct.pack(f'<{len(encoded)}I', *(NULL_LENGTH if value is None else len(value) for value in encoded))
+    return bytes([kind]) + zlib.compress(lengths + b''.join(value for value in encoded if value is not None))
+
+
+def decode_texts(data: bytes, count: int) -> List[str | bytes | None]:
+    if not count:
+        return []
+
+    kind = data[0]
+    raw = zlib.decompress(data[1:])
+    lengths = struct.unpack_from(f'<{count}I', raw)
+    position = 4 * count
+    result: List[str | bytes | None] = []
+    for length in lengths:
+        if length == NULL_LENGTH:
+            result.append(None)
+            continue
+        value = raw[position:position + length]
+        position += length
+        result.append(value.decode('utf-8') if kind == TEXT_KIND_STR else value)
+    return result
+
+
+@dataclass
+class DecodedBlock:
+    """Распакованный блок: значения столбцов по их номерам в encode_block"""
+    timestamps: List[int]
+    ids: List[int]
+    values: Dict[int, List[float | None]] = field(default_factory=dict)
+    texts: Dict[int, List[str | bytes | None]] = field(default_factory=dict)
+
+
+def encode_block(
+        timestamps: Sequence[int],
+        ids: Sequence[int],
+        columns: Sequence[Sequence[float | None]],
+        texts: Sequence[Sequence[str | bytes | None]] = ()
+) -> bytes:
+    """
+    Блок из меток времени, id, числовых и текстовых столбцов одинаковой длины.
+
+    Потоки выровнены по байту, а их смещения записаны в заголовке, поэтому
+    отдельный столбец распаковывается без разбора остальных.
+    """
+    streams = [encode_integers(timestamps), encode_integers(ids)]
+    streams += [encode_floats(column) for column in columns]
+    streams += [encode_texts(column) for column in texts]
+    offsets = []
+    position = BLOCK_HEADER.size + 4 * len(streams)
+    for stream in streams:
+        offsets.append(position)
+        position += len(stream)
+
+    header = BLOCK_HEADER.pack(BLOCK_FORMAT_VERSION, len(timestamps), len(columns), len(texts))
+    return header + struct.pack(f'<{len(offsets)}I', *offsets) + b''.join(streams)
+
+
+def decode_block(
+        data: bytes,
+        columns: Sequence[int] | None = None,
+        texts: Sequence[int] | None = None
+) -> DecodedBlock:
+    """
+    Распаковка блока.
+
+    :param columns: Номера числовых столбцов для распаковки; None - все
+    :param texts: Номера текстовых столбцов для распаковки; None - все
+    """
+    version, count, column_count, text_count = BLOCK_HEADER.unpack_from(data)
+    if version != BLOCK_FORMAT_VERSION:
+        raise ValueError(f"Неподдерживаемая версия блока: {version}")
+    stream_count = 2 + column_count + text_count
+    offsets = struct.unpack_from(f'<{stream_count}I', data, BLOCK_HEADER.size)
+
+    block = DecodedBlock(
+        timestamps=decode_integers(BitReader(data, offsets[0]), count),
+        ids=decode_integers(BitReader(data, offsets[1]), count)
+    )
+    for index in range(column_count) if columns is None else columns:
+        block.values[index] = decode_floats(BitReader(data, offsets[2 + index]), count)
+
+    for index in range(text_count) if texts is None else texts:
+        stream = 2 + column_count + index
+        end = offsets[stream + 1] if stream + 1 < len(offsets) else len(data)
+        block.texts[index] = decode_texts(data[offsets[stream]:end], count)
+    return block
@@ -2,6 +2,11 @@ import sys
 import os
 import subprocess
 import re
+import json
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List
 
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -11,81 +16,312 @@ sys.path.insert(0, project_root)
 from src.logger_config import get_logger
 
 
+DRM_PATH = '/sys/class/drm'
+
+BOOT_ID_PATH = '/proc/sys/kernel/random/boot_id'
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'systempulse',
+    'gpu_devices.json'
+)
+
+PCI_VENDORS = {
+    '0x10de': 'NVIDIA',
+    '0x1002': 'AMD',
+    '0x8086': 'Intel'
+}
+
+
+@dataclass
+class GPUDevice:
+    """
+    Видеокарта, обнаруженная через /sys/class/drm.
+    """
+    card: str
+    vendor: str
+    vendor_id: str
+    device_id: str
+    pci_slot: str
+    card_path: str
+
+    @property
+    def device_path(self) -> str:
+        return os.path.join(self.card_path, 'device')
+
+    @property
+    def model(self) -> str:
+        return f"{self.vendor_id[2:]}:{self.device_id[2:]}"
+
+
+class NvidiaSmiReader:
+    """
+    Долгоживущий процесс nvidia-smi в режиме цикла (-lms).
+
+    Процесс запускается один раз, его CSV-вывод разбирается в фоновом потоке,
+    а последнее значение загрузки хранится в памяти, поэтому get_load
+    возвращается сразу. При завершении процесса он перезапускается.
+    """
+
+    QUERY = 'index,utilization.gpu'
+
+    def __init__(
+            self,
+            interval_ms: int = 500,
+            executable: str = 'nvidia-smi',
+            restart_delay: float = 1.0,
+            stale_after: float | None = None
+    ):
+        """
+        :param interval_ms: Период опроса nvidia-smi
+        :param executable: Имя или путь исполняемого файла nvidia-smi
+        :param restart_delay: Пауза перед перезапуском упавшего процесса, сек
+        :param stale_after: Возраст данных, после которого они считаются устаревшими, сек.
+            По умолчанию - три периода опроса
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.interval_ms = interval_ms
+        self.executable = executable
+        self.restart_delay = restart_delay
+        self.stale_after = stale_after if stale_after is not None else max(3 * interval_ms / 1000, 1.0)
+        self.restart_count = 0
+
+        self._loads: dict[int, float] = {}
+        self._last_update: float | None = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._process: subprocess.Popen | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def command(self) -> list[str]:
+        return [
+            self.executable,
+            f'--query-gpu={self.QUERY}',
+            '--format=csv,noheader,nounits',
+            f'-lms={self.interval_ms}'
+        ]
+
+    @property
+    def age(self) -> float | None:
+        """Возраст последнего значения в секундах"""
+        with self._lock:
+            if self._last_update is None:
+                return None
+            return time.monotonic() - self._last_update
+
+    @property
+    def is_stale(self) -> bool:
+        """Данных нет или они старше stale_after"""
+        age = self.age
+        return age is None or age > self.stale_after
+
+    def get_load(self, index: int = 0) -> float | None:
+        """Последняя загрузка GPU с указанным индексом без ожидания"""
+        with self._lock:
+            return self._loads.get(index)
+
+    def get_loads(self) -> dict[int, float]:
+        """Последняя загрузка по всем GPU"""
+        with self._lock:
+            return dict(self._loads)
+
+    def start(self) -> None:
+        """Запуск фонового чтения"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='NvidiaSmiReader', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Цикл запуска и перезапуска nvidia-smi"""
+        while not self._stop_event.is_set():
+            try:
+                self._process = subprocess.Popen(
+                    self.command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    bufsize=1
+                )
+                if self._stop_event.is_set():
+                    self._process.terminate()
+
+                for line in self._process.stdout:
+                    self._parse_line(line)
+                self._process.wait()
+
+            except OSError as e:
+                self.logger.error(f"Не удалось запустить {self.executable}: {e}")
+
+            if self._stop_event.is_set():
+                return
+
+            self.restart_count += 1
+            self.logger.warning(f"Процесс nvidia-smi завершился, перезапуск №{self.restart_count}")
+            self._stop_event.wait(self.restart_delay)
+
+    def _parse_line(self, line: str) -> None:
+        """Разбор строки вида '0, 42'"""
+        try:
+            index, load = (part.strip() for part in line.split(','))
+            value = float(load)
+        except ValueError:
+            return
+
+        with self._lock:
+            self._loads[int(index)] = value
+            self._last_update = time.monotonic()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Остановка процесса nvidia-smi и фонового потока"""
+        self._stop_event.set()
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
 class GPUMonitoring:
 
-    def __init__(self):
+    def __init__(self, drm_path: str = DRM_PATH, cache_path: str | None = DEFAULT_CACHE_PATH):
+        """
+        :param drm_path: Каталог DRM в sysfs
+        :param cache_path: Файл кэша обнаруженных GPU (действует до перезагрузки);
+            None - не использовать кэш на диске
+        """
         self.logger = get_logger(self.__class__.__name__)
         self.logger.info("Инициализация GPUMonitoring")
+        self.drm_path = drm_path
+        self.cache_path = cache_path
+        self.devices: List[GPUDevice] = []
         self.vendor: str | None = None
         self.model: str | None = None
+        self._nvidia_reader: NvidiaSmiReader | None = None
         self._detect_gpu()
 
-    def _detect_gpu(self)  -> None:
+    def _detect_gpu(self) -> None:
         """
-        Обнаружение вендора и модели видеокарты
+        Обнаружение всех видеокарт; основной считается первая найденная
         """
-        supported_vendors = ['NVIDIA', 'AMD', 'Intel']
+        self.devices = self._load_cached_devices()
+        if self.devices is None:
+            self.devices = self.discover_devices()
+            self._save_cached_devices(self.devices)
+
+        if not self.devices:
+            self.logger.info("GPU не обнаружена, загрузка GPU не будет собираться")
+            return
+
+        self.vendor = self.devices[0].vendor
+        self.model = self.devices[0].model
+        for device in self.devices:
+            self.logger.info(
+                "Обнаружена GPU %s: Вендор = %s, Модель = %s, PCI = %s",
+                device.card, device.vendor, device.model, device.pci_slot
+            )
 
+    @staticmethod
+    def _read_sysfs(path: str) -> str | None:
         try:
-            lspci_output = subprocess.run(
-                ['lspci', '-vnn'],
-                capture_output=True,
-                text=True,
-                check=True
-            ).stdout.splitlines()
-
-            gpu_line = next(
-                (line for line in lspci_output
-                 if 'VGA' in line and any(vendor in line for vendor in supported_vendors)),
-                None
-            )
-            if not gpu_line:
-                raise ValueError("GPU не обнаружена")
+            with open(path, 'r') as f:
+                return f.read().strip()
+        except OSError:
+            return None
 
-            self.vendor: str | None = next(
-                (vendor for vendor in supported_vendors if vendor in gpu_line),
-                None
-            )
-            if not self.vendor:
-                raise ValueError(f"Неизвестный вендор GPU в строке: {gpu_line}")
+    def discover_devices(self) -> List[GPUDevice]:
+        """
+        Перечисление видеокарт по /sys/class/drm/card*/device.
 
-            model_match = re.search(r'[\[\(](.*?)[\]\)]', gpu_line)
-            self.model: str | None = model_match.group(1) if model_match else None
+        :return: Список GPU поддерживаемых вендоров в порядке PCI-адресов
+        """
+        try:
+            cards = [name for name in os.listdir(self.drm_path) if re.fullmatch(r'card\d+', name)]
+        except OSError:
+            return []
 
-            self.logger.info(
-                "Обнаружена GPU: Вендор = %s, Модель = %s",
-                self.vendor,
-                self.model or "Неизвестно"
-            )
+        devices: Dict[str, GPUDevice] = {}
+        for card in sorted(cards, key=lambda name: int(name[4:])):
+            card_path = os.path.join(self.drm_path, card)
+            vendor_id = self._read_sysfs(os.path.join(card_path, 'device', 'vendor'))
+            device_id = self._read_sysfs(os.path.join(card_path, 'device', 'device'))
+            vendor = PCI_VENDORS.get((vendor_id or '').lower())
+            if vendor is None or device_id is None:
+                continue
 
-        except subprocess.CalledProcessError as e:
-            self.logger.error(
-                "Ошибка выполнения команды lspci: код = %d, вывод = %s",
-                e.returncode,
-                e.output
-            )
-            raise
+            pci_slot = os.path.basename(os.path.realpath(os.path.join(card_path, 'device')))
+            devices.setdefault(pci_slot, GPUDevice(card, vendor, vendor_id.lower(), device_id.lower(), pci_slot, card_path))
 
-        except ValueError as e:
-            self.logger.error(str(e))
-            raise
+        return sorted(devices.values(), key=lambda device: device.pci_slot)
 
-        except Exception as e:
-            self.logger.error(
-                "Неожиданная ошибка при обнаружении GPU: %s",
-                str(e),
-                exc_info=True
-            )
-            raise
+    def _boot_id(self) -> str | None:
+        return self._read_sysfs(BOOT_ID_PATH)
+
+    def _load_cached_devices(self) -> List[GPUDevice] | None:
+        """Чтение кэша обнаружения, если он создан в текущей загрузке системы"""
+        boot_id = self._boot_id()
+        if self.cache_path is None or boot_id is None or not os.path.exists(self.cache_path):
+            return None
+
+        try:
+            with open(self.cache_path, 'r') as f:
+                cache = json.load(f)
+            if cache.get('boot_id') != boot_id or cache.get('drm_path') != self.drm_path:
+                return None
+            return [GPUDevice(**device) for device in cache['devices']]
+
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Кэш обнаружения GPU повреждён и будет пересоздан: {e}")
+            return None
+
+    def _save_cached_devices(self, devices: List[GPUDevice]) -> None:
+        """Сохранение результатов обнаружения до следующей перезагрузки"""
+        boot_id = self._boot_id()
+        if self.cache_path is None or boot_id is None:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, 'w') as f:
+                json.dump({
+                    'boot_id': boot_id,
+                    'drm_path': self.drm_path,
+                    'devices': [asdict(device) for device in devices]
+                }, f)
+
+        except OSError as e:
+            self.logger.warning(f"Не удалось сохранить кэш обнаружения GPU: {e}")
 
     def get_gpu_load(self) -> float:
         """
-        Получение процента загрузки GPU в зависимости от вендора
+        Получение процента загрузки основной GPU
         """
-        if not self.vendor:
-            self.logger.error("GPU не инициализирована")
+        if not self.devices:
             return 0.0
 
+        return self.get_device_load(self.devices[0])
+
+    def get_gpu_loads(self) -> Dict[str, float]:
+        """
+        Получение процента загрузки всех обнаруженных GPU
+
+        :return: Словарь {имя карты DRM: загрузка}
+        """
+        return {device.card: self.get_device_load(device) for device in self.devices}
+
+    def get_device_load(self, device: GPUDevice) -> float:
+        """
+        Получение процента загрузки GPU в зависимости от вендора
+        """
         vendors_mapping = {
             'NVIDIA': self.get_nvidia_load,
             'AMD': self.get_amd_load,
@@ -93,44 +329,48 @@ class GPUMonitoring:
         }
 
         try:
-            return vendors_mapping[self.vendor]()
+            return vendors_mapping[device.vendor](device)
 
-        except Exception as e:
-            self.logger.error(f"Ошибка получения загрузки GPU {self.vendor}: {e}")
+        except KeyError:
+            self.logger.error(f"Неподдерживаемый вендор GPU: {device.vendor}")
             return 0.0
 
-        except KeyError:
-            self.logger.error(f"Неподдерживаемый вендор GPU: {self.vendor}")
+        except Exception as e:
+            self.logger.error(f"Ошибка получения загрузки GPU {device.vendor}: {e}")
             return 0.0
 
-    def get_nvidia_load(self) -> float:
-        try:
-            result = subprocess.run(
-                ['nvidia-smi', '--query-gpu=utilization.gpu', '--format=csv,noheader,nounits'],
-                capture_output=True,
-                text=True
-            )
-            return float(result.stdout.strip())
+    def get_nvidia_load(self, device: GPUDevice | None = None) -> float:
+        """Последнее значение загрузки из долгоживущего процесса nvidia-smi"""
+        if self._nvidia_reader is None:
+            self._nvidia_reader = NvidiaSmiReader()
+            self._nvidia_reader.start()
 
-        except subprocess.CalledProcessError:
-            self.logger.error("Ошибка выполнения nvidia-smi")
+        nvidia_devices = [gpu for gpu in self.devices if gpu.vendor == 'NVIDIA']
+        index = nvidia_devices.index(device) if device in nvidia_devices else 0
+        load = self._nvidia_reader.get_load(index)
+        if load is None:
             return 0.0
 
-        except subprocess.TimeoutExpired:
-            self.logger.error("Превышено время ожидания nvidia-smi")
-            return 0.0
+        if self._nvidia_reader.is_stale:
+            # Текст без возраста, чтобы повторы на каждом тике подавлялись DuplicateFilter
+            self.logger.warning(f"Данные nvidia-smi устарели (старше {self._nvidia_reader.stale_after:.1f} сек)")
 
-        except (ValueError, TypeError):
-            self.logger.error("Невозможно преобразовать загрузку NVIDIA GPU")
-            return 0.0
+        return load
 
-        except Exception as e:
-            self.logger.error(f"Неожиданная ошибка при получении загрузки NVIDIA GPU: {e}")
-            return 0.0
+    @property
+    def is_stale(self) -> bool:
+        """Устарели ли данные о загрузке NVIDIA GPU"""
+        return self._nvidia_reader is not None and self._nvidia_reader.is_stale
+
+    def close(self) -> None:
+        """Остановка фоновых читателей загрузки GPU"""
+        if self._nvidia_reader is not None:
+            self._nvidia_reader.stop()
+            self._nvidia_reader = None
 
-    def get_amd_load(self) -> float:
+    def get_amd_load(self, device: GPUDevice) -> float:
         try:
-            with open('/sys/class/drm/renderD128/device/gpu_busy_percent', 'r') as f:
+            with open(os.path.join(device.device_path, 'gpu_busy_percent'), 'r') as f:
                 return float(f.read().strip())
 
         except FileNotFoundError:
@@ -145,10 +385,17 @@ class GPUMonitoring:
             self.logger.error(f"Неожиданная ошибка при получении загрузки AMD GPU: {e}")
             return 0.0
 
-    def get_intel_load(self) -> float:
+    def get_intel_load(self, device: GPUDevice) -> float:
+        """Загрузка Intel GPU как отношение текущей частоты к максимальной"""
         try:
-            with open('/sys/class/drm/renderD128/device/gt_cur_freq_mhz', 'r') as f:
-                return float(f.read().strip()) / 100
+            with open(os.path.join(device.card_path, 'gt_cur_freq_mhz'), 'r') as f:
+                cur_freq = float(f.read().strip())
+
+            max_freq = self._read_sysfs(os.path.join(device.card_path, 'gt_max_freq_mhz'))
+            if not max_freq or float(max_freq) <= 0:
+                return cur_freq / 100
+
+            return round(cur_freq / float(max_freq) * 100, 1)
 
         except FileNotFoundError:
             self.logger.error("Файл gt_cur_freq_mhz для Intel GPU не найден")
@@ -160,4 +407,4 @@ class GPUMonitoring:
 
         except Exception as e:
             self.logger.error(f"Неожиданная ошибка при получении загрузки Intel GPU: {e}")
-            return 0.0
\ No newline at end of file
+            return 0.0
@@ -0,0 +1,205 @@
+import sys
+import os
+import time
+from typing import Any, Dict, Tuple
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.proc_reader import ProcFile
+from src.logger_config import get_logger, LogSampler
+
+
+NET_DEV_PATH = '/proc/net/dev'
+DISKSTATS_PATH = '/proc/diskstats'
+SYS_BLOCK_PATH = '/sys/block'
+
+# Размер сектора в /proc/diskstats не зависит от устройства
+SECTOR_SIZE = 512
+
+# Бюджет времени сбора сетевой и дисковой статистики на один тик, мс
+IO_TICK_BUDGET_MS = 1.0
+
+IGNORED_INTERFACES = ('lo',)
+# Виртуальные устройства без /sys/block/<имя>/device: учитываются только при
+# недоступном /sys/block; dm-* и md* дублировали бы ввод-вывод своих дисков
+IGNORED_DISK_PREFIXES = ('loop', 'ram', 'zram', 'dm-', 'md')
+
+COUNTER_32_MAX = 2 ** 32
+COUNTER_64_MAX = 2 ** 64
+
+
+def counter_delta(current: int, previous: int) -> int:
+    """
+    Приращение монотонного счётчика с учётом переполнения.
+
+    Уменьшение значения трактуется как переполнение 32- или 64-битного
+    счётчика; если такое переполнение дало бы неправдоподобно большое
+    приращение, счётчик считается сброшенным (например, после
+    переподключения интерфейса).
+    """
+    if current >= previous:
+        return current - previous
+
+    modulus = COUNTER_32_MAX if previous < COUNTER_32_MAX else COUNTER_64_MAX
+    wrapped = current + modulus - previous
+    return wrapped if wrapped < modulus // 2 else current
+
+
+class RateTracker:
+    """Скорость изменения набора счётчиков по монотонному времени"""
+
+    def __init__(self):
+        self._last: Dict[str, Tuple[int, Tuple[int, ...]]] = {}
+
+    def update(self, counters: Dict[str, Tuple[int, ...]], now_ns: int) -> Dict[str, Tuple[float, ...]]:
+        """
+        Учёт новых значений счётчиков.
+
+        :return: Скорости в единицах в секунду для устройств, известных с прошлого вызова
+        """
+        rates = {}
+        for name, values in counters.items():
+            last = self._last.get(name)
+            if last is None:
+                continue
+
+            elapsed = (now_ns - last[0]) / 1_000_000_000
+            if elapsed > 0:
+                rates[name] = tuple(counter_delta(value, previous) / elapsed for value, previous in zip(values, last[1]))
+
+        self._last = {name: (now_ns, values) for name, values in counters.items()}
+        return rates
+
+
+class IOMonitoring:
+    """
+    Скорость сетевого и дискового ввода-вывода.
+
+    Счётчики читаются из /proc/net/dev (байты и пакеты по интерфейсам) и
+    /proc/diskstats (байты и операции по дискам) через постоянно открытые
+    файлы, скорости вычисляются по разности счётчиков между вызовами sample().
+    """
+
+    def __init__(
+            self,
+            net_dev_path: str = NET_DEV_PATH,
+            diskstats_path: str = DISKSTATS_PATH,
+            sys_block_path: str = SYS_BLOCK_PATH,
+            budget_ms: float = IO_TICK_BUDGET_MS
+    ):
+        self.logger = get_logger(self.__class__.__name__)
+        self.budget_ms = budget_ms
+        self.last_cost_ms = 0.0
+        self.budget_overruns = 0
+        self._overrun_log_sampler = LogSampler(100)
+
+        self._net_file = self._open(net_dev_path)
+        self._disk_file = self._open(diskstats_path)
+        self.disks = self._list_disks(sys_block_path)
+        self._net_rates = RateTracker()
+        self._disk_rates = RateTracker()
+        self.sample()
+
+    def _open(self, path: str) -> ProcFile | None:
+        try:
+            return ProcFile(path)
+        except OSError as e:
+            self.logger.warning(f"Статистика ввода-вывода недоступна, {path}: {e}")
+            return None
+
+    @staticmethod
+    def _list_disks(sys_block_path: str) -> set[str] | None:
+        """
+        Имена физических дисков (без разделов); None - фильтр по /sys/block недоступен.
+
+        Учитываются только устройства со ссылкой device: у виртуальных
+        (dm-*, md*, zram, loop) её нет, и их ввод-вывод уже входит в счётчики
+        нижележащих дисков.
+        """
+        try:
+            names = os.listdir(sys_block_path)
+        except OSError:
+            return None
+        return {
+            name.replace('!', '/') for name in names
+            if os.path.exists(os.path.join(sys_block_path, name, 'device'))
+        }
+
+    def read_network_counters(self) -> Dict[str, Tuple[int, int, int, int]]:
+        """Счётчики интерфейсов: (принято байт, отправлено байт, принято пакетов, отправлено пакетов)"""
+        if self._net_file is None:
+            return {}
+
+        counters = {}
+        for line in self._net_file.read_text().splitlines()[2:]:
+            name, _, data = line.partition(':')
+            name = name.strip()
+            fields = data.split()
+            if name in IGNORED_INTERFACES or len(fields) < 10:
+                continue
+            counters[name] = (int(fields[0]), int(fields[8]), int(fields[1]), int(fields[9]))
+        return counters
+
+    def read_disk_counters(self) -> Dict[str, Tuple[int, int, int, int]]:
+        """Счётчики дисков: (прочитано байт, записано байт, операций чтения, операций записи)"""
+        if self._disk_file is None:
+            return {}
+
+        counters = {}
+        for line in self._disk_file.read_text().splitlines():
+            fields = line.split()
+            if len(fields) < 10:
+                continue
+
+            name = fields[2]
+            if self.disks is not None and name not in self.disks:
+                continue
+            if self.disks is None and name.startswith(IGNORED_DISK_PREFIXES):
+                continue
+
+            counters[name] = (
+                int(fields[5]) * SECTOR_SIZE, int(fields[9]) * SECTOR_SIZE, int(fields[3]), int(fields[7])
+            )
+        return counters
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Скорости ввода-вывода с предыдущего вызова.
+
+        :return: Суммарные скорости (байт/с, операций/с) и скорости по устройствам в 'io_devices'
+        """
+        started = time.perf_counter_ns()
+        now_ns = time.monotonic_ns()
+        net_rates = self._net_rates.update(self.read_network_counters(), now_ns)
+        disk_rates = self._disk_rates.update(self.read_disk_counters(), now_ns)
+
+        metrics = {
+            'net_rx_bytes_s': sum(rates[0] for rates in net_rates.values()),
+            'net_tx_bytes_s': sum(rates[1] for rates in net_rates.values()),
+            'disk_read_bytes_s': sum(rates[0] for rates in disk_rates.values()),
+            'disk_write_bytes_s': sum(rates[1] for rates in disk_rates.values()),
+            'disk_read_iops': sum(rates[2] for rates in disk_rates.values()),
+            'disk_write_iops': sum(rates[3] for rates in disk_rates.values()),
+            'io_devices': {
+                'net': {name: [round(rate, 1) for rate in rates] for name, rates in net_rates.items()},
+                'disk': {name: [round(rate, 1) for rate in rates] for name, rates in disk_rates.items()},
+            },
+        }
+
+        self.last_cost_ms = (time.perf_counter_ns() - started) / 1_000_000
+        if self.last_cost_ms > self.budget_ms:
+            self.budget_overruns += 1
+            if self._overrun_log_sampler():
+                self.logger.warning(
+                    f"Сбор ввода-вывода превысил бюджет {self.budget_ms} мс: {self.last_cost_ms:.2f} мс "
+                    f"(всего превышений: {self.budget_overruns})"
+                )
+
+        return metrics
+
+    def close(self) -> None:
+        """Закрытие файлов статистики"""
+        for proc_file in (self._net_file, self._disk_file):
+            if proc_file is not None:
+                proc_file.close()
@@ -1,31 +1,222 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import threading
+import time
+
+LOGS_DIR = os.path.join(os.path.dirname(__file__), 'logs')
+
+# Окно, в течение которого одинаковые сообщения подавляются, сек
+DUPLICATE_WINDOW = 60.0
+
+_log_queue: queue.Queue = queue.Queue(-1)
+_listener: logging.handlers.QueueListener | None = None
+_listener_lock = threading.Lock()
+# Фильтры повторов всех логгеров: итоги подавления выводит поток записи (см. DuplicateFlushingListener)
+_duplicate_filters: list['DuplicateFilter'] = []
+
+
+class PerLoggerFileHandler(logging.Handler):
+    """Запись каждого логгера в собственный файл logs/<name>.log"""
+
+    def __init__(self, logs_dir: str):
+        super().__init__(logging.INFO)
+        self.logs_dir = logs_dir
+        self._handlers: dict[str, logging.FileHandler] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        handler = self._handlers.get(record.name)
+        if handler is None:
+            try:
+                os.makedirs(self.logs_dir, exist_ok=True)
+                handler = logging.FileHandler(os.path.join(self.logs_dir, f'{record.name}.log'))
+            except OSError:
+                self.handleError(record)
+                return
+            handler.setFormatter(self.formatter)
+            self._handlers[record.name] = handler
+        handler.emit(record)
+
+    def close(self) -> None:
+        for handler in self._handlers.values():
+            handler.close()
+        self._handlers.clear()
+        super().close()
+
+
+class DuplicateFilter(logging.Filter):
+    """
+    Подавление повторяющихся предупреждений и ошибок.
+
+    Первое сообщение проходит, одинаковые в течение window секунд отбрасываются.
+    Число подавленных выводится отдельным сообщением после окончания окна
+    (flush) или добавляется к следующему такому же сообщению, если оно пришло
+    раньше. Сообщения ниже WARNING проходят без изменений.
+    """
+
+    def __init__(self, window: float = DUPLICATE_WINDOW, max_keys: int = 1024):
+        super().__init__()
+        self.window = window
+        self.max_keys = max_keys
+        # Ключ -> [начало окна, число подавленных, первое сообщение окна]
+        self._seen: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+
+            suppressed = entry[1] if entry is not None else 0
+            if entry is None and len(self._seen) >= self.max_keys:
+                self._seen.pop(next(iter(self._seen)))
+            self._seen[key] = [now, 0, record]
+
+        if suppressed:
+            record.msg = self._with_count(record.getMessage(), suppressed)
+            record.args = None
+        return True
+
+    @staticmethod
+    def _with_count(message: str, suppressed: int) -> str:
+        return f"{message} (подавлено {suppressed} одинаковых сообщений)"
+
+    def flush(self, force: bool = False) -> list[logging.LogRecord]:
+        """
+        Итоги подавления по окнам, которые закончились.
+
+        :param force: Вывести итоги и по незакончившимся окнам (при завершении работы)
+        :return: Сообщения с числом подавленных; окна удаляются
+        """
+        now = time.monotonic()
+        records = []
+        with self._lock:
+            for key, (started, suppressed, record) in list(self._seen.items()):
+                if not force and now - started < self.window:
+                    continue
+                del self._seen[key]
+                if suppressed:
+                    summary = logging.makeLogRecord(record.__dict__)
+                    summary.msg = self._with_count(key[2], suppressed)
+                    summary.args = summary.exc_info = summary.exc_text = None
+                    summary.created = time.time()
+                    records.append(summary)
+        return records
+
+
+class DuplicateFlushingListener(logging.handlers.QueueListener):
+    """
+    QueueListener, который не реже раза в flush_interval секунд выводит итоги
+    подавления DuplicateFilter: иначе число подавленных в последней серии
+    повторов терялось бы, пока не придёт такое же сообщение.
+    """
+
+    def __init__(
+            self,
+            log_queue: queue.Queue,
+            *handlers: logging.Handler,
+            filters: list[DuplicateFilter],
+            flush_interval: float = 1.0,
+            respect_handler_level: bool = False
+    ):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.filters = filters
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        while True:
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush_duplicates()
+            try:
+                return self.queue.get(block, self.flush_interval if block else None)
+            except queue.Empty:
+                if not block:
+                    raise
+
+    def flush_duplicates(self, force: bool = False) -> None:
+        """Вывод итогов подавления всех фильтров в обработчики"""
+        self._last_flush = time.monotonic()
+        for duplicate_filter in list(self.filters):
+            for record in duplicate_filter.flush(force):
+                self.handle(record)
+
+
+class LogSampler:
+    """Запись только каждого every-го сообщения горячего пути; остальные отбрасываются"""
+
+    def __init__(self, every: int):
+        self.every = max(1, every)
+        self.count = 0
+
+    def __call__(self) -> bool:
+        """True для 1-го, (every+1)-го и т.д. вызова"""
+        self.count += 1
+        return (self.count - 1) % self.every == 0
+
+
+def _get_listener() -> logging.handlers.QueueListener:
+    """Запуск общего фонового потока записи логов"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            file_handler = PerLoggerFileHandler(LOGS_DIR)
+            file_handler.setFormatter(formatter)
+
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setLevel(logging.INFO)
+            console_handler.setFormatter(formatter)
+
+            _listener = DuplicateFlushingListener(
+                _log_queue, file_handler, console_handler, filters=_duplicate_filters, respect_handler_level=True
+            )
+            _listener.start()
+            atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging() -> None:
+    """Остановка фонового потока с записью всех сообщений из очереди"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener.flush_duplicates(force=True)
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
 
 def get_logger(name):
-    """Создает и возвращает настроенный логгер."""
-    # Создаем логгер
+    """
+    Создает и возвращает настроенный логгер.
+
+    Запись в файл и консоль выполняется в отдельном потоке QueueListener,
+    поэтому вызывающий поток только кладёт сообщение в очередь.
+    """
     logger = logging.getLogger(name)
 
     if not logger.handlers:
         logger.setLevel(logging.INFO)
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        logs_dir = os.path.join(os.path.dirname(__file__), 'logs')
-        os.makedirs(logs_dir, exist_ok=True)
-        file_handler = logging.FileHandler(
-            os.path.join(logs_dir, f'{name}.log')
-        )
-        file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(formatter)
-
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(formatter)
-
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        _get_listener()
+        queue_handler = logging.handlers.QueueHandler(_log_queue)
+        duplicate_filter = DuplicateFilter()
+        queue_handler.addFilter(duplicate_filter)
+        _duplicate_filters.append(duplicate_filter)
+        logger.addHandler(queue_handler)
         logger.propagate = False
 
     return logger
@@ -1,5 +1,7 @@
 import sys
 import os
+import math
+import time
 from typing import Dict, Any
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -7,17 +9,59 @@ sys.path.insert(0, project_root)
 
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import (
-    QApplication, QMainWindow, QTableWidgetItem,
-    QHeaderView, QAbstractItemView, QMessageBox
+    QApplication, QMainWindow, QHeaderView, QMessageBox, QLabel, QVBoxLayout, QGridLayout, QComboBox,
+    QProgressBar, QPushButton, QFileDialog, QCheckBox, QDialog
 )
 from PySide6.QtGui import QCloseEvent
 
 from src.UI.design import Ui_SystemPulse
+from src.UI.metrics_table_model import MetricsTableModel
+from src.UI.cpu_heatmap import CPUHeatmap
+from src.UI.database_clearer import DatabaseClearer
+from src.UI.export_dialog import ExportDialog
+from src.UI.metrics_exporter import MetricsExporter
+from src.UI.time_series_chart import TimeSeriesChart
+from src.UI.ui_updater import UpdateCoalescer, WidgetUpdater
 from src.system_monitor import SystemMonitor
 from src.database import DatabaseHandler
+from src.export import EXPORT_FORMATS, available_formats
+from src.metrics_writer import MetricsWriter
+from src.retention import RetentionPolicy, RetentionWorker, load_retention_policy, save_retention_policy
 from src.logger_config import get_logger
 from src.system_info import SystemInfo
 
+
+# Окно скользящей статистики в интерфейсе, сек
+STATS_WINDOW_SEC = 60
+
+# Минимальный интервал между обновлениями метрик в интерфейсе, мс
+UI_UPDATE_INTERVAL_MS = 100
+
+# Виджеты формы, в которые выводятся метрики
+UI_METRIC_WIDGETS = (
+    'progressBar_CPU', 'progressBar_GPU', 'label_RAM_free', 'label_RAM_all',
+    'label_ROM_free', 'label_ROM_all', 'label_time'
+)
+
+# Графики: метрика -> (подпись, единица, верхняя граница оси Y или None)
+CHART_METRICS = {
+    'cpu_percent': ("ЦП", "%", 100.0),
+    'gpu_load': ("ГП", "%", 100.0),
+    'ram_free_mb': ("ОЗУ свободно", "МБ", None),
+    'disk_free_gb': ("Диск свободно", "ГБ", None),
+}
+
+# Предельная частота перерисовки графиков, кадров в секунду
+CHART_FPS = 10
+
+# Диапазоны графиков: подпись -> длительность в секундах (None - текущая сессия из памяти)
+CHART_RANGES = {
+    "Текущая сессия": None,
+    "Последний час": 3600,
+    "Последние сутки": 24 * 3600,
+}
+
+
 class SystemPulse(QMainWindow):
 
     def __init__(self):
@@ -38,20 +82,122 @@ class SystemPulse(QMainWindow):
     def _init_ui(self):
         self.ui = Ui_SystemPulse()
         self.ui.setupUi(self)
-        self.ui.tableWidget_DB.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self._init_live_widgets()
+        self._init_clear_progress()
+        self._init_export()
+        self._init_retention()
+
+    def _init_live_widgets(self):
+        """Виджеты детальных метрик на вкладке мониторинга"""
+        self.live_layout = QVBoxLayout()
+        self.label_CPU_cores = QLabel("Загрузка ядер ЦП:", self.ui.tab_3)
+        self.cpu_heatmap = CPUHeatmap(parent=self.ui.tab_3)
+        self.label_CPU_breakdown = QLabel("", self.ui.tab_3)
+        self.label_CPU_stats = QLabel("", self.ui.tab_3)
+        self.label_IO_rates = QLabel("", self.ui.tab_3)
+        for widget in (
+                self.label_CPU_cores, self.cpu_heatmap, self.label_CPU_breakdown, self.label_CPU_stats,
+                self.label_IO_rates
+        ):
+            self.live_layout.addWidget(widget)
+        self._init_charts()
+        self.ui.gridLayout.addLayout(self.live_layout, 9, 0, 1, 5)
+
+        widgets = {name: getattr(self.ui, name) for name in UI_METRIC_WIDGETS}
+        widgets.update(
+            label_CPU_breakdown=self.label_CPU_breakdown,
+            label_CPU_stats=self.label_CPU_stats,
+            label_IO_rates=self.label_IO_rates
+        )
+        self.widget_updater = WidgetUpdater(widgets)
+        self.ui_coalescer = UpdateCoalescer(self.update_ui, UI_UPDATE_INTERVAL_MS, parent=self)
+
+    def _init_clear_progress(self):
+        """Индикатор фоновой очистки базы данных в строке состояния"""
+        self.progressBar_clear = QProgressBar(self)
+        self.progressBar_clear.setRange(0, 100)
+        self.progressBar_clear.setFormat("Очистка базы данных: %p%")
+        self.progressBar_clear.hide()
+        self.statusBar().addPermanentWidget(self.progressBar_clear)
+
+    def _init_export(self):
+        """Кнопка экспорта истории рядом с кнопкой очистки и индикатор в строке состояния"""
+        self.pushButton_export = QPushButton("Экспорт данных", self.ui.tab_4)
+        self.pushButton_export.setFont(self.ui.pushButton_remove.font())
+        layout = self.ui.horizontalLayout_2
+        layout.insertWidget(layout.indexOf(self.ui.pushButton_remove), self.pushButton_export)
+
+        self.progressBar_export = QProgressBar(self)
+        self.progressBar_export.setRange(0, 100)
+        self.progressBar_export.setFormat("Экспорт: %p%")
+        self.progressBar_export.hide()
+        self.statusBar().addPermanentWidget(self.progressBar_export)
+
+    def _init_retention(self):
+        """Флажок удаления устаревших данных рядом с кнопками истории; по умолчанию выключен"""
+        policy = RetentionPolicy()
+        self.checkBox_retention = QCheckBox("Удалять устаревшие данные", self.ui.tab_4)
+        self.checkBox_retention.setToolTip(
+            f"Сырые замеры хранятся {policy.raw_days:g} сут. (сжимаются через {policy.compress_after_days:g} сут.), "
+            + ", ".join(f"агрегаты {resolution} - {days:g} сут." for resolution, days in policy.rollup_days.items())
+        )
+        layout = self.ui.horizontalLayout_2
+        layout.insertWidget(layout.indexOf(self.pushButton_export), self.checkBox_retention)
+
+    def _init_charts(self):
+        """Графики метрик с перерисовкой не чаще CHART_FPS раз в секунду"""
+        self.comboBox_chart_range = QComboBox(self.ui.tab_3)
+        for label, seconds in CHART_RANGES.items():
+            self.comboBox_chart_range.addItem(label, seconds)
+        self.live_layout.addWidget(self.comboBox_chart_range)
+
+        charts_layout = QGridLayout()
+        self.charts: Dict[str, TimeSeriesChart] = {}
+        for index, (metric, (title, unit, y_max)) in enumerate(CHART_METRICS.items()):
+            chart = TimeSeriesChart(title, unit, y_max, parent=self.ui.tab_3)
+            charts_layout.addWidget(chart, index // 2, index % 2)
+            self.charts[metric] = chart
+        self.live_layout.addLayout(charts_layout)
+
+        self._charts_dirty = False
+        self.chart_timer = QTimer(self)
+        self.chart_timer.setInterval(1000 // CHART_FPS)
+        self.chart_timer.timeout.connect(self.refresh_charts)
 
     def _init_system_components(self):
-        self.database_handler = DatabaseHandler()
-        self.system_monitor = SystemMonitor()
+        self.database_handler = DatabaseHandler(persistent=True)
+        self.metrics_writer = MetricsWriter(self.database_handler)
+        self.metrics_writer.start()
+        # Сроки хранения читаются из базы: без сохранённой настройки данные не удаляются
+        retention_policy = load_retention_policy(self.database_handler)
+        self.retention_worker = RetentionWorker(self.database_handler, retention_policy)
+        if retention_policy is not None:
+            self.retention_worker.start()
+        self.checkBox_retention.setChecked(retention_policy is not None)
+        self.system_monitor = SystemMonitor(
+            database_handler=self.database_handler,
+            metrics_writer=self.metrics_writer
+        )
         self.system_info = SystemInfo()
+        self.database_clearer = DatabaseClearer(self.database_handler, parent=self)
+        self.metrics_exporter = MetricsExporter(self.database_handler, parent=self)
+        self.metrics_model = MetricsTableModel(self.database_handler, parent=self)
+        self.ui.tableView_DB.setModel(self.metrics_model)
 
     def _setup_connections(self):
-        self.system_monitor.update_metrics.connect(self.update_ui)
+        self.system_monitor.update_metrics.connect(self.ui_coalescer.submit, Qt.QueuedConnection)
         self.system_monitor.update_timer.connect(self.update_timer_display)
 
         self.ui.spinBox_update_interval.valueChanged.connect(self.system_monitor.set_time_lapse)
         self.ui.pushButton_play.clicked.connect(self.toggle_monitoring)
         self.ui.pushButton_remove.clicked.connect(self.clear_database)
+        self.database_clearer.progress.connect(self.progressBar_clear.setValue)
+        self.database_clearer.finished.connect(self._on_database_cleared)
+        self.pushButton_export.clicked.connect(self.export_database)
+        self.metrics_exporter.progress.connect(self.progressBar_export.setValue)
+        self.metrics_exporter.finished.connect(self._on_database_exported)
+        self.comboBox_chart_range.currentIndexChanged.connect(self._on_chart_range_changed)
+        self.checkBox_retention.toggled.connect(self.set_retention_enabled)
 
     def _post_init_setup(self):
         QTimer.singleShot(100, self.setup_table_widget)
@@ -60,7 +206,7 @@ class SystemPulse(QMainWindow):
 
     def update_timer_display(self, time_str):
         """Обновление отображения времени таймера"""
-        self.ui.label_time.setText(time_str)
+        self.widget_updater.apply({'label_time': time_str})
 
     def toggle_monitoring(self):
         """Переключает состояние мониторинга и обновляет текст кнопки"""
@@ -76,17 +222,56 @@ class SystemPulse(QMainWindow):
     def start_monitoring(self):
         """Запуск мониторинга"""
         self.system_monitor.start_monitoring()
+        self.chart_timer.start()
 
     def stop_monitoring(self):
         """Остановка мониторинга"""
         self.system_monitor.stop_monitoring()
+        self.ui_coalescer.cancel()
+        self.chart_timer.stop()
+        self.refresh_charts()
         self.reset_ui_metrics()
 
     def update_ui(self, metrics: Dict[str, Any]):
-        """Обновление UI данными"""
+        """Обновление UI данными; вызывается UpdateCoalescer не чаще UI_UPDATE_INTERVAL_MS"""
         self._update_system_metrics(metrics)
+        self._charts_dirty = True
         self.show_database_metrics()
 
+    def is_live_chart_range(self) -> bool:
+        return self.comboBox_chart_range.currentData() is None
+
+    def refresh_charts(self):
+        """Перерисовка графиков по истории в памяти, если появились новые замеры"""
+        if not self._charts_dirty or not self.is_live_chart_range():
+            return
+
+        history = self.system_monitor.history
+        for metric, chart in self.charts.items():
+            chart.set_data(*history.window(metric))
+        self._charts_dirty = False
+
+    def show_chart_history(self, seconds: float):
+        """
+        Графики за последние seconds секунд из базы данных.
+
+        Разрешение (сырые данные или агрегаты) выбирается по ширине графика,
+        поэтому длинные диапазоны не требуют чтения всех записей.
+        """
+        end_ms = int(time.time() * 1000)
+        start_ms = end_ms - int(seconds * 1000)
+        for metric, chart in self.charts.items():
+            _, rows = self.database_handler.get_trend(metric, start_ms, end_ms, chart.max_points())
+            chart.set_data([row[0] for row in rows], [math.nan if row[1] is None else row[1] for row in rows])
+
+    def _on_chart_range_changed(self, index: int):
+        seconds = self.comboBox_chart_range.itemData(index)
+        if seconds is None:
+            self._charts_dirty = True
+            self.refresh_charts()
+        else:
+            self.show_chart_history(seconds)
+
     def _update_system_metrics(self, metrics: Dict[str, Any]):
         """Обновление системных метрик в UI"""
         metrics_reset = {
@@ -99,31 +284,52 @@ class SystemPulse(QMainWindow):
             'label_time': metrics['monitoring_time']
         }
         self.put_in_ui_metrics(metrics_reset)
+        self._update_cpu_details(metrics)
+        self._update_io_rates(metrics)
+
+    def _update_cpu_details(self, metrics: Dict[str, Any]):
+        """Обновление тепловой карты ядер и составляющих загрузки ЦП"""
+        self.cpu_heatmap.set_values(metrics.get('cpu_per_core', []))
+        if 'cpu_user' in metrics:
+            self.widget_updater.apply({'label_CPU_breakdown': (
+                f"user {metrics['cpu_user']:.1f}%   system {metrics['cpu_system']:.1f}%   "
+                f"iowait {metrics['cpu_iowait']:.1f}%   steal {metrics['cpu_steal']:.1f}%"
+            )})
+
+        # Скользящая статистика за минуту из истории в памяти, без обращения к базе
+        window = max(int(STATS_WINDOW_SEC / self.system_monitor.time_lapse), 1)
+        stats = self.system_monitor.history.stats('cpu_percent', window)
+        if stats:
+            self.widget_updater.apply({'label_CPU_stats': (
+                f"ЦП за минуту: ср. {stats['avg']:.1f}%   мин. {stats['min']:.1f}%   макс. {stats['max']:.1f}%"
+            )})
+
+    @staticmethod
+    def format_rate(bytes_per_second: float) -> str:
+        """Скорость передачи данных в удобных единицах"""
+        for unit in ("Б/с", "КБ/с", "МБ/с"):
+            if bytes_per_second < 1024:
+                return f"{bytes_per_second:.1f} {unit}"
+            bytes_per_second /= 1024
+        return f"{bytes_per_second:.1f} ГБ/с"
+
+    def _update_io_rates(self, metrics: Dict[str, Any]):
+        """Обновление скоростей сетевого и дискового ввода-вывода"""
+        if 'net_rx_bytes_s' in metrics:
+            self.widget_updater.apply({'label_IO_rates': (
+                f"Сеть: ↓ {self.format_rate(metrics['net_rx_bytes_s'])}  ↑ {self.format_rate(metrics['net_tx_bytes_s'])}   "
+                f"Диск: чтение {self.format_rate(metrics['disk_read_bytes_s'])} ({metrics['disk_read_iops']:.0f} IOPS)  "
+                f"запись {self.format_rate(metrics['disk_write_bytes_s'])} ({metrics['disk_write_iops']:.0f} IOPS)"
+            )})
 
     def show_database_metrics(self):
-        """Отображение сохраненных метрик в таблице"""
-        self.ui.tableWidget_DB.setRowCount(0)
+        """Запуск фонового чтения метрик, появившихся в базе с прошлого обновления"""
         try:
-            metrics = self.database_handler.get_all_metric()
-            if not metrics:
-                return
-
-            for row_data in metrics:
-                row_position = self.ui.tableWidget_DB.rowCount()
-                self.ui.tableWidget_DB.insertRow(row_position)
-                self._populate_table_row(row_position, list(row_data))
+            self.metrics_model.append_new_rows()
 
         except Exception as e:
             self.logger.error(f"Ошибка отображения метрик: {e}", exc_info=True)
 
-    def _populate_table_row(self, row_position: int, row_data: list):
-        """Заполнение строки таблицы данными"""
-        for col, value in enumerate(row_data):
-            str_value = f"{value:.2f}" if isinstance(value, float) else str(value)
-            item = QTableWidgetItem(str_value)
-            item.setTextAlignment(Qt.AlignCenter)
-            self.ui.tableWidget_DB.setItem(row_position, col, item)
-
     def reset_ui_metrics(self):
         """Сброс метрик в интерфейсе"""
         metrics_reset = {
@@ -133,20 +339,25 @@ class SystemPulse(QMainWindow):
             'label_RAM_all': "0 МБ",
             'label_ROM_free': "0 ГБ",
             'label_ROM_all': "0 ГБ",
-            'label_time': ""
+            'label_time': "",
+            'label_CPU_breakdown': "",
+            'label_CPU_stats': "",
+            'label_IO_rates': ""
         }
         self.put_in_ui_metrics(metrics_reset)
+        self.cpu_heatmap.set_values([0.0] * len(self.cpu_heatmap.values))
 
     def put_in_ui_metrics(self, metrics_reset: Dict[str, Any]):
-        for attr, value in metrics_reset.items():
-            if hasattr(getattr(self.ui, attr), 'setText'):
-                getattr(self.ui, attr).setText(value)
-
-            else:
-                getattr(self.ui, attr).setValue(value)
+        """Вывод значений в виджеты; неизменившиеся виджеты пропускаются"""
+        self.widget_updater.apply(metrics_reset)
 
     def clear_database(self):
-        """Очистка базы данных и обновление таблицы"""
+        """
+        Запуск фоновой очистки базы данных с индикатором выполнения.
+
+        Запись метрик не останавливается: удаляются только строки, записанные
+        до начала очистки.
+        """
         reply = QMessageBox.question(
             self,
             'Очистка базы данных',
@@ -154,34 +365,98 @@ class SystemPulse(QMainWindow):
             QMessageBox.Yes | QMessageBox.No
         )
 
-        if reply == QMessageBox.Yes:
-            if self.system_monitor.monitoring:
-                self.stop_monitoring()
-                self.ui.pushButton_play.setText("Начать запись")
+        if reply == QMessageBox.Yes and self.database_clearer.start():
+            self.ui.pushButton_remove.setEnabled(False)
+            self.progressBar_clear.setValue(0)
+            self.progressBar_clear.show()
+
+    def _on_database_cleared(self, deleted: int):
+        """Завершение фоновой очистки базы данных"""
+        self.progressBar_clear.hide()
+        self.ui.pushButton_remove.setEnabled(True)
+        if deleted < 0:
+            self.statusBar().showMessage("Ошибка очистки базы данных", 5000)
+        else:
+            self.statusBar().showMessage(f"Удалено записей: {deleted}", 5000)
+
+        self.metrics_model.reload()
+        if not self.is_live_chart_range():
+            self._on_chart_range_changed(self.comboBox_chart_range.currentIndex())
+
+    def set_retention_enabled(self, enabled: bool):
+        """Включение или отключение удаления устаревших данных; выбор сохраняется в базе"""
+        policy = RetentionPolicy() if enabled else None
+        save_retention_policy(self.database_handler, policy)
+        if enabled:
+            self.retention_worker.policy = policy
+            self.retention_worker.start()
+        else:
+            # Без ожидания: сжатие или удаление порции не должно блокировать интерфейс
+            self.retention_worker.cancel()
+
+    def export_database(self):
+        """
+        Выбор интервала, сессии и файла и запуск фонового экспорта; формат - по расширению файла.
+
+        Интервалы совпадают с диапазонами графиков (кроме текущей сессии из памяти).
+        """
+        ranges = {label: seconds for label, seconds in CHART_RANGES.items() if seconds is not None}
+        dialog = ExportDialog(self.database_handler, ranges, parent=self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        start_ms, end_ms, session_id = dialog.selection()
+
+        filters = ";;".join(f"{fmt.upper()} (*{EXPORT_FORMATS[fmt]})" for fmt in available_formats())
+        path, _ = QFileDialog.getSaveFileName(self, 'Экспорт данных', 'system_monitoring.csv', filters)
+        if not path:
+            return
 
-            self.database_handler.clear_all_metric()
-            self.show_database_metrics()
-            self.reset_ui_metrics()
+        try:
+            started = self.metrics_exporter.start(path, start_ms, end_ms, session_id)
+        except (RuntimeError, ValueError) as e:
+            QMessageBox.warning(self, 'Экспорт данных', str(e))
+            return
+
+        if started:
+            self.pushButton_export.setEnabled(False)
+            self.progressBar_export.setValue(0)
+            self.progressBar_export.show()
+
+    def _on_database_exported(self, exported: int):
+        """Завершение фонового экспорта"""
+        self.progressBar_export.hide()
+        self.pushButton_export.setEnabled(True)
+        if exported < 0:
+            self.statusBar().showMessage("Ошибка экспорта данных", 5000)
+        else:
+            self.statusBar().showMessage(f"Экспортировано записей: {exported}", 5000)
 
     def setup_table_widget(self):
         """Настройка внешнего вида таблицы"""
-        header = self.ui.tableWidget_DB.horizontalHeader()
+        header = self.ui.tableView_DB.horizontalHeader()
         header.setStretchLastSection(True)
         last_column_index = header.count() - 1
 
         def resize_last_column():
-            table_width = self.ui.tableWidget_DB.width()
+            table_width = self.ui.tableView_DB.width()
             last_column_width = max(table_width * 0.2, 150)
-            self.ui.tableWidget_DB.setColumnWidth(last_column_index, int(last_column_width))
+            self.ui.tableView_DB.setColumnWidth(last_column_index, int(last_column_width))
 
         header.setSectionResizeMode(QHeaderView.ResizeToContents)
         header.setSectionResizeMode(last_column_index, QHeaderView.Stretch)
-        self.ui.tableWidget_DB.resizeEvent = lambda event: resize_last_column()
+        self.ui.tableView_DB.resizeEvent = lambda event: resize_last_column()
         resize_last_column()
 
     def closeEvent(self, event: QCloseEvent):
         """Обработка закрытия окна"""
         self._stop_monitoring_if_active()
+        self.system_monitor.close()
+        self.database_clearer.close()
+        self.metrics_exporter.close()
+        self.retention_worker.close()
+        self.metrics_model.wait()
+        self.metrics_writer.close()
+        self.database_handler.close()
         event.accept()
 
     def _stop_monitoring_if_active(self):
@@ -0,0 +1,266 @@
+import sys
+import os
+import json
+import shutil
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.database import DatabaseHandler
+from src.logger_config import get_logger
+
+
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'spill')
+
+
+class MetricsWriter:
+    """
+    Буферизованная запись метрик в базу данных (write-behind).
+
+    Метрики копятся в ограниченной очереди и сбрасываются в базу одной
+    транзакцией, когда набирается batch_size записей, когда проходит
+    flush_interval_ms с момента последнего сброса или при остановке.
+    """
+
+    def __init__(
+            self,
+            database_handler: DatabaseHandler,
+            batch_size: int = 50,
+            flush_interval_ms: int = 1000,
+            max_queue_size: int = 10000,
+            overflow_policy: str = 'drop_oldest',
+            spill_path: str | None = None
+    ):
+        """
+        :param database_handler: Обработчик базы данных
+        :param batch_size: Количество записей, при котором выполняется сброс
+        :param flush_interval_ms: Максимальное время ожидания записи в очереди
+        :param max_queue_size: Максимальный размер очереди
+        :param overflow_policy: Поведение при переполнении очереди:
+            'block' - ждать освобождения места,
+            'drop_oldest' - выбросить самую старую запись,
+            'spill' - сбросить запись во временный файл на диске
+        :param spill_path: Путь к файлу для политики 'spill'
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Неизвестная политика переполнения: {overflow_policy}")
+
+        if batch_size < 1 or max_queue_size < batch_size:
+            raise ValueError("Размер очереди должен быть не меньше размера пачки")
+
+        self.logger = get_logger(self.__class__.__name__)
+        self.database_handler = database_handler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.spill_path = spill_path or f"{database_handler.db_name}.spill"
+
+        self.dropped_count = 0
+        self.spilled_count = 0
+
+        self._queue: deque = deque()
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._running = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def pending(self) -> int:
+        """Количество записей, ожидающих сброса"""
+        with self._condition:
+            return len(self._queue)
+
+    def start(self) -> None:
+        """Запуск фонового потока записи"""
+        with self._condition:
+            if self._running:
+                return
+
+            self._running = True
+
+        self._thread = threading.Thread(target=self._run, name='MetricsWriter', daemon=True)
+        self._thread.start()
+        self.logger.info(
+            f"Буферизованная запись запущена: batch_size={self.batch_size}, "
+            f"flush_interval={self.flush_interval} сек, политика={self.overflow_policy}"
+        )
+
+    def submit(self, metrics: Dict[str, Any]) -> bool:
+        """
+        Постановка метрик в очередь на запись.
+
+        :return: False, если запись была отброшена
+        """
+        # Некорректные метрики отбрасываются сразу: иначе неудачная пачка
+        # не отличалась бы от ошибки базы и возвращалась бы в очередь бесконечно
+        if not self.database_handler._validate_metrics(metrics):
+            with self._condition:
+                self.dropped_count += 1
+            self.logger.error(f"Некорректные метрики не поставлены в очередь записи: {metrics}")
+            return False
+
+        with self._condition:
+            if len(self._queue) >= self.max_queue_size:
+                if self.overflow_policy == 'spill':
+                    return self._spill(metrics)
+
+                if not self._make_room():
+                    return False
+
+            self._queue.append(metrics)
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify_all()
+
+        return True
+
+    def _make_room(self) -> bool:
+        """Освобождение места в переполненной очереди. Вызывается под self._condition"""
+        if self.overflow_policy == 'drop_oldest':
+            self._queue.popleft()
+            self.dropped_count += 1
+            if self.dropped_count == 1 or self.dropped_count % 1000 == 0:
+                self.logger.warning(f"Очередь записи переполнена, отброшено записей: {self.dropped_count}")
+            return True
+
+        while self._running and len(self._queue) >= self.max_queue_size:
+            self._condition.notify_all()
+            self._condition.wait(self.flush_interval)
+
+        if len(self._queue) >= self.max_queue_size:
+            self.dropped_count += 1
+            self.logger.error("Очередь записи переполнена и не обслуживается, запись отброшена")
+            return False
+
+        return True
+
+    def _spill(self, metrics: Dict[str, Any]) -> bool:
+        """Сброс записи во временный файл на диске"""
+        try:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(metrics) + '\n')
+            self.spilled_count += 1
+            return True
+
+        except (OSError, TypeError, ValueError) as e:
+            self.dropped_count += 1
+            self.logger.error(f"Ошибка записи в файл переполнения {self.spill_path}: {e}")
+            return False
+
+    def _read_spill(self) -> List[Dict[str, Any]]:
+        """
+        Чтение файла переполнения.
+
+        Файл переименовывается в .flushing, чтобы новые записи шли в новый файл;
+        .flushing удаляется только после успешной записи в базу (_discard_spill),
+        а при ошибке перечитывается следующим сбросом вместе с новыми записями.
+        """
+        flushing_path = f"{self.spill_path}.flushing"
+        try:
+            with self._condition:
+                if os.path.exists(self.spill_path):
+                    if os.path.exists(flushing_path):
+                        with open(self.spill_path, 'rb') as src, open(flushing_path, 'ab') as dst:
+                            shutil.copyfileobj(src, dst)
+                        os.remove(self.spill_path)
+                    else:
+                        os.replace(self.spill_path, flushing_path)
+
+            if not os.path.exists(flushing_path):
+                return []
+
+            with open(flushing_path, 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Ошибка чтения файла переполнения {self.spill_path}: {e}")
+            return []
+
+    def _discard_spill(self) -> None:
+        """Удаление файла переполнения, записи из которого сохранены в базе"""
+        try:
+            os.remove(f"{self.spill_path}.flushing")
+        except OSError as e:
+            self.logger.error(f"Ошибка удаления файла переполнения {self.spill_path}: {e}")
+
+    def _requeue(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Возврат несохранённой пачки в начало очереди.
+
+        Записи сверх max_queue_size сбрасываются в файл при политике 'spill',
+        иначе отбрасываются самые старые.
+        """
+        with self._condition:
+            self._queue.extendleft(reversed(batch))
+            while len(self._queue) > self.max_queue_size:
+                oldest = self._queue.popleft()
+                if self.overflow_policy != 'spill' or not self._spill(oldest):
+                    self.dropped_count += 1
+
+    def flush(self) -> int:
+        """
+        Синхронный сброс всех накопленных записей в базу данных.
+
+        Если запись в базу не удалась, пачка возвращается в очередь, а файл
+        переполнения сохраняется до следующего сброса.
+
+        :return: Количество записанных строк
+        """
+        with self._flush_lock:
+            with self._condition:
+                batch = list(self._queue)
+                self._queue.clear()
+                self._condition.notify_all()
+
+            spilled = self._read_spill() if self.overflow_policy == 'spill' else []
+            if not batch and not spilled:
+                return 0
+
+            written = self.database_handler.adding_data_batch(batch + spilled)
+            if not written:
+                self.logger.warning(f"Запись пачки не удалась, записей возвращено в очередь: {len(batch)}")
+                self._requeue(batch)
+                return 0
+
+            if spilled:
+                self._discard_spill()
+            return written
+
+    def _run(self) -> None:
+        """Цикл фонового потока записи"""
+        last_flush = time.monotonic()
+        while True:
+            with self._condition:
+                while self._running and len(self._queue) < self.batch_size:
+                    remaining = self.flush_interval - (time.monotonic() - last_flush)
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                running = self._running
+
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"Ошибка фонового сброса метрик: {e}")
+
+            last_flush = time.monotonic()
+            if not running:
+                return
+
+    def close(self) -> None:
+        """Остановка фонового потока с гарантированным финальным сбросом"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self.flush()
+        self.logger.info("Буферизованная запись остановлена")
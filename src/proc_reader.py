@@ -0,0 +1,123 @@
+import sys
+import os
+import threading
+from typing import List, Tuple
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.logger_config import get_logger
+
+
+PROC_STAT_PATH = '/proc/stat'
+PROC_MEMINFO_PATH = '/proc/meminfo'
+
+# Начальный размер буфера чтения; /proc/stat и /proc/meminfo обычно в него помещаются
+BUFFER_SIZE = 64 * 1024
+
+KB_IN_MB = 1024
+
+
+class ProcFile:
+    """
+    Файл /proc, открытый один раз и перечитываемый с начала в собственный буфер.
+
+    Если содержимое не помещается в буфер, буфер увеличивается вдвое.
+    """
+
+    def __init__(self, path: str, buffer_size: int = BUFFER_SIZE):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+        self.buffer = bytearray(buffer_size)
+
+    def read(self) -> int:
+        """Чтение файла с начала; возвращает число прочитанных байт"""
+        size = os.preadv(self.fd, [self.buffer], 0)
+        while size == len(self.buffer):
+            self.buffer = bytearray(len(self.buffer) * 2)
+            size = os.preadv(self.fd, [self.buffer], 0)
+        return size
+
+    def read_text(self) -> str:
+        size = self.read()
+        return self.buffer[:size].decode('ascii', errors='replace')
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            fd, self.fd = self.fd, -1
+            os.close(fd)
+
+
+class ProcReader:
+    """
+    Чтение загрузки ЦП и памяти напрямую из /proc.
+
+    /proc/stat и /proc/meminfo открываются один раз как ProcFile и
+    перечитываются через os.preadv с нулевого смещения в собственные буферы,
+    без повторного открытия и разбора всего файла. Счётчики времени ЦП
+    (read_cpu_times) переводятся в проценты в CPUMonitoring по разности между
+    вызовами. Чтение и разбор защищены блокировкой: ЦП и память могут
+    запрашиваться из разных потоков пула сборщиков.
+    """
+
+    def __init__(self, stat_path: str = PROC_STAT_PATH, meminfo_path: str = PROC_MEMINFO_PATH):
+        self.logger = get_logger(self.__class__.__name__)
+        self._stat = ProcFile(stat_path)
+        self._meminfo = ProcFile(meminfo_path)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Доступны ли /proc и os.preadv на этой платформе"""
+        return hasattr(os, 'preadv') and os.path.exists(PROC_STAT_PATH) and os.path.exists(PROC_MEMINFO_PATH)
+
+    def read_cpu_times(self) -> List[Tuple[int, ...]]:
+        """
+        Счётчики всех строк cpu из /proc/stat.
+
+        :return: Список кортежей (user, nice, system, idle, iowait, irq, softirq, steal):
+            первый - суммарный по всем ядрам, далее - по каждому ядру
+        """
+        times = []
+        position = 0
+        with self._lock:
+            size = self._stat.read()
+            buffer = self._stat.buffer
+            # Хвост буфера после size может содержать строки прошлых чтений
+            while position < size and buffer.startswith(b'cpu', position, size):
+                end = buffer.find(b'\n', position, size)
+                if end == -1:
+                    end = size
+                fields = buffer[position:end].split()
+                times.append(tuple(int(value) for value in fields[1:9]))
+                position = end + 1
+        return times
+
+    @staticmethod
+    def _meminfo_field(buffer: bytearray, name: bytes, size: int) -> int:
+        """Значение поля /proc/meminfo в кБ"""
+        start = buffer.find(name, 0, size)
+        if start == -1:
+            raise ValueError(f"Поле {name.decode()} не найдено в meminfo")
+        end = buffer.find(b'kB', start, size)
+        return int(buffer[start + len(name):end])
+
+    def get_ram_info(self) -> Tuple[float, float]:
+        """
+        Доступная и общая оперативная память.
+
+        :return: (доступно МБ, всего МБ)
+        """
+        with self._lock:
+            size = self._meminfo.read()
+            total_kb = self._meminfo_field(self._meminfo.buffer, b'MemTotal:', size)
+            available_kb = self._meminfo_field(self._meminfo.buffer, b'MemAvailable:', size)
+        return round(available_kb / KB_IN_MB, 2), round(total_kb / KB_IN_MB, 2)
+
+    def close(self) -> None:
+        """Закрытие файловых дескрипторов"""
+        for proc_file in (self._stat, self._meminfo):
+            try:
+                proc_file.close()
+            except OSError as e:
+                self.logger.error(f"Ошибка закрытия {proc_file.path}: {e}")
@@ -0,0 +1,332 @@
+import sys
+import os
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.database import RAW_RESOLUTION, DatabaseHandler
+from src.logger_config import get_logger
+from src.rollups import ROLLUP_RESOLUTIONS
+
+
+DAY_MS = 24 * 3_600_000
+
+# Ключ настройки со сроками хранения (DatabaseHandler.get_setting)
+RETENTION_SETTING = 'retention_policy'
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    Сроки хранения данных в сутках: сырые замеры и агрегаты по разрешениям
+    (см. ROLLUP_RESOLUTIONS). None - хранить без ограничения.
+
+    Сырые замеры старше compress_after_days сжимаются в блоки
+    (DatabaseHandler.compact_window) и хранятся до raw_days уже в сжатом виде;
+    None - не сжимать.
+    """
+    raw_days: float | None = 7
+    rollup_days: Dict[str, float | None] = field(default_factory=lambda: {'1m': 90, '1h': 730})
+    compress_after_days: float | None = 1
+
+    def __post_init__(self):
+        unknown = set(self.rollup_days) - set(ROLLUP_RESOLUTIONS)
+        if unknown:
+            raise ValueError(f"Неизвестные разрешения агрегатов: {sorted(unknown)}")
+
+        for days in (self.raw_days, self.compress_after_days, *self.rollup_days.values()):
+            if days is not None and days <= 0:
+                raise ValueError("Срок хранения должен быть положительным")
+
+    def cutoffs(self, now_ms: int) -> Dict[str, int]:
+        """
+        Границы хранения: разрешение (RAW_RESOLUTION или ключ ROLLUP_RESOLUTIONS) ->
+        метка времени, мс; данные старше границы удаляются.
+        """
+        days = {RAW_RESOLUTION: self.raw_days, **self.rollup_days}
+        return {
+            resolution: int(now_ms - value * DAY_MS)
+            for resolution, value in days.items() if value is not None
+        }
+
+
+def load_retention_policy(database_handler: DatabaseHandler) -> RetentionPolicy | None:
+    """
+    Сроки хранения, сохранённые в базе.
+
+    :return: None, если очистка не включена или настройка повреждена -
+        данные хранятся без ограничения
+    """
+    value = database_handler.get_setting(RETENTION_SETTING)
+    if value is None:
+        return None
+    try:
+        return RetentionPolicy(**json.loads(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def save_retention_policy(database_handler: DatabaseHandler, policy: RetentionPolicy | None) -> bool:
+    """Сохранение сроков хранения в базе; None отключает очистку"""
+    value = None if policy is None else json.dumps(asdict(policy))
+    return database_handler.set_setting(RETENTION_SETTING, value)
+
+
+def vacuum_in_steps(
+        database_handler: DatabaseHandler,
+        pages: int,
+        pause_sec: float,
+        stop_event: threading.Event
+) -> int:
+    """
+    Инкрементальный VACUUM шагами по pages страниц с паузой между ними и
+    последующим усечением WAL.
+
+    :return: Количество освобождённых страниц
+    """
+    freed = 0
+    while not stop_event.is_set():
+        step = database_handler.incremental_vacuum(pages)
+        freed += step
+        if step < pages:
+            break
+        stop_event.wait(pause_sec)
+
+    database_handler.checkpoint()
+    return freed
+
+
+class RetentionWorker:
+    """
+    Фоновое сжатие и удаление устаревших данных по RetentionPolicy.
+
+    Раз в check_interval_sec поток сжимает закрытые окна старых замеров в
+    блоки (одно окно за транзакцию), затем удаляет строки старше сроков
+    хранения небольшими порциями, каждая в своей транзакции, с паузой между
+    ними: блокировка базы удерживается только на время одной порции, поэтому
+    запись метрик и чтение из интерфейса не ждут всей очистки. Затем
+    освободившиеся страницы возвращаются системе инкрементальным VACUUM
+    (при auto_vacuum = INCREMENTAL), а WAL усекается. Размер файла при
+    многонедельной работе ограничен объёмом данных за срок хранения.
+    """
+
+    def __init__(
+            self,
+            database_handler: DatabaseHandler,
+            policy: RetentionPolicy | None = None,
+            check_interval_sec: float = 3600,
+            chunk_size: int = 2000,
+            chunk_pause_sec: float = 0.05,
+            vacuum_pages: int = 1000
+    ):
+        """
+        :param database_handler: Обработчик базы данных
+        :param policy: Сроки хранения; по умолчанию RetentionPolicy()
+        :param check_interval_sec: Период проверки
+        :param chunk_size: Количество строк, удаляемых одной транзакцией
+        :param chunk_pause_sec: Пауза между порциями
+        :param vacuum_pages: Количество страниц, освобождаемых за один шаг VACUUM
+        """
+        if chunk_size < 1 or vacuum_pages < 1:
+            raise ValueError("Размер порции должен быть положительным")
+
+        self.logger = get_logger(self.__class__.__name__)
+        self.database_handler = database_handler
+        self.policy = policy or RetentionPolicy()
+        self.check_interval = check_interval_sec
+        self.chunk_size = chunk_size
+        self.chunk_pause = chunk_pause_sec
+        self.vacuum_pages = vacuum_pages
+
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """
+        Запуск фонового потока очистки.
+
+        Если поток после cancel() ещё завершает порцию, он продолжает работу
+        вместо запуска второго.
+        """
+        with self._lock:
+            self._stop_event.clear()
+            if self._thread is not None:
+                return
+
+            self._thread = threading.Thread(target=self._run, name='RetentionWorker', daemon=True)
+            self._thread.start()
+        self.logger.info(
+            f"Очистка устаревших данных запущена: {self.policy}, период {self.check_interval} сек"
+        )
+
+    def run_once(self, now_ms: int | None = None) -> Dict[str, int]:
+        """
+        Один проход очистки с последующим освобождением места.
+
+        :param now_ms: Текущее время, мс; по умолчанию time.time()
+        :return: Разрешение -> количество удалённых строк
+        """
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        compacted = self._compact(now_ms)
+        if compacted:
+            stats = self.database_handler.get_block_stats()
+            self.logger.info(f"Сжато строк: {compacted}, степень сжатия истории x{stats['ratio']:.1f}")
+
+        deleted: Dict[str, int] = {}
+        for resolution, cutoff_ms in self.policy.cutoffs(now_ms).items():
+            deleted[resolution] = 0
+            while not self._stop_event.is_set():
+                count = self.database_handler.delete_expired(resolution, cutoff_ms, self.chunk_size)
+                deleted[resolution] += count
+                if count < self.chunk_size:
+                    break
+                self._stop_event.wait(self.chunk_pause)
+
+        if any(deleted.values()):
+            freed = vacuum_in_steps(self.database_handler, self.vacuum_pages, self.chunk_pause, self._stop_event)
+            self.logger.info(f"Удалены устаревшие данные: {deleted}, освобождено страниц: {freed}")
+        return deleted
+
+    def _compact(self, now_ms: int) -> int:
+        """Сжатие закрытых окон старше compress_after_days; возвращает количество сжатых строк"""
+        if self.policy.compress_after_days is None:
+            return 0
+
+        before_ms = int(now_ms - self.policy.compress_after_days * DAY_MS)
+        compacted = 0
+        while not self._stop_event.is_set():
+            window_start = self.database_handler.oldest_window(before_ms)
+            if window_start is None:
+                break
+
+            count = self.database_handler.compact_window(window_start)
+            if not count:
+                break
+            compacted += count
+            self._stop_event.wait(self.chunk_pause)
+        return compacted
+
+    def _run(self) -> None:
+        """Цикл фонового потока очистки"""
+        while True:
+            while not self._stop_event.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    self.logger.error(f"Ошибка очистки устаревших данных: {e}")
+
+                self._stop_event.wait(self.check_interval)
+
+            with self._lock:
+                # start() после cancel() снимает флаг остановки: цикл продолжается
+                if self._stop_event.is_set():
+                    self._thread = None
+                    break
+        self.logger.info("Очистка устаревших данных остановлена")
+
+    def cancel(self) -> None:
+        """Остановка фонового потока без ожидания: текущая порция завершается в фоне"""
+        self._stop_event.set()
+
+    def close(self) -> None:
+        """Остановка фонового потока с ожиданием завершения текущей порции"""
+        self.cancel()
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+
+class ClearJob:
+    """
+    Очистка всех метрик без длительной блокировки базы.
+
+    Граница очистки фиксируется begin_clear, после чего записанные до неё
+    строки, сжатые блоки и агрегаты удаляются порциями, а место
+    возвращается системе инкрементальным VACUUM. Запись новых метрик
+    продолжается во время очистки и их не затрагивает. Выполняется в
+    фоновом потоке владельца.
+    """
+
+    def __init__(
+            self,
+            database_handler: DatabaseHandler,
+            chunk_size: int = 5000,
+            chunk_pause_sec: float = 0.01,
+            vacuum_pages: int = 1000
+    ):
+        """
+        :param database_handler: Обработчик базы данных
+        :param chunk_size: Количество строк, удаляемых одной транзакцией
+        :param chunk_pause_sec: Пауза между порциями
+        :param vacuum_pages: Количество страниц, освобождаемых за один шаг VACUUM
+        """
+        if chunk_size < 1 or vacuum_pages < 1:
+            raise ValueError("Размер порции должен быть положительным")
+
+        self.logger = get_logger(self.__class__.__name__)
+        self.database_handler = database_handler
+        self.chunk_size = chunk_size
+        self.chunk_pause = chunk_pause_sec
+        self.vacuum_pages = vacuum_pages
+        self._stop_event = threading.Event()
+
+    def run(self, progress: Callable[[int], None] | None = None) -> int | None:
+        """
+        Выполнение очистки.
+
+        :param progress: Вызывается с процентом выполнения (0-100)
+        :return: Количество удалённых строк метрик; None при ошибке
+        """
+        bounds = self.database_handler.begin_clear()
+        if bounds is None:
+            return None
+
+        min_id, max_id = bounds['min_id'], bounds['max_id']
+        deleted = 0
+        last_id = min_id - 1
+        while last_id < max_id and not self._stop_event.is_set():
+            chunk = self.database_handler.delete_metrics_chunk(max_id, self.chunk_size)
+            if chunk is None:
+                self.logger.error(f"Очистка метрик прервана из-за ошибки базы данных, удалено записей: {deleted}")
+                return None
+
+            count, last_id = chunk
+            deleted += count
+            if progress is not None:
+                progress(min(99, int((last_id - min_id + 1) * 100 / (max_id - min_id + 1))))
+            if count == 0:
+                break
+            self._stop_event.wait(self.chunk_pause)
+
+        while not self._stop_event.is_set():
+            blocks, count = self.database_handler.delete_blocks(bounds['blocks'], self.chunk_size)
+            deleted += count
+            if blocks < self.chunk_size:
+                break
+            self._stop_event.wait(self.chunk_pause)
+
+        for resolution in ROLLUP_RESOLUTIONS:
+            while not self._stop_event.is_set():
+                if self.database_handler.delete_expired(resolution, bounds[resolution], self.chunk_size) < self.chunk_size:
+                    break
+                self._stop_event.wait(self.chunk_pause)
+
+        freed = vacuum_in_steps(self.database_handler, self.vacuum_pages, self.chunk_pause, self._stop_event)
+        if self._stop_event.is_set():
+            self.logger.warning(f"Очистка метрик прервана, удалено записей: {deleted}")
+        else:
+            self.logger.info(f"Все метрики удалены: {deleted} записей, освобождено страниц: {freed}")
+            if progress is not None:
+                progress(100)
+        return deleted
+
+    def cancel(self) -> None:
+        """Прерывание очистки после текущей порции"""
+        self._stop_event.set()
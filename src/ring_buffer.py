@@ -0,0 +1,226 @@
+import math
+from array import array
+from itertools import chain
+from typing import Any, Dict, Iterator, Sequence, Tuple
+
+
+# Метрики, хранящиеся в памяти для графиков и скользящей статистики
+HISTORY_METRICS = (
+    'cpu_percent', 'gpu_load', 'ram_free_mb', 'disk_free_gb',
+    'net_rx_bytes_s', 'net_tx_bytes_s', 'disk_read_bytes_s', 'disk_write_bytes_s'
+)
+
+# Окно истории в памяти, минут; ёмкость буферов рассчитывается по интервалу сбора
+HISTORY_MINUTES = 30
+
+# Размер одного значения ('d' и 'q'), байт
+ITEM_SIZE = 8
+
+
+def bytes_per_hour(interval: float) -> int:
+    """
+    Объём памяти на одну метрику за час хранения при заданном интервале сбора.
+
+    Например, 28 800 байт (~28 КБ) при 1 сек и 288 000 байт (~281 КБ) при 0.1 сек.
+    """
+    return int(ITEM_SIZE * 3600 / interval)
+
+
+def history_capacity(interval: float, minutes: float = HISTORY_MINUTES) -> int:
+    """
+    Число замеров, покрывающее окно minutes при заданном интервале сбора.
+
+    Например, 1800 при 1 сек и 18 000 при 0.1 сек для окна 30 минут.
+    """
+    if interval <= 0 or minutes <= 0:
+        raise ValueError("Интервал и окно истории должны быть положительными")
+    return max(math.ceil(round(minutes * 60 / interval, 6)), 1)
+
+
+class RingBuffer:
+    """
+    Кольцевой буфер фиксированной ёмкости поверх array.
+
+    Память выделяется один раз при создании. Данные читаются без копирования
+    через segments(): два memoryview, которые вместе дают значения в порядке
+    поступления. Представления ссылаются на сам буфер, поэтому после
+    следующих append() их содержимое может измениться.
+    """
+
+    def __init__(self, capacity: int, typecode: str = 'd'):
+        if capacity <= 0:
+            raise ValueError("Ёмкость буфера должна быть положительной")
+
+        self.capacity = capacity
+        self._data = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self._view = memoryview(self._data)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[float]:
+        return chain(*self.segments())
+
+    @property
+    def nbytes(self) -> int:
+        return self._view.nbytes
+
+    def append(self, value: float) -> None:
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def latest(self) -> float | None:
+        """Последнее добавленное значение"""
+        if not self._size:
+            return None
+        return self._data[self._head - 1]
+
+    def segments(self, count: int | None = None) -> Tuple[memoryview, memoryview]:
+        """
+        Последние count значений (по умолчанию все) без копирования.
+
+        :return: (более старая часть, более новая часть)
+        """
+        count = self._size if count is None else max(min(count, self._size), 0)
+        start = self._head - count
+        if start >= 0:
+            return self._view[start:self._head], self._view[0:0]
+        return self._view[start + self.capacity:], self._view[:self._head]
+
+    def resize(self, capacity: int) -> None:
+        """
+        Изменение ёмкости с сохранением последних значений.
+
+        Выделяется новый массив; ранее полученные представления segments()
+        продолжают ссылаться на старый.
+        """
+        if capacity <= 0:
+            raise ValueError("Ёмкость буфера должна быть положительной")
+        if capacity == self.capacity:
+            return
+
+        older, newer = self.segments(min(self._size, capacity))
+        count = len(older) + len(newer)
+        data = array(self._data.typecode, bytes(self._data.itemsize * capacity))
+        view = memoryview(data)
+        view[:len(older)] = older
+        view[len(older):count] = newer
+
+        self.capacity = capacity
+        self._data = data
+        self._view = view
+        self._head = count % capacity
+        self._size = count
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
+
+
+class SegmentedView:
+    """
+    Последовательность поверх двух частей кольцевого буфера без их склеивания.
+
+    Нужна алгоритмам с произвольным доступом по индексу (например, прореживанию
+    для графиков).
+    """
+
+    def __init__(self, older: memoryview, newer: memoryview):
+        self._older = older
+        self._newer = newer
+        self._split = len(older)
+
+    def __len__(self) -> int:
+        return self._split + len(self._newer)
+
+    def __getitem__(self, index: int) -> float:
+        if index < 0:
+            index += len(self)
+        if index < self._split:
+            return self._older[index]
+        return self._newer[index - self._split]
+
+    def __iter__(self) -> Iterator[float]:
+        return chain(self._older, self._newer)
+
+
+class MetricsHistory:
+    """
+    Недавние значения метрик в памяти: по кольцевому буферу на метрику и
+    общий буфер меток времени (мс).
+
+    Объём памяти ограничен: (len(metrics) + 1) * capacity * ITEM_SIZE байт
+    (129 600 байт для окна 30 минут при интервале 1 сек, см. history_capacity).
+    Долговременная история хранится в базе данных.
+    """
+
+    def __init__(self, capacity: int, metrics: Sequence[str] = HISTORY_METRICS):
+        self.capacity = capacity
+        self.timestamps = RingBuffer(capacity, 'q')
+        self.buffers: Dict[str, RingBuffer] = {name: RingBuffer(capacity) for name in metrics}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + sum(buffer.nbytes for buffer in self.buffers.values())
+
+    def append(self, metrics: Dict[str, Any]) -> None:
+        """Добавление одного замера; отсутствующие метрики сохраняются как NaN"""
+        if 'timestamp_ms' not in metrics:
+            return
+
+        self.timestamps.append(int(metrics['timestamp_ms']))
+        for name, buffer in self.buffers.items():
+            value = metrics.get(name)
+            buffer.append(math.nan if value is None else float(value))
+
+    def series(self, name: str, count: int | None = None) -> Tuple[memoryview, memoryview]:
+        """Значения метрики без копирования, см. RingBuffer.segments"""
+        return self.buffers[name].segments(count)
+
+    def window(self, name: str, count: int | None = None) -> Tuple[SegmentedView, SegmentedView]:
+        """Метки времени и значения метрики за последние count замеров без копирования"""
+        return SegmentedView(*self.timestamps.segments(count)), SegmentedView(*self.series(name, count))
+
+    def stats(self, name: str, count: int | None = None) -> Dict[str, float] | None:
+        """
+        Скользящая статистика по последним count замерам без копирования данных.
+
+        :return: Словарь min/max/avg/last или None, если значений нет
+        """
+        total = 0.0
+        valid = 0
+        minimum = math.inf
+        maximum = -math.inf
+        for segment in self.series(name, count):
+            for value in segment:
+                if value != value:  # NaN
+                    continue
+                total += value
+                valid += 1
+                if value < minimum:
+                    minimum = value
+                if value > maximum:
+                    maximum = value
+
+        if not valid:
+            return None
+        return {'min': minimum, 'max': maximum, 'avg': total / valid, 'last': self.buffers[name].latest()}
+
+    def resize(self, capacity: int) -> None:
+        """Изменение ёмкости всех буферов с сохранением последних замеров"""
+        self.capacity = capacity
+        self.timestamps.resize(capacity)
+        for buffer in self.buffers.values():
+            buffer.resize(capacity)
+
+    def clear(self) -> None:
+        self.timestamps.clear()
+        for buffer in self.buffers.values():
+            buffer.clear()
@@ -0,0 +1,119 @@
+import math
+from array import array
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+# Метрики, для которых ведутся агрегаты
+ROLLUP_METRICS = (
+    'cpu_percent', 'gpu_load', 'ram_free_mb', 'disk_free_gb',
+    'net_rx_bytes_s', 'net_tx_bytes_s', 'disk_read_bytes_s', 'disk_write_bytes_s'
+)
+
+# Разрешения агрегатов: суффикс таблицы -> размер корзины, мс (по возрастанию)
+ROLLUP_RESOLUTIONS = {
+    '1m': 60_000,
+    '1h': 3_600_000,
+}
+
+ROLLUP_PERCENTILE = 0.95
+
+
+def rollup_table(resolution: str) -> str:
+    return f"metrics_rollup_{resolution}"
+
+
+def bucket_start(ts_ms: int, resolution_ms: int) -> int:
+    return ts_ms - ts_ms % resolution_ms
+
+
+def percentile(values: Sequence[float], q: float = ROLLUP_PERCENTILE) -> float | None:
+    """Перцентиль методом ближайшего ранга"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+def aggregate(
+        samples: Iterable[Tuple[int, Dict[str, float | None]]],
+        resolution_ms: int,
+        metrics: Sequence[str] = ROLLUP_METRICS
+) -> Dict[Tuple[str, int], List[float]]:
+    """
+    Агрегация пачки замеров по корзинам.
+
+    :param samples: Пары (ts_ms, словарь значений)
+    :return: (метрика, начало корзины) -> [count, sum, min, max]
+    """
+    result: Dict[Tuple[str, int], List[float]] = {}
+    for ts_ms, values in samples:
+        bucket = bucket_start(ts_ms, resolution_ms)
+        for metric in metrics:
+            value = values.get(metric)
+            if value is None:
+                continue
+            value = float(value)
+            entry = result.get((metric, bucket))
+            if entry is None:
+                result[(metric, bucket)] = [1, value, value, value]
+            else:
+                entry[0] += 1
+                entry[1] += value
+                if value < entry[2]:
+                    entry[2] = value
+                if value > entry[3]:
+                    entry[3] = value
+    return result
+
+
+class PercentileTracker:
+    """
+    Значения открытой (последней) корзины для расчёта перцентиля.
+
+    Перцентиль нельзя обновлять инкрементально, как count/sum/min/max, поэтому
+    значения текущей корзины держатся в памяти (не больше размера корзины,
+    делённого на интервал сбора, на метрику), а перцентиль вычисляется один
+    раз при закрытии корзины. Замеры из уже закрытых корзин (например,
+    дописанные из файла переполнения) в перцентиль не попадают.
+    """
+
+    def __init__(self, resolution_ms: int, metrics: Sequence[str] = ROLLUP_METRICS):
+        self.resolution_ms = resolution_ms
+        self.metrics = tuple(metrics)
+        self.bucket: int | None = None
+        self._values: Dict[str, array] = {metric: array('d') for metric in self.metrics}
+
+    def add(self, samples: Iterable[Tuple[int, Dict[str, float | None]]]) -> List[Tuple[float, str, int]]:
+        """
+        Учёт пачки замеров.
+
+        :return: Перцентили закрытых корзин: (значение, метрика, начало корзины)
+        """
+        closed: List[Tuple[float, str, int]] = []
+        for ts_ms, values in samples:
+            bucket = bucket_start(ts_ms, self.resolution_ms)
+            if self.bucket is None or bucket > self.bucket:
+                closed.extend(self.close())
+                self.bucket = bucket
+            elif bucket < self.bucket:
+                continue
+
+            for metric in self.metrics:
+                value = values.get(metric)
+                if value is not None:
+                    self._values[metric].append(float(value))
+        return closed
+
+    def close(self) -> List[Tuple[float, str, int]]:
+        """Закрытие текущей корзины с вычислением перцентилей"""
+        if self.bucket is None:
+            return []
+
+        closed = []
+        for metric, values in self._values.items():
+            value = percentile(values)
+            if value is not None:
+                closed.append((value, metric, self.bucket))
+            del values[:]
+        self.bucket = None
+        return closed
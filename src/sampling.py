@@ -0,0 +1,174 @@
+import sys
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.logger_config import get_logger
+
+
+# Поведение при пропущенных сроках тиков:
+# 'skip' - пропустить просроченные тики и продолжить по исходной сетке,
+# 'catch_up' - выполнить пропущенные тики подряд без ожидания
+SCHEDULE_POLICIES = ('skip', 'catch_up')
+
+NS_IN_SEC = 1_000_000_000
+NS_IN_MS = 1_000_000
+
+
+@dataclass(frozen=True)
+class Tick:
+    """Сведения о выполненном тике планировщика"""
+    index: int
+    scheduled_ns: int
+    actual_ns: int
+    timestamp_ms: int
+
+    @property
+    def lateness_ms(self) -> float:
+        """Опоздание фактического запуска относительно срока, мс"""
+        return (self.actual_ns - self.scheduled_ns) / NS_IN_MS
+
+
+class SamplingThread:
+    """
+    Фоновый поток, периодически вызывающий функцию сбора метрик.
+
+    Сроки тиков вычисляются от момента запуска как start + n * interval по
+    часам time.monotonic_ns, поэтому длительность сбора и неточность
+    пробуждения не накапливаются в дрейф. Поддерживаются дробные интервалы.
+    """
+
+    def __init__(
+            self,
+            callback: Callable[[Tick], None],
+            interval: float = 1.0,
+            name: str = 'SamplingThread',
+            policy: str = 'skip'
+    ):
+        """
+        :param callback: Функция, вызываемая на каждом тике с описанием тика
+        :param interval: Интервал между тиками в секундах
+        :param name: Имя потока
+        :param policy: Поведение при пропущенных сроках, см. SCHEDULE_POLICIES
+        """
+        if policy not in SCHEDULE_POLICIES:
+            raise ValueError(f"Неизвестная политика планирования: {policy}")
+
+        self.logger = get_logger(self.__class__.__name__)
+        self.callback = callback
+        self.interval = interval
+        self.name = name
+        self.policy = policy
+
+        self.last_tick: Tick | None = None
+        self.skipped_ticks = 0
+        self.max_lateness_ms = 0.0
+
+        self._interval_ns = self._to_ns(interval)
+        self._condition = threading.Condition()
+        self._running = False
+        self._rebase = False
+        self._thread: threading.Thread | None = None
+
+    @staticmethod
+    def _to_ns(interval: float) -> int:
+        if interval <= 0:
+            raise ValueError(f"Интервал должен быть положительным: {interval}")
+        return int(round(interval * NS_IN_SEC))
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def set_interval(self, interval: float) -> None:
+        """Изменение интервала; новая сетка сроков отсчитывается от текущего момента"""
+        interval_ns = self._to_ns(interval)
+        with self._condition:
+            self.interval = interval
+            self._interval_ns = interval_ns
+            self._rebase = True
+            self._condition.notify_all()
+
+    def start(self) -> None:
+        """Запуск потока сбора"""
+        if self._thread is not None and self._thread.is_alive():
+            if not self._running:
+                self.logger.warning("Предыдущий поток сбора ещё не завершился: повторный запуск отклонён")
+            return
+
+        with self._condition:
+            if self._running:
+                return
+
+            self._running = True
+            self.skipped_ticks = 0
+            self.max_lateness_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """
+        Остановка потока сбора.
+
+        :param timeout: Максимальное время ожидания завершения текущего тика
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        thread = self._thread
+        if thread is None:
+            return
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+            if thread.is_alive():
+                self.logger.warning("Поток сбора не завершился за отведённое время")
+        # Ссылка на незавершившийся поток сохраняется: start не запустит второй поток
+        if not thread.is_alive():
+            self._thread = None
+
+    def _next_deadline(self, deadline: int, now: int) -> int:
+        """Следующий срок после выполненного тика с учётом политики пропусков"""
+        deadline += self._interval_ns
+        if self.policy == 'skip' and deadline <= now:
+            missed = (now - deadline) // self._interval_ns + 1
+            self.skipped_ticks += missed
+            deadline += missed * self._interval_ns
+        return deadline
+
+    def _run(self) -> None:
+        """Цикл потока сбора"""
+        index = 0
+        deadline = time.monotonic_ns() + self._interval_ns
+        while True:
+            with self._condition:
+                while self._running:
+                    if self._rebase:
+                        deadline = time.monotonic_ns() + self._interval_ns
+                        self._rebase = False
+
+                    remaining = deadline - time.monotonic_ns()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining / NS_IN_SEC)
+
+                if not self._running:
+                    return
+
+            tick = Tick(index, deadline, time.monotonic_ns(), time.time_ns() // NS_IN_MS)
+            self.last_tick = tick
+            self.max_lateness_ms = max(self.max_lateness_ms, tick.lateness_ms)
+            try:
+                self.callback(tick)
+            except Exception as e:
+                self.logger.error(f"Ошибка в потоке сбора: {e}")
+
+            index += 1
+            with self._condition:
+                deadline = self._next_deadline(deadline, time.monotonic_ns())
@@ -0,0 +1,438 @@
+import sys
+import os
+import mmap
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.database import QUERY_COLUMNS, REQUIRED_KEYS
+from src.logger_config import get_logger, LogSampler
+
+try:
+    import numpy as np
+except ImportError:  # NumPy не входит в зависимости проекта: чтение через struct
+    np = None
+
+
+# Поля записи: числовые столбцы INSERT_INTO фиксированной ширины
+RECORD_FIELDS = (
+    'ts_ms', 'session_id', 'time_lapse', 'cpu_percent', 'gpu_load',
+    'ram_free_mb', 'ram_total_mb', 'disk_free_gb', 'disk_total_gb'
+)
+
+# int64 метка времени, int32 сессия (NO_SESSION - без сессии), 7 x float64; без выравнивания
+RECORD_STRUCT = struct.Struct('<qi7d')
+RECORD_SIZE = RECORD_STRUCT.size
+NO_SESSION = -1
+
+# Заголовок сегмента: сигнатура, версия схемы, размер записи, число полей, резерв
+HEADER_STRUCT = struct.Struct('<8sHHI16x')
+HEADER_SIZE = HEADER_STRUCT.size
+MAGIC = b'SPULSSEG'
+SEGMENT_SCHEMA_VERSION = 1
+
+SEGMENT_SUFFIX = '.seg'
+SESSIONS_FILE = 'sessions.log'
+
+# Записей в сегменте по умолчанию: ~68 МБ
+SEGMENT_RECORDS = 1_000_000
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([
+        ('ts_ms', '<i8'), ('session_id', '<i4'),
+        *((name, '<f8') for name in RECORD_FIELDS[2:])
+    ])
+else:
+    RECORD_DTYPE = None
+
+LOG_SAMPLE_EVERY = 100
+
+
+class SegmentReader:
+    """
+    Чтение одного сегмента через mmap без копирования.
+
+    Записи внутри сегмента упорядочены по ts_ms (см. SegmentLogHandler),
+    поэтому границы диапазона находятся двоичным поиском. Незавершённая
+    запись в конце файла (обрыв при записи) игнорируется.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            check_header(header, path)
+            self.size = os.fstat(f.fileno()).st_size
+            self.count = (self.size - HEADER_SIZE) // RECORD_SIZE
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+    def ts_at(self, index: int) -> int:
+        return struct.unpack_from('<q', self._mmap, HEADER_SIZE + index * RECORD_SIZE)[0]
+
+    def bounds(self, start_ms: int, end_ms: int) -> Tuple[int, int]:
+        """Индексы [lo, hi) записей с ts_ms в [start_ms, end_ms]"""
+        return self._search(start_ms, left=True), self._search(end_ms, left=False)
+
+    def _search(self, ts_ms: int, left: bool) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            middle = (lo + hi) // 2
+            value = self.ts_at(middle)
+            if value < ts_ms or (not left and value == ts_ms):
+                lo = middle + 1
+            else:
+                hi = middle
+        return lo
+
+    def records(self, lo: int, hi: int) -> Iterator[tuple]:
+        """Распаковка записей [lo, hi) из отображения без промежуточной копии"""
+        return RECORD_STRUCT.iter_unpack(self._view[HEADER_SIZE + lo * RECORD_SIZE:HEADER_SIZE + hi * RECORD_SIZE])
+
+    def array(self, lo: int, hi: int):
+        """Записи [lo, hi) как структурированный массив NumPy поверх mmap (без копирования)"""
+        if np is None:
+            raise RuntimeError("Для чтения в массив требуется NumPy")
+        return np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=hi - lo, offset=HEADER_SIZE + lo * RECORD_SIZE)
+
+    def close(self) -> None:
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # На отображение ссылаются выданные массивы; оно закроется вместе с ними
+            pass
+
+
+def check_header(header: bytes, path: str) -> None:
+    """Проверка заголовка сегмента; ValueError при несовместимом формате"""
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"Повреждён заголовок сегмента: {path}")
+
+    magic, version, record_size, field_count = HEADER_STRUCT.unpack(header[:HEADER_SIZE])
+    if magic != MAGIC:
+        raise ValueError(f"Файл не является сегментом журнала метрик: {path}")
+    if version != SEGMENT_SCHEMA_VERSION or record_size != RECORD_SIZE or field_count != len(RECORD_FIELDS):
+        raise ValueError(
+            f"Неподдерживаемый формат сегмента {path}: версия {version}, размер записи {record_size}"
+        )
+
+
+class SegmentLogHandler:
+    """
+    Хранилище метрик в виде журнала сегментов с записями фиксированной ширины.
+
+    Альтернатива DatabaseHandler для длительного частого сбора: вставка -
+    дозапись упакованных struct записей (RECORD_STRUCT, 68 байт) в конец
+    текущего сегмента без накладных расходов SQLite на строку и коммит.
+    Каждый сегмент начинается с заголовка с версией схемы и содержит не
+    больше segment_records записей, упорядоченных по времени: запись с
+    меткой раньше предыдущей начинает новый сегмент. Чтение выполняется
+    через mmap (SegmentReader): кортежами или, при наличии NumPy,
+    структурированными массивами без копирования (scan_arrays).
+
+    Поддерживает часть интерфейса DatabaseHandler, нужную для записи
+    (adding_data, adding_data_batch, сессии) и выборок по времени; хранятся
+    только поля RECORD_FIELDS, агрегаты не ведутся.
+    """
+
+    def __init__(self, db_name: str = 'system_monitoring.seg', segment_records: int = SEGMENT_RECORDS, fsync: bool = False):
+        """
+        :param db_name: Каталог сегментов
+        :param segment_records: Максимальное количество записей в сегменте
+        :param fsync: Вызывать fsync после каждой записи (надёжнее, но медленнее)
+        """
+        if segment_records < 1:
+            raise ValueError("Размер сегмента должен быть положительным")
+
+        self.logger = get_logger(self.__class__.__name__)
+        self.logger.info(f"Инициализация журнала сегментов: {db_name}")
+        self.db_name = db_name
+        self.segment_records = segment_records
+        self.fsync = fsync
+
+        self._lock = threading.RLock()
+        self._batch_log_sampler = LogSampler(LOG_SAMPLE_EVERY)
+        self._readers: Dict[str, SegmentReader] = {}
+        self._file = None
+        self._active_count = 0
+        self._last_ts: int | None = None
+
+        os.makedirs(db_name, exist_ok=True)
+        self._open_last_segment()
+
+    def segment_paths(self) -> List[str]:
+        """Пути сегментов в порядке создания"""
+        names = sorted(name for name in os.listdir(self.db_name) if name.endswith(SEGMENT_SUFFIX))
+        return [os.path.join(self.db_name, name) for name in names]
+
+    @property
+    def nbytes(self) -> int:
+        """Суммарный размер файлов сегментов"""
+        return sum(os.path.getsize(path) for path in self.segment_paths())
+
+    def _open_last_segment(self) -> None:
+        """Продолжение записи в последний сегмент с отбрасыванием незавершённой записи"""
+        paths = self.segment_paths()
+        if not paths:
+            return
+
+        path = paths[-1]
+        with open(path, 'rb') as f:
+            check_header(f.read(HEADER_SIZE), path)
+        size = os.path.getsize(path)
+        count = (size - HEADER_SIZE) // RECORD_SIZE
+        if HEADER_SIZE + count * RECORD_SIZE != size:
+            self.logger.warning(f"Отброшена незавершённая запись в конце сегмента {path}")
+            os.truncate(path, HEADER_SIZE + count * RECORD_SIZE)
+
+        self._file = open(path, 'ab')
+        self._active_count = count
+        if count:
+            with open(path, 'rb') as f:
+                f.seek(HEADER_SIZE + (count - 1) * RECORD_SIZE)
+                self._last_ts = RECORD_STRUCT.unpack(f.read(RECORD_SIZE))[0]
+
+    def _new_segment(self) -> None:
+        """Закрытие текущего сегмента и создание следующего"""
+        if self._file is not None:
+            self._file.close()
+
+        paths = self.segment_paths()
+        index = int(os.path.basename(paths[-1])[:-len(SEGMENT_SUFFIX)]) + 1 if paths else 1
+        self._file = open(os.path.join(self.db_name, f"{index:08d}{SEGMENT_SUFFIX}"), 'ab')
+        self._file.write(HEADER_STRUCT.pack(MAGIC, SEGMENT_SCHEMA_VERSION, RECORD_SIZE, len(RECORD_FIELDS)))
+        self._active_count = 0
+        self._last_ts = None
+
+    @staticmethod
+    def _validate_metrics(metrics: Dict[str, Any]) -> bool:
+        if not all(key in metrics for key in REQUIRED_KEYS):
+            return False
+        try:
+            for key in REQUIRED_KEYS:
+                if key != 'monitoring_time':
+                    float(metrics[key])
+        except (ValueError, TypeError):
+            return False
+        return True
+
+    @staticmethod
+    def _metrics_to_record(metrics: Dict[str, Any]) -> tuple:
+        session_id = metrics.get('session_id')
+        return (
+            int(metrics.get('timestamp_ms') or time.time() * 1000),
+            NO_SESSION if session_id is None else int(session_id),
+            *(float(metrics[name]) for name in RECORD_FIELDS[2:])
+        )
+
+    def adding_data(self, metrics: Dict[str, Any]) -> bool:
+        """Добавление метрик в журнал"""
+        return self.adding_data_batch([metrics]) == 1
+
+    def adding_data_batch(self, metrics_batch: List[Dict[str, Any]]) -> int:
+        """
+        Дозапись пачки метрик.
+
+        :return: Количество добавленных записей
+        """
+        records = [self._metrics_to_record(metrics) for metrics in metrics_batch if self._validate_metrics(metrics)]
+        if not records:
+            return 0
+
+        try:
+            with self._lock:
+                chunk: List[bytes] = []
+                for record in records:
+                    ts_ms = record[0]
+                    if self._file is None or self._active_count >= self.segment_records or (
+                            self._last_ts is not None and ts_ms < self._last_ts):
+                        self._write(chunk)
+                        chunk = []
+                        self._new_segment()
+                    chunk.append(RECORD_STRUCT.pack(*record))
+                    self._active_count += 1
+                    self._last_ts = ts_ms
+                self._write(chunk)
+
+            if self._batch_log_sampler():
+                self.logger.debug(f"Добавлено {len(records)} записей метрик")
+            return len(records)
+
+        except OSError as e:
+            self.logger.error(f"Ошибка записи в журнал сегментов: {e}")
+            return 0
+
+    def _write(self, chunk: List[bytes]) -> None:
+        if not chunk:
+            return
+        self._file.write(b''.join(chunk))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _reader(self, path: str) -> SegmentReader:
+        """Отображение сегмента; растущий сегмент отображается заново при изменении размера"""
+        reader = self._readers.get(path)
+        if reader is not None and reader.size == os.path.getsize(path):
+            return reader
+
+        if reader is not None:
+            reader.close()
+        reader = self._readers[path] = SegmentReader(path)
+        return reader
+
+    def _ranges(self, start_ms: int, end_ms: int) -> Iterator[Tuple[SegmentReader, int, int, int]]:
+        """Сегменты с записями из [start_ms, end_ms]: (читатель, lo, hi, номер первой записи сегмента)"""
+        with self._lock:
+            base = 0
+            for path in self.segment_paths():
+                reader = self._reader(path)
+                if reader.count and reader.ts_at(0) <= end_ms and reader.ts_at(reader.count - 1) >= start_ms:
+                    lo, hi = reader.bounds(start_ms, end_ms)
+                    if lo < hi:
+                        yield reader, lo, hi, base
+                base += reader.count
+
+    def iter_records(self, start_ms: int, end_ms: int, session_id: int | None = None) -> Iterator[tuple]:
+        """Записи (поля RECORD_FIELDS) за интервал [start_ms, end_ms] в порядке сегментов"""
+        for reader, lo, hi, _ in list(self._ranges(start_ms, end_ms)):
+            for record in reader.records(lo, hi):
+                if session_id is None or record[1] == session_id:
+                    yield record
+
+    def scan_arrays(self, start_ms: int, end_ms: int) -> list:
+        """
+        Записи за интервал [start_ms, end_ms] как структурированные массивы NumPy
+        (RECORD_DTYPE) поверх mmap, по одному на сегмент, без копирования данных.
+        """
+        return [reader.array(lo, hi) for reader, lo, hi, _ in self._ranges(start_ms, end_ms)]
+
+    def get_metrics_range(
+            self,
+            start_ms: int,
+            end_ms: int,
+            session_id: int | None = None,
+            limit: int | None = None
+    ) -> List[tuple]:
+        """
+        Получение метрик за интервал времени [start_ms, end_ms].
+
+        :return: Строки со столбцами QUERY_COLUMNS, как у DatabaseHandler; id -
+            порядковый номер записи в журнале, не хранящиеся столбцы равны None
+        """
+        rows = []
+        for reader, lo, hi, base in list(self._ranges(start_ms, end_ms)):
+            for index, record in enumerate(reader.records(lo, hi), start=base + lo + 1):
+                if session_id is not None and record[1] != session_id:
+                    continue
+                rows.append(self._record_to_row(index, record))
+                if limit is not None and len(rows) >= limit:
+                    return rows
+        return rows
+
+    @staticmethod
+    def _record_to_row(index: int, record: tuple) -> tuple:
+        values = dict(zip(RECORD_FIELDS, record))
+        if values['session_id'] == NO_SESSION:
+            values['session_id'] = None
+        values.update(
+            id=index,
+            timestamp=datetime.fromtimestamp(values['ts_ms'] / 1000).strftime('%Y-%m-%d'),
+            interval_ms=values['time_lapse'] * 1000
+        )
+        return tuple(values.get(column) for column in QUERY_COLUMNS)
+
+    def get_series(self, columns: Sequence[str], start_ms: int, end_ms: int) -> List[tuple]:
+        """
+        Временные ряды выбранных полей за интервал [start_ms, end_ms].
+
+        :param columns: Поля из RECORD_FIELDS
+        :return: Строки (ts_ms, *columns)
+        """
+        if not columns or not set(columns) <= set(RECORD_FIELDS):
+            raise ValueError(f"Недопустимый набор столбцов: {columns}")
+
+        indexes = [RECORD_FIELDS.index(column) for column in columns]
+        return [(record[0], *(record[i] for i in indexes)) for record in self.iter_records(start_ms, end_ms)]
+
+    def _append_session_event(self, event: str, session_id: int) -> None:
+        with open(os.path.join(self.db_name, SESSIONS_FILE), 'a', encoding='utf-8') as f:
+            f.write(f"{event} {session_id} {int(time.time() * 1000)}\n")
+
+    def start_session(self) -> int | None:
+        """
+        Регистрация новой сессии записи.
+
+        :return: Идентификатор сессии или None при ошибке
+        """
+        try:
+            with self._lock:
+                sessions = self.get_sessions()
+                session_id = sessions[-1][0] + 1 if sessions else 1
+                self._append_session_event('start', session_id)
+            self.logger.info(f"Начата сессия записи {session_id}")
+            return session_id
+        except OSError as e:
+            self.logger.error(f"Ошибка при создании сессии записи: {e}")
+            return None
+
+    def end_session(self, session_id: int | None) -> None:
+        """Отметка времени завершения сессии записи"""
+        if session_id is None:
+            return
+
+        try:
+            with self._lock:
+                self._append_session_event('end', session_id)
+        except OSError as e:
+            self.logger.error(f"Ошибка при завершении сессии записи: {e}")
+
+    def get_sessions(self) -> List[tuple]:
+        """Получение списка сессий записи (id, started_ms, ended_ms)"""
+        path = os.path.join(self.db_name, SESSIONS_FILE)
+        if not os.path.exists(path):
+            return []
+
+        sessions: Dict[int, list] = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                event, session_id, ts_ms = line.split()
+                if event == 'start':
+                    sessions[int(session_id)] = [int(session_id), int(ts_ms), None]
+                elif int(session_id) in sessions:
+                    sessions[int(session_id)][2] = int(ts_ms)
+        return [tuple(session) for session in sorted(sessions.values())]
+
+    def _close_files(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+
+    def clear_all_metric(self) -> bool:
+        """Удаление всех сегментов"""
+        try:
+            with self._lock:
+                self._close_files()
+                for path in self.segment_paths():
+                    os.remove(path)
+                self._active_count = 0
+                self._last_ts = None
+            self.logger.info("Все метрики удалены")
+            return True
+        except OSError as e:
+            self.logger.error(f"Ошибка при очистке метрик: {e}")
+            return False
+
+    def close(self) -> None:
+        """Закрытие текущего сегмента и отображений"""
+        with self._lock:
+            self._close_files()
@@ -0,0 +1,19 @@
+import pytest
+
+from src import logger_config
+from src.collector_registry import GPUCollector
+
+
+@pytest.fixture(autouse=True)
+def gpu_cache_path(tmp_path, monkeypatch):
+    """Кэш обнаруженных GPU во временном каталоге теста вместо ~/.cache"""
+    path = str(tmp_path / "gpu_devices.json")
+    monkeypatch.setattr(GPUCollector, 'cache_path', path)
+    return path
+
+
+@pytest.fixture(autouse=True, scope='session')
+def flush_logging():
+    """Запись оставшихся сообщений журнала, пока перехваченный pytest stdout ещё открыт"""
+    yield
+    logger_config.shutdown_logging()
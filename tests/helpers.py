@@ -0,0 +1,22 @@
+def make_metrics(ts_ms: int | None = None, session_id: int | None = None, cpu_percent: float = 50.0, **fields) -> dict:
+    """
+    Словарь метрик с обязательными полями для записи в базу.
+
+    :param ts_ms: Метка времени, мс; None - момент записи
+    :param fields: Дополнительные или переопределяемые поля
+    """
+    metrics = {
+        'session_id': session_id,
+        'time_lapse': 1,
+        'monitoring_time': '00:01',
+        'cpu_percent': cpu_percent,
+        'gpu_load': 0.0,
+        'ram_free_mb': 1024.0,
+        'ram_total_mb': 8192.0,
+        'disk_free_gb': 100.5,
+        'disk_total_gb': 500.0
+    }
+    if ts_ms is not None:
+        metrics['timestamp_ms'] = ts_ms
+    metrics.update(fields)
+    return metrics
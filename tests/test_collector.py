@@ -0,0 +1,236 @@
+import pytest
+import subprocess
+import sys
+import time
+from unittest.mock import patch, MagicMock
+
+from src.collector import MetricsCollector, main, parse_args, retention_policy_from_args
+from src.database import DatabaseHandler
+from src.retention import DAY_MS, RetentionPolicy
+from src.segment_log import SegmentLogHandler
+from src.sampling import SamplingThread, Tick
+from src.proc_reader import ProcReader
+from tests.helpers import make_metrics
+
+
+CPU_SAMPLE = {
+    'cpu_percent': 50.0, 'cpu_per_core': [90.0, 10.0],
+    'cpu_user': 40.0, 'cpu_system': 5.0, 'cpu_iowait': 5.0, 'cpu_steal': 0.0
+}
+
+
+class TestMetricsCollector:
+    @pytest.fixture
+    def mock_database_handler(self):
+        return MagicMock(spec=DatabaseHandler)
+
+    @pytest.fixture
+    def collector(self, mock_database_handler):
+        collector = MetricsCollector(database_handler=mock_database_handler)
+        yield collector
+        collector.close()
+
+    def test_init(self, collector, mock_database_handler):
+        assert collector.database_handler == mock_database_handler
+        assert collector.monitoring is False
+        assert collector.start_time is None
+        assert collector.time_lapse == 1
+        assert isinstance(collector.sampler, SamplingThread)
+
+    def test_set_interval(self, collector):
+        with patch.object(collector.sampler, 'set_interval') as mock_set_interval:
+            collector.set_interval(0.5)
+
+            assert collector.time_lapse == 0.5
+            mock_set_interval.assert_called_once_with(0.5)
+
+    def test_start_and_stop(self, collector, mock_database_handler):
+        mock_database_handler.start_session.return_value = 7
+        with patch.object(collector.sampler, 'start'), patch.object(collector.sampler, 'stop'):
+            assert collector.start() is True
+            assert collector.monitoring is True
+            assert collector.start_time is not None
+            assert collector.session_id == 7
+
+            collector.stop()
+            assert collector.monitoring is False
+            assert collector.start_time is None
+            mock_database_handler.end_session.assert_called_once_with(7)
+
+    def test_start_exception(self, collector):
+        with patch.object(collector.sampler, 'start', side_effect=Exception("Test error")):
+            assert collector.start() is False
+            assert collector.monitoring is False
+
+    def test_get_monitoring_time(self, collector):
+        collector.start_time = time.monotonic() - 125
+        assert collector.get_monitoring_time() == "02:05"
+        collector.start_time = None
+        assert collector.get_monitoring_time() == ""
+
+    def test_gather_metrics(self, collector):
+        with patch.object(collector.pool.get('memory'), 'collect',
+                          return_value={'ram_free_mb': 4000.0, 'ram_total_mb': 8000.0}), \
+                patch.object(collector.pool.get('disk'), 'collect',
+                             return_value={'disk_free_gb': 50.0, 'disk_total_gb': 100.0}), \
+                patch.object(collector.pool.get('cpu'), 'collect', return_value=CPU_SAMPLE):
+            collector.start_time = time.monotonic() - 125
+            metrics = collector.gather_metrics()
+            assert metrics['cpu_percent'] == 50.0
+            assert metrics['ram_free_mb'] == 4000.0
+            assert metrics['ram_total_mb'] == 8000.0
+            assert metrics['disk_free_gb'] == 50.0
+            assert metrics['disk_total_gb'] == 100.0
+            assert metrics['monitoring_time'] == "02:05"
+            assert metrics['cpu_per_core'] == [90.0, 10.0]
+            assert metrics['cpu_iowait'] == 5.0
+            assert metrics['stale_collectors'] == []
+            assert set(metrics['collector_latency_ms']) == {'cpu', 'memory', 'disk', 'gpu', 'io'}
+
+    def test_gather_metrics_uses_tick_timing(self, collector):
+        collector.set_interval(0.25)
+        tick = Tick(index=3, scheduled_ns=1_000_000_000, actual_ns=1_004_500_000, timestamp_ms=1_700_000_000_123)
+        metrics = collector.gather_metrics(tick)
+
+        assert metrics['timestamp_ms'] == 1_700_000_000_123
+        assert metrics['interval_ms'] == 250.0
+        assert metrics['lateness_ms'] == 4.5
+
+    def test_gather_metrics_marks_failed_collector_stale(self, collector):
+        with patch.object(collector.pool.get('memory'), 'collect', side_effect=OSError("Test RAM error")):
+            metrics = collector.gather_metrics()
+
+        assert metrics['stale_collectors'] == ['memory']
+        assert metrics['ram_free_mb'] == 0.0
+        assert collector.pool.stats['memory'].errors == 1
+
+    def test_gather_metrics_exception_handling(self, collector):
+        with patch.object(collector.pool, 'run', side_effect=RuntimeError("Test error")), \
+                patch.object(collector.logger, 'error') as mock_logger:
+            assert collector.gather_metrics() == {}
+            assert "Ошибка получения системных метрик" in mock_logger.call_args[0][0]
+
+    def test_unknown_collector_name(self, mock_database_handler):
+        with pytest.raises(ValueError):
+            MetricsCollector(database_handler=mock_database_handler, collectors=['cpu', 'missing'])
+
+    @pytest.mark.skipif(not ProcReader.is_supported(), reason="/proc недоступен")
+    def test_proc_reader_path(self, mock_database_handler):
+        collector = MetricsCollector(database_handler=mock_database_handler, use_proc_reader=True)
+        try:
+            with patch('psutil.cpu_percent') as mock_cpu_percent, \
+                    patch('psutil.virtual_memory') as mock_virtual_memory:
+                metrics = collector.gather_metrics()
+
+            mock_cpu_percent.assert_not_called()
+            mock_virtual_memory.assert_not_called()
+            assert 0 < metrics['ram_free_mb'] <= metrics['ram_total_mb']
+        finally:
+            collector.close()
+
+    def test_collect_metrics_writes_and_notifies(self, collector, mock_database_handler):
+        received = []
+        collector.add_listener(received.append)
+        with patch.object(collector, 'gather_metrics', return_value={'cpu': 50}):
+            collector.collect_metrics()
+
+        mock_database_handler.adding_data.assert_called_once_with({'cpu': 50})
+        assert received == [{'cpu': 50}]
+
+    def test_remove_listener(self, collector):
+        received = []
+        collector.add_listener(received.append)
+        collector.remove_listener(received.append)
+        with patch.object(collector, 'gather_metrics', return_value={'cpu': 50}):
+            collector.collect_metrics()
+        assert received == []
+
+    def test_collect_metrics_with_writer(self, mock_database_handler):
+        mock_writer = MagicMock()
+        collector = MetricsCollector(database_handler=mock_database_handler, metrics_writer=mock_writer)
+        with patch.object(collector, 'gather_metrics', return_value={'cpu': 50}):
+            collector.collect_metrics()
+        collector.close()
+
+        mock_writer.submit.assert_called_once_with({'cpu': 50})
+        mock_database_handler.adding_data.assert_not_called()
+
+    def test_collect_metrics_exception_handling(self, collector):
+        with patch.object(collector, 'gather_metrics', side_effect=Exception("Test collect error")), \
+                patch.object(collector.logger, 'error') as mock_logger:
+            collector.collect_metrics()
+            mock_logger.assert_called_once_with("Ошибка сбора системных метрик: Test collect error")
+
+    def test_stop_flushes_writer(self, mock_database_handler):
+        mock_writer = MagicMock()
+        collector = MetricsCollector(database_handler=mock_database_handler, metrics_writer=mock_writer)
+        collector.start()
+        collector.close()
+        mock_writer.flush.assert_called_once()
+
+
+class TestCollectorCli:
+    def test_parse_args(self):
+        args = parse_args(['--interval', '0.5', '--db', 'metrics.db'])
+        assert args.interval == 0.5
+        assert args.db == 'metrics.db'
+        assert args.duration is None
+        assert args.mount_points is None
+        assert parse_args(['--mount', '/', '--mount', '/home']).mount_points == ['/', '/home']
+
+    def test_retention_policy_from_args(self):
+        policy = retention_policy_from_args(parse_args(['--keep-raw-days', '3', '--keep-1h-days', '0']))
+        assert policy.raw_days == 3
+        assert policy.compress_after_days == 1
+        assert policy.rollup_days == {'1m': 90, '1h': None}
+
+    def test_retention_disabled_without_flags(self):
+        assert retention_policy_from_args(parse_args([])) is None
+
+        saved = RetentionPolicy(raw_days=30)
+        assert retention_policy_from_args(parse_args([]), saved) is saved
+        assert retention_policy_from_args(parse_args(['--compress-after-days', '0']), saved) == \
+            RetentionPolicy(raw_days=30, compress_after_days=None)
+
+    def test_main_keeps_old_data_without_retention(self, tmp_path):
+        db_path = str(tmp_path / 'metrics.db')
+        old_ms = int(time.time() * 1000) - 30 * DAY_MS
+        database_handler = DatabaseHandler(db_path)
+        assert database_handler.adding_data_batch([make_metrics(old_ms + index * 1000) for index in range(10)]) == 10
+        database_handler.close()
+
+        with patch('src.collector.RetentionWorker') as mock_worker:
+            assert main(['--interval', '0.05', '--duration', '0.1', '--db', db_path]) == 0
+        mock_worker.assert_not_called()
+
+        database_handler = DatabaseHandler(db_path)
+        assert len(database_handler.get_metrics_range(0, old_ms + DAY_MS)) == 10
+        database_handler.close()
+
+    def test_parse_args_rejects_non_positive_interval(self):
+        with pytest.raises(SystemExit):
+            parse_args(['--interval', '0'])
+
+    def test_main_collects_into_database(self, tmp_path):
+        db_path = str(tmp_path / 'metrics.db')
+        with patch('psutil.cpu_percent', return_value=10.0):
+            assert main(['--interval', '0.02', '--duration', '0.3', '--db', db_path]) == 0
+
+        database_handler = DatabaseHandler(db_path)
+        rows = database_handler.get_metrics_range(0, 2 ** 62)
+        assert len(rows) > 0
+        assert all(row[12] == 20.0 and row[13] >= 0 for row in rows)
+        assert len(database_handler.get_sessions()) == 1
+
+    def test_main_collects_into_segment_log(self, tmp_path):
+        log_path = str(tmp_path / 'metrics.seg')
+        assert main(['--interval', '0.02', '--duration', '0.3', '--db', log_path, '--storage', 'segments']) == 0
+
+        handler = SegmentLogHandler(log_path)
+        assert len(handler.get_metrics_range(0, 2 ** 62)) > 0
+        assert len(handler.get_sessions()) == 1
+        handler.close()
+
+    def test_module_does_not_import_qt(self):
+        code = "import sys, src.collector; sys.exit('PySide6' in sys.modules)"
+        assert subprocess.run([sys.executable, '-c', code]).returncode == 0
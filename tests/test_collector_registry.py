@@ -0,0 +1,139 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.collector_registry import (
+    COLLECTOR_REGISTRY, Collector, CollectorPool, MemoryCollector, create_collectors, register_collector
+)
+
+
+class FakeCollector(Collector):
+    name = 'fake'
+    timeout = 0.5
+    default = {'value': 0}
+
+    def __init__(self, name='fake', delay=0.0, values=None, timeout=None):
+        super().__init__(timeout=timeout)
+        self.name = name
+        self.delay = delay
+        self.values = values or [{'value': 1}]
+        self.calls = 0
+        self.closed = False
+
+    def collect(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        value = self.values[min(self.calls, len(self.values)) - 1]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def close(self):
+        self.closed = True
+
+
+class TestRegistry:
+    def test_builtin_collectors_registered(self):
+        assert list(COLLECTOR_REGISTRY)[:5] == ['cpu', 'memory', 'disk', 'gpu', 'io']
+
+    def test_register_requires_unique_name(self):
+        class Unnamed(Collector):
+            pass
+
+        class Duplicate(Collector):
+            name = 'cpu'
+
+        with pytest.raises(ValueError):
+            register_collector(Unnamed)
+        with pytest.raises(ValueError):
+            register_collector(Duplicate)
+
+    def test_create_collectors(self):
+        collectors = create_collectors(['memory'])
+        assert [type(collector) for collector in collectors] == [MemoryCollector]
+        with pytest.raises(ValueError):
+            create_collectors(['missing'])
+
+    def test_disk_collector_mount_points(self):
+        collectors = create_collectors(['disk'], options={'disk': {'mount_points': ['/']}})
+        metrics = collectors[0].collect()
+        assert list(metrics['disk_mounts']) == ['/']
+        assert metrics['disk_mounts']['/'] == [metrics['disk_free_gb'], metrics['disk_total_gb']]
+        collectors[0].close()
+        with pytest.raises(ValueError):
+            create_collectors(['memory'], options={'missing': {}})
+
+    def test_memory_collector_psutil(self):
+        mock_memory = MagicMock(available=4 * 1024 * 1024, total=8 * 1024 * 1024)
+        with patch('psutil.virtual_memory', return_value=mock_memory):
+            assert MemoryCollector().collect() == {'ram_free_mb': 4.0, 'ram_total_mb': 8.0}
+
+
+class TestCollectorPool:
+    def test_collectors_run_concurrently(self):
+        collectors = [FakeCollector(f'slow{index}', delay=0.2, values=[{f'v{index}': index}]) for index in range(3)]
+        pool = CollectorPool(collectors)
+
+        started = time.monotonic()
+        metrics, stale = pool.run()
+        elapsed = time.monotonic() - started
+        pool.close()
+
+        assert metrics == {'v0': 0, 'v1': 1, 'v2': 2}
+        assert stale == []
+        assert elapsed < 0.5
+        assert all(pool.stats[collector.name].last_ms >= 200 for collector in collectors)
+
+    def test_late_collector_returns_last_good_value(self):
+        release = threading.Event()
+        slow = FakeCollector('slow', timeout=0.05, values=[{'value': 1}, {'value': 2}])
+        pool = CollectorPool([slow, FakeCollector('fast', values=[{'other': 5}])])
+
+        assert pool.run() == ({'value': 1, 'other': 5}, [])
+
+        slow.collect = lambda: release.wait() and {'value': 3}
+        metrics, stale = pool.run()
+        assert metrics == {'value': 1, 'other': 5}
+        assert stale == ['slow']
+        assert pool.stats['slow'].timeouts == 1
+
+        # Незавершённый сборщик не запускается повторно
+        pool.run()
+        assert pool.stats['slow'].timeouts == 2
+
+        release.set()
+        time.sleep(0.05)
+        assert pool.run() == ({'value': 3, 'other': 5}, [])
+        pool.close()
+
+    def test_default_used_before_first_success(self):
+        pool = CollectorPool([FakeCollector(values=[OSError("нет данных"), {'value': 7}])])
+
+        assert pool.run() == ({'value': 0}, ['fake'])
+        assert pool.stats['fake'].errors == 1
+        assert pool.run() == ({'value': 7}, [])
+        pool.close()
+
+    def test_deadline_limits_timeout(self):
+        pool = CollectorPool([FakeCollector(delay=0.3, timeout=1.0)])
+
+        started = time.monotonic()
+        _, stale = pool.run(deadline=0.05)
+        assert time.monotonic() - started < 0.25
+        assert stale == ['fake']
+        pool.close()
+
+    def test_close_closes_collectors(self):
+        collector = FakeCollector()
+        pool = CollectorPool([collector])
+        pool.close()
+        assert collector.closed is True
+
+    def test_get(self):
+        collector = FakeCollector()
+        pool = CollectorPool([collector])
+        assert pool.get('fake') is collector
+        with pytest.raises(KeyError):
+            pool.get('missing')
+        pool.close()
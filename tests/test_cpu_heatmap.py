@@ -0,0 +1,47 @@
+from unittest.mock import patch
+import pytest
+
+from src.UI.cpu_heatmap import CPUHeatmap
+
+
+class TestCPUHeatmap:
+    @pytest.fixture
+    def heatmap(self, qtbot):
+        heatmap = CPUHeatmap(columns=4)
+        qtbot.addWidget(heatmap)
+        heatmap.set_values([0.0] * 8)
+        return heatmap
+
+    def test_layout_by_columns(self, heatmap):
+        step = heatmap.cell_size + heatmap.spacing
+        assert heatmap.cell_rect(5).topLeft().x() == step
+        assert heatmap.cell_rect(5).topLeft().y() == step
+        assert heatmap.sizeHint().width() == 4 * step
+        assert heatmap.sizeHint().height() == 2 * step
+
+    def test_only_changed_cells_redrawn(self, heatmap):
+        with patch.object(heatmap, 'update') as mock_update:
+            heatmap.set_values([0.0, 1.0, 50.0, 0.0, 0.0, 0.0, 0.0, 100.0])
+
+        # Ядро 1 осталось в том же уровне (0-5%), перерисованы только ядра 2 и 7
+        assert [call.args[0] for call in mock_update.call_args_list] == [heatmap.cell_rect(2), heatmap.cell_rect(7)]
+        assert heatmap.values[1] == 1.0
+
+    def test_core_count_change_redraws_all(self, heatmap):
+        with patch.object(heatmap, 'update') as mock_update:
+            heatmap.set_values([10.0] * 16)
+
+        mock_update.assert_called_once_with()
+        assert len(heatmap.values) == 16
+
+    def test_level_colors(self):
+        assert CPUHeatmap.level(-1) == 0
+        assert CPUHeatmap.level(100) == 20
+        assert CPUHeatmap.level_color(0).hue() == 120
+        assert CPUHeatmap.level_color(20).hue() == 0
+
+    def test_paint(self, heatmap, qtbot):
+        heatmap.set_values([25.0] * 8)
+        heatmap.show()
+        qtbot.waitExposed(heatmap)
+        heatmap.repaint()
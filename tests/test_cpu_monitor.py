@@ -0,0 +1,75 @@
+import os
+from collections import namedtuple
+from unittest.mock import patch
+import pytest
+
+from src.cpu_monitor import CPUMonitoring
+from src.proc_reader import ProcReader
+
+CPUTimes = namedtuple('CPUTimes', 'user nice system idle iowait irq softirq steal guest guest_nice')
+
+
+def write_stat(path, cores):
+    """cores - список кортежей (user, system, idle, iowait, steal) по ядрам"""
+    def line(name, user, system, idle, iowait, steal):
+        return f"{name} {user} 0 {system} {idle} {iowait} 0 0 {steal} 0 0\n"
+
+    total = [sum(values) for values in zip(*cores)]
+    content = line("cpu ", *total)
+    content += "".join(line(f"cpu{index}", *core) for index, core in enumerate(cores))
+    path.write_text(content + "intr 1 2 3\nctxt 100\n")
+
+
+@pytest.mark.skipif(not hasattr(os, 'preadv'), reason="os.preadv недоступен")
+class TestCPUMonitoringProc:
+    @pytest.fixture
+    def stat_path(self, tmp_path):
+        stat_path = tmp_path / "stat"
+        write_stat(stat_path, [(100, 100, 800, 0, 0), (100, 100, 800, 0, 0)])
+        (tmp_path / "meminfo").write_text("MemTotal: 1 kB\nMemAvailable: 1 kB\n")
+        return stat_path
+
+    @pytest.fixture
+    def cpu_monitoring(self, stat_path):
+        reader = ProcReader(str(stat_path), str(stat_path.parent / "meminfo"))
+        yield CPUMonitoring(reader)
+        reader.close()
+
+    def test_per_core_and_breakdown(self, cpu_monitoring, stat_path):
+        # Ядро 0 загружено полностью, ядро 1 простаивает
+        write_stat(stat_path, [(180, 120, 800, 0, 0), (100, 100, 880, 10, 10)])
+        metrics = cpu_monitoring.sample()
+
+        assert metrics['cpu_per_core'] == [100.0, 10.0]
+        assert metrics['cpu_percent'] == 55.0
+        assert metrics['cpu_user'] == 40.0
+        assert metrics['cpu_system'] == 10.0
+        assert metrics['cpu_iowait'] == 5.0
+        assert metrics['cpu_steal'] == 5.0
+
+    def test_core_count_change(self, cpu_monitoring, stat_path):
+        write_stat(stat_path, [(200, 100, 800, 0, 0), (200, 100, 800, 0, 0), (0, 0, 100, 0, 0)])
+        metrics = cpu_monitoring.sample()
+
+        assert metrics['cpu_per_core'] == [0.0, 0.0, 0.0]
+        assert metrics['cpu_percent'] == 66.7
+        assert metrics['cpu_user'] == 66.7
+
+    def test_no_progress(self, cpu_monitoring):
+        metrics = cpu_monitoring.sample()
+        assert metrics['cpu_percent'] == 0.0
+        assert metrics['cpu_user'] == 0.0
+
+
+class TestCPUMonitoringPsutil:
+    def test_psutil_fallback(self):
+        before = [CPUTimes(10, 0, 10, 80, 0, 0, 0, 0, 0, 0)]
+        after = [CPUTimes(20, 0, 20, 160, 0, 0, 0, 0, 0, 0)]
+        with patch('psutil.cpu_times', side_effect=lambda percpu=False: before if percpu else before[0]):
+            cpu_monitoring = CPUMonitoring()
+        with patch('psutil.cpu_times', side_effect=lambda percpu=False: after if percpu else after[0]):
+            metrics = cpu_monitoring.sample()
+
+        assert metrics['cpu_percent'] == 20.0
+        assert metrics['cpu_per_core'] == [20.0]
+        assert metrics['cpu_user'] == 10.0
@@ -1,8 +1,12 @@
+import json
 import pytest
 import sqlite3
 from unittest.mock import patch
 
-from src.database import DatabaseHandler
+from src.database import (
+    BLOCK_COLUMNS, BLOCK_TEXT_COLUMNS, INSERT_COLUMNS, QUERY_COLUMNS, DatabaseHandler, pack_per_core, unpack_per_core
+)
+from tests.helpers import make_metrics
 
 
 class TestDatabaseHandler:
@@ -36,6 +40,7 @@ class TestDatabaseHandler:
             'time_lapse': 1,
             'monitoring_time': '00:10:00',
             'cpu_percent': 50.5,
+            'gpu_load': 10.0,
             'ram_free_mb': 1024.0,
             'ram_total_mb': 8192.0,
             'disk_free_gb': 100.5,
@@ -78,6 +83,7 @@ class TestDatabaseHandler:
             'time_lapse': 1,
             'monitoring_time': '00:10:00',
             'cpu_percent': 50.5,
+            'gpu_load': 10.0,
             'ram_free_mb': 1024.0,
             'ram_total_mb': 8192.0,
             'disk_free_gb': 100.5,
@@ -96,6 +102,7 @@ class TestDatabaseHandler:
             'time_lapse': 1,
             'monitoring_time': '00:10:00',
             'cpu_percent': 50.5,
+            'gpu_load': 10.0,
             'ram_free_mb': 1024.0,
             'ram_total_mb': 8192.0,
             'disk_free_gb': 100.5,
@@ -111,6 +118,7 @@ class TestDatabaseHandler:
             'time_lapse': 1,
             'monitoring_time': '00:10:00',
             'cpu_percent': 50.5,
+            'gpu_load': 10.0,
             'ram_free_mb': 1024.0,
             'ram_total_mb': 8192.0,
             'disk_free_gb': 100.5,
@@ -130,6 +138,7 @@ class TestDatabaseHandler:
             'time_lapse': 1,
             'monitoring_time': '00:10:00',
             'cpu_percent': 50.5,
+            'gpu_load': 10.0,
             'ram_free_mb': 1024.0,
             'ram_total_mb': 8192.0,
             'disk_free_gb': 100.5,
@@ -170,3 +179,386 @@ class TestDatabaseHandler:
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='system_metrics'")
             table_exists = cursor.fetchone()
             assert table_exists is not None
+
+    def test_persistent_connection_reused(self, temp_db_path):
+        handler = DatabaseHandler(db_name=temp_db_path, persistent=True)
+        assert handler._get_connection() is handler._get_connection()
+        handler.close()
+        assert handler._connection is None
+
+    def test_persistent_connection_wal_mode(self, temp_db_path):
+        handler = DatabaseHandler(db_name=temp_db_path, persistent=True, synchronous='off', cache_size_kb=4096)
+        conn = handler._get_connection()
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 0
+        assert conn.execute('PRAGMA cache_size').fetchone()[0] == -4096
+        handler.close()
+
+    def test_persistent_adding_and_reading(self, temp_db_path):
+        handler = DatabaseHandler(db_name=temp_db_path, persistent=True)
+        metrics = {
+            'time_lapse': 1,
+            'monitoring_time': '00:10:00',
+            'cpu_percent': 50.5,
+            'gpu_load': 10.0,
+            'ram_free_mb': 1024.0,
+            'ram_total_mb': 8192.0,
+            'disk_free_gb': 100.5,
+            'disk_total_gb': 500.0
+        }
+        assert handler.adding_data(metrics) is True
+        assert len(handler.get_all_metric()) == 1
+        handler.close()
+        assert len(DatabaseHandler(db_name=temp_db_path).get_all_metric()) == 1
+
+    def test_invalid_synchronous_level(self, temp_db_path):
+        with pytest.raises(ValueError):
+            DatabaseHandler(db_name=temp_db_path, synchronous='SOMETIMES')
+
+    def test_adding_data_batch(self, database_handler):
+        metrics = {
+            'time_lapse': 1,
+            'monitoring_time': '00:10:00',
+            'cpu_percent': 50.5,
+            'gpu_load': 10.0,
+            'ram_free_mb': 1024.0,
+            'ram_total_mb': 8192.0,
+            'disk_free_gb': 100.5,
+            'disk_total_gb': 500.0
+        }
+        assert database_handler.adding_data_batch([metrics, {}, metrics]) == 2
+        assert len(database_handler.get_all_metric()) == 2
+
+    def test_adding_data_batch_database_error(self, database_handler):
+        metrics = {
+            'time_lapse': 1,
+            'monitoring_time': '00:10:00',
+            'cpu_percent': 50.5,
+            'gpu_load': 10.0,
+            'ram_free_mb': 1024.0,
+            'ram_total_mb': 8192.0,
+            'disk_free_gb': 100.5,
+            'disk_total_gb': 500.0
+        }
+        with patch.object(database_handler, '_get_connection', side_effect=sqlite3.Error):
+            assert database_handler.adding_data_batch([metrics]) == 0
+
+    def test_schema_indexes_and_version(self, database_handler):
+        with database_handler._get_connection() as conn:
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+
+        assert {
+            'idx_system_metrics_ts', 'idx_system_metrics_session_ts', 'idx_metrics_blocks_start',
+            'idx_metrics_blocks_max_id'
+        } <= indexes
+        assert version == 10
+
+    def test_settings(self, database_handler):
+        assert database_handler.get_setting('key') is None
+        assert database_handler.set_setting('key', 'a')
+        assert database_handler.set_setting('key', 'b')
+        assert database_handler.get_setting('key') == 'b'
+        assert database_handler.set_setting('key', None)
+        assert database_handler.get_setting('key') is None
+
+    def test_migration_from_legacy_schema(self, temp_db_path):
+        with sqlite3.connect(temp_db_path) as conn:
+            conn.execute('''CREATE TABLE system_metrics (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT, time_lapse INTEGER, timestamp DATE,
+                            monitoring_time TEXT, cpu_percent REAL, gpu_load REAL, ram_free_mb REAL,
+                            ram_total_mb REAL, disk_free_gb REAL, disk_total_gb REAL)''')
+            conn.execute("INSERT INTO system_metrics VALUES (1, 1, '2024-01-15', '00:01', 1, 2, 3, 4, 5, 6)")
+
+        handler = DatabaseHandler(db_name=temp_db_path)
+        rows = handler.get_metrics_range(0, 2 ** 62)
+        assert len(rows) == 1
+        assert rows[0][10] == 1705276800000
+        assert rows[0][11] is None
+        assert rows[0][12] == 1000.0
+        assert handler.get_all_metric()[0] == (1, 1, '2024-01-15', '00:01', 1, 2, 3, 4, 5, 6)
+
+    def test_fractional_interval_stored_in_ms(self, database_handler):
+        metrics = make_metrics(1000)
+        metrics.update(time_lapse=0.25, lateness_ms=1.5)
+        assert database_handler.adding_data(metrics)
+
+        row = database_handler.get_metrics_range(0, 2000)[0]
+        assert row[1] == 0.25
+        assert row[12] == 250.0
+        assert row[13] == 1.5
+
+    def test_cpu_breakdown_and_per_core_stored(self, database_handler):
+        metrics = make_metrics(1000)
+        metrics.update(cpu_user=40.0, cpu_system=5.5, cpu_iowait=2.0, cpu_steal=0.5, cpu_per_core=[99.99, 0.0, 12.34])
+        assert database_handler.adding_data(metrics)
+
+        row = database_handler.get_metrics_range(0, 2000)[0]
+        assert row[14:18] == (40.0, 5.5, 2.0, 0.5)
+        assert len(row[18]) == 6
+        assert unpack_per_core(row[18]) == [99.99, 0.0, 12.34]
+
+    def test_io_rates_stored(self, database_handler):
+        metrics = make_metrics(1000)
+        metrics.update(
+            net_rx_bytes_s=1024.0, net_tx_bytes_s=512.0, disk_read_bytes_s=4096.0, disk_write_bytes_s=0.0,
+            disk_read_iops=1.0, disk_write_iops=0.0,
+            io_devices={'net': {'eth0': [1024.0, 512.0, 2.0, 1.0]}, 'disk': {'sda': [4096.0, 0.0, 1.0, 0.0]}}
+        )
+        assert database_handler.adding_data(metrics)
+
+        row = database_handler.get_metrics_range(0, 2000)[0]
+        assert row[19:25] == (1024.0, 512.0, 4096.0, 0.0, 1.0, 0.0)
+        assert json.loads(row[25])['net']['eth0'] == [1024.0, 512.0, 2.0, 1.0]
+
+    def test_disk_mounts_stored(self, database_handler):
+        metrics = make_metrics(1000)
+        metrics['disk_mounts'] = {'/': [25.0, 100.0], '/home': [1.5, 2.0]}
+        assert database_handler.adding_data(metrics)
+
+        row = database_handler.get_metrics_range(0, 2000)[0]
+        assert json.loads(row[QUERY_COLUMNS.index('disk_mounts')]) == {'/': [25.0, 100.0], '/home': [1.5, 2.0]}
+
+    def test_get_series(self, database_handler):
+        for ts_ms in (1000, 2000, 3000):
+            assert database_handler.adding_data(make_metrics(ts_ms))
+
+        rows = database_handler.get_series(('cpu_percent', 'gpu_load'), 1500, 3000)
+        assert [row[0] for row in rows] == [2000, 3000]
+        assert all(len(row) == 3 for row in rows)
+
+        with pytest.raises(ValueError):
+            database_handler.get_series(('ts_ms; DROP TABLE system_metrics',), 0, 1)
+
+    def test_rollups_maintained_incrementally(self, database_handler):
+        base = 10 * 3_600_000
+        batch = [make_metrics(base + offset, cpu_percent=float(index))
+                 for index, offset in enumerate(range(0, 120_000, 1000))]
+        assert database_handler.adding_data_batch(batch[:90]) == 90
+        for metrics in batch[90:]:
+            assert database_handler.adding_data(metrics)
+        database_handler.flush_rollups()
+
+        with database_handler._get_connection() as conn:
+            minutes = conn.execute(
+                "SELECT bucket_ms, count, sum, min, max, p95 FROM metrics_rollup_1m "
+                "WHERE metric = 'cpu_percent' ORDER BY bucket_ms"
+            ).fetchall()
+            hours = conn.execute("SELECT count, min, max FROM metrics_rollup_1h WHERE metric = 'cpu_percent'").fetchall()
+
+        assert minutes == [
+            (base, 60, float(sum(range(60))), 0.0, 59.0, 56.0),
+            (base + 60_000, 60, float(sum(range(60, 120))), 60.0, 119.0, 116.0)
+        ]
+        assert hours == [(120, 0.0, 119.0)]
+
+    def test_rollups_backfilled_on_migration(self, temp_db_path):
+        handler = DatabaseHandler(db_name=temp_db_path)
+        assert handler.adding_data_batch([make_metrics(ts_ms) for ts_ms in (1000, 2000)]) == 2
+        with sqlite3.connect(temp_db_path) as conn:
+            conn.execute('DELETE FROM metrics_rollup_1m')
+            conn.execute('PRAGMA user_version = 6')
+
+        handler = DatabaseHandler(db_name=temp_db_path)
+        with handler._get_connection() as conn:
+            row = conn.execute("SELECT count, sum FROM metrics_rollup_1m WHERE metric = 'cpu_percent'").fetchone()
+        assert row == (2, 100.0)
+
+    def test_get_trend_picks_resolution_by_point_budget(self, database_handler):
+        base = 10 * 3_600_000
+        batch = [make_metrics(base + offset, cpu_percent=float(offset // 60_000))
+                 for offset in range(0, 600_000, 1000)]
+        assert database_handler.adding_data_batch(batch) == 600
+        end = base + 600_000
+
+        resolution, rows = database_handler.get_trend('cpu_percent', base, end, max_points=1000)
+        assert resolution == 'raw'
+        assert len(rows) == 600
+
+        resolution, rows = database_handler.get_trend('cpu_percent', base, end, max_points=50)
+        assert resolution == '1m'
+        assert len(rows) == 10
+        assert rows[3][:4] == (base + 180_000, 3.0, 3.0, 3.0)
+
+        resolution, rows = database_handler.get_trend('cpu_percent', base, end, max_points=5)
+        assert resolution == '1h'
+        assert rows[0][1:4] == (4.5, 0.0, 9.0)
+
+    def test_get_trend_unknown_metric(self, database_handler):
+        with pytest.raises(ValueError):
+            database_handler.get_trend('ram_total_mb', 0, 1, 10)
+
+    def test_clear_removes_rollups(self, database_handler):
+        assert database_handler.adding_data(make_metrics(1000))
+        assert database_handler.clear_all_metric()
+        assert database_handler.get_trend('cpu_percent', 0, 2000, 10)[1] == []
+
+    def test_delete_expired_in_chunks(self, database_handler):
+        base = 10 * 3_600_000
+        assert database_handler.adding_data_batch(
+            [make_metrics(base + offset) for offset in range(0, 10_000, 1000)]
+        ) == 10
+
+        assert database_handler.delete_expired('raw', base + 5000, limit=3) == 3
+        assert database_handler.delete_expired('raw', base + 5000, limit=3) == 2
+        assert database_handler.delete_expired('raw', base + 5000, limit=3) == 0
+        assert [row[10] for row in database_handler.get_metrics_range(0, 2 ** 62)] == list(
+            range(base + 5000, base + 10_000, 1000)
+        )
+
+        assert database_handler.delete_expired('1m', base + 60_000, limit=100) == 4
+        assert database_handler.delete_expired('1h', base, limit=100) == 0
+        with pytest.raises(ValueError):
+            database_handler.delete_expired('1d', base, limit=1)
+
+    def test_begin_clear_and_delete_chunks(self, database_handler):
+        base = 10 * 3_600_000
+        assert database_handler.adding_data_batch([make_metrics(base + index) for index in range(10)]) == 10
+        bounds = database_handler.begin_clear()
+        assert (bounds['min_id'], bounds['max_id']) == (1, 10)
+        assert database_handler.adding_data(make_metrics(base + 100))
+
+        assert database_handler.delete_metrics_chunk(bounds['max_id'], 4) == (4, 4)
+        assert database_handler.delete_metrics_chunk(bounds['max_id'], 4) == (4, 8)
+        assert database_handler.delete_metrics_chunk(bounds['max_id'], 4) == (2, 10)
+        assert [row[0] for row in database_handler.get_metrics_range(0, 2 ** 62)] == [11]
+
+    def test_compact_window_keeps_history_readable(self, database_handler):
+        base = 10 * 3_600_000
+        metrics = [
+            dict(
+                make_metrics(base + index * 1000, session_id=1 + index % 2, cpu_percent=index % 7),
+                monitoring_time=f'00:{index:02d}', cpu_per_core=[index, 100 - index],
+                io_devices={'sda': [index, 0]}, stale_collectors=['gpu'] if index % 5 == 0 else [],
+                collector_latency_ms={'cpu': 0.5}
+            )
+            for index in range(50)
+        ]
+        database_handler.adding_data_batch(metrics + [make_metrics(base + 3_600_000, session_id=1)])
+        readers = {
+            'range': lambda: database_handler.get_metrics_range(0, 2 ** 62),
+            'series': lambda: database_handler.get_series(('cpu_percent', 'ram_free_mb'), 0, 2 ** 62),
+            'session': lambda: database_handler.get_session_metrics(1),
+            'all': database_handler.get_all_metric,
+            'since': lambda: database_handler.get_metrics_since(10, limit=7),
+            'latest': lambda: database_handler.get_latest_metrics(20),
+            'iter': lambda: list(database_handler.iter_metrics(chunk_size=8, columns=QUERY_COLUMNS))
+        }
+        before = {name: reader() for name, reader in readers.items()}
+
+        assert database_handler.oldest_window(base + 3_600_000) == base
+        assert database_handler.compact_window(base) == 50
+        assert database_handler.oldest_window(base + 3_600_000) is None
+        assert database_handler.get_block_stats()['rows'] == 50
+
+        # Сжатие не меняет ни одного столбца ни одной строки
+        assert {name: reader() for name, reader in readers.items()} == before
+        stats = database_handler.get_block_stats()
+        assert (stats['blocks'], stats['rows']) == (2, 50)
+        assert stats['ratio'] > 2
+
+        assert database_handler.delete_blocks(base + 3_600_000, 1) == (1, 25)
+        assert database_handler.delete_expired('raw', base + 3_600_000, limit=100) == 25
+        assert database_handler.get_block_stats()['blocks'] == 0
+        assert database_handler.delete_blocks(base + 3_600_000, 1) == (0, 0)
+
+    def test_iter_metrics_range_merges_blocks(self, database_handler):
+        base = 10 * 3_600_000
+        database_handler.adding_data_batch([make_metrics(base + index * 1000, session_id=1) for index in range(10)])
+        database_handler.compact_window(base)
+        # Одинаковые метки времени: пагинация по (ts_ms, id) не теряет строки на границе пачки
+        database_handler.adding_data_batch([make_metrics(base + 5500, session_id=2)] * 5)
+
+        chunks = list(database_handler.iter_metrics_range(0, 2 ** 62, chunk_size=4, columns=('ts_ms', 'session_id')))
+        rows = [row for chunk in chunks for row in chunk]
+
+        assert [len(chunk) for chunk in chunks] == [4, 4, 4, 3]
+        assert [row[0] for row in rows] == sorted(row[0] for row in rows)
+        assert rows.count((base + 5500, 2)) == 5
+        assert database_handler.count_metrics_range(0, 2 ** 62) == 15
+        assert len([row for chunk in database_handler.iter_metrics_range(0, 2 ** 62, session_id=2) for row in chunk]) == 5
+
+    def test_block_columns_cover_schema(self):
+        assert set(INSERT_COLUMNS) == {'ts_ms', 'session_id', *BLOCK_COLUMNS, *BLOCK_TEXT_COLUMNS}
+
+    def test_clear_removes_blocks(self, database_handler):
+        base = 10 * 3_600_000
+        database_handler.adding_data_batch([make_metrics(base + index) for index in range(5)])
+        database_handler.compact_window(base)
+
+        database_handler.clear_all_metric()
+        assert database_handler.get_metrics_range(0, 2 ** 62) == []
+
+    def test_incremental_vacuum_returns_space(self, database_handler):
+        assert database_handler.get_storage_stats()['auto_vacuum'] == 2
+        database_handler.adding_data_batch(
+            [dict(make_metrics(1000 + index), io_devices={'sda': 'x' * 500}) for index in range(2000)]
+        )
+        while database_handler.delete_expired('raw', 2 ** 62, limit=500):
+            pass
+
+        pages_before = database_handler.get_storage_stats()['page_count']
+        assert database_handler.get_storage_stats()['freelist_count'] > 0
+        while database_handler.incremental_vacuum(100):
+            pass
+
+        stats = database_handler.get_storage_stats()
+        assert stats['freelist_count'] == 0
+        assert stats['page_count'] < pages_before
+
+    def test_collector_diagnostics_stored(self, database_handler):
+        metrics = make_metrics(1000)
+        metrics.update(stale_collectors=['gpu', 'disk'], collector_latency_ms={'cpu': 0.12, 'gpu': 400.0})
+        assert database_handler.adding_data(metrics)
+        assert database_handler.adding_data(make_metrics(2000))
+
+        first, second = database_handler.get_metrics_range(0, 3000)
+        assert first[26] == 'gpu,disk'
+        assert json.loads(first[27]) == {'cpu': 0.12, 'gpu': 400.0}
+        assert second[26] is None and second[27] is None
+
+    def test_pack_per_core_clamps_and_handles_empty(self):
+        assert pack_per_core([]) is None
+        assert unpack_per_core(None) == []
+        assert unpack_per_core(pack_per_core([-5.0, 150.0])) == [0.0, 100.0]
+
+    def test_get_metrics_range(self, database_handler):
+        for ts_ms in (1000, 2000, 3000, 4000):
+            database_handler.adding_data(make_metrics(ts_ms, session_id=1 if ts_ms < 3000 else 2))
+
+        assert [row[10] for row in database_handler.get_metrics_range(2000, 3000)] == [2000, 3000]
+        assert [row[10] for row in database_handler.get_metrics_range(0, 5000, session_id=2)] == [3000, 4000]
+        assert [row[10] for row in database_handler.get_metrics_range(0, 5000, limit=1)] == [1000]
+
+    def test_get_session_and_latest_metrics(self, database_handler):
+        session_id = database_handler.start_session()
+        for ts_ms in (1000, 2000, 3000):
+            database_handler.adding_data(make_metrics(ts_ms, session_id=session_id))
+        database_handler.adding_data(make_metrics(4000))
+        database_handler.end_session(session_id)
+
+        assert len(database_handler.get_session_metrics(session_id)) == 3
+        assert [row[10] for row in database_handler.get_latest_metrics(2)] == [3000, 4000]
+        sessions = database_handler.get_sessions()
+        assert sessions[0][0] == session_id
+        assert sessions[0][2] is not None
+
+    def test_iter_metrics_chunks(self, database_handler):
+        database_handler.adding_data_batch([make_metrics(ts_ms) for ts_ms in range(1, 11)])
+        chunks = list(database_handler.iter_metrics(chunk_size=4))
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        assert [row[0] for chunk in chunks for row in chunk] == list(range(1, 11))
+
+    def test_iter_metrics_after_id_and_columns(self, database_handler):
+        database_handler.adding_data_batch([make_metrics(ts_ms) for ts_ms in range(1, 6)])
+        chunks = list(database_handler.iter_metrics(chunk_size=10, after_id=3, columns=('id', 'ts_ms')))
+        assert chunks == [[(4, 4), (5, 5)]]
+
+        with pytest.raises(ValueError):
+            list(database_handler.iter_metrics(columns=('ts_ms; DROP TABLE system_metrics',)))
+
+    def test_get_metrics_since(self, database_handler):
+        database_handler.adding_data_batch([make_metrics(ts_ms) for ts_ms in range(1, 6)])
+        assert [row[0] for row in database_handler.get_metrics_since(2)] == [3, 4, 5]
+        assert [row[0] for row in database_handler.get_metrics_since(2, limit=1)] == [3]
+        assert database_handler.get_metrics_since(5) == []
@@ -0,0 +1,52 @@
+import pytest
+
+from src.database import DatabaseHandler
+from src.UI.database_clearer import DatabaseClearer
+from tests.helpers import make_metrics
+
+
+class TestDatabaseClearer:
+    @pytest.fixture
+    def database_handler(self, tmp_path):
+        handler = DatabaseHandler(db_name=str(tmp_path / "clearer.db"), persistent=True)
+        yield handler
+        handler.close()
+
+    def test_clear_in_background(self, database_handler, qtbot):
+        assert database_handler.adding_data_batch([make_metrics() for _ in range(30)]) == 30
+        clearer = DatabaseClearer(database_handler, chunk_size=10)
+        progress = []
+        clearer.progress.connect(progress.append)
+
+        with qtbot.waitSignal(clearer.finished, timeout=5000) as blocker:
+            assert clearer.start()
+            assert not clearer.start()
+
+        assert blocker.args == [30]
+        assert progress[-1] == 100
+        assert not clearer.running
+        assert database_handler.get_all_metric() == []
+
+    def test_database_error_reported(self, database_handler, qtbot, monkeypatch):
+        assert database_handler.adding_data_batch([make_metrics() for _ in range(3)]) == 3
+        monkeypatch.setattr(database_handler, 'delete_metrics_chunk', lambda max_id, limit: None)
+        clearer = DatabaseClearer(database_handler)
+
+        with qtbot.waitSignal(clearer.finished, timeout=5000) as blocker:
+            assert clearer.start()
+
+        assert blocker.args == [-1]
+        assert len(database_handler.get_all_metric()) == 3
+
+    def test_close_cancels_running_job(self, database_handler, qtbot, monkeypatch):
+        assert database_handler.adding_data_batch([make_metrics() for _ in range(30)]) == 30
+        clearer = DatabaseClearer(database_handler, chunk_size=10)
+        clearer.progress.connect(lambda percent: clearer._job.cancel())
+
+        with qtbot.waitSignal(clearer.finished, timeout=5000) as blocker:
+            assert clearer.start()
+        clearer.close()
+
+        assert blocker.args == [10]
+        assert not clearer.running
+        assert len(database_handler.get_all_metric()) == 20
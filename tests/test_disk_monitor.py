@@ -0,0 +1,88 @@
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.disk_monitor import DiskMonitoring
+
+
+MOUNTINFO = (
+    "23 28 0:22 / /proc rw,relatime - proc proc rw\n"
+    "28 1 8:1 / / rw,relatime - ext4 /dev/sda1 rw\n"
+    "29 28 8:2 / /home rw,relatime shared:1 - ext4 /dev/sda2 rw\n"
+    "30 28 8:3 / /mnt/my\\040disk rw,relatime - xfs /dev/sdb1 rw\n"
+    "31 28 0:30 / /run rw - tmpfs tmpfs rw\n"
+    "32 28 7:0 / /snap/core ro,relatime - squashfs /dev/loop0 ro\n"
+)
+
+
+class TestDiskMonitoring:
+    @pytest.fixture
+    def mountinfo_path(self, tmp_path):
+        path = tmp_path / "mountinfo"
+        path.write_text(MOUNTINFO)
+        return str(path)
+
+    @pytest.fixture
+    def fake_statvfs(self):
+        stat = MagicMock(f_bavail=25 * 1024 * 1024, f_blocks=100 * 1024 * 1024, f_frsize=1024)
+        with patch('os.statvfs', return_value=stat) as mock_statvfs:
+            yield mock_statvfs
+
+    def test_read_block_device_mounts(self, mountinfo_path):
+        disk_monitoring = DiskMonitoring(mountinfo_path=mountinfo_path)
+        assert disk_monitoring.mounts == {
+            '/': ('ext4', '/dev/sda1'),
+            '/home': ('ext4', '/dev/sda2'),
+            '/mnt/my disk': ('xfs', '/dev/sdb1')
+        }
+        disk_monitoring.close()
+
+    def test_mounts_are_cached(self, mountinfo_path):
+        disk_monitoring = DiskMonitoring(mountinfo_path=mountinfo_path)
+        with patch.object(disk_monitoring, '_read_mounts', wraps=disk_monitoring._read_mounts) as mock_read:
+            disk_monitoring.mounts
+            disk_monitoring.mounts
+            disk_monitoring.monitored_mounts()
+            assert mock_read.call_count == 1
+
+            with patch.object(disk_monitoring, '_mounts_changed', return_value=True):
+                disk_monitoring.mounts
+            assert mock_read.call_count == 2
+        disk_monitoring.close()
+
+    def test_get_rom_info_order(self, mountinfo_path, fake_statvfs):
+        disk_monitoring = DiskMonitoring(mountinfo_path=mountinfo_path)
+        assert disk_monitoring.get_rom_info() == (25.0, 100.0)
+        fake_statvfs.assert_called_once_with('/')
+
+    def test_configured_mount_points(self, mountinfo_path, fake_statvfs):
+        disk_monitoring = DiskMonitoring(['/home', '/not-mounted', '/mnt/my disk'], mountinfo_path=mountinfo_path)
+        assert disk_monitoring.primary_mount == '/home'
+        assert disk_monitoring.monitored_mounts() == ['/home', '/mnt/my disk']
+        assert disk_monitoring.get_all_usage() == {'/home': (25.0, 100.0), '/mnt/my disk': (25.0, 100.0)}
+
+    def test_all_usage_includes_primary_mount(self, tmp_path, fake_statvfs):
+        path = tmp_path / "mountinfo"
+        path.write_text("29 28 8:2 / /home rw,relatime - ext4 /dev/sda2 rw\n")
+        disk_monitoring = DiskMonitoring(mountinfo_path=str(path))
+        assert disk_monitoring.get_all_usage() == {'/': (25.0, 100.0), '/home': (25.0, 100.0)}
+        disk_monitoring.close()
+
+    def test_statvfs_error(self, mountinfo_path):
+        disk_monitoring = DiskMonitoring(mountinfo_path=mountinfo_path)
+        with patch('os.statvfs', side_effect=OSError("Test error")):
+            assert disk_monitoring.get_rom_info() == (0.0, 0.0)
+
+    def test_missing_mountinfo_falls_back_to_psutil(self, tmp_path):
+        partition = MagicMock(mountpoint='/', fstype='ext4', device='/dev/sda1')
+        with patch('psutil.disk_partitions', return_value=[partition]):
+            disk_monitoring = DiskMonitoring(mountinfo_path=str(tmp_path / "missing"))
+            assert disk_monitoring.mounts == {'/': ('ext4', '/dev/sda1')}
+
+    @pytest.mark.skipif(not os.path.exists('/proc/self/mountinfo'), reason="Требуется Linux")
+    def test_real_root_usage(self):
+        disk_monitoring = DiskMonitoring()
+        free_gb, total_gb = disk_monitoring.get_rom_info()
+        assert 0 <= free_gb <= total_gb
+        assert disk_monitoring._mounts_changed() is False
+        disk_monitoring.close()
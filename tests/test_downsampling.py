@@ -0,0 +1,44 @@
+import math
+import pytest
+
+from src.downsampling import finite_range, lttb
+
+
+class TestLttb:
+    def test_short_series_returned_as_is(self):
+        assert lttb([0, 1, 2], [5, 6, 7], 10) == ([0, 1, 2], [5, 6, 7])
+
+    def test_point_count_and_endpoints(self):
+        xs = list(range(1000))
+        ys = [math.sin(x / 50) for x in xs]
+        sampled_x, sampled_y = lttb(xs, ys, 100)
+
+        assert len(sampled_x) == len(sampled_y) == 100
+        assert sampled_x[0] == 0 and sampled_x[-1] == 999
+        assert sampled_x == sorted(sampled_x)
+
+    def test_spike_preserved(self):
+        xs = list(range(1000))
+        ys = [0.0] * 1000
+        ys[437] = 100.0
+        sampled_x, sampled_y = lttb(xs, ys, 20)
+
+        assert 437 in sampled_x
+        assert max(sampled_y) == 100.0
+
+    def test_nan_points_not_selected(self):
+        xs = list(range(100))
+        ys = [math.nan if 20 <= x < 80 else float(x) for x in xs]
+        _, sampled_y = lttb(xs, ys, 10)
+
+        finite = [y for y in sampled_y if not math.isnan(y)]
+        assert len(finite) >= 4
+
+    def test_threshold_too_small(self):
+        with pytest.raises(ValueError):
+            lttb(list(range(10)), list(range(10)), 2)
+
+
+def test_finite_range():
+    assert finite_range([3.0, math.nan, 1.0]) == (1.0, 3.0)
+    assert finite_range([math.nan]) is None
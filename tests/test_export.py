@@ -0,0 +1,98 @@
+import csv
+import os
+import pytest
+
+from src.database import DatabaseHandler
+from src.export import EXPORT_COLUMNS, NPZ_NO_SESSION, ExportJob, format_from_path, main, np, parse_time_ms, pq
+from tests.helpers import make_metrics
+
+
+BASE_MS = 10 * 3_600_000
+
+PER_CORE = [10.0, 20.5]
+
+
+def read_csv(path: str) -> list:
+    with open(path, newline='', encoding='utf-8') as file:
+        return list(csv.reader(file))
+
+
+class TestExportJob:
+    @pytest.fixture
+    def database_handler(self, tmp_path):
+        handler = DatabaseHandler(db_name=str(tmp_path / "export.db"))
+        # Первый час сжат в блоки, во втором - несжатые строки двух сессий
+        handler.adding_data_batch([make_metrics(BASE_MS + index * 1000, 1, index, cpu_per_core=PER_CORE) for index in range(20)])
+        handler.compact_window(BASE_MS)
+        handler.adding_data_batch(
+            [make_metrics(BASE_MS + 3_600_000 + index, 1 + index % 2, 100 + index, cpu_per_core=PER_CORE) for index in range(10)]
+        )
+        return handler
+
+    def test_csv_streams_blocks_and_rows_in_order(self, database_handler, tmp_path):
+        path = str(tmp_path / "out.csv")
+        progress = []
+
+        assert ExportJob(database_handler, path, chunk_size=3).run(progress.append) == 30
+
+        rows = read_csv(path)
+        ts_index = EXPORT_COLUMNS.index('ts_ms')
+        assert tuple(rows[0]) == EXPORT_COLUMNS
+        assert [int(row[ts_index]) for row in rows[1:]] == sorted(int(row[ts_index]) for row in rows[1:])
+        assert rows[-1][EXPORT_COLUMNS.index('cpu_per_core')] == '[10.0, 20.5]'
+        assert progress[-1] == 100 and progress == sorted(progress)
+        assert not os.path.exists(path + '.part')
+
+    def test_filters(self, database_handler, tmp_path):
+        path = str(tmp_path / "out.csv")
+        job = ExportJob(database_handler, path, start_ms=BASE_MS + 5000, end_ms=BASE_MS + 3_600_000 + 5, session_id=1)
+
+        assert job.run() == 15 + 3
+        cpu_index = EXPORT_COLUMNS.index('cpu_percent')
+        assert [float(row[cpu_index]) for row in read_csv(path)[1:]] == [*range(5, 20), 100, 102, 104]
+
+    @pytest.mark.skipif(np is None, reason="NumPy не установлен")
+    def test_npz_columns(self, database_handler, tmp_path):
+        database_handler.adding_data(make_metrics(BASE_MS + 7_200_000, cpu_per_core=PER_CORE))
+        path = str(tmp_path / "out.npz")
+
+        assert ExportJob(database_handler, path, chunk_size=4).run() == 31
+
+        with np.load(path) as archive:
+            assert archive['ts_ms'].dtype == np.int64 and len(archive['ts_ms']) == 31
+            assert archive['session_id'][-1] == NPZ_NO_SESSION
+            assert np.isnan(archive['cpu_user'][-1])
+            assert list(archive['cpu_percent'][:3]) == [0.0, 1.0, 2.0]
+            assert 'monitoring_time' not in archive.files
+
+    @pytest.mark.skipif(pq is None, reason="pyarrow не установлен")
+    def test_parquet(self, database_handler, tmp_path):
+        path = str(tmp_path / "out.parquet")
+
+        assert ExportJob(database_handler, path, chunk_size=7).run() == 30
+        table = pq.read_table(path)
+        assert table.column_names == list(EXPORT_COLUMNS)
+        assert table.num_rows == 30
+
+    def test_cancel_removes_partial_file(self, database_handler, tmp_path):
+        path = str(tmp_path / "out.csv")
+        job = ExportJob(database_handler, path, chunk_size=5)
+
+        assert job.run(lambda percent: job.cancel()) is None
+        assert not os.path.exists(path) and not os.path.exists(path + '.part')
+
+    def test_unknown_format(self, database_handler, tmp_path):
+        with pytest.raises(ValueError):
+            ExportJob(database_handler, str(tmp_path / "out.xlsx"))
+        assert format_from_path('data.PARQUET') == 'parquet'
+
+    def test_parse_time_ms(self):
+        assert parse_time_ms('1700000000000') == 1_700_000_000_000
+        assert parse_time_ms('2024-01-31 12:00') > 0
+
+    def test_cli(self, database_handler, tmp_path):
+        path = str(tmp_path / "cli.csv")
+
+        assert main([path, '--db', database_handler.db_name, '--session', '2']) == 0
+        assert len(read_csv(path)) == 1 + 5
+        assert main([str(tmp_path / "cli.csv"), '--db', str(tmp_path / "missing.db")]) == 1
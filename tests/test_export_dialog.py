@@ -0,0 +1,39 @@
+import time
+import pytest
+
+from src.database import DatabaseHandler
+from src.UI.export_dialog import ExportDialog, format_session
+
+
+class TestExportDialog:
+    @pytest.fixture
+    def database_handler(self, tmp_path):
+        handler = DatabaseHandler(db_name=str(tmp_path / "export_dialog.db"))
+        first = handler.start_session()
+        handler.end_session(first)
+        handler.start_session()
+        return handler
+
+    def test_defaults_export_everything(self, database_handler, qtbot):
+        dialog = ExportDialog(database_handler, {"Последний час": 3600})
+        qtbot.addWidget(dialog)
+
+        assert dialog.selection() == (None, None, None)
+        assert dialog.comboBox_range.count() == 2
+        assert [dialog.comboBox_session.itemData(index) for index in range(3)] == [None, 2, 1]
+
+    def test_range_and_session(self, database_handler, qtbot):
+        dialog = ExportDialog(database_handler, {"Последний час": 3600})
+        qtbot.addWidget(dialog)
+        dialog.comboBox_range.setCurrentIndex(1)
+        dialog.comboBox_session.setCurrentIndex(2)
+
+        now_ms = int(time.time() * 1000)
+        start_ms, end_ms, session_id = dialog.selection()
+        assert end_ms - start_ms == 3_600_000
+        assert abs(end_ms - now_ms) < 5000
+        assert session_id == 1
+
+    def test_format_session(self):
+        assert format_session((3, 0, None)).startswith("Сессия 3: ")
+        assert format_session((3, 0, None)).endswith(" - ...")
@@ -0,0 +1,70 @@
+import math
+import pytest
+
+from src.gorilla import (
+    BitReader, BitWriter, decode_block, decode_floats, decode_texts, encode_block, encode_floats, encode_texts
+)
+
+
+class TestGorilla:
+    def test_bit_stream_round_trip(self):
+        writer = BitWriter()
+        fields = [(1, 1), (0b101, 3), (2 ** 64 - 1, 64), (0, 5), (12345, 17)]
+        for value, width in fields:
+            writer.write(value, width)
+
+        reader = BitReader(writer.getvalue())
+        assert [reader.read(width) for _, width in fields] == [value for value, _ in fields]
+
+    def test_block_round_trip(self):
+        timestamps = [1_700_000_000_000 + index * 1000 + (index % 3) * 7 for index in range(200)]
+        timestamps[100] += 5_000_000
+        ids = [index * 2 + 1 for index in range(200)]
+        ids[50] = 10_000
+        columns = [
+            [float(index % 100) for index in range(200)],
+            [1024.0 + index * 0.25 for index in range(200)],
+            [None if index % 10 == 0 else 1e-310 * index for index in range(200)]
+        ]
+        texts = [
+            [f'00:{index:02d}' for index in range(200)],
+            [None if index % 3 else bytes([index % 256, 1]) for index in range(200)]
+        ]
+
+        block = decode_block(encode_block(timestamps, ids, columns, texts))
+        assert block.timestamps == timestamps
+        assert block.ids == ids
+        assert block.values == {index: column for index, column in enumerate(columns)}
+        assert block.texts == {index: column for index, column in enumerate(texts)}
+
+    def test_special_floats(self):
+        values = [0.0, -0.0, math.inf, -math.inf, None, 5e-324, 1.7976931348623157e308, None, 3.5]
+        decoded = decode_floats(BitReader(encode_floats(values)), len(values))
+
+        assert decoded == values
+        assert math.copysign(1.0, decoded[1]) == -1.0
+
+    def test_constant_column_takes_one_bit_per_value(self):
+        encoded = encode_floats([42.0] * 800)
+        assert len(encoded) == 8 + 100
+
+    def test_texts(self):
+        values = ['', None, 'Привет', '{"sda":[1,2]}', None]
+        assert decode_texts(encode_texts(values), len(values)) == values
+        with pytest.raises(ValueError):
+            encode_texts(['a', b'b'])
+
+    def test_single_column_decode(self):
+        data = encode_block([1, 2, 3], [7, 8, 9], [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], [['a', 'b', 'c']])
+        block = decode_block(data, columns=[1], texts=[])
+        assert (block.timestamps, block.ids, block.values, block.texts) == ([1, 2, 3], [7, 8, 9], {1: [4.0, 5.0, 6.0]}, {})
+
+    def test_empty_block(self):
+        block = decode_block(encode_block([], [], [[]], [[]]))
+        assert (block.timestamps, block.values, block.texts) == ([], {0: []}, {0: []})
+
+    def test_unknown_version(self):
+        data = bytearray(encode_block([1], [1], [[1.0]]))
+        data[0] = 99
+        with pytest.raises(ValueError):
+            decode_block(bytes(data))
@@ -0,0 +1,169 @@
+import os
+import stat
+import time
+import pytest
+from unittest.mock import patch
+
+from src.gpu_monitor import GPUMonitoring, GPUDevice, NvidiaSmiReader
+
+
+def write_fake_nvidia_smi(directory, body: str) -> str:
+    path = directory / "nvidia-smi"
+    path.write_text("#!/bin/sh\n" + body)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def fake_path(tmp_path, monkeypatch):
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ.get('PATH', '')}")
+    return tmp_path
+
+
+class TestNvidiaSmiReader:
+    def test_streaming_values(self, fake_path):
+        write_fake_nvidia_smi(fake_path, 'while true; do echo "0, 42"; echo "1, 7"; sleep 0.05; done\n')
+        reader = NvidiaSmiReader(interval_ms=50)
+        reader.start()
+        try:
+            assert wait_for(lambda: reader.get_loads() == {0: 42.0, 1: 7.0})
+            assert reader.get_load() == 42.0
+            assert reader.is_stale is False
+            assert reader.restart_count == 0
+        finally:
+            reader.stop()
+
+    def test_command_uses_loop_mode(self):
+        assert NvidiaSmiReader(interval_ms=250).command[-1] == '-lms=250'
+
+    def test_restart_after_exit(self, fake_path):
+        write_fake_nvidia_smi(fake_path, 'echo "0, 13"\n')
+        reader = NvidiaSmiReader(restart_delay=0.01)
+        reader.start()
+        try:
+            assert wait_for(lambda: reader.restart_count >= 2)
+            assert reader.get_load() == 13.0
+        finally:
+            reader.stop()
+
+    def test_staleness(self, fake_path):
+        write_fake_nvidia_smi(fake_path, 'echo "0, 5"\nexec sleep 30\n')
+        reader = NvidiaSmiReader(stale_after=0.1)
+        assert reader.is_stale is True
+        reader.start()
+        try:
+            assert wait_for(lambda: reader.get_load() == 5.0)
+            assert wait_for(lambda: reader.is_stale)
+            assert reader.restart_count == 0
+        finally:
+            reader.stop()
+
+    def test_missing_executable(self, tmp_path):
+        reader = NvidiaSmiReader(executable=str(tmp_path / "missing"), restart_delay=0.01)
+        reader.start()
+        try:
+            assert wait_for(lambda: reader.restart_count >= 1)
+            assert reader.get_load() is None
+        finally:
+            reader.stop()
+
+    def test_unparsable_lines_ignored(self):
+        reader = NvidiaSmiReader()
+        reader._parse_line("0, [N/A]\n")
+        reader._parse_line("garbage\n")
+        reader._parse_line("2, 17\n")
+        assert reader.get_loads() == {2: 17.0}
+
+
+class TestGPUMonitoringNvidia:
+    @pytest.fixture
+    def gpu_monitoring(self, tmp_path):
+        with patch.object(GPUMonitoring, '_detect_gpu'):
+            monitoring = GPUMonitoring(drm_path=str(tmp_path), cache_path=None)
+        monitoring.devices = [GPUDevice('card0', 'NVIDIA', '0x10de', '0x2484', '0000:01:00.0', str(tmp_path))]
+        yield monitoring
+        monitoring.close()
+
+    def test_get_gpu_load_from_reader(self, gpu_monitoring, fake_path):
+        write_fake_nvidia_smi(fake_path, 'while true; do echo "0, 64"; sleep 0.05; done\n')
+        assert gpu_monitoring.get_gpu_load() in (0.0, 64.0)
+        assert wait_for(lambda: gpu_monitoring.get_gpu_load() == 64.0)
+        assert gpu_monitoring.is_stale is False
+
+
+def make_card(drm_path, card: str, vendor_id: str, device_id: str, pci_slot: str, files: dict | None = None):
+    pci_dir = drm_path / "devices" / pci_slot
+    pci_dir.mkdir(parents=True, exist_ok=True)
+    (pci_dir / "vendor").write_text(vendor_id + "\n")
+    (pci_dir / "device").write_text(device_id + "\n")
+    card_dir = drm_path / card
+    card_dir.mkdir()
+    (card_dir / "device").symlink_to(pci_dir)
+    for name, value in (files or {}).items():
+        (card_dir / name).write_text(value)
+    return pci_dir
+
+
+class TestGPUDiscovery:
+    @pytest.fixture
+    def drm_path(self, tmp_path):
+        drm = tmp_path / "drm"
+        drm.mkdir()
+        amd_dir = make_card(drm, "card1", "0x1002", "0x73bf", "0000:03:00.0")
+        (amd_dir / "gpu_busy_percent").write_text("37\n")
+        make_card(drm, "card0", "0x8086", "0x9a49", "0000:00:02.0",
+                  {"gt_cur_freq_mhz": "650\n", "gt_max_freq_mhz": "1300\n"})
+        make_card(drm, "card2", "0x1af4", "0x1050", "0000:00:01.0")
+        (drm / "card0-HDMI-A-1").mkdir()
+        (drm / "renderD128").mkdir()
+        return drm
+
+    def test_discover_all_gpus(self, drm_path):
+        monitoring = GPUMonitoring(drm_path=str(drm_path), cache_path=None)
+        assert [(device.card, device.vendor) for device in monitoring.devices] == [
+            ('card0', 'Intel'), ('card1', 'AMD')
+        ]
+        assert monitoring.vendor == 'Intel'
+        assert monitoring.model == '8086:9a49'
+
+    def test_per_device_loads(self, drm_path):
+        monitoring = GPUMonitoring(drm_path=str(drm_path), cache_path=None)
+        assert monitoring.get_gpu_loads() == {'card0': 50.0, 'card1': 37.0}
+        assert monitoring.get_gpu_load() == 50.0
+
+    def test_no_gpu_degrades_gracefully(self, tmp_path):
+        monitoring = GPUMonitoring(drm_path=str(tmp_path / "missing"), cache_path=None)
+        assert monitoring.devices == []
+        assert monitoring.vendor is None
+        with patch.object(monitoring.logger, 'error') as mock_error:
+            assert monitoring.get_gpu_load() == 0.0
+            assert monitoring.get_gpu_loads() == {}
+            mock_error.assert_not_called()
+
+    def test_discovery_cached_per_boot(self, drm_path, tmp_path):
+        cache_path = str(tmp_path / "cache" / "gpus.json")
+        with patch.object(GPUMonitoring, '_boot_id', return_value='boot-1'):
+            first = GPUMonitoring(drm_path=str(drm_path), cache_path=cache_path)
+            with patch.object(GPUMonitoring, 'discover_devices') as mock_discover:
+                second = GPUMonitoring(drm_path=str(drm_path), cache_path=cache_path)
+                mock_discover.assert_not_called()
+
+        assert second.devices == first.devices
+
+        with patch.object(GPUMonitoring, '_boot_id', return_value='boot-2'), \
+                patch.object(GPUMonitoring, 'discover_devices', return_value=[]) as mock_discover:
+            third = GPUMonitoring(drm_path=str(drm_path), cache_path=cache_path)
+            mock_discover.assert_called_once()
+            assert third.devices == []
+
+    def test_amd_missing_busy_file(self, drm_path):
+        monitoring = GPUMonitoring(drm_path=str(drm_path), cache_path=None)
+        os.remove(drm_path / "devices" / "0000:03:00.0" / "gpu_busy_percent")
+        assert monitoring.get_device_load(monitoring.devices[1]) == 0.0
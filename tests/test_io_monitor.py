@@ -0,0 +1,125 @@
+import os
+import pytest
+
+from src.io_monitor import IOMonitoring, RateTracker, counter_delta, SECTOR_SIZE
+
+NET_HEADER = (
+    "Inter-|   Receive                                                |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n"
+)
+
+
+def write_net_dev(path, interfaces):
+    lines = [
+        f"{name:>6}: {rx} {rx_packets} 0 0 0 0 0 0 {tx} {tx_packets} 0 0 0 0 0 0\n"
+        for name, (rx, tx, rx_packets, tx_packets) in interfaces.items()
+    ]
+    path.write_text(NET_HEADER + "".join(lines))
+
+
+def write_diskstats(path, disks):
+    lines = [
+        f"   8       0 {name} {reads} 0 {sectors_read} 0 {writes} 0 {sectors_written} 0 0 0 0 0 0 0 0 0 0\n"
+        for name, (sectors_read, sectors_written, reads, writes) in disks.items()
+    ]
+    path.write_text("".join(lines))
+
+
+class TestCounterDelta:
+    def test_regular_increment(self):
+        assert counter_delta(150, 100) == 50
+
+    def test_32bit_wraparound(self):
+        assert counter_delta(10, 2 ** 32 - 10) == 20
+
+    def test_64bit_wraparound(self):
+        assert counter_delta(5, 2 ** 64 - 5) == 10
+
+    def test_counter_reset(self):
+        # Падение с середины диапазона - сброс счётчика, а не переполнение
+        assert counter_delta(100, 2 ** 31 - 1) == 100
+
+
+class TestRateTracker:
+    def test_rates_per_second(self):
+        tracker = RateTracker()
+        assert tracker.update({'eth0': (1000, 10)}, 0) == {}
+        assert tracker.update({'eth0': (3000, 30)}, 500_000_000) == {'eth0': (4000.0, 40.0)}
+
+    def test_new_device_has_no_rate_until_second_sample(self):
+        tracker = RateTracker()
+        tracker.update({'eth0': (0,)}, 0)
+        rates = tracker.update({'eth0': (100,), 'wlan0': (50,)}, 1_000_000_000)
+        assert rates == {'eth0': (100.0,)}
+
+
+@pytest.mark.skipif(not hasattr(os, 'preadv'), reason="os.preadv недоступен")
+class TestIOMonitoring:
+    @pytest.fixture
+    def paths(self, tmp_path):
+        net_dev = tmp_path / "net_dev"
+        diskstats = tmp_path / "diskstats"
+        sys_block = tmp_path / "block"
+        (sys_block / "sda" / "device").mkdir(parents=True)
+        (sys_block / "sda" / "holders" / "dm-0").mkdir(parents=True)
+        for name in ("loop0", "dm-0", "md0", "zram0"):
+            (sys_block / name).mkdir(parents=True)
+        write_net_dev(net_dev, {'lo': (0, 0, 0, 0), 'eth0': (0, 0, 0, 0)})
+        write_diskstats(diskstats, {
+            'sda': (0, 0, 0, 0), 'sda1': (0, 0, 0, 0), 'loop0': (0, 0, 0, 0),
+            'dm-0': (0, 0, 0, 0), 'md0': (0, 0, 0, 0), 'zram0': (0, 0, 0, 0)
+        })
+        return net_dev, diskstats, sys_block
+
+    @pytest.fixture
+    def io_monitoring(self, paths):
+        io_monitoring = IOMonitoring(*(str(path) for path in paths))
+        yield io_monitoring
+        io_monitoring.close()
+
+    def test_reads_physical_disks_only(self, io_monitoring):
+        assert set(io_monitoring.read_network_counters()) == {'eth0'}
+        assert set(io_monitoring.read_disk_counters()) == {'sda'}
+
+    def test_sample_rates(self, io_monitoring, paths):
+        net_dev, diskstats, _ = paths
+        write_net_dev(net_dev, {'lo': (10 ** 9, 10 ** 9, 1, 1), 'eth0': (10 ** 6, 10 ** 5, 1000, 100)})
+        write_diskstats(diskstats, {
+            'sda': (2000, 4000, 10, 20), 'sda1': (2000, 4000, 10, 20), 'loop0': (0, 0, 0, 0),
+            'dm-0': (2000, 4000, 10, 20), 'md0': (0, 0, 0, 0), 'zram0': (100, 100, 1, 1)
+        })
+
+        metrics = io_monitoring.sample()
+
+        assert metrics['net_rx_bytes_s'] > metrics['net_tx_bytes_s'] > 0
+        assert metrics['disk_write_bytes_s'] == pytest.approx(2 * metrics['disk_read_bytes_s'])
+        assert metrics['disk_write_iops'] == pytest.approx(2 * metrics['disk_read_iops'])
+        assert set(metrics['io_devices']['net']) == {'eth0'}
+        assert set(metrics['io_devices']['disk']) == {'sda'}
+        rx, tx, rx_packets, tx_packets = metrics['io_devices']['net']['eth0']
+        assert rx / rx_packets == pytest.approx(1000, rel=0.01)
+        read_bytes, _, reads, _ = metrics['io_devices']['disk']['sda']
+        assert read_bytes / reads == pytest.approx(200 * SECTOR_SIZE, rel=0.01)
+
+    def test_budget_overrun_counted(self, paths):
+        io_monitoring = IOMonitoring(*(str(path) for path in paths), budget_ms=0)
+        io_monitoring.sample()
+        io_monitoring.close()
+        assert io_monitoring.budget_overruns >= 1
+
+    def test_missing_sources(self, tmp_path):
+        io_monitoring = IOMonitoring(str(tmp_path / "none"), str(tmp_path / "none"), str(tmp_path / "none"))
+        metrics = io_monitoring.sample()
+        io_monitoring.close()
+        assert metrics['net_rx_bytes_s'] == 0
+        assert metrics['io_devices'] == {'net': {}, 'disk': {}}
+
+    @pytest.mark.skipif(not os.path.exists('/proc/net/dev'), reason="/proc недоступен")
+    def test_real_proc_within_budget(self):
+        io_monitoring = IOMonitoring()
+        costs = []
+        for _ in range(50):
+            io_monitoring.sample()
+            costs.append(io_monitoring.last_cost_ms)
+        io_monitoring.close()
+        assert sorted(costs)[len(costs) // 2] < io_monitoring.budget_ms
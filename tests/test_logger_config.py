@@ -0,0 +1,154 @@
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from unittest.mock import patch
+
+from src import logger_config
+from src.logger_config import (
+    DuplicateFilter, DuplicateFlushingListener, LogSampler, PerLoggerFileHandler, get_logger
+)
+
+
+def make_record(msg: str, level: int = logging.ERROR, name: str = 'Test') -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 0, msg, None, None)
+
+
+class TestDuplicateFilter:
+    def test_identical_messages_suppressed_within_window(self):
+        duplicate_filter = DuplicateFilter(window=60)
+        results = [duplicate_filter.filter(make_record("ошибка")) for _ in range(5)]
+        assert results == [True, False, False, False, False]
+
+    def test_different_messages_pass(self):
+        duplicate_filter = DuplicateFilter(window=60)
+        assert duplicate_filter.filter(make_record("ошибка 1"))
+        assert duplicate_filter.filter(make_record("ошибка 2"))
+        assert duplicate_filter.filter(make_record("ошибка 1", level=logging.WARNING))
+
+    def test_info_messages_not_filtered(self):
+        duplicate_filter = DuplicateFilter(window=60)
+        assert all(duplicate_filter.filter(make_record("сообщение", level=logging.INFO)) for _ in range(3))
+        assert duplicate_filter._seen == {}
+
+    def test_suppressed_count_reported_after_window(self):
+        duplicate_filter = DuplicateFilter(window=10)
+        with patch('src.logger_config.time.monotonic', side_effect=[0.0, 1.0, 2.0, 11.0]):
+            for _ in range(3):
+                duplicate_filter.filter(make_record("ошибка"))
+            record = make_record("ошибка")
+            assert duplicate_filter.filter(record)
+
+        assert record.getMessage() == "ошибка (подавлено 2 одинаковых сообщений)"
+
+    def test_flush_reports_last_burst(self):
+        duplicate_filter = DuplicateFilter(window=10)
+        with patch('src.logger_config.time.monotonic', side_effect=[0.0, 1.0, 2.0, 5.0, 11.0]):
+            for _ in range(3):
+                duplicate_filter.filter(make_record("ошибка"))
+            assert duplicate_filter.flush() == []
+            records = duplicate_filter.flush()
+
+        assert [(record.name, record.levelno, record.getMessage()) for record in records] == [
+            ('Test', logging.ERROR, "ошибка (подавлено 2 одинаковых сообщений)")
+        ]
+        assert duplicate_filter._seen == {}
+
+    def test_flush_force_and_without_duplicates(self):
+        duplicate_filter = DuplicateFilter(window=60)
+        duplicate_filter.filter(make_record("ошибка 1"))
+        duplicate_filter.filter(make_record("ошибка 2"))
+        duplicate_filter.filter(make_record("ошибка 2"))
+
+        assert [record.getMessage() for record in duplicate_filter.flush(force=True)] == [
+            "ошибка 2 (подавлено 1 одинаковых сообщений)"
+        ]
+        assert duplicate_filter.filter(make_record("ошибка 2"))
+
+    def test_key_count_is_bounded(self):
+        duplicate_filter = DuplicateFilter(window=60, max_keys=10)
+        for i in range(100):
+            duplicate_filter.filter(make_record(f"ошибка {i}"))
+        assert len(duplicate_filter._seen) == 10
+
+
+class TestLogSampler:
+    def test_every_nth_call_passes(self):
+        sampler = LogSampler(3)
+        assert [sampler() for _ in range(7)] == [True, False, False, True, False, False, True]
+
+    def test_every_one_passes_all(self):
+        sampler = LogSampler(1)
+        assert all(sampler() for _ in range(5))
+
+
+class TestPerLoggerFileHandler:
+    def test_records_routed_to_file_per_logger(self, tmp_path):
+        handler = PerLoggerFileHandler(str(tmp_path))
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        handler.handle(make_record("первый", name='First'))
+        handler.handle(make_record("второй", name='Second'))
+        handler.close()
+
+        assert (tmp_path / 'First.log').read_text().strip() == "первый"
+        assert (tmp_path / 'Second.log').read_text().strip() == "второй"
+
+
+class TestGetLogger:
+    def test_logger_uses_queue_handler(self):
+        logger = get_logger('TestQueueLogger')
+        assert len(logger.handlers) == 1
+        assert isinstance(logger.handlers[0], logging.handlers.QueueHandler)
+        assert logger.propagate is False
+
+    def test_repeated_get_logger_does_not_add_handlers(self):
+        get_logger('TestRepeatedLogger')
+        logger = get_logger('TestRepeatedLogger')
+        assert len(logger.handlers) == 1
+
+    def test_records_written_by_listener_thread(self, tmp_path):
+        threads = []
+        logger = get_logger('TestListenerThread')
+
+        class Recorder(logging.Handler):
+            def emit(self, record):
+                threads.append(threading.current_thread())
+
+        recorder = Recorder()
+        listener = logger_config._get_listener()
+        listener.handlers = listener.handlers + (recorder,)
+        try:
+            logger.info("сообщение")
+            logger_config.shutdown_logging()
+        finally:
+            listener.handlers = tuple(h for h in listener.handlers if h is not recorder)
+            logger_config._get_listener()
+
+        assert threads and threads[0] is not threading.current_thread()
+
+
+class TestDuplicateFlushingListener:
+    def test_summary_written_when_queue_idle(self):
+        records = []
+
+        class Recorder(logging.Handler):
+            def emit(self, record):
+                records.append(record.getMessage())
+
+        duplicate_filter = DuplicateFilter(window=0.05)
+        log_queue = queue.Queue()
+        listener = DuplicateFlushingListener(log_queue, Recorder(), filters=[duplicate_filter], flush_interval=0.01)
+        listener.start()
+        try:
+            for _ in range(3):
+                record = make_record("ошибка")
+                if duplicate_filter.filter(record):
+                    log_queue.put(record)
+            deadline = time.monotonic() + 5
+            while len(records) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            listener.stop()
+
+        assert records == ["ошибка", "ошибка (подавлено 2 одинаковых сообщений)"]
@@ -1,11 +1,15 @@
 import sys
+import time
+import threading
 import logging
 import pytest
 from unittest.mock import MagicMock, patch
-from PySide6.QtWidgets import QApplication, QMessageBox, QHeaderView
+from PySide6.QtWidgets import QApplication, QMessageBox, QHeaderView, QFileDialog, QDialog
 from PySide6.QtCore import Qt
 
-from src.main import SystemPulse, main
+from src.main import CHART_FPS, SystemPulse, main
+from src.UI.export_dialog import ExportDialog
+from src.retention import RetentionPolicy, load_retention_policy
 
 
 class TestSystemPulse:
@@ -32,9 +36,88 @@ class TestSystemPulse:
         assert system_pulse_app.ui.pushButton_play.text() == "Начать запись"
         assert system_pulse_app.system_monitor.monitoring == False
 
+    def test_update_cpu_details(self, system_pulse_app):
+        system_pulse_app._update_cpu_details({
+            'cpu_per_core': [90.0, 10.0], 'cpu_user': 40.0, 'cpu_system': 5.0, 'cpu_iowait': 4.0, 'cpu_steal': 1.0
+        })
+
+        assert system_pulse_app.cpu_heatmap.values == [90.0, 10.0]
+        assert "iowait 4.0%" in system_pulse_app.label_CPU_breakdown.text()
+
+        system_pulse_app.reset_ui_metrics()
+        assert system_pulse_app.cpu_heatmap.values == [0.0, 0.0]
+        assert system_pulse_app.label_CPU_breakdown.text() == ""
+
+    def test_cpu_stats_from_history(self, system_pulse_app):
+        for index, cpu in enumerate((10.0, 30.0)):
+            system_pulse_app.system_monitor.history.append({'timestamp_ms': index * 1000, 'cpu_percent': cpu})
+        system_pulse_app._update_cpu_details({'cpu_per_core': []})
+
+        assert "ср. 20.0%" in system_pulse_app.label_CPU_stats.text()
+        assert "макс. 30.0%" in system_pulse_app.label_CPU_stats.text()
+
+        system_pulse_app.reset_ui_metrics()
+        assert system_pulse_app.label_CPU_stats.text() == ""
+
+    def test_charts_refresh_from_history_at_capped_rate(self, system_pulse_app):
+        assert system_pulse_app.chart_timer.interval() == 1000 // CHART_FPS
+        for index in range(5):
+            system_pulse_app.system_monitor.history.append({'timestamp_ms': index * 1000, 'cpu_percent': 10.0 * index})
+
+        system_pulse_app.refresh_charts()
+        assert system_pulse_app.charts['cpu_percent'].point_count == 0
+
+        system_pulse_app._charts_dirty = True
+        system_pulse_app.refresh_charts()
+        assert system_pulse_app.charts['cpu_percent'].point_count == 5
+        assert system_pulse_app._charts_dirty is False
+
+    def test_charts_historical_range(self, system_pulse_app):
+        now_ms = int(time.time() * 1000)
+        system_pulse_app.database_handler.get_trend = MagicMock(return_value=(
+            '1m', [(now_ms - 120_000, 10.0, 5.0, 15.0, 14.0), (now_ms - 60_000, 20.0, 10.0, 30.0, 29.0)]
+        ))
+        system_pulse_app.comboBox_chart_range.setCurrentIndex(1)
+
+        assert system_pulse_app.database_handler.get_trend.call_count == len(system_pulse_app.charts)
+        metric, start_ms, end_ms, max_points = system_pulse_app.database_handler.get_trend.call_args.args
+        assert end_ms - start_ms == 3600 * 1000
+        assert max_points == system_pulse_app.charts[metric].max_points()
+        assert system_pulse_app.charts['ram_free_mb'].point_count == 2
+        assert system_pulse_app.is_live_chart_range() is False
+
+    def test_metrics_signal_coalesced(self, system_pulse_app, qtbot):
+        with patch.object(system_pulse_app, 'update_ui') as mock_update_ui:
+            system_pulse_app.ui_coalescer._apply = mock_update_ui
+            for value in range(5):
+                system_pulse_app.system_monitor.update_metrics.emit({'cpu_percent': float(value)})
+            qtbot.waitUntil(lambda: mock_update_ui.call_count == 2, timeout=1000)
+
+        assert mock_update_ui.call_args_list[-1].args[0] == {'cpu_percent': 4.0}
+
+    def test_update_io_rates(self, system_pulse_app):
+        system_pulse_app._update_io_rates({
+            'net_rx_bytes_s': 2048.0, 'net_tx_bytes_s': 100.0, 'disk_read_bytes_s': 3 * 1024 ** 2,
+            'disk_write_bytes_s': 0.0, 'disk_read_iops': 12.0, 'disk_write_iops': 0.0
+        })
+
+        text = system_pulse_app.label_IO_rates.text()
+        assert "↓ 2.0 КБ/с" in text
+        assert "↑ 100.0 Б/с" in text
+        assert "чтение 3.0 МБ/с (12 IOPS)" in text
+
+        system_pulse_app.reset_ui_metrics()
+        assert system_pulse_app.label_IO_rates.text() == ""
+
+    def test_sub_second_update_interval(self, system_pulse_app):
+        system_pulse_app.ui.spinBox_update_interval.setValue(0.25)
+        assert system_pulse_app.system_monitor.time_lapse == 0.25
+        assert system_pulse_app.system_monitor.collector.sampler.interval == 0.25
+
     def test_update_ui(self, system_pulse_app):
         test_metrics = {
             'cpu_percent': 50.0,
+            'gpu_load': 25.0,
             'ram_free_mb': 4096,
             'ram_total_mb': 8192,
             'disk_free_gb': 100,
@@ -45,6 +128,7 @@ class TestSystemPulse:
         system_pulse_app.update_ui(test_metrics)
 
         assert system_pulse_app.ui.progressBar_CPU.value() == 50
+        assert system_pulse_app.ui.progressBar_GPU.value() == 25
         assert system_pulse_app.ui.label_RAM_free.text() == "4096 МБ"
         assert system_pulse_app.ui.label_RAM_all.text() == "8192 МБ"
         assert system_pulse_app.ui.label_ROM_free.text() == "100 ГБ"
@@ -73,6 +157,7 @@ class TestSystemPulse:
     def test_update_system_metrics(self, system_pulse_app):
         metrics = {
             'cpu_percent': 50.5,
+            'gpu_load': 75.5,
             'ram_free_mb': 4096,
             'ram_total_mb': 16384,
             'disk_free_gb': 500.25,
@@ -81,37 +166,16 @@ class TestSystemPulse:
         }
         system_pulse_app._update_system_metrics(metrics)
         assert system_pulse_app.ui.progressBar_CPU.value() == 50
+        assert system_pulse_app.ui.progressBar_GPU.value() == 75
         assert system_pulse_app.ui.label_RAM_free.text() == "4096 МБ"
         assert system_pulse_app.ui.label_RAM_all.text() == "16384 МБ"
         assert system_pulse_app.ui.label_ROM_free.text() == "500.25 ГБ"
         assert system_pulse_app.ui.label_ROM_all.text() == "1000 ГБ"
         assert system_pulse_app.ui.label_time.text() == "00:10:30"
 
-    def test_populate_table_row(self, system_pulse_app, qtbot):
-        row_data = [1, 'Test', 3.14159, 42.5]
-        system_pulse_app.ui.tableWidget_DB.setRowCount(0)
-        system_pulse_app.ui.tableWidget_DB.setColumnCount(len(row_data))
-        row_position = system_pulse_app.ui.tableWidget_DB.rowCount()
-        system_pulse_app.ui.tableWidget_DB.insertRow(row_position)
-        system_pulse_app._populate_table_row(row_position, row_data)
-        for col, value in enumerate(row_data):
-            item = system_pulse_app.ui.tableWidget_DB.item(row_position, col)
-            assert item is not None, f"Элемент в столбце {col} не создан"
-
-            if isinstance(value, float):
-                assert item.text() == f"{value:.2f}"
-            else:
-                assert item.text() == str(value)
-
-            assert item.textAlignment() == Qt.AlignCenter
-        empty_row_data = []
-        system_pulse_app.ui.tableWidget_DB.insertRow(row_position + 1)
-        system_pulse_app._populate_table_row(row_position + 1, empty_row_data)
-        assert system_pulse_app.ui.tableWidget_DB.rowCount() == row_position + 2
-
     def test_setup_table_widget(self, system_pulse_app, qtbot):
         system_pulse_app.setup_table_widget()
-        header = system_pulse_app.ui.tableWidget_DB.horizontalHeader()
+        header = system_pulse_app.ui.tableView_DB.horizontalHeader()
         last_column_index = header.count() - 1
         assert header.sectionResizeMode(last_column_index) == QHeaderView.Stretch
 
@@ -170,19 +234,18 @@ class TestSystemPulse:
         system_pulse_app._stop_monitoring_if_active()
         assert system_pulse_app.system_monitor.monitoring == False
 
-    def test_populate_table_row_empty_data(self, system_pulse_app):
-        empty_row_data = []
-        row_position = system_pulse_app.ui.tableWidget_DB.rowCount()
-        system_pulse_app.ui.tableWidget_DB.insertRow(row_position)
-        system_pulse_app._populate_table_row(row_position, empty_row_data)
-        assert system_pulse_app.ui.tableWidget_DB.item(row_position, 0) is None
-
-    def test_clear_database_confirmation(self, system_pulse_app, monkeypatch):
+    def test_clear_database_confirmation(self, system_pulse_app, monkeypatch, qtbot):
         system_pulse_app.start_monitoring()
         monkeypatch.setattr(QMessageBox, 'question', lambda *args: QMessageBox.Yes)
-        system_pulse_app.clear_database()
-        assert system_pulse_app.system_monitor.monitoring == False
-        assert system_pulse_app.ui.pushButton_play.text() == "Начать запись"
+        with qtbot.waitSignal(system_pulse_app.database_clearer.finished, timeout=10000) as blocker:
+            system_pulse_app.clear_database()
+            assert not system_pulse_app.ui.pushButton_remove.isEnabled()
+
+        assert blocker.args[0] >= 0
+        assert system_pulse_app.system_monitor.monitoring == True
+        assert system_pulse_app.ui.pushButton_remove.isEnabled()
+        assert system_pulse_app.progressBar_clear.isHidden()
+        system_pulse_app.stop_monitoring()
 
     def test_clear_database_cancellation(self, system_pulse_app, monkeypatch):
         monkeypatch.setattr(QMessageBox, 'question', lambda *args: QMessageBox.No)
@@ -190,55 +253,116 @@ class TestSystemPulse:
         system_pulse_app.clear_database()
         assert system_pulse_app.system_monitor.monitoring == True
 
+    def test_export_database(self, system_pulse_app, monkeypatch, qtbot, tmp_path):
+        path = str(tmp_path / "history.csv")
+        monkeypatch.setattr(ExportDialog, 'exec', lambda dialog: QDialog.Accepted)
+        monkeypatch.setattr(ExportDialog, 'selection', lambda dialog: (0, 1, 7))
+        monkeypatch.setattr(QFileDialog, 'getSaveFileName', lambda *args: (path, ''))
+        with qtbot.waitSignal(system_pulse_app.metrics_exporter.finished, timeout=10000) as blocker:
+            system_pulse_app.export_database()
+            assert not system_pulse_app.pushButton_export.isEnabled()
+
+        assert blocker.args[0] == 0
+        assert system_pulse_app.pushButton_export.isEnabled()
+        assert system_pulse_app.progressBar_export.isHidden()
+
+    def test_retention_is_opt_in(self, system_pulse_app):
+        assert not system_pulse_app.checkBox_retention.isChecked()
+        assert system_pulse_app.retention_worker._thread is None
+
+        system_pulse_app.checkBox_retention.setChecked(True)
+        assert load_retention_policy(system_pulse_app.database_handler) == RetentionPolicy()
+        assert system_pulse_app.retention_worker._thread is not None
+
+        system_pulse_app.checkBox_retention.setChecked(False)
+        assert load_retention_policy(system_pulse_app.database_handler) is None
+        assert system_pulse_app.retention_worker._stop_event.is_set()
+
+    def test_retention_toggle_does_not_block(self, system_pulse_app, qtbot):
+        worker = system_pulse_app.retention_worker
+        release = threading.Event()
+        passes = []
+
+        def run_once():
+            passes.append(1)
+            release.wait(5)
+
+        worker.run_once = run_once
+        system_pulse_app.checkBox_retention.setChecked(True)
+        qtbot.waitUntil(lambda: len(passes) == 1, timeout=5000)
+        thread = worker._thread
+
+        started = time.monotonic()
+        system_pulse_app.checkBox_retention.setChecked(False)
+        system_pulse_app.checkBox_retention.setChecked(True)
+        system_pulse_app.checkBox_retention.setChecked(False)
+        assert time.monotonic() - started < 1
+        assert worker._thread is thread
+
+        release.set()
+        thread.join(5)
+        assert not thread.is_alive()
+        assert worker._thread is None
+
+    def test_export_database_cancelled_dialog(self, system_pulse_app, monkeypatch):
+        monkeypatch.setattr(ExportDialog, 'exec', lambda dialog: QDialog.Rejected)
+        monkeypatch.setattr(QFileDialog, 'getSaveFileName', MagicMock(return_value=('', '')))
+        system_pulse_app.export_database()
+        assert not QFileDialog.getSaveFileName.called
+
+        monkeypatch.setattr(ExportDialog, 'exec', lambda dialog: QDialog.Accepted)
+        system_pulse_app.export_database()
+        assert not system_pulse_app.metrics_exporter.running
+
     def test_setup_table_widget_resize(self, system_pulse_app):
         mock_event = MagicMock()
         system_pulse_app.setup_table_widget()
-        system_pulse_app.ui.tableWidget_DB.resizeEvent(mock_event)
-        header = system_pulse_app.ui.tableWidget_DB.horizontalHeader()
+        system_pulse_app.ui.tableView_DB.resizeEvent(mock_event)
+        header = system_pulse_app.ui.tableView_DB.horizontalHeader()
         last_column_index = header.count() - 1
         assert header.sectionResizeMode(last_column_index) == QHeaderView.Stretch
 
-    def test_show_database_metrics_population(self, system_pulse_app, monkeypatch):
+    def test_show_database_metrics_population(self, system_pulse_app, monkeypatch, qtbot):
         test_metrics = [
-            (1, '2024-01-15', 'CPU', 50.5, 'Test1'),
-            (2, '2024-01-16', 'RAM', 60.7, 'Test2')
+            (1, 1, '2024-01-15', '00:01', 50.5, 1.0, 4096.0, 8192.0, 100.0, 500.0),
+            (2, 1, '2024-01-16', '00:02', 60.7, 2.0, 4096.0, 8192.0, 100.0, 500.0)
         ]
+        requested_ids = []
 
-        def mock_get_all_metric():
-            return test_metrics
+        def mock_get_metrics_since(last_id, limit=None):
+            requested_ids.append(last_id)
+            return [row for row in test_metrics if row[0] > last_id]
 
-        monkeypatch.setattr(system_pulse_app.database_handler, 'get_all_metric', mock_get_all_metric)
-        mock_populate_calls = []
+        monkeypatch.setattr(system_pulse_app.database_handler, 'get_metrics_since', mock_get_metrics_since)
+        model = system_pulse_app.metrics_model
+        model.reload()
+        while model.canFetchMore():
+            model.fetchMore()
 
-        def mock_populate_table_row(row_position, row_data):
-            mock_populate_calls.append((row_position, row_data))
-
-        monkeypatch.setattr(system_pulse_app, '_populate_table_row', mock_populate_table_row)
         system_pulse_app.show_database_metrics()
-        assert len(mock_populate_calls) == len(test_metrics), "Должны быть заполнены все строки"
-        for i, (row_position, row_data) in enumerate(mock_populate_calls):
-            assert row_position == i, f"Неверная позиция строки для записи {i}"
-            assert row_data == list(test_metrics[i]), f"Неверные данные для строки {i}"
+        assert model.wait(5)
+        qtbot.waitUntil(lambda: model.rowCount() == len(test_metrics), timeout=5000)
+        assert requested_ids[-1] == 2, "Должны запрашиваться только новые строки"
+        assert model.data(model.index(1, 4)) == "60.70"
+        assert system_pulse_app.ui.tableView_DB.model() is model
 
     def test_show_database_metrics_empty(self, system_pulse_app, monkeypatch):
-        monkeypatch.setattr(system_pulse_app.database_handler, 'get_all_metric', lambda: [])
-        mock_populate_calls = []
-        def mock_populate_table_row(row_position, row_data):
-            mock_populate_calls.append((row_position, row_data))
-        monkeypatch.setattr(system_pulse_app, '_populate_table_row', mock_populate_table_row)
-        system_pulse_app.ui.tableWidget_DB.setRowCount(0)
+        monkeypatch.setattr(system_pulse_app.database_handler, 'get_metrics_since', lambda last_id, limit=None: [])
+        model = system_pulse_app.metrics_model
+        model.reload()
+        while model.canFetchMore():
+            model.fetchMore()
+
         system_pulse_app.show_database_metrics()
-        assert len(mock_populate_calls) == 0, "Не должно быть попыток заполнения при пустой базе"
-        assert system_pulse_app.ui.tableWidget_DB.rowCount() == 0, "Таблица должна остаться пустой"
+        assert model.wait(5)
+        assert model.rowCount() == 0, "Таблица должна остаться пустой"
 
     def test_show_database_metrics_exception_handling(self, system_pulse_app, caplog):
         caplog.set_level(logging.ERROR)
-        with patch.object(system_pulse_app.database_handler, 'get_all_metric',
+        with patch.object(system_pulse_app.metrics_model, 'append_new_rows',
                           side_effect=Exception("Тестовая ошибка базы данных")), \
-                patch.object(system_pulse_app.ui.tableWidget_DB, 'setRowCount') as mock_set_row_count, \
                 patch.object(system_pulse_app, 'logger') as mock_logger:
             system_pulse_app.show_database_metrics()
-            mock_set_row_count.assert_called_once_with(0)
             mock_logger.error.assert_called_once_with(
                 "Ошибка отображения метрик: Тестовая ошибка базы данных",
                 exc_info=True
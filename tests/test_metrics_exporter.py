@@ -0,0 +1,30 @@
+import os
+import pytest
+
+from src.database import DatabaseHandler
+from src.UI.metrics_exporter import MetricsExporter
+from tests.helpers import make_metrics
+
+
+class TestMetricsExporter:
+    @pytest.fixture
+    def database_handler(self, tmp_path):
+        handler = DatabaseHandler(db_name=str(tmp_path / "exporter.db"), persistent=True)
+        yield handler
+        handler.close()
+
+    def test_export_in_background(self, database_handler, tmp_path, qtbot):
+        assert database_handler.adding_data_batch([make_metrics() for _ in range(30)]) == 30
+        exporter = MetricsExporter(database_handler, chunk_size=10)
+        progress = []
+        exporter.progress.connect(progress.append)
+        path = str(tmp_path / "history.csv")
+
+        with qtbot.waitSignal(exporter.finished, timeout=5000) as blocker:
+            assert exporter.start(path)
+            assert not exporter.start(path)
+
+        assert blocker.args == [30]
+        assert progress[-1] == 100
+        assert exporter.wait(5)
+        assert os.path.exists(path)
@@ -0,0 +1,113 @@
+import threading
+import pytest
+from PySide6.QtCore import Qt, QModelIndex
+
+from src.database import DatabaseHandler
+from src.UI.metrics_table_model import MetricsTableModel, HEADERS
+from tests.helpers import make_metrics
+
+
+class TestMetricsTableModel:
+    @pytest.fixture
+    def database_handler(self, tmp_path):
+        handler = DatabaseHandler(db_name=str(tmp_path / "model.db"), persistent=True)
+        yield handler
+        handler.close()
+
+    @pytest.fixture
+    def model(self, qapp, database_handler):
+        return MetricsTableModel(database_handler, page_size=4)
+
+    def test_headers(self, model):
+        assert model.columnCount() == len(HEADERS)
+        assert model.headerData(4, Qt.Horizontal) == 'ЦП (%)'
+
+    def test_lazy_paging(self, model, database_handler):
+        database_handler.adding_data_batch([make_metrics(cpu_percent=i) for i in range(10)])
+        assert model.rowCount() == 0
+        assert model.canFetchMore() is True
+
+        model.fetchMore()
+        assert model.rowCount() == 4
+
+        while model.canFetchMore():
+            model.fetchMore()
+        assert model.rowCount() == 10
+
+    def test_reload_shows_compacted_rows(self, model, database_handler):
+        base = 10 * 3_600_000
+        database_handler.adding_data_batch(
+            [make_metrics(base + i * 1000, cpu_percent=i) for i in range(6)]
+            + [make_metrics(base + 3_600_000, cpu_percent=6)]
+        )
+        assert database_handler.compact_window(base) == 6
+
+        model.reload()
+        while model.canFetchMore():
+            model.fetchMore()
+
+        assert model.rowCount() == 7
+        assert [model.data(model.index(row, 0)) for row in range(7)] == [str(i) for i in range(1, 8)]
+        assert model.data(model.index(2, 3)) == '00:01'
+        assert model.data(model.index(2, 4)) == '2.00'
+
+    def test_data_formatting(self, model, database_handler):
+        database_handler.adding_data(make_metrics(cpu_percent=3.14159))
+        model.fetchMore()
+        assert model.data(model.index(0, 0)) == '1'
+        assert model.data(model.index(0, 4)) == '3.14'
+        assert model.data(model.index(0, 4), Qt.TextAlignmentRole) == Qt.AlignCenter
+        assert model.data(QModelIndex()) is None
+
+    def test_append_new_rows(self, model, database_handler, qtbot):
+        database_handler.adding_data(make_metrics(cpu_percent=1))
+        model.fetchMore()
+        assert model.canFetchMore() is False
+
+        inserted = []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+        database_handler.adding_data_batch([make_metrics(cpu_percent=2), make_metrics(cpu_percent=3)])
+        assert model.append_new_rows() is True
+        assert model.rowCount() == 1
+
+        qtbot.waitUntil(lambda: model.rowCount() == 3, timeout=5000)
+        assert inserted == [(1, 2)]
+
+    def test_append_new_rows_off_gui_thread(self, model, database_handler, qtbot):
+        model.fetchMore()
+        threads = []
+        get_metrics_since = database_handler.get_metrics_since
+
+        def record_thread(last_id, limit=None):
+            threads.append(threading.current_thread())
+            return get_metrics_since(last_id, limit)
+
+        database_handler.get_metrics_since = record_thread
+        database_handler.adding_data(make_metrics(cpu_percent=1))
+        assert model.append_new_rows() is True
+        qtbot.waitUntil(lambda: model.rowCount() == 1, timeout=5000)
+        assert threads and threads[0] is not threading.main_thread()
+
+    def test_append_new_rows_waits_for_fetch_more(self, model, database_handler):
+        database_handler.adding_data_batch([make_metrics(cpu_percent=i) for i in range(6)])
+        model.fetchMore()
+        assert model.append_new_rows() is False
+        assert model.rowCount() == 4
+
+    def test_rows_fetched_before_reload_discarded(self, model, database_handler, qtbot):
+        model.fetchMore()
+        database_handler.adding_data(make_metrics(cpu_percent=1))
+        assert model.append_new_rows() is True
+        model.reload()
+        assert model.wait(5)
+        qtbot.wait(10)
+        assert model.rowCount() == 0
+
+    def test_reload(self, model, database_handler):
+        database_handler.adding_data(make_metrics(cpu_percent=1))
+        model.fetchMore()
+        database_handler.clear_all_metric()
+        model.reload()
+        assert model.rowCount() == 0
+        model.fetchMore()
+        assert model.rowCount() == 0
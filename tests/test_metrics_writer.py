@@ -0,0 +1,132 @@
+import os
+import time
+import pytest
+
+from src.database import DatabaseHandler
+from src.metrics_writer import MetricsWriter
+from tests.helpers import make_metrics
+
+
+class TestMetricsWriter:
+    @pytest.fixture
+    def database_handler(self, tmp_path):
+        handler = DatabaseHandler(db_name=str(tmp_path / "writer.db"), persistent=True)
+        yield handler
+        handler.close()
+
+    def test_invalid_policy(self, database_handler):
+        with pytest.raises(ValueError):
+            MetricsWriter(database_handler, overflow_policy='ignore')
+
+    def test_flush_writes_batch(self, database_handler):
+        writer = MetricsWriter(database_handler, batch_size=10)
+        for i in range(5):
+            writer.submit(make_metrics(cpu_percent=i))
+
+        assert writer.pending == 5
+        assert database_handler.get_all_metric() == []
+        assert writer.flush() == 5
+        assert writer.pending == 0
+        assert [row[4] for row in database_handler.get_all_metric()] == [0, 1, 2, 3, 4]
+
+    def test_flush_on_batch_size(self, database_handler):
+        writer = MetricsWriter(database_handler, batch_size=3, flush_interval_ms=60000)
+        writer.start()
+        for i in range(3):
+            writer.submit(make_metrics(cpu_percent=i))
+
+        deadline = time.monotonic() + 5
+        while writer.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(database_handler.get_all_metric()) == 3
+        writer.close()
+
+    def test_flush_on_interval(self, database_handler):
+        writer = MetricsWriter(database_handler, batch_size=100, flush_interval_ms=50)
+        writer.start()
+        writer.submit(make_metrics())
+
+        deadline = time.monotonic() + 5
+        while writer.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(database_handler.get_all_metric()) == 1
+        writer.close()
+
+    def test_close_performs_final_flush(self, database_handler):
+        writer = MetricsWriter(database_handler, batch_size=100, flush_interval_ms=60000)
+        writer.start()
+        for i in range(7):
+            writer.submit(make_metrics(cpu_percent=i))
+
+        writer.close()
+        assert len(database_handler.get_all_metric()) == 7
+
+    def test_drop_oldest_policy(self, database_handler):
+        writer = MetricsWriter(database_handler, batch_size=2, max_queue_size=3, overflow_policy='drop_oldest')
+        for i in range(5):
+            assert writer.submit(make_metrics(cpu_percent=i)) is True
+
+        assert writer.dropped_count == 2
+        writer.flush()
+        assert [row[4] for row in database_handler.get_all_metric()] == [2, 3, 4]
+
+    def test_spill_policy(self, database_handler, tmp_path):
+        spill_path = str(tmp_path / "writer.spill")
+        writer = MetricsWriter(
+            database_handler, batch_size=2, max_queue_size=2,
+            overflow_policy='spill', spill_path=spill_path
+        )
+        for i in range(4):
+            assert writer.submit(make_metrics(cpu_percent=i)) is True
+
+        assert writer.spilled_count == 2
+        assert writer.flush() == 4
+        assert [row[4] for row in database_handler.get_all_metric()] == [0, 1, 2, 3]
+
+    def test_failed_write_keeps_queue_and_spill(self, database_handler, tmp_path, monkeypatch):
+        spill_path = str(tmp_path / "writer.spill")
+        writer = MetricsWriter(
+            database_handler, batch_size=2, max_queue_size=2,
+            overflow_policy='spill', spill_path=spill_path
+        )
+        for i in range(3):
+            writer.submit(make_metrics(cpu_percent=i))
+
+        adding_data_batch = database_handler.adding_data_batch
+        monkeypatch.setattr(database_handler, 'adding_data_batch', lambda batch: 0)
+        assert writer.flush() == 0
+        assert writer.pending == 2
+        assert os.path.exists(spill_path + '.flushing')
+
+        writer.submit(make_metrics(cpu_percent=3))
+        writer.submit(make_metrics(cpu_percent=4))
+        monkeypatch.setattr(database_handler, 'adding_data_batch', adding_data_batch)
+        assert writer.flush() == 5
+        assert sorted(row[4] for row in database_handler.get_all_metric()) == [0, 1, 2, 3, 4]
+        assert not os.path.exists(spill_path) and not os.path.exists(spill_path + '.flushing')
+
+    def test_invalid_metrics_rejected(self, database_handler):
+        writer = MetricsWriter(database_handler)
+        assert writer.submit({'cpu_percent': 1.0}) is False
+        assert writer.dropped_count == 1 and writer.pending == 0
+
+    def test_block_policy_without_writer_thread(self, database_handler):
+        writer = MetricsWriter(database_handler, batch_size=1, max_queue_size=1, overflow_policy='block')
+        assert writer.submit(make_metrics(cpu_percent=0)) is True
+        assert writer.submit(make_metrics(cpu_percent=1)) is False
+        assert writer.dropped_count == 1
+
+    def test_block_policy_waits_for_flush(self, database_handler):
+        writer = MetricsWriter(
+            database_handler, batch_size=1, max_queue_size=1,
+            flush_interval_ms=10, overflow_policy='block'
+        )
+        writer.start()
+        for i in range(20):
+            assert writer.submit(make_metrics(cpu_percent=i)) is True
+
+        writer.close()
+        assert writer.dropped_count == 0
+        assert len(database_handler.get_all_metric()) == 20
@@ -0,0 +1,85 @@
+import os
+import pytest
+
+from src.proc_reader import ProcReader
+
+MEMINFO = (
+    "MemTotal:        8192000 kB\n"
+    "MemFree:         1024000 kB\n"
+    "MemAvailable:    4096000 kB\n"
+    "Buffers:          100000 kB\n"
+)
+
+
+def write_stat(path, user, system, idle, iowait=0, steal=0, guest=0):
+    path.write_text(
+        f"cpu  {user} 0 {system} {idle} {iowait} 0 0 {steal} {guest} 0\n"
+        f"cpu0 {user} 0 {system} {idle} {iowait} 0 0 {steal} {guest} 0\n"
+        "intr 12345 0 0\n"
+    )
+
+
+@pytest.mark.skipif(not hasattr(os, 'preadv'), reason="os.preadv недоступен")
+class TestProcReader:
+    @pytest.fixture
+    def proc_files(self, tmp_path):
+        stat_path = tmp_path / "stat"
+        meminfo_path = tmp_path / "meminfo"
+        write_stat(stat_path, user=100, system=100, idle=800)
+        meminfo_path.write_text(MEMINFO)
+        return stat_path, meminfo_path
+
+    @pytest.fixture
+    def reader(self, proc_files):
+        reader = ProcReader(str(proc_files[0]), str(proc_files[1]))
+        yield reader
+        reader.close()
+
+    def test_read_cpu_times(self, reader, proc_files):
+        write_stat(proc_files[0], user=150, system=50, idle=900, iowait=10, steal=5)
+        assert reader.read_cpu_times() == [(150, 0, 50, 900, 10, 0, 0, 5)] * 2
+
+    def test_stale_buffer_tail_ignored(self, reader, proc_files):
+        proc_files[0].write_text("cpu  1 0 1 1 0 0 0 0\ncpu0 1 0 1 1 0 0 0 0\ncpu1 1 0 1 1 0 0 0 0\n")
+        assert len(reader.read_cpu_times()) == 3
+
+        proc_files[0].write_text("cpu  2 0 2 2 0 0 0 0\n")
+        assert reader.read_cpu_times() == [(2, 0, 2, 2, 0, 0, 0, 0)]
+
+    def test_large_stat_grows_buffer(self, tmp_path, proc_files):
+        stat_path = tmp_path / "large_stat"
+        stat_path.write_text("".join(f"cpu{index} 1 0 1 1 0 0 0 0\n" for index in range(5000)))
+        reader = ProcReader(str(stat_path), str(proc_files[1]))
+        assert len(reader.read_cpu_times()) == 5000
+        reader.close()
+
+    def test_get_ram_info(self, reader):
+        assert reader.get_ram_info() == (4000.0, 8000.0)
+
+    def test_files_kept_open_between_reads(self, reader, proc_files):
+        fds = (reader._stat.fd, reader._meminfo.fd)
+        buffers = (reader._stat.buffer, reader._meminfo.buffer)
+        reader.read_cpu_times()
+        reader.get_ram_info()
+        assert (reader._stat.fd, reader._meminfo.fd) == fds
+        assert reader._stat.buffer is buffers[0] and reader._meminfo.buffer is buffers[1]
+
+    def test_missing_meminfo_field(self, reader, proc_files):
+        proc_files[1].write_text("MemTotal: 1024 kB\n")
+        with pytest.raises(ValueError):
+            reader.get_ram_info()
+
+    def test_close_is_idempotent(self, reader):
+        reader.close()
+        reader.close()
+        assert reader._stat.fd == reader._meminfo.fd == -1
+
+    @pytest.mark.skipif(not ProcReader.is_supported(), reason="/proc недоступен")
+    def test_real_proc(self):
+        reader = ProcReader()
+        try:
+            assert len(reader.read_cpu_times()) >= 2
+            available_mb, total_mb = reader.get_ram_info()
+            assert 0 < available_mb <= total_mb
+        finally:
+            reader.close()
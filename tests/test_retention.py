@@ -0,0 +1,185 @@
+import time
+import threading
+import pytest
+from unittest.mock import patch
+
+from src.database import DatabaseHandler
+from src.retention import (
+    DAY_MS, RETENTION_SETTING, ClearJob, RetentionPolicy, RetentionWorker, load_retention_policy,
+    save_retention_policy
+)
+from tests.helpers import make_metrics
+
+
+NOW_MS = 100 * DAY_MS
+
+
+class TestRetentionPolicy:
+    def test_cutoffs(self):
+        policy = RetentionPolicy(raw_days=1, rollup_days={'1m': 10, '1h': None})
+        assert policy.cutoffs(NOW_MS) == {'raw': NOW_MS - DAY_MS, '1m': NOW_MS - 10 * DAY_MS}
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            RetentionPolicy(rollup_days={'1d': 10})
+        with pytest.raises(ValueError):
+            RetentionPolicy(raw_days=0)
+
+
+class TestRetentionWorker:
+    @pytest.fixture
+    def database_handler(self, tmp_path):
+        handler = DatabaseHandler(db_name=str(tmp_path / "retention.db"), persistent=True)
+        yield handler
+        handler.close()
+
+    def test_run_once_deletes_expired_data(self, database_handler):
+        old = [make_metrics(NOW_MS - 3 * DAY_MS + index * 1000) for index in range(50)]
+        recent = [make_metrics(NOW_MS - index * 1000) for index in range(1, 6)]
+        assert database_handler.adding_data_batch(old + recent) == 55
+
+        worker = RetentionWorker(
+            database_handler,
+            RetentionPolicy(raw_days=1, rollup_days={'1m': 2, '1h': None}, compress_after_days=None),
+            chunk_size=7, chunk_pause_sec=0
+        )
+        deleted = worker.run_once(NOW_MS)
+
+        assert deleted['raw'] == 50
+        assert deleted['1m'] > 0
+        assert len(database_handler.get_metrics_range(0, 2 ** 62)) == 5
+        with database_handler._get_connection() as conn:
+            minutes = conn.execute("SELECT MIN(bucket_ms) FROM metrics_rollup_1m").fetchone()[0]
+            hours = conn.execute("SELECT MIN(bucket_ms) FROM metrics_rollup_1h").fetchone()[0]
+        assert minutes == NOW_MS - 60_000
+        assert hours == NOW_MS - 3 * DAY_MS
+        assert database_handler.get_storage_stats()['auto_vacuum'] == 2
+        assert database_handler.get_storage_stats()['freelist_count'] == 0
+
+    def test_run_once_compacts_closed_windows(self, database_handler):
+        old = [make_metrics(NOW_MS - 2 * DAY_MS + index * 1000) for index in range(30)]
+        assert database_handler.adding_data_batch(old + [make_metrics(NOW_MS)]) == 31
+
+        worker = RetentionWorker(database_handler, RetentionPolicy(raw_days=None, rollup_days={}), chunk_pause_sec=0)
+        assert worker.run_once(NOW_MS) == {}
+
+        assert database_handler.get_block_stats()['rows'] == 30
+        assert [row[0] for row in database_handler.get_metrics_since(0)] == list(range(1, 32))
+        assert [row[0] for row in database_handler.get_series(('cpu_percent',), 0, NOW_MS)] == [
+            metrics['timestamp_ms'] for metrics in old
+        ] + [NOW_MS]
+
+        worker = RetentionWorker(database_handler, RetentionPolicy(raw_days=1, rollup_days={}), chunk_pause_sec=0)
+        assert worker.run_once(NOW_MS) == {'raw': 30}
+        assert database_handler.get_block_stats()['rows'] == 0
+
+    def test_run_once_without_expired_data(self, database_handler):
+        assert database_handler.adding_data(make_metrics(NOW_MS))
+        assert RetentionWorker(database_handler).run_once(NOW_MS) == {'raw': 0, '1m': 0, '1h': 0}
+
+    def test_background_thread(self, database_handler):
+        assert database_handler.adding_data(make_metrics(1000))
+        worker = RetentionWorker(database_handler, check_interval_sec=60)
+        worker.start()
+        deadline = time.monotonic() + 5
+        while database_handler.get_metrics_range(0, 2 ** 62) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        worker.close()
+
+        assert database_handler.get_metrics_range(0, 2 ** 62) == []
+        assert worker._thread is None
+
+    def test_cancel_does_not_wait_and_start_resumes(self, database_handler):
+        worker = RetentionWorker(database_handler, check_interval_sec=60)
+        release = threading.Event()
+        passes = []
+
+        def run_once():
+            passes.append(1)
+            release.wait(5)
+
+        worker.run_once = run_once
+        worker.start()
+        deadline = time.monotonic() + 5
+        while not passes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        thread = worker._thread
+
+        worker.cancel()
+        assert thread.is_alive()
+        worker.start()
+        assert worker._thread is thread
+
+        release.set()
+        time.sleep(0.05)
+        assert thread.is_alive()
+        worker.close()
+        assert not thread.is_alive()
+        assert worker._thread is None
+
+    def test_policy_setting(self, database_handler):
+        assert load_retention_policy(database_handler) is None
+
+        policy = RetentionPolicy(raw_days=3.5, rollup_days={'1m': None, '1h': 30}, compress_after_days=None)
+        assert save_retention_policy(database_handler, policy)
+        assert load_retention_policy(database_handler) == policy
+
+        database_handler.set_setting(RETENTION_SETTING, '{"raw_days": -1}')
+        assert load_retention_policy(database_handler) is None
+
+        assert save_retention_policy(database_handler, None)
+        assert database_handler.get_setting(RETENTION_SETTING) is None
+
+    def test_invalid_chunk_size(self, database_handler):
+        with pytest.raises(ValueError):
+            RetentionWorker(database_handler, chunk_size=0)
+
+
+class TestClearJob:
+    @pytest.fixture
+    def database_handler(self, tmp_path):
+        handler = DatabaseHandler(db_name=str(tmp_path / "clear.db"), persistent=True)
+        yield handler
+        handler.close()
+
+    def test_run_keeps_rows_written_during_clear(self, database_handler):
+        assert database_handler.adding_data_batch([make_metrics(NOW_MS - DAY_MS + index) for index in range(25)]) == 25
+        progress = []
+
+        def on_progress(percent: int):
+            if not progress:
+                database_handler.adding_data(make_metrics(NOW_MS))
+            progress.append(percent)
+
+        assert ClearJob(database_handler, chunk_size=10, chunk_pause_sec=0).run(on_progress) == 25
+        assert progress == [40, 80, 99, 100]
+        assert [row[10] for row in database_handler.get_metrics_range(0, 2 ** 62)] == [NOW_MS]
+        with database_handler._get_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM metrics_rollup_1m WHERE bucket_ms < ?",
+                                (NOW_MS - 60_000,)).fetchone()[0] == 0
+
+    def test_run_counts_compressed_rows(self, database_handler):
+        windows = [NOW_MS - DAY_MS - hour * 3_600_000 for hour in range(3)]
+        for window_start in windows:
+            batch = [make_metrics(window_start + index * 1000) for index in range(4)]
+            assert database_handler.adding_data_batch(batch) == 4
+        for window_start in windows:
+            assert database_handler.compact_window(window_start) == 4
+
+        with patch.object(database_handler, 'delete_blocks', wraps=database_handler.delete_blocks) as delete_blocks:
+            assert ClearJob(database_handler, chunk_size=2, chunk_pause_sec=0).run() == 12
+        assert delete_blocks.call_count == 2
+        assert database_handler.get_block_stats()['blocks'] == 0
+
+    def test_cancel(self, database_handler):
+        assert database_handler.adding_data_batch([make_metrics(NOW_MS + index) for index in range(5)]) == 5
+        job = ClearJob(database_handler, chunk_size=2, chunk_pause_sec=0)
+        progress = []
+
+        def on_progress(percent: int):
+            progress.append(percent)
+            job.cancel()
+
+        assert job.run(on_progress) == 2
+        assert progress == [40]
+        assert len(database_handler.get_metrics_range(0, 2 ** 62)) == 3
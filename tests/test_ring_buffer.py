@@ -0,0 +1,145 @@
+import math
+import pytest
+
+from src.ring_buffer import (
+    HISTORY_METRICS, ITEM_SIZE, MetricsHistory, RingBuffer, SegmentedView, bytes_per_hour, history_capacity
+)
+
+
+class TestRingBuffer:
+    def test_append_before_wrap(self):
+        buffer = RingBuffer(4)
+        for value in (1.0, 2.0, 3.0):
+            buffer.append(value)
+
+        assert len(buffer) == 3
+        assert list(buffer) == [1.0, 2.0, 3.0]
+        assert buffer.latest() == 3.0
+
+    def test_wraparound_keeps_order(self):
+        buffer = RingBuffer(4)
+        for value in range(1, 7):
+            buffer.append(value)
+
+        older, newer = buffer.segments()
+        assert list(older) == [3.0, 4.0]
+        assert list(newer) == [5.0, 6.0]
+        assert list(buffer) == [3.0, 4.0, 5.0, 6.0]
+
+    def test_segments_with_count(self):
+        buffer = RingBuffer(4)
+        for value in range(1, 7):
+            buffer.append(value)
+
+        assert [list(segment) for segment in buffer.segments(3)] == [[4.0], [5.0, 6.0]]
+        assert [list(segment) for segment in buffer.segments(1)] == [[6.0], []]
+        assert list(chain_segments(buffer.segments(10))) == [3.0, 4.0, 5.0, 6.0]
+
+    def test_segments_are_views_without_copy(self):
+        buffer = RingBuffer(4)
+        buffer.append(1.0)
+        older, _ = buffer.segments()
+        assert isinstance(older, memoryview)
+        assert older.obj is buffer._data
+
+    def test_memory_is_preallocated(self):
+        buffer = RingBuffer(1000)
+        assert buffer.nbytes == 1000 * ITEM_SIZE
+        for value in range(5000):
+            buffer.append(value)
+        assert buffer.nbytes == 1000 * ITEM_SIZE
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            RingBuffer(0)
+
+    def test_resize_keeps_latest_values(self):
+        buffer = RingBuffer(4)
+        for value in range(1, 7):
+            buffer.append(value)
+
+        buffer.resize(3)
+        assert buffer.capacity == 3
+        assert list(buffer) == [4.0, 5.0, 6.0]
+
+        buffer.resize(5)
+        buffer.append(7.0)
+        assert list(buffer) == [4.0, 5.0, 6.0, 7.0]
+        assert buffer.nbytes == 5 * ITEM_SIZE
+
+        with pytest.raises(ValueError):
+            buffer.resize(0)
+
+    def test_clear(self):
+        buffer = RingBuffer(2)
+        buffer.append(1.0)
+        buffer.clear()
+        assert len(buffer) == 0
+        assert buffer.latest() is None
+
+
+def test_segmented_view_indexing():
+    buffer = RingBuffer(4)
+    for value in range(1, 7):
+        buffer.append(value)
+    view = SegmentedView(*buffer.segments())
+
+    assert len(view) == 4
+    assert [view[index] for index in range(4)] == [3.0, 4.0, 5.0, 6.0]
+    assert view[-1] == 6.0
+    assert list(view) == [3.0, 4.0, 5.0, 6.0]
+
+
+def chain_segments(segments):
+    for segment in segments:
+        yield from segment
+
+
+class TestMetricsHistory:
+    def test_append_and_stats(self):
+        history = MetricsHistory(capacity=3)
+        for index, cpu in enumerate((10.0, 20.0, 30.0, 60.0)):
+            history.append({'timestamp_ms': index * 1000, 'cpu_percent': cpu})
+
+        assert len(history) == 3
+        assert list(chain_segments(history.timestamps.segments())) == [1000, 2000, 3000]
+        assert history.stats('cpu_percent') == {'min': 20.0, 'max': 60.0, 'avg': 110.0 / 3, 'last': 60.0}
+        assert history.stats('cpu_percent', count=2)['avg'] == 45.0
+
+    def test_missing_metrics_stored_as_nan(self):
+        history = MetricsHistory(capacity=3)
+        history.append({'timestamp_ms': 0})
+
+        assert math.isnan(history.buffers['gpu_load'].latest())
+        assert history.stats('gpu_load') is None
+
+    def test_samples_without_timestamp_ignored(self):
+        history = MetricsHistory(capacity=3)
+        history.append({})
+        assert len(history) == 0
+
+    def test_memory_bound(self):
+        history = MetricsHistory(capacity=6000)
+        assert history.nbytes == (len(HISTORY_METRICS) + 1) * 6000 * ITEM_SIZE
+
+    def test_resize(self):
+        history = MetricsHistory(capacity=3)
+        for index in range(3):
+            history.append({'timestamp_ms': index * 1000, 'cpu_percent': float(index)})
+
+        history.resize(2)
+        assert history.capacity == 2
+        assert list(chain_segments(history.timestamps.segments())) == [1000, 2000]
+        assert history.stats('cpu_percent')['min'] == 1.0
+
+    def test_history_capacity(self):
+        assert history_capacity(1.0) == 1800
+        assert history_capacity(0.1) == 18_000
+        assert history_capacity(0.3, minutes=1) == 200
+        assert history_capacity(60, minutes=0.5) == 1
+        with pytest.raises(ValueError):
+            history_capacity(0)
+
+    def test_bytes_per_hour(self):
+        assert bytes_per_hour(1.0) == 28_800
+        assert bytes_per_hour(0.1) == 288_000
@@ -0,0 +1,42 @@
+from src.rollups import PercentileTracker, aggregate, bucket_start, percentile
+
+
+def test_bucket_start():
+    assert bucket_start(125_000, 60_000) == 120_000
+    assert bucket_start(120_000, 60_000) == 120_000
+
+
+def test_percentile_nearest_rank():
+    assert percentile(list(range(1, 101))) == 95
+    assert percentile([5.0]) == 5.0
+    assert percentile([]) is None
+
+
+def test_aggregate_by_bucket():
+    samples = [
+        (1_000, {'cpu_percent': 10.0, 'gpu_load': None}),
+        (59_000, {'cpu_percent': 30.0, 'gpu_load': 5.0}),
+        (61_000, {'cpu_percent': 50.0, 'gpu_load': 7.0}),
+    ]
+    result = aggregate(samples, 60_000, metrics=('cpu_percent', 'gpu_load'))
+
+    assert result[('cpu_percent', 0)] == [2, 40.0, 10.0, 30.0]
+    assert result[('gpu_load', 0)] == [1, 5.0, 5.0, 5.0]
+    assert result[('cpu_percent', 60_000)] == [1, 50.0, 50.0, 50.0]
+
+
+class TestPercentileTracker:
+    def test_percentile_written_when_bucket_closes(self):
+        tracker = PercentileTracker(60_000, metrics=('cpu_percent',))
+        assert tracker.add([(ts, {'cpu_percent': float(ts // 1000)}) for ts in range(0, 60_000, 1000)]) == []
+
+        closed = tracker.add([(60_000, {'cpu_percent': 1.0})])
+        assert closed == [(56.0, 'cpu_percent', 0)]
+        assert tracker.close() == [(1.0, 'cpu_percent', 60_000)]
+        assert tracker.close() == []
+
+    def test_late_samples_ignored(self):
+        tracker = PercentileTracker(60_000, metrics=('cpu_percent',))
+        tracker.add([(120_000, {'cpu_percent': 10.0})])
+        tracker.add([(1_000, {'cpu_percent': 99.0})])
+        assert tracker.close() == [(10.0, 'cpu_percent', 120_000)]
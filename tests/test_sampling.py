@@ -0,0 +1,144 @@
+import threading
+import time
+import pytest
+
+from src.sampling import SamplingThread
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+class TestSamplingThread:
+    def test_callback_runs_off_calling_thread(self):
+        threads = []
+        sampler = SamplingThread(lambda tick: threads.append(threading.current_thread()), interval=0.01)
+        sampler.start()
+        assert wait_for(lambda: len(threads) >= 3)
+        sampler.stop()
+
+        assert sampler.is_running is False
+        assert all(thread is not threading.main_thread() for thread in threads)
+
+    def test_no_callbacks_after_stop(self):
+        calls = []
+        sampler = SamplingThread(lambda tick: calls.append(1), interval=0.01)
+        sampler.start()
+        assert wait_for(lambda: len(calls) >= 1)
+        sampler.stop()
+        count = len(calls)
+        time.sleep(0.05)
+        assert len(calls) == count
+
+    def test_set_interval_applies_to_waiting_tick(self):
+        calls = []
+        sampler = SamplingThread(lambda tick: calls.append(1), interval=60)
+        sampler.start()
+        sampler.set_interval(0.01)
+        assert wait_for(lambda: len(calls) >= 1, timeout=2)
+        sampler.stop()
+
+    def test_invalid_interval(self):
+        sampler = SamplingThread(lambda tick: None)
+        with pytest.raises(ValueError):
+            sampler.set_interval(0)
+
+    def test_callback_exception_does_not_stop_thread(self):
+        calls = []
+
+        def callback(tick):
+            calls.append(1)
+            raise RuntimeError("Test error")
+
+        sampler = SamplingThread(callback, interval=0.01)
+        sampler.start()
+        assert wait_for(lambda: len(calls) >= 2)
+        sampler.stop()
+
+    def test_restart(self):
+        calls = []
+        sampler = SamplingThread(lambda tick: calls.append(1), interval=0.01)
+        sampler.start()
+        sampler.stop()
+        sampler.start()
+        assert wait_for(lambda: len(calls) >= 1)
+        sampler.stop()
+
+    def test_no_restart_while_previous_thread_alive(self):
+        release = threading.Event()
+        calls = []
+
+        def callback(tick):
+            calls.append(1)
+            release.wait(5)
+
+        sampler = SamplingThread(callback, interval=0.01)
+        sampler.start()
+        assert wait_for(lambda: len(calls) >= 1)
+        sampler.stop(timeout=0.05)
+        thread = sampler._thread
+        assert thread is not None and thread.is_alive()
+
+        sampler.start()
+        assert sampler.is_running is False
+        assert sampler._thread is thread
+
+        release.set()
+        sampler.stop()
+        assert sampler._thread is None
+        sampler.start()
+        assert sampler.is_running is True
+        sampler.stop()
+
+    def test_fractional_interval_without_drift(self):
+        ticks = []
+        sampler = SamplingThread(ticks.append, interval=0.02)
+        sampler.start()
+        assert wait_for(lambda: len(ticks) >= 10)
+        sampler.stop()
+
+        first = ticks[0]
+        for tick in ticks[1:10]:
+            # Сроки лежат строго на сетке start + n * interval
+            assert tick.scheduled_ns - first.scheduled_ns == (tick.index - first.index) * 20_000_000
+        assert all(tick.lateness_ms >= 0 for tick in ticks)
+
+    def test_skip_policy_drops_missed_deadlines(self):
+        ticks = []
+
+        def slow_callback(tick):
+            ticks.append(tick)
+            time.sleep(0.035)
+
+        sampler = SamplingThread(slow_callback, interval=0.01, policy='skip')
+        sampler.start()
+        assert wait_for(lambda: len(ticks) >= 3)
+        sampler.stop()
+
+        assert sampler.skipped_ticks > 0
+        # После пропуска срок следующего тика не в прошлом относительно завершения предыдущего
+        assert all(tick.lateness_ms < 20 for tick in ticks[1:3])
+
+    def test_catch_up_policy_runs_missed_ticks(self):
+        ticks = []
+
+        def callback(tick):
+            ticks.append(tick)
+            if tick.index == 0:
+                time.sleep(0.05)
+
+        sampler = SamplingThread(callback, interval=0.01, policy='catch_up')
+        sampler.start()
+        assert wait_for(lambda: len(ticks) >= 5)
+        sampler.stop()
+
+        assert sampler.skipped_ticks == 0
+        assert [tick.index for tick in ticks[:5]] == [0, 1, 2, 3, 4]
+        assert ticks[1].lateness_ms >= 30
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            SamplingThread(lambda tick: None, policy='unknown')
@@ -0,0 +1,103 @@
+import os
+import pytest
+
+from src.database import QUERY_COLUMNS
+from src.segment_log import (
+    HEADER_SIZE, RECORD_SIZE, SEGMENT_SUFFIX, SegmentLogHandler, SegmentReader, np
+)
+from tests.helpers import make_metrics
+
+
+class TestSegmentLogHandler:
+    @pytest.fixture
+    def log_path(self, tmp_path):
+        return str(tmp_path / "metrics.seg")
+
+    @pytest.fixture
+    def handler(self, log_path):
+        handler = SegmentLogHandler(log_path, segment_records=4)
+        yield handler
+        handler.close()
+
+    def test_append_and_range(self, handler):
+        batch = [make_metrics(1000 * i, cpu_percent=float(i), time_lapse=0.5) for i in range(1, 11)]
+        assert handler.adding_data_batch(batch) == 10
+        assert handler.adding_data(make_metrics(11_000, cpu_percent=11.0))
+        assert len(handler.segment_paths()) == 3
+
+        assert handler.get_series(('cpu_percent',), 2000, 6000) == [(1000 * i, float(i)) for i in range(2, 7)]
+        rows = handler.get_metrics_range(3000, 5000, limit=2)
+        assert len(rows) == 2
+        row = dict(zip(QUERY_COLUMNS, rows[0]))
+        assert row['id'] == 3 and row['ts_ms'] == 3000 and row['interval_ms'] == 500.0
+        assert row['session_id'] is None and row['monitoring_time'] is None
+
+    def test_segment_header_and_size(self, handler):
+        handler.adding_data_batch([make_metrics(i) for i in range(1, 5)])
+        path = handler.segment_paths()[0]
+        assert os.path.getsize(path) == HEADER_SIZE + 4 * RECORD_SIZE
+        assert RECORD_SIZE == 68
+
+    def test_invalid_metrics_skipped(self, handler):
+        metrics = make_metrics(1000)
+        metrics['cpu_percent'] = 'invalid'
+        assert handler.adding_data_batch([metrics, {'time_lapse': 1}]) == 0
+
+    def test_out_of_order_starts_new_segment(self, handler):
+        handler.adding_data_batch([make_metrics(ts) for ts in (5000, 6000, 1000)])
+        assert len(handler.segment_paths()) == 2
+        assert [row[0] for row in handler.get_series(('cpu_percent',), 0, 10_000)] == [5000, 6000, 1000]
+
+    def test_session_filter_and_sessions(self, handler):
+        session_id = handler.start_session()
+        handler.adding_data_batch([make_metrics(1000, session_id=session_id), make_metrics(2000)])
+        handler.end_session(session_id)
+
+        assert [row[0] for row in handler.iter_records(0, 3000, session_id=session_id)] == [1000]
+        assert handler.start_session() == 2
+        sessions = handler.get_sessions()
+        assert [session[0] for session in sessions] == [1, 2]
+        assert sessions[0][2] is not None and sessions[1][2] is None
+
+    def test_reopen_truncates_partial_record(self, log_path):
+        handler = SegmentLogHandler(log_path)
+        handler.adding_data_batch([make_metrics(1000), make_metrics(2000)])
+        handler.close()
+        with open(handler.segment_paths()[0], 'ab') as f:
+            f.write(b'\x01\x02\x03')
+
+        handler = SegmentLogHandler(log_path)
+        assert handler.adding_data(make_metrics(3000))
+        assert [row[0] for row in handler.get_series(('gpu_load',), 0, 5000)] == [1000, 2000, 3000]
+        handler.close()
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / f"00000001{SEGMENT_SUFFIX}"
+        path.write_bytes(b'not a segment' * 4)
+        with pytest.raises(ValueError):
+            SegmentReader(str(path))
+
+    def test_reader_sees_appended_records(self, handler):
+        handler.adding_data(make_metrics(1000))
+        assert len(handler.get_series(('cpu_percent',), 0, 5000)) == 1
+        handler.adding_data(make_metrics(2000))
+        assert len(handler.get_series(('cpu_percent',), 0, 5000)) == 2
+
+    def test_clear_all_metric(self, handler):
+        handler.adding_data_batch([make_metrics(i) for i in range(1, 7)])
+        assert handler.clear_all_metric()
+        assert handler.segment_paths() == []
+        assert handler.adding_data(make_metrics(1))
+        assert handler.get_series(('cpu_percent',), 0, 10) == [(1, 50.0)]
+
+    @pytest.mark.skipif(np is None, reason="NumPy не установлен")
+    def test_scan_arrays_zero_copy(self, handler):
+        handler.adding_data_batch([make_metrics(1000 * i, cpu_percent=float(i)) for i in range(1, 11)])
+        arrays = handler.scan_arrays(2500, 7000)
+
+        assert [len(array) for array in arrays] == [2, 3]
+        assert not arrays[0].flags.owndata and not arrays[0].flags.writeable
+        assert np.concatenate([array['cpu_percent'] for array in arrays]).tolist() == [3.0, 4.0, 5.0, 6.0, 7.0]
+
+        handler.close()
+        assert arrays[1]['ts_ms'].tolist() == [5000, 6000, 7000]
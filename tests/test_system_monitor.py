@@ -1,11 +1,11 @@
 import pytest
 import time
-import subprocess
-import logging
+import threading
 from unittest.mock import patch, MagicMock
 from PySide6.QtCore import QTimer
 
 from src.system_monitor import SystemMonitor
+from src.collector import MetricsCollector
 from src.database import DatabaseHandler
 
 
@@ -16,164 +16,97 @@ class TestSystemMonitor:
 
     @pytest.fixture
     def system_monitor(self, mock_database_handler):
-        return SystemMonitor(database_handler=mock_database_handler)
+        system_monitor = SystemMonitor(database_handler=mock_database_handler)
+        yield system_monitor
+        system_monitor.close()
 
     def test_init(self, system_monitor, mock_database_handler):
         assert system_monitor.database_handler == mock_database_handler
         assert system_monitor.monitoring == False
-        assert system_monitor.start_time is None
         assert system_monitor.time_lapse == 1
-        assert isinstance(system_monitor.metrics_timer, QTimer)
+        assert isinstance(system_monitor.collector, MetricsCollector)
         assert isinstance(system_monitor.timer_updater, QTimer)
 
     def test_set_time_lapse(self, system_monitor):
-        with patch.object(system_monitor.metrics_timer, 'start') as mock_start:
-            system_monitor.monitoring = True
+        with patch.object(system_monitor.collector, 'set_interval') as mock_set_interval:
             system_monitor.set_time_lapse(5)
+            mock_set_interval.assert_called_once_with(5)
 
-            assert system_monitor.time_lapse == 5
-            mock_start.assert_called_once_with(5 * 1000)
+    def test_history_window_follows_interval(self, system_monitor):
+        assert system_monitor.history.capacity == 1800
+        system_monitor._record_history({'timestamp_ms': 1000, 'cpu_percent': 25.0})
+
+        system_monitor.set_time_lapse(0.5)
+        assert system_monitor.history.capacity == 3600
+        assert len(system_monitor.history) == 1
 
     def test_start_monitoring(self, system_monitor):
-        with patch.object(system_monitor.metrics_timer, 'start'), \
-                patch.object(system_monitor.timer_updater, 'start'):
+        with patch.object(system_monitor.collector.sampler, 'start'), \
+                patch.object(system_monitor.timer_updater, 'start') as mock_timer_start:
             system_monitor.start_monitoring()
 
             assert system_monitor.monitoring == True
-            assert system_monitor.start_time is not None
+            mock_timer_start.assert_called_once_with(1000)
+
+    def test_start_monitoring_exception(self, system_monitor):
+        with patch.object(system_monitor.collector.sampler, 'start', side_effect=Exception("Test error")), \
+                patch.object(system_monitor.timer_updater, 'start') as mock_timer_start:
+            system_monitor.start_monitoring()
+
+            assert system_monitor.monitoring == False
+            mock_timer_start.assert_not_called()
 
     def test_stop_monitoring(self, system_monitor):
-        with patch.object(system_monitor.metrics_timer, 'stop'), \
-                patch.object(system_monitor.timer_updater, 'stop'):
-            system_monitor.monitoring = True
-            system_monitor.start_time = time.time()
+        with patch.object(system_monitor.collector.sampler, 'start'), \
+                patch.object(system_monitor.collector.sampler, 'stop'), \
+                patch.object(system_monitor.timer_updater, 'stop') as mock_timer_stop:
+            system_monitor.start_monitoring()
             system_monitor.stop_monitoring()
 
             assert system_monitor.monitoring == False
-            assert system_monitor.start_time is None
+            assert system_monitor.collector.start_time is None
+            mock_timer_stop.assert_called()
 
     def test_get_monitoring_time(self, system_monitor):
-        system_monitor.start_time = time.time() - 125
+        system_monitor.collector.start_time = time.monotonic() - 125
         assert system_monitor.get_monitoring_time() == "02:05"
-        system_monitor.start_time = None
-        assert system_monitor.get_monitoring_time() == ""
-
-    @patch('psutil.cpu_percent')
-    @patch('psutil.virtual_memory')
-    def test_get_ram_info(self, mock_virtual_memory, mock_cpu_percent, system_monitor):
-        mock_memory = MagicMock()
-        mock_memory.available = 4 * 1024 * 1024
-        mock_memory.total = 8 * 1024 * 1024
-        mock_virtual_memory.return_value = mock_memory
-        free_ram, total_ram = system_monitor.get_ram_info()
-
-        assert free_ram == 4.0
-        assert total_ram == 8.0
-
-    def test_gather_system_metrics(self, system_monitor):
-        with patch.object(system_monitor, 'get_ram_info', return_value=(4000.0, 8000.0)), \
-                patch.object(system_monitor, 'get_rom_info', return_value=(50.0, 100.0)), \
-                patch('psutil.cpu_percent', return_value=50.0):
-            system_monitor.start_time = time.time() - 125  # 2 минуты 5 секунд
-            metrics = system_monitor._gather_system_metrics()
-            assert metrics['cpu_percent'] == 50.0
-            assert metrics['ram_free_mb'] == 4000.0
-            assert metrics['ram_total_mb'] == 8000.0
-            assert metrics['disk_free_gb'] == 50.0
-            assert metrics['disk_total_gb'] == 100.0
-            assert metrics['monitoring_time'] == "02:05"
-
-    def test_collect_system_metrics(self, system_monitor, mock_database_handler):
-        with patch.object(system_monitor, '_gather_system_metrics', return_value={'cpu': 50}):
-            system_monitor._collect_system_metrics()
-            mock_database_handler.adding_data.assert_called_once_with({'cpu': 50})
-
-    def test_start_monitoring_exception(self, system_monitor):
-        with patch.object(system_monitor.metrics_timer, 'start', side_effect=Exception("Test error")), \
-                patch.object(system_monitor, 'stop_monitoring') as mock_stop:
-            system_monitor.monitoring = False
-            system_monitor.start_monitoring()
-            assert system_monitor.monitoring == False
-            mock_stop.assert_called_once()
 
     def test_update_monitoring_time(self, system_monitor):
         mock_signal = MagicMock()
         system_monitor.update_timer = mock_signal
-        system_monitor.start_time = time.time() - 125
+        system_monitor.collector.start_time = time.monotonic() - 125
         system_monitor._update_monitoring_time()
         mock_signal.emit.assert_called_once_with("02:05")
 
     def test_update_monitoring_time_no_start_time(self, system_monitor):
-        system_monitor.start_time = None
-        with patch.object(system_monitor, '_update_monitoring_time') as mock_method:
-            system_monitor._update_monitoring_time()
-            mock_method.assert_called_once()
-
-    def test_get_rom_info_subprocess_error(self, system_monitor):
-        with patch('subprocess.run', side_effect=subprocess.CalledProcessError(1, 'pydf')):
-            total_disk, disk_free = system_monitor.get_rom_info()
-
-            assert total_disk == 0.0
-            assert disk_free == 0.0
-
-    def test_get_rom_info_insufficient_lines(self, system_monitor):
-        with patch('subprocess.run') as mock_run:
-            mock_result = MagicMock()
-            mock_result.stdout = "Filesystem"
-            mock_run.return_value = mock_result
-            total_disk, disk_free = system_monitor.get_rom_info()
-            assert total_disk == 0.0
-            assert disk_free == 0.0
-
-    def test_get_rom_info_invalid_data_format(self, system_monitor):
-        with patch('subprocess.run') as mock_run:
-            mock_result = MagicMock()
-            mock_result.stdout = "Filesystem\n/dev/sda1 Incomplete Data"
-            mock_run.return_value = mock_result
-            total_disk, disk_free = system_monitor.get_rom_info()
-            assert total_disk == 0.0
-            assert disk_free == 0.0
-
-    def test_get_rom_info_value_conversion_error(self, system_monitor):
-        with patch('subprocess.run') as mock_run:
-            mock_result = MagicMock()
-            mock_result.stdout = "Filesystem     Size   Used  Avail  Use%\n/dev/sda1    SizeG   UsedG   AvailG   50%"
-            mock_run.return_value = mock_result
-            total_disk, disk_free = system_monitor.get_rom_info()
-            assert total_disk == 0.0
-            assert disk_free == 0.0
-
-    def test_get_rom_info_general_exception(self, system_monitor):
-        with patch('subprocess.run', side_effect=Exception("Unexpected error")):
-            total_disk, disk_free = system_monitor.get_rom_info()
-
-            assert total_disk == 0.0
-            assert disk_free == 0.0
-
-    def test_collect_system_metrics_exception_handling(self, system_monitor):
-        with patch.object(system_monitor, '_gather_system_metrics', side_effect=Exception("Test collect error")), \
-                patch.object(system_monitor.logger, 'error') as mock_logger:
-            system_monitor._collect_system_metrics()
-            mock_logger.assert_called_once_with("Ошибка сбора системных метрик: Test collect error")
-
-    def test_get_ram_info_exception_handling(self, system_monitor, caplog):
-        caplog.set_level(logging.ERROR)
-        caplog.clear()
-        with patch('psutil.virtual_memory', side_effect=Exception("Test RAM error")), \
-            patch.object(system_monitor.logger, 'error') as mock_logger:
-            free_ram, total_ram = system_monitor.get_ram_info()
-            assert free_ram == 0.0
-            assert total_ram == 0.0
-            mock_logger.assert_called_once_with("Ошибка получения RAM информации: Test RAM error")
-
-    def test_gather_system_metrics_none_values_handling(self, system_monitor, caplog):
-        caplog.set_level(logging.ERROR)
-        caplog.clear()
-        with patch('psutil.cpu_percent', return_value=None), \
-                patch.object(system_monitor, 'get_ram_info', return_value=(None, None)), \
-                patch.object(system_monitor, 'get_rom_info', return_value=(None, None)), \
-                patch.object(system_monitor.logger, 'error') as mock_logger:
-            result = system_monitor._gather_system_metrics()
-            assert result == {}
-            mock_logger.assert_called_once()
-            assert "Ошибка получения системных метрик" in mock_logger.call_args[0][0]
+        mock_signal = MagicMock()
+        system_monitor.update_timer = mock_signal
+        system_monitor._update_monitoring_time()
+        mock_signal.emit.assert_not_called()
+
+    def test_metrics_delivered_to_gui_thread(self, system_monitor, qtbot):
+        received_threads = []
+        system_monitor.update_metrics.connect(lambda metrics: received_threads.append(threading.current_thread()))
+        with patch.object(system_monitor.collector, 'gather_metrics', return_value={'cpu': 50}):
+            system_monitor.set_time_lapse(0.01)
+            system_monitor.start_monitoring()
+            qtbot.waitUntil(lambda: len(received_threads) > 0, timeout=5000)
+            system_monitor.stop_monitoring()
+
+        assert received_threads[0] is threading.main_thread()
+
+    def test_history_recorded_in_gui_thread(self, system_monitor, qtbot):
+        metrics = {'timestamp_ms': 1000, 'cpu_percent': 25.0}
+        with patch.object(system_monitor.collector, 'gather_metrics', return_value=metrics):
+            system_monitor.set_time_lapse(0.01)
+            system_monitor.start_monitoring()
+            qtbot.waitUntil(lambda: len(system_monitor.history) >= 3, timeout=5000)
+            system_monitor.stop_monitoring()
+
+        assert system_monitor.history.stats('cpu_percent')['avg'] == 25.0
+
+    def test_history_cleared_on_start(self, system_monitor):
+        system_monitor._record_history({'timestamp_ms': 1000, 'cpu_percent': 25.0})
+        with patch.object(system_monitor.collector.sampler, 'start'):
+            system_monitor.start_monitoring()
+        assert len(system_monitor.history) == 0
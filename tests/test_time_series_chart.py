@@ -0,0 +1,43 @@
+import math
+import pytest
+
+from src.UI.time_series_chart import TimeSeriesChart
+
+
+class TestTimeSeriesChart:
+    @pytest.fixture
+    def chart(self, qtbot):
+        chart = TimeSeriesChart("ЦП", "%", y_max=100.0)
+        qtbot.addWidget(chart)
+        chart.resize(208, 120)
+        return chart
+
+    def test_points_limited_by_pixel_width(self, chart):
+        xs = list(range(10_000))
+        chart.set_data(xs, [float(x % 100) for x in xs])
+        assert chart.point_count == chart.max_points() == 200
+
+    def test_resize_resamples(self, chart, qtbot):
+        xs = list(range(10_000))
+        chart.set_data(xs, [0.0] * len(xs))
+        chart.show()
+        qtbot.waitExposed(chart)
+        chart.resize(108, 120)
+        qtbot.waitUntil(lambda: chart.point_count == 100, timeout=1000)
+
+    def test_nan_breaks_line(self, chart):
+        chart.set_data([0, 1, 2, 3, 4], [1.0, 2.0, math.nan, 3.0, 4.0])
+        assert [polyline.size() for polyline in chart._polylines()] == [2, 2]
+
+    def test_y_range(self):
+        chart = TimeSeriesChart("ОЗУ", "МБ")
+        chart.set_data([0, 1], [100.0, 300.0])
+        assert chart._y_range() == (100.0, 300.0)
+        chart.set_data([0, 1], [5.0, 5.0])
+        assert chart._y_range() == (4.0, 6.0)
+
+    def test_paint_with_data(self, chart, qtbot):
+        chart.set_data([0, 1, 2], [10.0, 50.0, 90.0])
+        chart.show()
+        qtbot.waitExposed(chart)
+        chart.repaint()
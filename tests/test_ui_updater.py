@@ -0,0 +1,82 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from PySide6.QtWidgets import QLabel, QProgressBar
+
+from src.UI.ui_updater import UpdateCoalescer, WidgetUpdater
+
+
+class TestWidgetUpdater:
+    @pytest.fixture
+    def widgets(self, qtbot):
+        label = QLabel()
+        progress_bar = QProgressBar()
+        qtbot.addWidget(label)
+        qtbot.addWidget(progress_bar)
+        return {'label': label, 'progress': progress_bar}
+
+    def test_setters_chosen_once(self, widgets):
+        updater = WidgetUpdater(widgets)
+        assert updater.apply({'label': "1 МБ", 'progress': 42}) == 2
+        assert widgets['label'].text() == "1 МБ"
+        assert widgets['progress'].value() == 42
+
+    def test_unchanged_values_skipped(self, widgets):
+        updater = WidgetUpdater(widgets)
+        updater.apply({'label': "1 МБ", 'progress': 42})
+
+        with patch.object(widgets['label'], 'setText') as mock_set_text:
+            # Сеттеры привязаны при создании, поэтому подмена метода на виджете не действует
+            assert updater.apply({'label': "1 МБ", 'progress': 43}) == 1
+        mock_set_text.assert_not_called()
+        assert widgets['progress'].value() == 43
+
+    def test_invalidate(self, widgets):
+        updater = WidgetUpdater(widgets)
+        updater.apply({'label': "1 МБ"})
+        widgets['label'].setText("изменено извне")
+        updater.invalidate()
+
+        assert updater.apply({'label': "1 МБ"}) == 1
+        assert widgets['label'].text() == "1 МБ"
+
+
+class TestUpdateCoalescer:
+    def test_first_sample_applied_immediately(self, qtbot):
+        apply = MagicMock()
+        coalescer = UpdateCoalescer(apply, interval_ms=100)
+        coalescer.submit({'cpu_percent': 1})
+        apply.assert_called_once_with({'cpu_percent': 1})
+
+    def test_burst_keeps_only_latest(self, qtbot):
+        applied = []
+        coalescer = UpdateCoalescer(applied.append, interval_ms=100)
+        for value in range(10):
+            coalescer.submit({'cpu_percent': value})
+
+        assert applied == [{'cpu_percent': 0}]
+        qtbot.waitUntil(lambda: len(applied) == 2, timeout=1000)
+        assert applied[1] == {'cpu_percent': 9}
+        assert coalescer.dropped == 8
+
+    def test_rate_limited(self, qtbot):
+        applied_at = []
+        coalescer = UpdateCoalescer(lambda metrics: applied_at.append(time.monotonic()), interval_ms=50)
+        deadline = time.monotonic() + 0.3
+        while time.monotonic() < deadline:
+            coalescer.submit({})
+            qtbot.wait(5)
+
+        intervals = [later - earlier for earlier, later in zip(applied_at, applied_at[1:])]
+        assert len(applied_at) <= 8
+        assert min(intervals) >= 0.045
+
+    def test_cancel_drops_pending(self, qtbot):
+        apply = MagicMock()
+        coalescer = UpdateCoalescer(apply, interval_ms=50)
+        coalescer.submit({'cpu_percent': 1})
+        coalescer.submit({'cpu_percent': 2})
+        coalescer.cancel()
+        qtbot.wait(100)
+
+        apply.assert_called_once_with({'cpu_percent': 1})